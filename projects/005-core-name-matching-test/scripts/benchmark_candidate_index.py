@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Recall / Throughput Benchmark for the Tier 2 Candidate Index
+Measures how often the true match survives candidate generation (recall@K)
+and how much faster candidate scoring is than the all-pairs scan
+"""
+
+import os
+import sys
+import time
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+# Shared production matcher lives in src/analysis/01-core-name-matching
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+from tier2_matcher import Tier2NameMatcher
+
+
+def run_benchmark(test_file: str, k_values: list, exhaustive_sample: int = 50):
+    """
+    Benchmark candidate generation against the labeled test dataset.
+
+    Every variant name is used as a query against the index of all unique
+    reference names; a labeled positive pair counts as recalled when its
+    reference name is among the query's top-K candidates.
+    """
+    test_df = pd.read_csv(test_file)
+    test_df['expected_match'] = test_df['expected_match'].astype(str).str.lower().isin(['true', '1', 'yes'])
+    positives = test_df[test_df['expected_match']]
+
+    references = test_df['reference_name'].drop_duplicates().tolist()
+    ref_position = {name: pos for pos, name in enumerate(references)}
+
+    # No API calls are made; a placeholder key keeps the client constructor happy
+    matcher = Tier2NameMatcher(api_key=os.getenv('OPENAI_API_KEY', 'benchmark-no-ai'))
+
+    print("=" * 70)
+    print("TIER 2 CANDIDATE INDEX BENCHMARK")
+    print("=" * 70)
+    print(f"Test file: {test_file}")
+    print(f"Reference names indexed: {len(references):,}")
+    print(f"Queries: {len(positives):,} labeled positive pairs")
+
+    start = time.time()
+    index = matcher.build_candidate_index(references)
+    build_time = time.time() - start
+    print(f"Index build time: {build_time:.3f}s")
+
+    queries = [matcher.preprocess_name(name) for name in positives['variant_name']]
+    targets = [ref_position[name] for name in positives['reference_name']]
+    max_k = max(k_values)
+
+    # Candidate generation throughput
+    start = time.time()
+    candidate_lists = [[pos for pos, _ in index.candidates_clean(q, top_k=max_k)] for q in queries]
+    candidate_time = time.time() - start
+
+    # Full scoring of top-K candidates (what match_dataframes does per name)
+    start = time.time()
+    scored_pairs = 0
+    for query, candidates in zip(queries, candidate_lists):
+        for pos in candidates:
+            matcher.fuzzy_match_preprocessed(query, index.clean_names[pos])
+            scored_pairs += 1
+    scoring_time = time.time() - start
+
+    # Exhaustive scan on a sample of queries, extrapolated
+    sample = queries[:exhaustive_sample]
+    start = time.time()
+    for query in sample:
+        for clean_b in index.clean_names:
+            matcher.fuzzy_match_preprocessed(query, clean_b)
+    exhaustive_time = (time.time() - start) / max(len(sample), 1) * len(queries)
+
+    print("\nRecall@K (true reference among top-K candidates):")
+    for k in sorted(k_values):
+        hits = sum(target in candidates[:k] for target, candidates in zip(targets, candidate_lists))
+        print(f"  K={k:>4}: {hits / len(targets):.3%} ({hits}/{len(targets)})")
+
+    missed = [(name, ref) for name, ref, target, candidates in
+              zip(positives['variant_name'], positives['reference_name'], targets, candidate_lists)
+              if target not in candidates]
+    if missed:
+        print(f"\nMissed at K={max_k} (showing up to 10):")
+        for name, ref in missed[:10]:
+            print(f"  {name!r} -> {ref!r}")
+
+    indexed_time = candidate_time + scoring_time
+    all_pairs = len(queries) * len(references)
+    print("\nThroughput:")
+    print(f"  Candidate generation: {len(queries) / candidate_time:,.0f} queries/sec")
+    print(f"  Indexed (K={max_k}) total: {indexed_time:.2f}s for {scored_pairs:,} scored pairs")
+    print(f"  Exhaustive (estimated): {exhaustive_time:.2f}s for {all_pairs:,} scored pairs")
+    print(f"  Pair reduction: {1 - scored_pairs / all_pairs:.2%}")
+    print(f"  Speedup: {exhaustive_time / indexed_time:.1f}x")
+
+    return {
+        'build_time': build_time,
+        'candidate_time': candidate_time,
+        'scoring_time': scoring_time,
+        'exhaustive_time_estimate': exhaustive_time,
+        'recall': {k: float(np.mean([t in c[:k] for t, c in zip(targets, candidate_lists)])) for k in k_values}
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--test-file', default='test-data/test-data-inputs/test_dataset.csv',
+                       help='Path to labeled test dataset CSV')
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 5, 10, 25, 50],
+                       help='Candidate list sizes to report recall for')
+    parser.add_argument('--exhaustive-sample', type=int, default=50,
+                       help='Queries used to estimate the all-pairs scan time')
+
+    args = parser.parse_args()
+
+    run_benchmark(args.test_file, args.k, args.exhaustive_sample)
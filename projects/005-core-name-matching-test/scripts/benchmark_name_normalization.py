@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the Shared Name Normalization Pipeline
+Reports names/second for each normalization profile (cold cache, warm cache
+and normalize_series over a column with repeated names)
+"""
+
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+
+# Shared normalization lives in src/analysis/01-core-name-matching
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+from name_normalization import NORMALIZERS
+
+
+def run_benchmark(test_file: str, repeat: int = 5):
+    """Time every profile over the names in the test dataset"""
+    test_df = pd.read_csv(test_file)
+    column = pd.concat([test_df['reference_name'], test_df['variant_name']], ignore_index=True)
+    column = pd.concat([column] * repeat, ignore_index=True)
+    unique_names = column.drop_duplicates().tolist()
+
+    print("=" * 70)
+    print("NAME NORMALIZATION MICROBENCHMARK")
+    print("=" * 70)
+    print(f"Names: {len(column):,} total, {len(unique_names):,} unique")
+    print(f"\n{'Profile':<12} {'Cold (names/s)':>16} {'Warm (names/s)':>16} {'Series (names/s)':>18}")
+
+    results = {}
+    for profile, normalizer in NORMALIZERS.items():
+        normalizer.cache_clear()
+        start = time.perf_counter()
+        for name in unique_names:
+            normalizer.normalize(name)
+        cold = len(unique_names) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for name in column:
+            normalizer.normalize(name)
+        warm = len(column) / (time.perf_counter() - start)
+
+        normalizer.cache_clear()
+        start = time.perf_counter()
+        normalizer.normalize_series(column)
+        series = len(column) / (time.perf_counter() - start)
+
+        results[profile] = {'cold': cold, 'warm': warm, 'series': series}
+        print(f"{profile:<12} {cold:>16,.0f} {warm:>16,.0f} {series:>18,.0f}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--test-file', default='test-data/test-data-inputs/test_dataset.csv',
+                       help='Path to test dataset CSV')
+    parser.add_argument('--repeat', type=int, default=5,
+                       help='Times the name column is repeated to simulate duplicates')
+
+    args = parser.parse_args()
+
+    run_benchmark(args.test_file, args.repeat)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Blocking Quality Evaluation for Multi-Key Blocking
+Reports pair reduction ratio and pairs completeness (share of labeled true
+matches that survive blocking) for the multi-key blocker, each key on its own,
+and the legacy first-letter blocking used by the OP/RX runners
+"""
+
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+
+# Shared production matcher lives in src/analysis/01-core-name-matching
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+from blocking import MultiKeyBlocker, KEY_TYPES
+from pair_generation import count_blocked_pairs
+
+
+def first_letter_key(name: str) -> str:
+    """Legacy blocking key of the 192 runners (first character after articles)"""
+    name = str(name).strip().upper()
+    for prefix in ['THE ', 'A ', 'AN ']:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    if not name:
+        return 'UNKNOWN'
+    if name[0].isdigit():
+        return 'NUMERIC'
+    return name[0] if name[0].isalpha() else 'SPECIAL'
+
+
+def run_evaluation(test_file: str, key_types: list, bands: int, rows: int, max_block_size: int = None):
+    """
+    Evaluate blocking against the labeled test dataset.
+
+    Every unique variant name is blocked against every unique reference name;
+    labeled positive pairs are the ground truth.
+    """
+    test_df = pd.read_csv(test_file)
+    test_df['expected_match'] = test_df['expected_match'].astype(str).str.lower().isin(['true', '1', 'yes'])
+    positives = test_df[test_df['expected_match']]
+
+    variants = test_df['variant_name'].drop_duplicates().tolist()
+    references = test_df['reference_name'].drop_duplicates().tolist()
+    true_pairs = list(zip(positives['variant_name'], positives['reference_name']))
+    total = len(variants) * len(references)
+
+    print("=" * 70)
+    print("MULTI-KEY BLOCKING EVALUATION")
+    print("=" * 70)
+    print(f"Test file: {test_file}")
+    print(f"{len(variants):,} variant x {len(references):,} reference names = {total:,} pairs")
+    print(f"Labeled true pairs: {len(set(true_pairs)):,}")
+    print(f"Keys: {', '.join(key_types)} (MinHash {bands} bands x {rows} rows)")
+
+    blocker = MultiKeyBlocker(key_types=key_types, minhash_bands=bands, minhash_rows=rows,
+                              max_block_size=max_block_size)
+    start = time.time()
+    report = blocker.evaluate(variants, references, true_pairs)
+    elapsed = time.time() - start
+
+    # Legacy first-letter blocking
+    variant_keys = {name: first_letter_key(name) for name in variants}
+    reference_keys = {name: first_letter_key(name) for name in references}
+    legacy_candidates = count_blocked_pairs(list(variant_keys.values()), list(reference_keys.values()))
+    legacy_found = sum(variant_keys[a] == reference_keys[b] for a, b in set(true_pairs))
+
+    print(f"\n{'Blocking':<22}{'Candidates':>12}{'Reduction':>12}{'Completeness':>14}")
+    print(f"{'first letter (legacy)':<22}{legacy_candidates:>12,}{1 - legacy_candidates / total:>12.2%}"
+          f"{legacy_found / len(set(true_pairs)):>14.2%}")
+    for key_type, stats in report['by_key'].items():
+        print(f"{key_type:<22}{stats['candidates']:>12,}{1 - stats['candidates'] / total:>12.2%}"
+              f"{stats['pairs_completeness']:>14.2%}")
+    print(f"{'multi-key union':<22}{report['candidates']:>12,}{report['reduction_ratio']:>12.2%}"
+          f"{report['pairs_completeness']:>14.2%}")
+    print(f"\nPairs quality (true pairs per candidate): {report['pairs_quality']:.3%}")
+    print(f"Evaluation time (incl. per-key runs): {elapsed:.2f}s")
+
+    # Completeness by variant type shows which keys cover which perturbations
+    missed = set(report['missed'])
+    by_type = positives.assign(found=[(a, b) not in missed for a, b in true_pairs])
+    print("\nPairs completeness by variant type:")
+    for variant_type, group in by_type.groupby('variant_type'):
+        print(f"  {variant_type:<14} {group['found'].mean():>8.2%} ({group['found'].sum()}/{len(group)})")
+
+    if report['missed']:
+        print(f"\nMissed true pairs (showing up to 10 of {len(report['missed'])}):")
+        for name, ref in report['missed'][:10]:
+            print(f"  {name!r} -> {ref!r}")
+
+    report['legacy_candidates'] = legacy_candidates
+    report['legacy_pairs_completeness'] = legacy_found / len(set(true_pairs))
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--test-file', default='test-data/test-data-inputs/test_dataset.csv',
+                       help='Path to labeled test dataset CSV')
+    parser.add_argument('--keys', nargs='+', default=list(KEY_TYPES), choices=KEY_TYPES,
+                       help='Blocking key types to combine')
+    parser.add_argument('--bands', type=int, default=20, help='MinHash LSH bands')
+    parser.add_argument('--rows', type=int, default=3, help='MinHash rows per band')
+    parser.add_argument('--max-block-size', type=int, default=None,
+                       help='Skip keys shared by more reference names than this')
+
+    args = parser.parse_args()
+
+    run_evaluation(args.test_file, args.keys, args.bands, args.rows, args.max_block_size)
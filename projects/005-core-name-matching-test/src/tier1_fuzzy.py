@@ -3,11 +3,17 @@ Tier 1: Enhanced Fuzzy Matching for Healthcare Organizations
 Uses multiple algorithms to calculate similarity scores
 """
 
+import sys
+from pathlib import Path
 from rapidfuzz import fuzz
 import jellyfish
-import re
 from typing import Dict, Tuple
 
+# Shared normalization lives in src/analysis/01-core-name-matching
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+from name_normalization import HEALTHCARE_NORMALIZER
+
 
 def fuzzy_match(name_a: str, name_b: str) -> Tuple[float, Dict[str, float]]:
     """
@@ -63,80 +69,15 @@ def preprocess_healthcare(name: str) -> str:
     """
     Preprocess healthcare organization names for better matching.
     
+    Uses the shared precompiled 'healthcare' normalization profile.
+    
     Args:
         name: Organization name to preprocess
         
     Returns:
         Cleaned and standardized name
     """
-    if not name:
-        return ""
-    
-    name = str(name).lower().strip()
-    
-    # Healthcare-specific abbreviation expansions
-    replacements = {
-        r'\bhosp\.?\b': 'hospital',
-        r'\bhosps\.?\b': 'hospitals',
-        r'\bmed\.?\b': 'medical',
-        r'\bctr\.?\b': 'center',
-        r'\bctrs\.?\b': 'centers',
-        r'\bhc\b': 'healthcare',
-        r'\bhca\b': 'healthcare',
-        r'\bhlth\b': 'health',
-        r'\bsvcs?\b': 'services',
-        r'\bmgmt\b': 'management',
-        r'\bassoc\.?\b': 'associates',
-        r'\bgrp\.?\b': 'group',
-        r'\buniv\.?\b': 'university',
-        r'\bsys\.?\b': 'system',
-        r'\bphys\.?\b': 'physicians',
-        r'\bclin\.?\b': 'clinic',
-        r'\brehab\.?\b': 'rehabilitation',
-        r'\bspec\.?\b': 'specialty',
-        r'\bemerg\.?\b': 'emergency',
-        r'\bsurg\.?\b': 'surgical',
-        r'\bortho\.?\b': 'orthopedic',
-        r'\bcardio\.?\b': 'cardiovascular',
-        r'\bpeds?\b': 'pediatric',
-        r'\bob\/gyn\b': 'obstetrics gynecology',
-        r'\bobgyn\b': 'obstetrics gynecology',
-        r'\ber\b': 'emergency room',
-        r'\bicu\b': 'intensive care unit',
-        r'\bdba\b': '',  # Remove "doing business as"
-        r'\bfka\b': '',  # Remove "formerly known as"
-        r'\bcorp\.?\b': 'corporation',
-        r'\binc\.?\b': 'incorporated',
-        r'\bllc\b': 'limited liability company',
-        r'\bllp\b': 'limited liability partnership',
-        r'\bltd\.?\b': 'limited',
-        r'\bco\.?\b': 'company',
-        r'\bst\.?\b': 'saint',
-        r'\bmt\.?\b': 'mount'
-    }
-    
-    # Apply replacements
-    for pattern, replacement in replacements.items():
-        name = re.sub(pattern, replacement, name)
-    
-    # Remove common suffixes that don't add value
-    suffixes_to_remove = [
-        'incorporated', 'corporation', 'limited liability company', 
-        'limited liability partnership', 'limited', 'company',
-        'llc', 'llp', 'inc', 'corp', 'ltd', 'co'
-    ]
-    
-    for suffix in suffixes_to_remove:
-        if name.endswith(f' {suffix}'):
-            name = name[:-len(suffix)-1].strip()
-    
-    # Remove punctuation except hyphens and spaces
-    name = re.sub(r'[^\w\s-]', '', name)
-    
-    # Normalize whitespace
-    name = ' '.join(name.split())
-    
-    return name
+    return HEALTHCARE_NORMALIZER.normalize(name)
 
 
 def calculate_confidence_level(score: float) -> str:
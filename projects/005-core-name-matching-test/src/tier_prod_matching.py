@@ -5,14 +5,20 @@ Based on conflixis-engine PR #1362 company-matching-api
 """
 
 import os
+import sys
 import time
+from pathlib import Path
 from typing import Dict, Tuple, List, Optional
 from rapidfuzz import fuzz
 import jellyfish
-import re
 from openai import OpenAI
 from dotenv import load_dotenv
 
+# Shared normalization lives in src/analysis/01-core-name-matching
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+from name_normalization import TIER_PROD_NORMALIZER
+
 # Load environment variables
 load_dotenv()
 
@@ -70,44 +76,10 @@ def calculate_edit_distance(str1: str, str2: str) -> int:
 def preprocess_name(name: str) -> str:
     """
     Preprocess company name for matching (normalization).
-    Based on PR1362's normalizeCompanyName function.
+    Based on PR1362's normalizeCompanyName function, via the shared
+    precompiled 'tier_prod' normalization profile.
     """
-    if not name:
-        return ""
-    
-    name = str(name).lower().strip()
-    
-    # Remove common suffixes
-    suffixes = [
-        r'\binc\.?$', r'\bincorporated$', r'\bcorp\.?$', r'\bcorporation$',
-        r'\bllc\.?$', r'\bllp\.?$', r'\blp\.?$', r'\bltd\.?$', r'\blimited$',
-        r'\bco\.?$', r'\bcompany$', r'\bplc\.?$', r'\bgmbh$', r'\bsa$', r'\bag$'
-    ]
-    for suffix in suffixes:
-        name = re.sub(suffix, '', name, flags=re.IGNORECASE)
-    
-    # Healthcare-specific expansions (our addition)
-    replacements = {
-        r'\bhosp\.?\b': 'hospital',
-        r'\bmed\.?\b': 'medical',
-        r'\bctr\.?\b': 'center',
-        r'\bhc\b': 'healthcare',
-        r'\bhlth\b': 'health',
-        r'\bsvcs?\b': 'services',
-        r'\bmgmt\b': 'management',
-        r'\bgrp\.?\b': 'group',
-        r'\buniv\.?\b': 'university',
-        r'\bsys\.?\b': 'system',
-    }
-    for pattern, replacement in replacements.items():
-        name = re.sub(pattern, replacement, name)
-    
-    # Remove special characters but keep spaces
-    name = re.sub(r'[^\w\s]', ' ', name)
-    # Normalize whitespace
-    name = ' '.join(name.split())
-    
-    return name
+    return TIER_PROD_NORMALIZER.normalize(name)
 
 
 def elasticsearch_style_search(query: str, candidate: str) -> Dict[str, float]:
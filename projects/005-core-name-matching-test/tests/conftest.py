@@ -0,0 +1,35 @@
+"""Shared fixtures for the name matching tests"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+# Shared production matcher lives in src/analysis/01-core-name-matching
+sys.path.append(str(REPO_ROOT / 'src' / 'analysis' / '01-core-name-matching'))
+
+TEST_DATASET = PROJECT_DIR / 'test-data' / 'test-data-inputs' / 'test_dataset.csv'
+MANUFACTURER_FILES = [
+    REPO_ROOT / 'projects' / '192-op-rx-manufacturer-matching' / 'data' / 'input' / 'op_manufacturers.csv',
+    REPO_ROOT / 'projects' / '192-op-rx-manufacturer-matching' / 'data' / 'input' / 'rx_manufacturers.csv',
+]
+
+
+@pytest.fixture(scope='session')
+def test_dataset() -> pd.DataFrame:
+    """Labeled reference/variant name pairs"""
+    return pd.read_csv(TEST_DATASET)
+
+
+@pytest.fixture(scope='session')
+def real_names(test_dataset) -> list:
+    """Every distinct organization name in the 005 test dataset and the 192 manufacturer inputs"""
+    names = set(test_dataset['reference_name'].dropna().astype(str))
+    names |= set(test_dataset['variant_name'].dropna().astype(str))
+    for path in MANUFACTURER_FILES:
+        names |= set(pd.read_csv(path)['manufacturer_name'].dropna().astype(str))
+    return sorted(names)
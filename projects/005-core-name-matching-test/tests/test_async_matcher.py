@@ -0,0 +1,312 @@
+"""Async Tier 2 engine (AsyncTier2Matcher) against a fake OpenAI client and a fake OpenAI server"""
+
+import asyncio
+import email.utils
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from async_matcher import AIMDConcurrencyLimiter, AsyncTier2Matcher, TokenBucket, retry_after_seconds
+from tier2_matcher import Tier2NameMatcher
+
+
+class FakeCompletions:
+    """chat.completions stand-in answering every pair with a fixed confidence"""
+
+    def __init__(self, confidence: str = '40'):
+        self.confidence = confidence
+        self.request_times = []
+
+    async def create(self, **kwargs):
+        self.request_times.append(time.monotonic())
+        message = SimpleNamespace(content=self.confidence)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class MalformedCompletions(FakeCompletions):
+    """Returns responses without choices, which the engine cannot read"""
+
+    async def create(self, **kwargs):
+        self.request_times.append(time.monotonic())
+        return SimpleNamespace(choices=[], usage=None)
+
+
+class FakeAsyncClient:
+    def __init__(self, completions: FakeCompletions):
+        self.chat = SimpleNamespace(completions=completions)
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def completions():
+    return FakeCompletions()
+
+
+@pytest.fixture
+def engine(completions):
+    # No real API calls are made; a placeholder key keeps the client constructor happy
+    matcher = Tier2NameMatcher(api_key='async-no-ai', model='gpt-4o-mini')
+    matcher.cache = None
+    engine = AsyncTier2Matcher(matcher=matcher, requests_per_minute=60, max_concurrency=8)
+    engine._make_client = lambda: FakeAsyncClient(completions)
+    yield engine
+    engine.close()
+
+
+def low_confidence_pairs(batch: int, size: int):
+    """Dissimilar names, so every pair is sent to the AI"""
+    return [(f"Alpha Manufacturer {batch}-{i}", f"Zeta Pharmaceuticals {i * 7919}") for i in range(size)]
+
+
+def test_rate_limit_holds_across_batches(engine, completions):
+    # Three batches use up the 60 requests/min burst between them
+    for batch in range(3):
+        results = engine.match_batch(low_confidence_pairs(batch, 20))
+        assert all(result['ai_reasoning'] == "AI enhanced" for result in results)
+    assert len(completions.request_times) == 60
+
+    # A fresh bucket per batch would send these at once; the shared one refills at 1 request/sec
+    start = time.monotonic()
+    engine.match_batch(low_confidence_pairs(3, 2))
+    assert time.monotonic() - start >= 1.5
+    assert len(completions.request_times) == 62
+    assert engine.get_statistics()['requests'] == 62
+
+
+def test_client_shared_and_closed(engine):
+    engine.match_batch(low_confidence_pairs(0, 2))
+    client = engine._client
+    engine.match_batch(low_confidence_pairs(1, 2))
+    assert engine._client is client
+
+    engine.close()
+    assert client.closed
+
+
+def test_unexpected_errors_fall_back_to_fuzzy(engine):
+    completions = MalformedCompletions()
+    engine._make_client = lambda: FakeAsyncClient(completions)
+    # More pairs than the queue holds: the run only finishes if the workers survive
+    pairs = low_confidence_pairs(0, engine.max_concurrency * 6)
+
+    results = engine.match_batch(pairs)
+
+    assert len(completions.request_times) == len(pairs)
+    assert all(result['ai_reasoning'].startswith("Error:") for result in results)
+    assert all(result['ai_score'] == result['fuzzy_score'] for result in results)
+    assert engine.get_statistics()['failures'] == len(pairs)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions endpoint with a sliding-window rate limit (429 + Retry-After)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+
+        with server.lock:
+            now = time.monotonic()
+            while server.window and now - server.window[0] > server.window_seconds:
+                server.window.popleft()
+            if len(server.window) >= server.limit:
+                retry_after = server.window_seconds - (now - server.window[0])
+                server.log.append((now, 429, retry_after))
+                self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                                'code': 'rate_limit_exceeded'}},
+                                {'retry-after-ms': str(int(retry_after * 1000))})
+                return
+            server.window.append(now)
+            server.log.append((now, 200, None))
+
+        prompt = request['messages'][-1]['content']
+        self._send_json(200, {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'gpt-4o-mini'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': '40'},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': 2,
+                      'total_tokens': len(prompt) // 4 + 2}
+        })
+
+
+@pytest.fixture
+def fake_server():
+    """Fake OpenAI server accepting `limit` requests per `window_seconds` on a free local port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.limit = 2
+    server.window_seconds = 1.0
+    server.window = deque()
+    server.lock = threading.Lock()
+    server.log = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def server_engine(server, **kwargs) -> AsyncTier2Matcher:
+    matcher = Tier2NameMatcher(api_key='async-no-ai', model='gpt-4o-mini')
+    matcher.cache = None
+    # Client-side budget well above the server's, so only the server's 429s slow it down
+    return AsyncTier2Matcher(matcher=matcher, api_key='async-no-ai',
+                             base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                             requests_per_minute=6000, **kwargs)
+
+
+def test_retry_after_pauses_requests(fake_server):
+    engine = server_engine(fake_server, initial_concurrency=2, max_concurrency=2)
+    try:
+        results = engine.match_batch(low_confidence_pairs(0, 6))
+    finally:
+        engine.close()
+
+    # Every pair is eventually adjudicated, none falls back to the fuzzy score
+    assert all(result['ai_reasoning'] == "AI enhanced" for result in results)
+    stats = engine.get_statistics()
+    assert stats['throttled'] >= 1
+    assert stats['successes'] == 6
+    assert stats['retries'] == stats['throttled']
+
+    # Once a 429 is answered, nothing new reaches the server until its Retry-After has passed
+    # (a request already on the wire may still arrive in the first few milliseconds)
+    log = fake_server.log
+    for arrived, status, retry_after in log:
+        if status == 429:
+            early = [t for t, _, _ in log if arrived + 0.1 < t < arrived + retry_after - 0.05]
+            assert early == []
+    accepted = [t for t, status, _ in log if status == 200]
+    assert accepted[-1] - accepted[0] >= 2 * fake_server.window_seconds * 0.9
+
+
+def test_throttling_halves_concurrency(fake_server):
+    fake_server.limit = 4
+    engine = server_engine(fake_server, initial_concurrency=8, max_concurrency=8)
+    try:
+        results = engine.match_batch(low_confidence_pairs(0, 12))
+    finally:
+        engine.close()
+
+    assert all(result['ai_reasoning'] == "AI enhanced" for result in results)
+    stats = engine.get_statistics()
+    assert stats['concurrency_decreases'] >= 1
+    assert stats['peak_concurrency'] == 8
+    assert engine._limiter.limit < 8
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'retry-after-ms': '1500'}, 1.5),
+    ({'retry-after': '2'}, 2.0),
+    ({'retry-after-ms': 'soon', 'retry-after': '3'}, 3.0),
+    ({'retry-after': 'not a date'}, None),
+    ({}, None),
+])
+def test_retry_after_headers(headers, expected):
+    error = SimpleNamespace(response=SimpleNamespace(headers=headers))
+    assert retry_after_seconds(error) == expected
+
+
+def test_retry_after_http_date():
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    error = SimpleNamespace(response=SimpleNamespace(headers={'retry-after': date}))
+    assert 28 <= retry_after_seconds(error) <= 30
+
+
+def test_aimd_halves_once_per_cooldown_and_grows_additively(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('async_matcher.time.monotonic', lambda: clock[0])
+    limiter = AIMDConcurrencyLimiter(initial=8, min_limit=1, max_limit=10, cooldown=2.0)
+
+    limiter.on_throttle()
+    assert limiter.limit == 4
+    # A burst of 429s is one congestion signal
+    limiter.on_throttle()
+    assert limiter.limit == 4 and limiter.decreases == 1
+
+    clock[0] += 2.0
+    limiter.on_throttle()
+    assert limiter.limit == 2
+
+    # About +1 per window of `limit` successes
+    for _ in range(2):
+        limiter.on_success()
+    assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 10
+
+    for _ in range(10):
+        clock[0] += 2.0
+        limiter.on_throttle()
+    assert limiter.limit == 1
+
+
+def test_aimd_caps_in_flight_requests():
+    limiter = AIMDConcurrencyLimiter(initial=3)
+
+    async def request():
+        async with limiter:
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(20)))
+
+    asyncio.run(run())
+    assert limiter.peak_in_flight == 3
+    assert limiter.in_flight == 0
+
+
+def test_token_bucket_bursts_then_refills():
+    # 10 per second, burst of 5
+    bucket = TokenBucket(600, capacity=5)
+
+    async def take(count):
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire(1)
+        return time.monotonic() - start
+
+    assert asyncio.run(take(5)) < 0.05
+    assert 0.25 <= asyncio.run(take(3)) < 0.5
+
+    # Usage above the estimate puts the bucket into debt, delaying the next acquisition
+    bucket.adjust(5)
+    assert asyncio.run(take(1)) >= 0.5
+
+
+def test_token_bucket_pause_blocks_acquisitions():
+    bucket = TokenBucket(6000)
+    bucket.pause(0.3)
+    bucket.pause(0.1)  # A shorter pause does not cut the longer one
+
+    async def take():
+        start = time.monotonic()
+        await bucket.acquire(1)
+        return time.monotonic() - start
+
+    assert asyncio.run(take()) >= 0.28
+    assert asyncio.run(take()) < 0.05
@@ -0,0 +1,159 @@
+"""Multi-pair AI adjudication (enhance_with_ai_batch) against a stubbed OpenAI client"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from llm_cache import LLMVerdictCache
+from tier2_matcher import Tier2NameMatcher
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('{"scores": [{"id": 1, "confidence": 90}, {"id": 2, "confidence": "15%"}]}', {1: 90.0, 2: 15.0}),
+    # Entries may come back out of order
+    ('{"scores": [{"id": 2, "confidence": 15}, {"id": 1, "confidence": 90}]}', {1: 90.0, 2: 15.0}),
+    # Ids default to the entry position; bare arrays are in pair order
+    ('{"scores": [{"confidence": 90}, {"confidence": 15}]}', {1: 90.0, 2: 15.0}),
+    ('[90, 15]', {1: 90.0, 2: 15.0}),
+    # Partial replies keep only the valid entries
+    ('{"scores": [{"id": 1, "confidence": 90}]}', {1: 90.0}),
+    ('{"scores": [{"id": 1, "confidence": "high"}, {"id": 2, "confidence": 15}]}', {2: 15.0}),
+    ('{"scores": [{"id": 1}, {"id": 2, "confidence": null}, {"id": 2, "confidence": 15}]}', {2: 15.0}),
+    ('{"scores": [{"id": 1, "confidence": 150}, {"id": 2, "confidence": -5}]}', {}),
+    ('{"scores": [{"id": 3, "confidence": 90}, {"id": 0, "confidence": 90}]}', {}),
+    # A duplicated id keeps its first answer
+    ('{"scores": [{"id": 1, "confidence": 90}, {"id": 1, "confidence": 10}]}', {1: 90.0}),
+    ('{"scores": "90, 15"}', {}),
+    ('{"result": []}', {}),
+    ('[]', {}),
+])
+def test_parse_batch_scores(reply, expected):
+    assert Tier2NameMatcher._parse_batch_scores(reply, expected=2) == expected
+
+
+@pytest.mark.parametrize('reply', ['', 'Scores: 90, 15', '{"scores": [{"id": 1, "confidence": 90}'])
+def test_parse_batch_scores_rejects_invalid_json(reply):
+    # The caller treats the error like a failed request and re-sends every pair
+    with pytest.raises(ValueError):
+        Tier2NameMatcher._parse_batch_scores(reply, expected=2)
+
+
+class StubCompletions:
+    """chat.completions stand-in: scripted replies to batch requests, fixed answers to single pairs"""
+
+    def __init__(self, batch_replies, single_reply='20'):
+        self.batch_replies = list(batch_replies)
+        self.single_reply = single_reply
+        self.batch_prompts = []
+        self.single_prompts = []
+
+    def create(self, **kwargs):
+        prompt = kwargs['messages'][-1]['content']
+        if 'response_format' in kwargs:
+            self.batch_prompts.append(prompt)
+            reply = self.batch_replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+        else:
+            self.single_prompts.append(prompt)
+            reply = self.single_reply
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=5)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))], usage=usage)
+
+
+def make_matcher(completions, cache=None, ai_batch_size=3):
+    # No real API calls are made; a placeholder key keeps the client constructor happy
+    matcher = Tier2NameMatcher(api_key='batch-no-ai', ai_batch_size=ai_batch_size, max_workers=1)
+    matcher.cache = cache
+    matcher.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return matcher
+
+
+ITEMS = [
+    ('Acme Health', 'Acme Healthcare Systems', 60.0),
+    ('Bolt Medical', 'Volt Medical Devices', 55.0),
+    ('Cobalt Pharma', 'Kobalt Pharmaceuticals', 70.0),
+]
+
+
+def scores(*confidences):
+    return json.dumps({'scores': [{'id': n, 'confidence': c} for n, c in enumerate(confidences, 1)]})
+
+
+def test_one_request_answers_the_whole_batch():
+    completions = StubCompletions([scores(90, 10, 75)])
+    matcher = make_matcher(completions)
+
+    assert matcher.enhance_with_ai_batch(ITEMS) == [
+        (90.0, 'AI enhanced (batch)'), (10.0, 'AI enhanced (batch)'), (75.0, 'AI enhanced (batch)')
+    ]
+    assert len(completions.batch_prompts) == 1 and completions.single_prompts == []
+    assert all(f'{n}. Name A: "{a}" | Name B: "{b}"' in completions.batch_prompts[0]
+               for n, (a, b, _) in enumerate(ITEMS, 1))
+    stats = matcher.get_statistics()
+    assert (stats['api_requests'], stats['batch_requests'], stats['batch_fallbacks']) == (1, 1, 0)
+
+
+def test_missing_and_invalid_entries_are_resent_individually():
+    completions = StubCompletions(['{"scores": [{"id": 1, "confidence": 90}, {"id": 2, "confidence": "n/a"}]}'])
+    matcher = make_matcher(completions)
+
+    assert matcher.enhance_with_ai_batch(ITEMS) == [
+        (90.0, 'AI enhanced (batch)'), (20.0, 'AI enhanced'), (20.0, 'AI enhanced')
+    ]
+    assert len(completions.single_prompts) == 2
+    assert 'Name A: "Bolt Medical"' in completions.single_prompts[0]
+    assert 'Name A: "Cobalt Pharma"' in completions.single_prompts[1]
+    stats = matcher.get_statistics()
+    assert (stats['api_requests'], stats['batch_fallbacks'], stats['api_errors']) == (3, 2, 0)
+
+
+@pytest.mark.parametrize('reply', ['not json', RuntimeError('503 Service Unavailable')])
+def test_failed_batches_fall_back_to_per_pair_calls(reply):
+    completions = StubCompletions([reply])
+    matcher = make_matcher(completions)
+
+    assert matcher.enhance_with_ai_batch(ITEMS) == [(20.0, 'AI enhanced')] * 3
+    assert len(completions.single_prompts) == 3
+    stats = matcher.get_statistics()
+    assert (stats['batch_fallbacks'], stats['api_errors']) == (3, 1)
+
+
+def test_per_pair_errors_fall_back_to_the_fuzzy_score():
+    completions = StubCompletions(['{}'], single_reply='unsure')
+    matcher = make_matcher(completions)
+
+    results = matcher.enhance_with_ai_batch(ITEMS)
+    assert [score for score, _ in results] == [60.0, 55.0, 70.0]
+    assert all(reasoning.startswith('Error:') for _, reasoning in results)
+
+
+def test_cached_pairs_skip_the_request(tmp_path):
+    cache = LLMVerdictCache(str(tmp_path / 'verdicts.sqlite'))
+    completions = StubCompletions([scores(90, 10)])
+    try:
+        matcher = make_matcher(completions, cache=cache)
+        matcher.enhance_with_ai_batch(ITEMS[:2])
+        results = matcher.enhance_with_ai_batch(ITEMS)
+    finally:
+        cache.close()
+
+    assert results == [(90.0, 'AI enhanced (cached)'), (10.0, 'AI enhanced (cached)'), (20.0, 'AI enhanced')]
+    # A single uncached pair goes out as a single-pair request
+    assert len(completions.batch_prompts) == 1 and len(completions.single_prompts) == 1
+    assert 'Name A: "Cobalt Pharma"' in completions.single_prompts[0]
+
+
+def test_match_batch_groups_low_confidence_pairs():
+    completions = StubCompletions([scores(90, 10, 75)])
+    matcher = make_matcher(completions)
+    pairs = [(a, b) for a, b, _ in ITEMS] + [('Delta Labs', 'Delta Labs'), ('Echo Clinic', 'Ekko Clinical')]
+
+    results = matcher.match_batch(pairs)
+
+    assert [result['name_a'] for result in results] == [a for a, _ in pairs]
+    # The exact match is accepted on its fuzzy score; the other four go out in two requests
+    assert results[3]['confidence_source'] == 'fuzzy_high_confidence'
+    assert [result['ai_score'] for result in results] == [90.0, 10.0, 75.0, None, 20.0]
+    assert len(completions.batch_prompts) == 1 and len(completions.single_prompts) == 1
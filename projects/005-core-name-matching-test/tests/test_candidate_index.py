@@ -0,0 +1,105 @@
+"""Tier 2 candidate index: recall@K on the labeled dataset and parity with the exhaustive scan"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candidate_index import CandidateIndex, blocking_key, char_ngrams
+from tier2_matcher import Tier2NameMatcher
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope='module')
+def matcher() -> Tier2NameMatcher:
+    # No API calls are made; a placeholder key keeps the client constructor happy
+    return Tier2NameMatcher(api_key='index-no-ai')
+
+
+@pytest.fixture(scope='module')
+def labeled(test_dataset):
+    """Positive pairs and the de-duplicated reference names they point into"""
+    expected = test_dataset['expected_match'].astype(str).str.lower().isin(['true', '1', 'yes'])
+    positives = test_dataset[expected]
+    references = test_dataset['reference_name'].drop_duplicates().tolist()
+    return positives, references
+
+
+@pytest.fixture(scope='module')
+def candidate_lists(matcher, labeled):
+    positives, references = labeled
+    index = matcher.build_candidate_index(references)
+    lists = [[index.names[pos] for pos, _ in index.candidates(name, top_k=25)]
+             for name in positives['variant_name']]
+    return list(positives['reference_name']), lists
+
+
+def recall_at(k, candidate_lists):
+    targets, lists = candidate_lists
+    return np.mean([target in candidates[:k] for target, candidates in zip(targets, lists)])
+
+
+@pytest.mark.parametrize('k, minimum', [(1, 0.97), (5, 1.0), (25, 1.0)])
+def test_recall_at_k(candidate_lists, k, minimum):
+    # Measured: 98.75% at K=1, every true reference within the top 5
+    assert recall_at(k, candidate_lists) >= minimum
+
+
+def test_candidates_are_ranked_and_capped(matcher, labeled):
+    _, references = labeled
+    index = matcher.build_candidate_index(references)
+    candidates = index.candidates('Sonedno Inc', top_k=10)
+
+    assert len(candidates) == 10
+    scores = [score for _, score in candidates]
+    assert scores == sorted(scores, reverse=True)
+    assert index.names[candidates[0][0]] == 'Sonendo Inc'
+    # Names sharing no token, n-gram or blocking key are never candidates
+    assert CandidateIndex(['Abc Corp'], preprocess=matcher.preprocess_name).candidates('zzz') == []
+
+
+def test_ngrams_and_blocking_key():
+    assert char_ngrams('ab') == [' ab', 'ab ']
+    assert char_ngrams('aaaa') == [' aa', 'aaa', 'aa ']
+    assert char_ngrams('') == []
+    assert blocking_key('the medicines company') == 'medicines'
+    assert blocking_key('the') == 'the'
+    assert blocking_key('') == ''
+
+
+@pytest.fixture(scope='module')
+def indexed_and_exhaustive(matcher, test_dataset):
+    df_a = test_dataset[['variant_name', 'expected_match']].head(300)
+    df_b = pd.DataFrame({'name': test_dataset['reference_name'].drop_duplicates().tolist()})
+    # Non-default labels, so positions and labels cannot be confused
+    df_b.index = df_b.index * 10 + 7
+    indexed = matcher.match_dataframes(df_a, df_b, 'variant_name', 'name', use_ai=False)
+    exhaustive = matcher.match_dataframes(df_a, df_b, 'variant_name', 'name', use_ai=False, candidate_k=None)
+    return df_a, indexed, exhaustive
+
+
+def test_indexed_never_finds_a_better_match_than_exhaustive(indexed_and_exhaustive):
+    df_a, indexed, exhaustive = indexed_and_exhaustive
+    assert indexed['index_a'].tolist() == exhaustive['index_a'].tolist() == df_a.index.tolist()
+    assert (indexed['final_score'] <= exhaustive['final_score'] + TOLERANCE).all()
+
+
+def test_confident_matches_equal_exhaustive(matcher, indexed_and_exhaustive):
+    _, indexed, exhaustive = indexed_and_exhaustive
+    confident = exhaustive['final_score'] >= matcher.fuzzy_threshold
+    assert confident.sum() > 100
+    columns = ['name_b', 'index_b', 'is_match', 'confidence_source']
+    assert indexed.loc[confident, columns].equals(exhaustive.loc[confident, columns])
+    np.testing.assert_allclose(indexed.loc[confident, 'final_score'], exhaustive.loc[confident, 'final_score'],
+                               rtol=0, atol=TOLERANCE)
+
+
+def test_labeled_positives_equal_exhaustive(indexed_and_exhaustive):
+    df_a, indexed, exhaustive = indexed_and_exhaustive
+    positive = (df_a['expected_match'].astype(str).str.lower() == 'true').to_numpy()
+    columns = ['name_b', 'index_b', 'is_match']
+    assert indexed.loc[positive, columns].equals(exhaustive.loc[positive, columns])
+    # Near the decision threshold the exhaustive scan can accept a weak match the index ranks below
+    # its top K (e.g. 'Sirtex Medical Inc' -> 'SportsTek Medical, Inc'); the index only ever drops those
+    negative = ~positive
+    assert (indexed.loc[negative, 'is_match'] <= exhaustive.loc[negative, 'is_match']).all()
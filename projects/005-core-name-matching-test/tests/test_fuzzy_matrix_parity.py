@@ -0,0 +1,61 @@
+"""Bulk Tier 2 fuzzy scoring (fuzzy_match_matrix) against the per-pair fuzzy_match reference"""
+
+import numpy as np
+import pytest
+
+from tier2_matcher import Tier2NameMatcher
+
+TOLERANCE = 1e-9
+TOP_N = 3
+
+
+@pytest.fixture(scope='module')
+def matcher() -> Tier2NameMatcher:
+    # No API calls are made; a placeholder key keeps the client constructor happy
+    return Tier2NameMatcher(api_key='parity-no-ai')
+
+
+@pytest.fixture(scope='module')
+def parity_names(test_dataset):
+    """Variant vs reference names, plus blank and suffix-only edge cases"""
+    names_a = test_dataset['variant_name'].head(60).tolist() + ['', 'Inc.']
+    names_b = test_dataset['reference_name'].drop_duplicates().head(60).tolist() + ['']
+    return names_a, names_b
+
+
+@pytest.fixture(scope='module')
+def bulk_and_reference(matcher, parity_names):
+    names_a, names_b = parity_names
+    bulk = matcher.fuzzy_match_matrix(names_a, names_b, top_n=TOP_N, return_components=True)
+    scores, _, _, components = bulk
+
+    reference = np.zeros_like(scores)
+    reference_components = {key: np.zeros_like(scores) for key in components}
+    for i, name_a in enumerate(names_a):
+        for j, name_b in enumerate(names_b):
+            score, details = matcher.fuzzy_match(name_a, name_b)
+            reference[i, j] = score
+            for key, value in details.items():
+                reference_components[key][i, j] = value
+    return bulk, reference, reference_components
+
+
+def test_components_match_per_pair(bulk_and_reference):
+    (_, _, _, components), _, reference_components = bulk_and_reference
+    assert set(components) == set(reference_components)
+    for key in reference_components:
+        np.testing.assert_allclose(components[key], reference_components[key], rtol=0, atol=TOLERANCE,
+                                   err_msg=key)
+
+
+def test_final_scores_match_per_pair(bulk_and_reference):
+    (scores, _, _, _), reference, _ = bulk_and_reference
+    np.testing.assert_allclose(scores, reference, rtol=0, atol=TOLERANCE)
+
+
+def test_top_n_matches_reference_ordering(bulk_and_reference):
+    (scores, top_idx, top_scores, _), reference, _ = bulk_and_reference
+    # Ties may swap indices, so compare the scores
+    expected_top = -np.sort(-reference, axis=1)[:, :top_scores.shape[1]]
+    np.testing.assert_allclose(top_scores, expected_top, rtol=0, atol=TOLERANCE)
+    np.testing.assert_allclose(np.take_along_axis(scores, top_idx, axis=1), top_scores, rtol=0, atol=TOLERANCE)
@@ -0,0 +1,143 @@
+"""Persistent LLM verdict cache: expiry, LRU eviction and opening from the environment"""
+
+import pytest
+
+import llm_cache
+from llm_cache import CACHE_PATH_ENV, LLMVerdictCache
+
+MODEL = 'gpt-4o-mini'
+PROMPT = 'tier2-v1'
+DAY = 86400
+
+
+@pytest.fixture
+def open_cache(tmp_path):
+    caches = []
+
+    def open_cache(ttl_days, **kwargs):
+        cache = LLMVerdictCache(str(tmp_path / f'cache_{len(caches)}.sqlite'), ttl_days=ttl_days, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield open_cache
+    for cache in caches:
+        cache.close()
+
+
+@pytest.mark.parametrize('ttl_days', [None, 180])
+def test_verdicts_are_reused(open_cache, ttl_days):
+    cache = open_cache(ttl_days)
+    cache.put('gpt-4o-mini', 'acme', 'acme labs', 'tier2-v1', 90.0)
+    assert cache.get('gpt-4o-mini', 'acme labs', 'acme', 'tier2-v1') == (90.0, '')
+
+
+def test_zero_ttl_never_reuses_verdicts(open_cache):
+    cache = open_cache(0)
+    cache.put('gpt-4o-mini', 'acme', 'acme labs', 'tier2-v1', 90.0)
+    assert cache.get('gpt-4o-mini', 'acme', 'acme labs', 'tier2-v1') is None
+    assert cache.stats['expired'] == 1
+
+
+def test_prompt_versions_do_not_share_verdicts(open_cache):
+    cache = open_cache(None)
+    cache.put('gpt-4o-mini', 'acme', 'acme labs', 'tier2-v1', 90.0)
+    assert cache.get('gpt-4o-mini', 'acme', 'acme labs', 'tier2-batch-v1') is None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable stand-in for time.time as seen by the cache"""
+    clock = {'now': 1_000_000.0}
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: clock['now'])
+    return clock
+
+
+def names(cache):
+    return {row[0] for row in cache._conn.execute('SELECT name_hi FROM verdicts')}
+
+
+def test_eviction_drops_least_recently_accessed(open_cache, clock):
+    cache = open_cache(None, max_entries=3, eviction_check_interval=1)
+    for name in ['a', 'b', 'c']:
+        cache.put(MODEL, '', name, PROMPT, 50.0)
+        clock['now'] += 1
+
+    # Reading 'a' makes 'b' the least recently used entry
+    assert cache.get(MODEL, '', 'a', PROMPT) == (50.0, '')
+    clock['now'] += 1
+    cache.put(MODEL, '', 'd', PROMPT, 50.0)
+    assert names(cache) == {'a', 'c', 'd'}
+    assert cache.stats['evicted'] == 1
+
+    clock['now'] += 1
+    cache.get(MODEL, '', 'c', PROMPT)
+    clock['now'] += 1
+    cache.put(MODEL, '', 'e', PROMPT, 50.0)
+    assert names(cache) == {'c', 'd', 'e'}
+    assert len(cache) == 3 and cache.stats['evicted'] == 2
+
+
+def test_eviction_waits_for_the_check_interval(open_cache, clock):
+    cache = open_cache(None, max_entries=2, eviction_check_interval=3)
+    for name in ['a', 'b']:
+        cache.put(MODEL, '', name, PROMPT, 50.0)
+        clock['now'] += 1
+    assert len(cache) == 2
+    cache.put(MODEL, '', 'c', PROMPT, 50.0)
+    assert names(cache) == {'b', 'c'}
+
+
+def test_get_expires_entries_older_than_the_ttl(open_cache, clock):
+    cache = open_cache(1)
+    cache.put(MODEL, 'acme', 'acme labs', PROMPT, 90.0)
+
+    clock['now'] += DAY - 1
+    assert cache.get(MODEL, 'acme', 'acme labs', PROMPT) == (90.0, '')
+
+    # Reads refresh recency, not age: the entry still expires one TTL after it was written
+    clock['now'] += 1
+    assert cache.get(MODEL, 'acme', 'acme labs', PROMPT) is None
+    assert len(cache) == 0
+    assert (cache.stats['hits'], cache.stats['misses'], cache.stats['expired']) == (1, 1, 1)
+
+
+def test_eviction_expires_entries_before_dropping_by_size(open_cache, clock):
+    cache = open_cache(1, max_entries=2, eviction_check_interval=1)
+    cache.put(MODEL, '', 'old', PROMPT, 50.0)
+    clock['now'] += DAY / 2
+    cache.put(MODEL, '', 'b', PROMPT, 50.0)
+    clock['now'] += DAY / 2
+    # 'old' has expired, which leaves room for 'c' without a size eviction
+    cache.put(MODEL, '', 'c', PROMPT, 50.0)
+    assert names(cache) == {'b', 'c'}
+    assert (cache.stats['expired'], cache.stats['evicted']) == (1, 0)
+
+
+def test_purge_runs_expiry_and_eviction_now(open_cache, clock):
+    cache = open_cache(1, max_entries=2, eviction_check_interval=1000)
+    for name in ['a', 'b', 'c', 'd']:
+        cache.put(MODEL, '', name, PROMPT, 50.0)
+        clock['now'] += DAY / 4
+    assert len(cache) == 4
+
+    # 'a' is a full day old; of the remaining three the least recently used is dropped
+    cache.purge()
+    assert names(cache) == {'c', 'd'}
+    assert (cache.stats['expired'], cache.stats['evicted']) == (1, 1)
+
+    cache.purge()
+    assert len(cache) == 2
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv(CACHE_PATH_ENV, raising=False)
+    assert LLMVerdictCache.from_env() is None
+
+    path = tmp_path / 'env' / 'verdicts.sqlite'
+    monkeypatch.setenv(CACHE_PATH_ENV, str(path))
+    cache = LLMVerdictCache.from_env(ttl_days=None, max_entries=10)
+    try:
+        assert cache.path == path and path.exists()
+        assert (cache.ttl_seconds, cache.max_entries) == (None, 10)
+    finally:
+        cache.close()
@@ -0,0 +1,226 @@
+"""
+Parity tests for the shared name normalization profiles
+The compiled profiles must reproduce the loop-based functions they replaced
+"""
+
+import itertools
+import re
+
+import pandas as pd
+import pytest
+
+from name_normalization import (HEALTHCARE_NORMALIZER, TIER2_NORMALIZER, TIER_PROD_NORMALIZER,
+                                normalize_series)
+
+
+def reference_preprocess_healthcare(name: str) -> str:
+    """preprocess_healthcare as it was before the shared pipeline (src/tier1_fuzzy.py)"""
+    if not name:
+        return ""
+
+    name = str(name).lower().strip()
+
+    replacements = {
+        r'\bhosp\.?\b': 'hospital',
+        r'\bhosps\.?\b': 'hospitals',
+        r'\bmed\.?\b': 'medical',
+        r'\bctr\.?\b': 'center',
+        r'\bctrs\.?\b': 'centers',
+        r'\bhc\b': 'healthcare',
+        r'\bhca\b': 'healthcare',
+        r'\bhlth\b': 'health',
+        r'\bsvcs?\b': 'services',
+        r'\bmgmt\b': 'management',
+        r'\bassoc\.?\b': 'associates',
+        r'\bgrp\.?\b': 'group',
+        r'\buniv\.?\b': 'university',
+        r'\bsys\.?\b': 'system',
+        r'\bphys\.?\b': 'physicians',
+        r'\bclin\.?\b': 'clinic',
+        r'\brehab\.?\b': 'rehabilitation',
+        r'\bspec\.?\b': 'specialty',
+        r'\bemerg\.?\b': 'emergency',
+        r'\bsurg\.?\b': 'surgical',
+        r'\bortho\.?\b': 'orthopedic',
+        r'\bcardio\.?\b': 'cardiovascular',
+        r'\bpeds?\b': 'pediatric',
+        r'\bob\/gyn\b': 'obstetrics gynecology',
+        r'\bobgyn\b': 'obstetrics gynecology',
+        r'\ber\b': 'emergency room',
+        r'\bicu\b': 'intensive care unit',
+        r'\bdba\b': '',
+        r'\bfka\b': '',
+        r'\bcorp\.?\b': 'corporation',
+        r'\binc\.?\b': 'incorporated',
+        r'\bllc\b': 'limited liability company',
+        r'\bllp\b': 'limited liability partnership',
+        r'\bltd\.?\b': 'limited',
+        r'\bco\.?\b': 'company',
+        r'\bst\.?\b': 'saint',
+        r'\bmt\.?\b': 'mount'
+    }
+    for pattern, replacement in replacements.items():
+        name = re.sub(pattern, replacement, name)
+
+    suffixes_to_remove = [
+        'incorporated', 'corporation', 'limited liability company',
+        'limited liability partnership', 'limited', 'company',
+        'llc', 'llp', 'inc', 'corp', 'ltd', 'co'
+    ]
+    for suffix in suffixes_to_remove:
+        if name.endswith(f' {suffix}'):
+            name = name[:-len(suffix)-1].strip()
+
+    name = re.sub(r'[^\w\s-]', '', name)
+    return ' '.join(name.split())
+
+
+TIER2_REPLACEMENTS = {
+    r'\bhosp\.?\b': 'hospital',
+    r'\bhosps\.?\b': 'hospitals',
+    r'\bmed\.?\b': 'medical',
+    r'\bctr\.?\b': 'center',
+    r'\bctrs\.?\b': 'centers',
+    r'\bhc\b': 'healthcare',
+    r'\bhca\b': 'healthcare',
+    r'\bhlth\b': 'health',
+    r'\bsvcs?\b': 'services',
+    r'\bmgmt\b': 'management',
+    r'\bassoc\.?\b': 'associates',
+    r'\bgrp\.?\b': 'group',
+    r'\buniv\.?\b': 'university',
+    r'\bsys\.?\b': 'system',
+    r'\bphys\.?\b': 'physicians',
+    r'\bclin\.?\b': 'clinic',
+    r'\brehab\.?\b': 'rehabilitation',
+    r'\bspec\.?\b': 'specialty',
+    r'\bemerg\.?\b': 'emergency',
+    r'\bsurg\.?\b': 'surgical',
+    r'\bortho\.?\b': 'orthopedic',
+    r'\bcardio\.?\b': 'cardiovascular',
+}
+
+TIER2_SUFFIXES = [
+    r'\binc\.?$', r'\bincorporated$', r'\bcorp\.?$', r'\bcorporation$',
+    r'\bllc\.?$', r'\bllp\.?$', r'\blp\.?$', r'\bltd\.?$', r'\blimited$',
+    r'\bco\.?$', r'\bcompany$', r'\bplc\.?$'
+]
+
+
+def reference_preprocess_tier2(name: str) -> str:
+    """Tier2NameMatcher.preprocess_name as it was before the shared pipeline"""
+    if not name:
+        return ""
+
+    name = str(name).lower().strip()
+    for pattern, replacement in TIER2_REPLACEMENTS.items():
+        name = re.sub(pattern, replacement, name)
+    for suffix in TIER2_SUFFIXES:
+        name = re.sub(suffix, '', name, flags=re.IGNORECASE)
+
+    name = re.sub(r'[^\w\s]', ' ', name)
+    return ' '.join(name.split())
+
+
+def reference_preprocess_tier_prod(name: str) -> str:
+    """preprocess_name as it was before the shared pipeline (src/tier_prod_matching.py)"""
+    if not name:
+        return ""
+
+    name = str(name).lower().strip()
+    for suffix in TIER2_SUFFIXES + [r'\bgmbh$', r'\bsa$', r'\bag$']:
+        name = re.sub(suffix, '', name, flags=re.IGNORECASE)
+
+    replacements = {
+        r'\bhosp\.?\b': 'hospital',
+        r'\bmed\.?\b': 'medical',
+        r'\bctr\.?\b': 'center',
+        r'\bhc\b': 'healthcare',
+        r'\bhlth\b': 'health',
+        r'\bsvcs?\b': 'services',
+        r'\bmgmt\b': 'management',
+        r'\bgrp\.?\b': 'group',
+        r'\buniv\.?\b': 'university',
+        r'\bsys\.?\b': 'system',
+    }
+    for pattern, replacement in replacements.items():
+        name = re.sub(pattern, replacement, name)
+
+    name = re.sub(r'[^\w\s]', ' ', name)
+    return ' '.join(name.split())
+
+
+PROFILES = [
+    pytest.param(TIER2_NORMALIZER, reference_preprocess_tier2, id='tier2'),
+    pytest.param(HEALTHCARE_NORMALIZER, reference_preprocess_healthcare, id='healthcare'),
+    pytest.param(TIER_PROD_NORMALIZER, reference_preprocess_tier_prod, id='tier_prod'),
+]
+
+
+def synthetic_names():
+    """Two abbreviation/suffix tokens joined by every separator, with and without a trailing period"""
+    tokens = ['acme', 'st', 'hosp', 'med', 'hc', 'ctr', 'grp', 'sys', 'svc', 'inc', 'co',
+              'corp', 'company', 'incorporated', 'llc', 'lp', 'ltd', 'plc', 'gmbh', 'sa', 'ag']
+    return [first + separator + second + trailer
+            for first, second in itertools.product(tokens, repeat=2)
+            for separator in [' ', '. ', '.', '-', ', ']
+            for trailer in ['', '.']]
+
+
+@pytest.mark.parametrize('normalizer, reference', PROFILES)
+def test_profile_matches_reference_on_real_names(real_names, normalizer, reference):
+    normalizer.cache_clear()
+    mismatches = [
+        (name, reference(name), normalizer.normalize(name))
+        for name in real_names
+        if normalizer.normalize(name) != reference(name)
+    ]
+    assert not mismatches, f"{len(mismatches)} names differ, e.g. {mismatches[:5]}"
+
+
+@pytest.mark.parametrize('normalizer, reference', PROFILES)
+def test_profile_matches_reference_on_synthetic_names(normalizer, reference):
+    mismatches = [(name, reference(name), normalizer.normalize(name))
+                  for name in synthetic_names()
+                  if normalizer.normalize(name) != reference(name)]
+    assert not mismatches, f"{len(mismatches)} names differ, e.g. {mismatches[:5]}"
+
+
+@pytest.mark.parametrize('name, expected', [
+    # The chained rules lost the word boundary after "hosp." had been expanded
+    ('acme hosp.grp', 'acme hospitalgrp'),
+    ('hosp.med.sys', 'hospitalmed system'),
+    # ... unless the later word's rule ran first
+    ('grp.hosp', 'grouphospital'),
+    ('hosp. grp', 'hospital group'),
+])
+def test_tier2_profile_keeps_chained_expansion_of_dotted_abbreviations(name, expected):
+    assert reference_preprocess_tier2(name) == expected
+    assert TIER2_NORMALIZER.normalize(name) == expected
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Pharmacia and Upjohn Company LLC', 'pharmacia and upjohn'),
+    ('Huons Co Ltd', 'huons'),
+    ('Kadmon Corporation LLC', 'kadmon corporation'),
+])
+def test_healthcare_profile_strips_stacked_suffixes(name, expected):
+    assert HEALTHCARE_NORMALIZER.normalize(name) == expected
+
+
+@pytest.mark.parametrize('normalizer, reference', PROFILES)
+def test_profile_matches_reference_on_suffix_stacks(normalizer, reference):
+    suffixes = ['inc', 'corp', 'co', 'ltd', 'llc', 'llp', 'lp', 'company', 'limited',
+                'corporation', 'incorporated', 'plc', 'gmbh', 'sa', 'ag']
+    names = ['acme ' + separator.join(stack) for size in (1, 2, 3)
+             for stack in itertools.product(suffixes, repeat=size)
+             for separator in [' ', '.']]
+    mismatches = [name for name in names if normalizer.normalize(name) != reference(name)]
+    assert not mismatches, mismatches[:5]
+
+
+def test_normalize_series_matches_scalar(real_names):
+    names = pd.Series(real_names[:500] * 2 + [None])
+    normalized = normalize_series(names, profile='healthcare')
+    assert normalized.iloc[-1] == ''
+    assert normalized.iloc[:-1].tolist() == [HEALTHCARE_NORMALIZER.normalize(name) for name in names.iloc[:-1]]
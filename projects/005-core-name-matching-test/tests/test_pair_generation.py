@@ -0,0 +1,115 @@
+"""Lazy blocked pair generation (iter_blocked_pairs) against the materialized nested-loop list it replaced"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pair_generation import blocked_pair_indices, count_blocked_pairs, iter_blocked_pairs
+
+MATCHING_DIR = Path(__file__).resolve().parents[3] / 'projects' / '192-op-rx-manufacturer-matching'
+
+
+def materialized_pairs(op_df, rx_df):
+    """The pre-streaming pair list of the 192 runners: nested iterrows loops per blocking key"""
+    pairs = []
+    for blocking_key in op_df['blocking_key'].unique():
+        if blocking_key not in rx_df['blocking_key'].values:
+            continue
+
+        op_block = op_df[op_df['blocking_key'] == blocking_key]
+        rx_block = rx_df[rx_df['blocking_key'] == blocking_key]
+
+        for _, op_row in op_block.iterrows():
+            for _, rx_row in rx_block.iterrows():
+                pairs.append((
+                    op_row['manufacturer_id'],
+                    op_row['manufacturer_name'],
+                    rx_row['manufacturer_name'],
+                    blocking_key
+                ))
+    return pairs
+
+
+def streamed_pairs(op_df, rx_df, chunk_size):
+    chunks = list(iter_blocked_pairs(op_df, rx_df, left_columns=['manufacturer_id', 'manufacturer_name'],
+                                     right_columns=['manufacturer_name'], chunk_size=chunk_size))
+    assert all(len(chunk) == chunk_size for chunk in chunks[:-1])
+    assert not chunks or 0 < len(chunks[-1]) <= chunk_size
+    pairs = []
+    for chunk in chunks:
+        pairs.extend(zip(chunk['manufacturer_id'].tolist(), chunk['manufacturer_name_left'].tolist(),
+                         chunk['manufacturer_name_right'].tolist(), chunk['blocking_key'].tolist()))
+    return pairs
+
+
+@pytest.fixture(scope='module')
+def small_frames():
+    """Interleaved blocks, blocks on one side only, and duplicate names"""
+    op_df = pd.DataFrame({
+        'manufacturer_id': [1, 2, 3, 4, 5, 6, 7],
+        'manufacturer_name': ['Beta', 'Alpha', 'Bravo', 'Zulu', 'Alpha', 'Acme', 'Beta'],
+        'blocking_key': ['B', 'A', 'B', 'Z', 'A', 'A', 'B'],
+    })
+    rx_df = pd.DataFrame({
+        'manufacturer_name': ['Alpha', 'Bolt', 'Charlie', 'Alpine', 'Beta', 'Axe'],
+        'blocking_key': ['A', 'B', 'C', 'A', 'B', 'A'],
+    })
+    return op_df, rx_df
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 100])
+def test_small_blocks_stream_in_materialized_order(small_frames, chunk_size):
+    op_df, rx_df = small_frames
+    expected = materialized_pairs(op_df, rx_df)
+    assert len(expected) == 3 * 2 + 3 * 3
+    assert streamed_pairs(op_df, rx_df, chunk_size) == expected
+    assert count_blocked_pairs(op_df['blocking_key'], rx_df['blocking_key']) == len(expected)
+
+
+@pytest.fixture(scope='module')
+def manufacturer_frames():
+    """OP sample and full RX manufacturer inputs of project 192, keyed by its first-letter blocking"""
+    spec = importlib.util.spec_from_file_location(
+        'run_tier2_with_checkpoint', MATCHING_DIR / 'scripts' / '07_run_tier2_with_checkpoint.py')
+    runner = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(runner)
+
+    op_df = pd.read_csv(MATCHING_DIR / 'data' / 'input' / 'op_manufacturers_sample100.csv')
+    rx_df = pd.read_csv(MATCHING_DIR / 'data' / 'input' / 'rx_manufacturers.csv')
+    op_df['blocking_key'] = op_df['manufacturer_name'].apply(runner.get_blocking_key)
+    rx_df['blocking_key'] = rx_df['manufacturer_name'].apply(runner.get_blocking_key)
+    return runner, op_df, rx_df
+
+
+@pytest.mark.parametrize('chunk_size', [100, 4096])
+def test_manufacturer_pairs_stream_in_materialized_order(manufacturer_frames, chunk_size):
+    _, op_df, rx_df = manufacturer_frames
+    expected = materialized_pairs(op_df, rx_df)
+    assert len(expected) > 1_000
+    assert streamed_pairs(op_df, rx_df, chunk_size) == expected
+
+
+def test_checkpoint_runner_batches_match_materialized_list(manufacturer_frames):
+    runner, op_df, rx_df = manufacturer_frames
+    expected = materialized_pairs(op_df, rx_df)
+
+    total_pairs, generate_batches = runner.prepare_comparison_pairs(op_df.copy(), rx_df.copy())
+    batches = list(generate_batches(runner.BATCH_SIZE))
+
+    assert total_pairs == len(expected)
+    # Batch i holds the same pairs as the old pairs[i * BATCH_SIZE:(i + 1) * BATCH_SIZE] slice
+    assert batches == [expected[i:i + runner.BATCH_SIZE] for i in range(0, len(expected), runner.BATCH_SIZE)]
+
+
+def test_missing_keys_are_never_paired():
+    left, right = list(blocked_pair_indices(['A', None, np.nan, 'B'], [None, 'A', np.nan, 'B'], chunk_size=10))[0]
+    assert list(zip(left.tolist(), right.tolist())) == [(0, 1), (3, 3)]
+    assert count_blocked_pairs(['A', None, np.nan, 'B'], [None, 'A', np.nan, 'B']) == 2
+
+
+def test_no_shared_keys_yield_nothing():
+    assert list(blocked_pair_indices(['A', 'B'], ['C'])) == []
+    assert count_blocked_pairs(['A', 'B'], ['C']) == 0
@@ -4,11 +4,19 @@ DA-173: Provider Profile Web Enrichment POC
 """
 
 import re
+import sys
 import json
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
 
+# Shared NPI check-digit kernel: the validation package in the repository's src
+REPO_SRC = str(Path(__file__).resolve().parents[3] / "src")
+if REPO_SRC not in sys.path:
+    sys.path.append(REPO_SRC)
+from validation import is_valid_npi
+
 class ProfileParser:
     """
     Parses raw LLM responses into structured provider profile data.
@@ -687,24 +695,8 @@ class ProfileParser:
         return profile
     
     def _validate_npi(self, npi: str) -> bool:
-        """Validate NPI number using Luhn algorithm."""
-        if not npi or len(npi) != 10 or not npi.isdigit():
-            return False
-        
-        # Luhn algorithm
-        digits = [int(d) for d in npi]
-        check_digit = digits[-1]
-        digits = digits[:-1]
-        
-        # Double every other digit
-        for i in range(len(digits) - 1, -1, -2):
-            digits[i] *= 2
-            if digits[i] > 9:
-                digits[i] -= 9
-        
-        # Sum and check
-        total = sum(digits)
-        return (total * 9) % 10 == check_digit
+        """Validate NPI number using Luhn algorithm (with the 80840 prefix)."""
+        return is_valid_npi(npi)
     
     def _validate_dates(self, obj: Any) -> Any:
         """Validate and standardize date formats."""
@@ -5,10 +5,12 @@ DA-173: Provider Profile Web Enrichment POC
 
 import os
 import re
+import sys
 import json
 import time
 import uuid
 import yaml
+import hashlib
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from pathlib import Path
@@ -20,6 +22,10 @@ from .profile_parser import ProfileParser
 from .citation_extractor import CitationExtractor
 from .logger import setup_logger
 
+# Shared crash-safe checkpoint store lives in the repository's src/checkpointing
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "src" / "checkpointing"))
+from segment_store import SegmentCheckpointStore
+
 # Load environment variables
 load_dotenv()
 
@@ -427,55 +433,68 @@ class ProviderProfileScraper:
         """
         Scrape multiple providers with checkpointing.
         
+        Every `checkpoint_frequency` providers are committed as one segment of
+        a SegmentCheckpointStore, keyed by the index of the first provider.
+        Re-running with the same provider list skips committed segments and
+        returns the results of all providers, including earlier sessions.
+        
         Args:
             providers: List of provider dictionaries with name, institution, etc.
-            checkpoint_file: Path to checkpoint file for resuming
+            checkpoint_file: Checkpoint directory for resuming
             
         Returns:
-            List of scraping results
+            List of scraping results, in provider order
         """
-        results = []
-        checkpoint_path = Path(checkpoint_file) if checkpoint_file else \
-                         Path(self.config["storage"]["checkpoint_dir"]) / "checkpoint.json"
-        
-        # Load checkpoint if exists
-        start_index = 0
-        if checkpoint_path.exists():
-            with open(checkpoint_path, 'r') as f:
-                checkpoint = json.load(f)
-                start_index = checkpoint.get("last_completed_index", 0) + 1
-                self.logger.info(f"Resuming from index {start_index}")
-        
-        # Process providers
-        for i, provider in enumerate(providers[start_index:], start=start_index):
-            self.logger.info(f"Processing provider {i+1}/{len(providers)}: {provider.get('name')}")
-            
-            # Scrape provider
-            result = self.scrape_provider(
-                name=provider.get("name"),
-                institution=provider.get("institution"),
-                specialty=provider.get("specialty"),
-                npi=provider.get("npi"),
-                location=provider.get("location")
-            )
+        checkpoint_dir = Path(checkpoint_file) if checkpoint_file else \
+                         Path(self.config["storage"]["checkpoint_dir"]) / "bulk"
+        batch_size = max(1, self.config["processing"]["checkpoint_frequency"])
+        store = SegmentCheckpointStore(checkpoint_dir, run_key=self._providers_run_key(providers, batch_size))
+        
+        if store.completed_batches():
+            self.logger.info(f"Resuming: {store.total_rows()} providers already scraped")
+        
+        # Process providers one checkpoint batch at a time
+        for start in range(0, len(providers), batch_size):
+            if store.is_complete(start):
+                continue
             
-            results.append(result)
+            batch_results = []
+            for i, provider in enumerate(providers[start:start + batch_size], start=start):
+                self.logger.info(f"Processing provider {i+1}/{len(providers)}: {provider.get('name')}")
+                
+                # Scrape provider
+                result = self.scrape_provider(
+                    name=provider.get("name"),
+                    institution=provider.get("institution"),
+                    specialty=provider.get("specialty"),
+                    npi=provider.get("npi"),
+                    location=provider.get("location")
+                )
+                
+                # Results are nested and vary by provider, so segments store them as JSON
+                batch_results.append({"index": i, "result": json.dumps(result, default=str)})
+                
+                # Rate limiting
+                if (i + 1) < len(providers):
+                    time.sleep(60 / self.config["processing"]["rate_limit_per_minute"])
             
             # Save checkpoint
-            if (i + 1) % self.config["processing"]["checkpoint_frequency"] == 0:
-                checkpoint = {
-                    "last_completed_index": i,
-                    "timestamp": datetime.now().isoformat(),
-                    "total_providers": len(providers)
-                }
-                checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(checkpoint_path, 'w') as f:
-                    json.dump(checkpoint, f, indent=2)
-                self.logger.info(f"Checkpoint saved at index {i}")
-            
-            # Rate limiting
-            if (i + 1) < len(providers):
-                time.sleep(60 / self.config["processing"]["rate_limit_per_minute"])
+            store.write_segment(start, batch_results)
+            self.logger.info(f"Checkpoint saved at index {start + len(batch_results) - 1}")
+        
+        results = [json.loads(record["result"])
+                   for record in sorted(store.iter_records(), key=lambda record: record["index"])]
         
         self.logger.info(f"Completed bulk scraping of {len(results)} providers")
-        return results
\ No newline at end of file
+        return results
+    
+    @staticmethod
+    def _providers_run_key(providers: List[Dict], batch_size: int) -> str:
+        """
+        Fingerprint the provider list and batch size so a checkpoint only
+        resumes the same input split into the same segments.
+        """
+        digest = hashlib.sha1()
+        for provider in providers:
+            digest.update(f"{provider.get('npi')}|{provider.get('name')}\n".encode())
+        return f"{len(providers)}:{batch_size}:{digest.hexdigest()[:16]}"
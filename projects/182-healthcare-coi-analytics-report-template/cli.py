@@ -14,6 +14,7 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent))
 
 from pipelines.full_analysis import FullAnalysisPipeline
+from pipelines.batch_analysis import BatchAnalysisPipeline
 from src.data import DataValidator
 from src.reporting import VisualizationGenerator
 
@@ -43,7 +44,16 @@ def cli():
               default='markdown',
               help='Output format')
 @click.option('--no-viz', is_flag=True, help='Skip visualization generation')
-def analyze(config, force_reload, style, format, no_viz):
+@click.option('--draft-charts', is_flag=True,
+              help='Render charts in the lightweight draft mode (low resolution, no labels)')
+@click.option('--backend',
+              type=click.Choice(['bigquery', 'duckdb']),
+              help='SQL execution backend (default from config; duckdb runs locally on Parquet extracts)')
+@click.option('--step', 'steps', multiple=True,
+              help='Only (re)run this pipeline step and what it depends on, e.g. --step report '
+                   '(tables, open_payments, prescriptions, correlations, risk_assessment, visualizations, report)')
+@click.option('--no-step-cache', is_flag=True, help='Re-execute every step instead of reusing unchanged outputs')
+def analyze(config, force_reload, style, format, no_viz, draft_charts, backend, steps, no_step_cache):
     """Run complete COI analysis pipeline"""
     try:
         click.echo(click.style('🚀 Starting Healthcare COI Analysis', fg='green', bold=True))
@@ -52,12 +62,14 @@ def analyze(config, force_reload, style, format, no_viz):
         click.echo(f"Output format: {format}")
         
         # Run pipeline
-        pipeline = FullAnalysisPipeline(config)
+        pipeline = FullAnalysisPipeline(config, backend=backend, draft_charts=draft_charts)
         results = pipeline.run(
             force_reload=force_reload,
             generate_visualizations=not no_viz,
             report_style=style,
-            output_format=format
+            output_format=format,
+            steps=list(steps) or None,
+            use_step_cache=not no_step_cache
         )
         
         # Display results
@@ -83,6 +95,10 @@ def analyze(config, force_reload, style, format, no_viz):
             click.echo(f"\n⚠️  Risk Assessment:")
             click.echo(f"   High-Risk Providers: {risk.get('high_risk_count', 0):,}")
         
+        cached = [name for name, status in results.get('pipeline_steps', {}).items() if status['status'] == 'cached']
+        if cached:
+            click.echo(f"\n♻️  Reused from step cache: {', '.join(cached)}")
+        
         click.echo(f"\n📄 Report: {results.get('report_path', 'N/A')}")
         
     except Exception as e:
@@ -90,6 +106,56 @@ def analyze(config, force_reload, style, format, no_viz):
         sys.exit(1)
 
 
+@cli.command()
+@click.argument('configs', nargs=-1)
+@click.option('--force-reload', is_flag=True, help='Rebuild the shared tables and re-execute every step')
+@click.option('--style', 
+              type=click.Choice(['investigative', 'compliance', 'executive']),
+              default='investigative',
+              help='Report style')
+@click.option('--format',
+              type=click.Choice(['markdown', 'html']),
+              default='markdown',
+              help='Output format')
+@click.option('--no-viz', is_flag=True, help='Skip visualization generation')
+@click.option('--draft-charts', is_flag=True,
+              help='Render charts in the lightweight draft mode (low resolution, no labels)')
+@click.option('--backend',
+              type=click.Choice(['bigquery', 'duckdb']),
+              help='SQL execution backend (default from config; duckdb runs locally on Parquet extracts)')
+@click.option('--no-step-cache', is_flag=True, help='Re-execute every step instead of reusing unchanged outputs')
+def batch(configs, force_reload, style, format, no_viz, draft_charts, backend, no_step_cache):
+    """Run the analysis for several health systems over one shared scan (default: all of config/)"""
+    try:
+        if not configs:
+            configs = sorted(str(path) for path in Path('config').glob('*.yaml') if path.stem != 'template')
+        click.echo(click.style(f'🚀 Starting batch analysis of {len(configs)} health systems', fg='green', bold=True))
+        for config in configs:
+            click.echo(f"Configuration: {config}")
+        
+        pipeline = BatchAnalysisPipeline(list(configs), backend=backend, draft_charts=draft_charts)
+        results = pipeline.run(
+            force_reload=force_reload,
+            generate_visualizations=not no_viz,
+            report_style=style,
+            output_format=format,
+            use_step_cache=not no_step_cache
+        )
+        
+        click.echo("\n" + "="*60)
+        for short_name, client_results in results['clients'].items():
+            click.echo(click.style(f"✅ {short_name}", fg='green') + f": {client_results.get('report_path', 'N/A')}")
+        for short_name, error in results['failed'].items():
+            click.echo(click.style(f"❌ {short_name}: {error}", fg='red'))
+        
+        if results['failed']:
+            sys.exit(1)
+        
+    except Exception as e:
+        click.echo(click.style(f'❌ Batch analysis failed: {e}', fg='red'), err=True)
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--config', default='config/config.yaml', help='Configuration file path')
 def validate(config):
@@ -155,16 +221,16 @@ def export(data_type, output):
     try:
         click.echo(click.style(f'📤 Exporting {data_type} data', fg='blue'))
         
-        from src.data import DataLoader
+        from src.data import DataLoader, StreamedDataset
         import pandas as pd
         
         loader = DataLoader()
         
-        # Load the requested data
+        # Load the requested data (detailed tables are streamed, not held in memory)
         if data_type == 'payments':
-            data = loader.load_open_payments()
+            data = loader.load_open_payments(stream=True)
         elif data_type == 'prescriptions':
-            data = loader.load_prescriptions()
+            data = loader.load_prescriptions(stream=True)
         elif data_type == 'correlations':
             data = loader.load_analysis_results('correlations')
         
@@ -176,7 +242,17 @@ def export(data_type, output):
         # Save data
         Path(output).parent.mkdir(parents=True, exist_ok=True)
         
-        if output.endswith('.parquet'):
+        if isinstance(data, StreamedDataset):
+            if output.endswith('.parquet'):
+                import pyarrow.parquet as pq
+                with pq.ParquetWriter(output, data.schema) as writer:
+                    for batch in data.iter_batches():
+                        writer.write_batch(batch)
+            else:
+                data.schema.empty_table().to_pandas().to_csv(output, index=False)
+                for chunk in data.iter_frames():
+                    chunk.to_csv(output, mode='a', header=False, index=False)
+        elif output.endswith('.parquet'):
             data.to_parquet(output, index=False)
         else:
             data.to_csv(output, index=False)
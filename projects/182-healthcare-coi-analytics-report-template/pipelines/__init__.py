@@ -1,5 +1,6 @@
 """Pipeline orchestrators for Healthcare COI Analytics"""
 
 from .full_analysis import FullAnalysisPipeline
+from .batch_analysis import BatchAnalysisPipeline
 
-__all__ = ['FullAnalysisPipeline']
\ No newline at end of file
+__all__ = ['FullAnalysisPipeline', 'BatchAnalysisPipeline']
\ No newline at end of file
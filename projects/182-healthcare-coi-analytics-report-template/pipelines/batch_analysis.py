@@ -0,0 +1,164 @@
+"""
+Batch Analysis Pipeline
+Full healthcare COI analysis for several health systems over one shared scan
+"""
+
+import sys
+from pathlib import Path
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import traceback
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.data_lineage import DataLineageTracker
+from src.data.shared_tables import SharedTables, source_signature
+from pipelines.full_analysis import FullAnalysisPipeline
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalysisPipeline:
+    """Runs FullAnalysisPipeline per health system, scanning each source table once per batch"""
+
+    def __init__(
+        self,
+        config_paths: List[str],
+        backend: Optional[str] = None,
+        draft_charts: bool = False
+    ):
+        """
+        Initialize one pipeline per configuration
+
+        Health systems whose configs read the same source tables, years and
+        temp dataset share one scan; configs that differ form separate groups.
+
+        Args:
+            config_paths: Configuration files, one per health system
+            backend: Override the SQL execution backend ('bigquery' or 'duckdb')
+            draft_charts: Render charts in the lightweight draft mode
+        """
+        self.pipelines: Dict[str, FullAnalysisPipeline] = {}
+        for config_path in config_paths:
+            pipeline = FullAnalysisPipeline(config_path, backend=backend, draft_charts=draft_charts)
+            short_name = pipeline.data_loader.config['health_system']['short_name']
+            if short_name in self.pipelines:
+                raise ValueError(f"Duplicate health_system.short_name '{short_name}' in {config_path}")
+            self.pipelines[short_name] = pipeline
+        self.results = {}
+
+    def _groups(self) -> List[List[str]]:
+        """Clients grouped by the source tables they scan"""
+        groups: Dict[tuple, List[str]] = {}
+        for short_name, pipeline in self.pipelines.items():
+            groups.setdefault(source_signature(pipeline.data_loader.config), []).append(short_name)
+        return list(groups.values())
+
+    def run(
+        self,
+        force_reload: bool = False,
+        generate_visualizations: bool = True,
+        report_style: str = "investigative",
+        output_format: str = "markdown",
+        use_step_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Build the shared tables, then run the analysis of every client on its partition
+
+        A client whose pipeline fails is reported and the batch continues.
+
+        Args:
+            force_reload: Rebuild the shared tables and re-execute every step
+            generate_visualizations: Whether to generate charts
+            report_style: Style of report to generate
+            output_format: Output format for report
+            use_step_cache: Reuse unchanged step outputs from earlier runs
+
+        Returns:
+            Dictionary with per-client results, failures and the shared tables
+        """
+        logger.info("="*60)
+        logger.info(f"STARTING BATCH ANALYSIS FOR {len(self.pipelines)} HEALTH SYSTEMS")
+        logger.info("="*60)
+
+        self.results = {'clients': {}, 'failed': {}, 'shared_tables': {}}
+        for clients in self._groups():
+            tables = self._build_shared_tables(clients, force_reload)
+
+            for short_name in clients:
+                logger.info(f"\n[Batch] Running analysis for {short_name}")
+                pipeline = self.pipelines[short_name]
+                try:
+                    if tables is None:
+                        raise RuntimeError("Shared tables could not be built")
+                    pipeline.data_loader.use_shared_tables(tables)
+                    self.results['clients'][short_name] = pipeline.run(
+                        force_reload=force_reload,
+                        generate_visualizations=generate_visualizations,
+                        report_style=report_style,
+                        output_format=output_format,
+                        use_bigquery_analysis=True,
+                        use_step_cache=use_step_cache
+                    )
+                except Exception as e:
+                    logger.error(f"Analysis failed for {short_name}: {e}")
+                    self.results['failed'][short_name] = str(e)
+
+        self._print_summary()
+        return self.results
+
+    def _build_shared_tables(self, clients: List[str], force_reload: bool) -> Optional[Dict[str, Dict[str, str]]]:
+        """Create the mapping and shared tables of one client group (None on failure)"""
+        loader = self.pipelines[clients[0]].data_loader
+        shared = SharedTables(loader)
+
+        # The shared scan runs with the first client's cache and cost settings
+        loader.apply_connector_settings()
+        
+        # The shared scan gets its own lineage (and performance profile)
+        tracker = DataLineageTracker(pipeline_id=f"{shared.prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        loader.set_lineage_tracker(tracker)
+        tracker.set_current_step('shared_tables')
+        if loader.bq.cost_guard:
+            loader.bq.cost_guard.start_run()
+
+        try:
+            rosters = {
+                short_name: self.pipelines[short_name].data_loader.load_provider_npis()
+                for short_name in clients
+            }
+            tables = shared.build(rosters, force_reload=force_reload)
+        except Exception as e:
+            logger.error(f"Shared tables for {', '.join(clients)} failed: {e}")
+            logger.error(traceback.format_exc())
+            return None
+        finally:
+            tracker.set_current_step(None)
+            tracker.finalize()
+            tracker.save_lineage()
+
+        self.results['shared_tables'][shared.prefix] = {
+            'clients': clients,
+            'tables': tables,
+            'lineage_id': tracker.pipeline_id
+        }
+        return tables
+
+    def _print_summary(self):
+        """Print batch summary"""
+        print("\n" + "="*60)
+        print("BATCH SUMMARY")
+        print("="*60)
+
+        for prefix, shared in self.results['shared_tables'].items():
+            print(f"\nShared tables {prefix}_*: {', '.join(shared['clients'])}")
+
+        for short_name, results in self.results['clients'].items():
+            print(f"\n{short_name}: {results.get('report_path', 'no report')}")
+
+        for short_name, error in self.results['failed'].items():
+            print(f"\n{short_name}: FAILED ({error})")
+
+        print("="*60)
@@ -7,7 +7,7 @@ import sys
 from pathlib import Path
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import traceback
 
 # Add src to path
@@ -24,6 +24,7 @@ from src.analysis import (
 )
 from src.analysis.bigquery_analysis import BigQueryAnalyzer
 from src.reporting import ReportGenerator, VisualizationGenerator
+from pipelines.step_cache import PipelineStep, StepCache, StepRunner
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,36 +36,63 @@ logger = logging.getLogger(__name__)
 class FullAnalysisPipeline:
     """Orchestrates complete healthcare COI analysis pipeline"""
     
-    def __init__(self, config_path: str = "config/config.yaml"):
+    def __init__(
+        self,
+        config_path: str = "config/config.yaml",
+        backend: Optional[str] = None,
+        draft_charts: bool = False
+    ):
         """
         Initialize pipeline with configuration
         
         Args:
             config_path: Path to configuration file
+            backend: Override the SQL execution backend ('bigquery' or 'duckdb')
+            draft_charts: Render charts in the lightweight draft mode
         """
         self.config_path = config_path
-        self.data_loader = DataLoader(config_path)
+        self.data_loader = DataLoader(config_path, backend=backend)
+        if draft_charts:
+            # Part of the visualizations step's config fingerprint
+            reports_config = self.data_loader.config.setdefault('reports', {})
+            reports_config['visualizations'] = dict(reports_config.get('visualizations') or {}, draft=True)
         self.validator = DataValidator()
         self.lineage_tracker = None
         self.results = {}
         
+        # Outputs of unchanged steps are reused across runs
+        cache_config = dict((self.data_loader.config.get('performance') or {}).get('step_cache') or {})
+        self.step_cache = StepCache(
+            cache_dir=cache_config.get('cache_dir', 'data/cache/pipeline_steps'),
+            keep_versions=cache_config.get('keep_versions', 3)
+        ) if cache_config.get('enabled', True) else None
+        
     def run(
         self,
         force_reload: bool = False,
         generate_visualizations: bool = True,
         report_style: str = "investigative",
         output_format: str = "markdown",
-        use_bigquery_analysis: bool = True
+        use_bigquery_analysis: bool = True,
+        steps: Optional[List[str]] = None,
+        use_step_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Run complete analysis pipeline
         
+        Steps whose inputs (config, NPI roster, upstream outputs, code) are
+        unchanged since an earlier run are restored from the step cache, so a
+        rerun resumes from the first invalidated step.
+        
         Args:
-            force_reload: Force reload data from BigQuery
+            force_reload: Force reload data from BigQuery (re-executes every step)
             generate_visualizations: Whether to generate charts
             report_style: Style of report to generate
             output_format: Output format for report
             use_bigquery_analysis: Use BigQuery for analysis (no large downloads)
+            steps: Only bring these steps (and the steps they depend on) up to
+                date; the named steps are re-executed even if cached
+            use_step_cache: Reuse unchanged step outputs from earlier runs
             
         Returns:
             Dictionary with analysis results and report path
@@ -73,116 +101,47 @@ class FullAnalysisPipeline:
         logger.info("STARTING FULL HEALTHCARE COI ANALYSIS PIPELINE")
         logger.info("="*60)
         
+        # The connector is shared with other clients' pipelines (batch mode)
+        self.data_loader.apply_connector_settings()
+        
         # Initialize lineage tracking
         self.lineage_tracker = DataLineageTracker()
+        self.data_loader.set_lineage_tracker(self.lineage_tracker)
+        self._bq_analyzer = None
+        
+        # Start a fresh bytes-billed budget for this run
+        if self.data_loader.bq.cost_guard:
+            self.data_loader.bq.cost_guard.start_run()
         
         try:
             if use_bigquery_analysis:
                 # Use BigQuery for all analysis - minimal downloads
                 logger.info("\n[Using BigQuery Analysis - No Large Downloads]")
-                
-                # Step 1: Create tables in BigQuery (no download)
-                logger.info("\n[Step 1/7] Creating BigQuery tables...")
-                self._create_bigquery_tables(force_reload)
-                
-                # Step 2-5: Run all analysis in BigQuery
-                logger.info("\n[Step 2-5/7] Running analysis in BigQuery...")
-                bq_analyzer = BigQueryAnalyzer(
-                    self.data_loader.bq.client,
-                    self.data_loader.config,
-                    self.data_loader.config['analysis']['start_year'],
-                    self.data_loader.config['analysis']['end_year'],
-                    lineage_tracker=self.lineage_tracker
-                )
-                
-                logger.info("  - Analyzing Open Payments...")
-                self.results['open_payments'] = bq_analyzer.analyze_open_payments()
-                
-                logger.info("  - Analyzing Prescriptions...")
-                self.results['prescriptions'] = bq_analyzer.analyze_prescriptions()
-                
-                logger.info("  - Analyzing Correlations...")
-                self.results['correlations'] = bq_analyzer.analyze_correlations()
-                
-                logger.info("  - Performing Risk Assessment...")
-                self.results['risk_assessment'] = bq_analyzer.analyze_risk_assessment()
-                
                 # Skip specialty analysis for now (can be added to BigQuery analyzer)
                 self.results['specialty_analysis'] = {}
-                
-                # Add query tracking summary to lineage
-                query_summary = bq_analyzer.get_query_summary()
-                logger.info(f"\nQuery Execution Summary:")
-                logger.info(f"  Total queries: {query_summary['total_queries']}")
-                logger.info(f"  Successful with data: {query_summary['successful_with_data']}")
-                logger.info(f"  Successful but empty: {query_summary['successful_empty']}")
-                logger.info(f"  Failed: {query_summary['failed']}")
-                logger.info(f"  Data completeness: {query_summary['data_completeness']:.1f}%")
-                
-                # Add to results for lineage tracking
-                self.results['query_summary'] = query_summary
-                
-            else:
-                # Original approach - downloads data to pandas
-                # Step 1: Load and validate data
-                logger.info("\n[Step 1/7] Loading and validating data...")
-                data = self._load_and_validate_data(force_reload)
-                
-                # Step 2: Analyze Open Payments
-                logger.info("\n[Step 2/7] Analyzing Open Payments...")
-                self.results['open_payments'] = self._analyze_open_payments(data['payments'])
-                
-                # Step 3: Analyze Prescriptions
-                logger.info("\n[Step 3/7] Analyzing prescription patterns...")
-                self.results['prescriptions'] = self._analyze_prescriptions(data['prescriptions'])
-                
-                # Step 4: Analyze Correlations
-                logger.info("\n[Step 4/7] Analyzing payment-prescription correlations...")
-                self.results['correlations'] = self._analyze_correlations(
-                    data['payments'], data['prescriptions']
-                )
-                
-                # Step 5: Risk Assessment
-                logger.info("\n[Step 5/7] Performing risk assessment...")
-                self.results['risk_assessment'] = self._assess_risks(
-                    data['payments'], data['prescriptions']
-                )
-                
-                # Step 6: Specialty Analysis
-                logger.info("\n[Step 6/7] Analyzing specialty patterns...")
-                self.results['specialty_analysis'] = self._analyze_specialties(
-                    data['payments'], data['prescriptions']
-                )
             
-            # Step 7: Generate visualizations
-            if generate_visualizations:
-                logger.info("\n[Step 7/7] Generating visualizations...")
-                self.results['visualizations'] = self._generate_visualizations()
+            pipeline_steps = self._build_steps(
+                force_reload, generate_visualizations, report_style, output_format, use_bigquery_analysis
+            )
+            self._runner = StepRunner(
+                pipeline_steps,
+                self.data_loader.config,
+                npi_hash=self._npi_hash(),
+                cache=self.step_cache if use_step_cache else None
+            )
+            force = list(self._runner.steps) if force_reload else list(steps or [])
             
-            # Finalize lineage tracking and add to results BEFORE report generation
-            self.lineage_tracker.finalize()
-            
-            # Include query summary in lineage if available
-            lineage_data = {
-                'markdown': self.lineage_tracker.generate_lineage_markdown(),
-                'summary': self.lineage_tracker.get_summary(),
-                'full_lineage': self.lineage_tracker.get_lineage()
-            }
+            # Analysis queries of every step that will run are submitted together
+            self._planned_steps = set(self._runner.order(steps))
+            self._pending_steps = set(self._runner.pending(steps, force))
+            # BigQuery job telemetry is attributed to the step that is executing
+            self._runner.run(steps, force=force, on_output=self._store_step_output,
+                             on_start=lambda step: self.lineage_tracker.set_current_step(step.name))
+            self.lineage_tracker.set_current_step(None)
             
-            # Add query summary if using BigQuery approach
-            if 'query_summary' in self.results:
-                lineage_data['query_summary'] = self.results['query_summary']
-                
-            self.results['data_lineage'] = lineage_data
-            
-            # Save lineage to file
-            lineage_path = self.lineage_tracker.save_lineage()
-            self.results['lineage_path'] = str(lineage_path)
-            
-            # Generate report (now with lineage data available)
-            logger.info("\n[Final Step] Generating report...")
-            report_path = self._generate_report(report_style, output_format)
-            self.results['report_path'] = report_path
+            # Lineage is finalized by the report step; targeted runs may not reach it
+            self._finalize_lineage()
+            self.results['pipeline_steps'] = dict(self._runner.status)
             
             # Print summary
             self._print_summary()
@@ -198,6 +157,218 @@ class FullAnalysisPipeline:
             logger.error(traceback.format_exc())
             raise
     
+    def _build_steps(
+        self,
+        force_reload: bool,
+        generate_visualizations: bool,
+        report_style: str,
+        output_format: str,
+        use_bigquery_analysis: bool
+    ) -> List[PipelineStep]:
+        """Declare the pipeline DAG for this run's options"""
+        analysis_config = ['analysis', 'health_system.short_name', 'thresholds']
+        analysis_steps = ['open_payments', 'prescriptions', 'correlations', 'risk_assessment']
+        
+        if use_bigquery_analysis:
+            table_config = ['analysis', 'health_system', 'bigquery.project_id', 'bigquery.dataset',
+                            'bigquery.temp_dataset', 'bigquery.tables', 'bigquery.backend']
+            analyzer_code = ['src/analysis/bigquery_analysis.py', 'src/analysis/metric_compiler.py',
+                             'src/config/analysis_config.py']
+            steps = [
+                PipelineStep('tables', lambda inputs: self._create_bigquery_tables(force_reload),
+                             config_keys=table_config, uses_npis=True,
+                             code=['src/data/data_loader.py'],
+                             validate=lambda output: output == self._temp_table_versions())
+            ]
+            for name in analysis_steps:
+                steps.append(PipelineStep(
+                    name, lambda inputs, name=name: self._run_bigquery_analysis(name),
+                    depends_on=['tables'], config_keys=analysis_config + table_config,
+                    code=analyzer_code, result_key=name
+                ))
+        else:
+            steps = [
+                PipelineStep('data', lambda inputs: self._load_and_validate_data(force_reload),
+                             config_keys=['analysis', 'health_system', 'bigquery'], uses_npis=True,
+                             code=['src/data/data_loader.py', 'src/data/data_validator.py']),
+                PipelineStep('open_payments',
+                             lambda inputs: self._analyze_open_payments(inputs['data']['payments']),
+                             depends_on=['data'], code=['src/analysis/open_payments.py'],
+                             result_key='open_payments'),
+                PipelineStep('prescriptions',
+                             lambda inputs: self._analyze_prescriptions(inputs['data']['prescriptions']),
+                             depends_on=['data'], code=['src/analysis/prescriptions.py'],
+                             result_key='prescriptions'),
+                PipelineStep('correlations',
+                             lambda inputs: self._analyze_correlations(inputs['data']['payments'],
+                                                                       inputs['data']['prescriptions']),
+                             depends_on=['data'],
+                             code=['src/analysis/correlations.py', 'src/config/analysis_config.py'],
+                             result_key='correlations'),
+                PipelineStep('risk_assessment',
+                             lambda inputs: self._assess_risks(inputs['data']['payments'],
+                                                               inputs['data']['prescriptions']),
+                             depends_on=['data'], config_keys=analysis_config,
+                             code=['src/analysis/risk_scoring.py', 'src/analysis/risk_model.py',
+                                   'src/analysis/open_payments.py'],
+                             result_key='risk_assessment'),
+                PipelineStep('specialty_analysis',
+                             lambda inputs: self._analyze_specialties(inputs['data']['payments'],
+                                                                      inputs['data']['prescriptions']),
+                             depends_on=['data'], code=['src/analysis/specialty_analysis.py'],
+                             result_key='specialty_analysis')
+            ]
+            analysis_steps = analysis_steps + ['specialty_analysis']
+        
+        report_inputs = list(analysis_steps)
+        if generate_visualizations:
+            steps.append(PipelineStep(
+                'visualizations', lambda inputs: self._generate_visualizations(),
+                depends_on=analysis_steps, config_keys=['reports.visualizations'],
+                code=['src/reporting/visualizations.py'], result_key='visualizations',
+                validate=lambda output: (isinstance(output, dict) and
+                                         VisualizationGenerator.figures_unchanged(output))
+            ))
+            report_inputs.append('visualizations')
+        
+        steps.append(PipelineStep(
+            'report', lambda inputs: self._generate_report(report_style, output_format),
+            depends_on=report_inputs, config_keys=['health_system', 'analysis', 'reports'],
+            code=['src/reporting/*.py', 'src/reporting/section_prompts.yaml', 'src/reporting/templates/**'],
+            params={'report_style': report_style, 'output_format': output_format},
+            result_key='report_path',
+            validate=lambda output: Path(output).exists()
+        ))
+        return steps
+    
+    def _store_step_output(self, step: PipelineStep, output: Any):
+        """Expose a completed (or restored) step output to downstream steps"""
+        if step.result_key:
+            self.results[step.result_key] = output
+    
+    def _npi_hash(self) -> str:
+        """Hash of the current NPI roster file (empty if it doesn't exist)"""
+        npi_file = Path(self.data_loader.config['health_system']['npi_file'])
+        return self.data_loader._calculate_file_hash(npi_file) if npi_file.exists() else ''
+    
+    def _temp_table_versions(self) -> Dict[str, Optional[str]]:
+        """last_modified of each temp table the analysis reads (None if missing)"""
+        config = self.data_loader.config
+        temp_dataset = config['bigquery'].get('temp_dataset', 'temp')
+        short_name = config['health_system']['short_name']
+        years = f"{config['analysis']['start_year']}_{config['analysis']['end_year']}"
+        tables = [
+            f"{short_name}_{family}_{grain}_{years}"
+            for family in ('open_payments', 'prescriptions') for grain in ('detailed', 'summary')
+        ]
+        
+        versions = {}
+        for table in tables:
+            try:
+                modified = self.data_loader.bq.client.get_table(
+                    f"{config['bigquery']['project_id']}.{temp_dataset}.{table}"
+                ).modified
+                versions[table] = modified.isoformat() if modified else None
+            except Exception:
+                versions[table] = None
+        return versions
+    
+    def _run_bigquery_analysis(self, step_name: str) -> Dict[str, Any]:
+        """Run one BigQuery analysis step, submitting the queries of all pending ones first"""
+        if self._bq_analyzer is None:
+            # Pass the connector (not the raw client) so results go through the query cache
+            self._bq_analyzer = BigQueryAnalyzer(
+                self.data_loader.bq,
+                self.data_loader.config,
+                self.data_loader.config['analysis']['start_year'],
+                self.data_loader.config['analysis']['end_year'],
+                lineage_tracker=self.lineage_tracker
+            )
+            query_builders = {
+                'open_payments': self._bq_analyzer._open_payments_queries,
+                'prescriptions': self._bq_analyzer._prescriptions_queries,
+                'correlations': self._bq_analyzer._correlations_queries,
+                'risk_assessment': self._bq_analyzer._risk_assessment_queries
+            }
+            # Steps below rebuilt tables rerun too, even if they looked cached up front
+            tables_rebuilt = self._runner.status.get('tables', {}).get('status') == 'ran'
+            queries = {}
+            for name, build in query_builders.items():
+                if name == step_name or name in self._pending_steps or (
+                        tables_rebuilt and name in self._planned_steps and name not in self._runner.outputs):
+                    queries.update(build())
+            logger.info(f"  - Running analysis queries concurrently ({len(queries)} queries)...")
+            self._bq_analyzer.prefetch(queries)
+        
+        logger.info(f"  - Analyzing {step_name.replace('_', ' ').title()}...")
+        analyze = {
+            'open_payments': self._bq_analyzer.analyze_open_payments,
+            'prescriptions': self._bq_analyzer.analyze_prescriptions,
+            'correlations': self._bq_analyzer.analyze_correlations,
+            'risk_assessment': self._bq_analyzer.analyze_risk_assessment
+        }[step_name]
+        return analyze()
+    
+    def _record_query_summary(self):
+        """Add this run's query tracking, cache and cost summary to the results"""
+        query_summary = self._bq_analyzer.get_query_summary()
+        logger.info(f"\nQuery Execution Summary:")
+        logger.info(f"  Total queries: {query_summary['total_queries']}")
+        logger.info(f"  Successful with data: {query_summary['successful_with_data']}")
+        logger.info(f"  Successful but empty: {query_summary['successful_empty']}")
+        logger.info(f"  Failed: {query_summary['failed']}")
+        logger.info(f"  Data completeness: {query_summary['data_completeness']:.1f}%")
+        logger.info(f"  BigQuery jobs: {query_summary['bigquery_jobs']}")
+        logger.info(f"  Total query time: {query_summary['total_query_time_ms'] / 1000:.1f}s")
+        
+        # Add to results for lineage tracking
+        self.results['query_summary'] = query_summary
+        
+        cache_stats = self.data_loader.bq.get_cache_stats()
+        logger.info(f"Query cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                   f"({cache_stats['hit_rate']:.1f}% hit rate), "
+                   f"{cache_stats['bytes_read'] / 1024 ** 2:,.1f} MB read from cache")
+        self.results['query_summary']['cache'] = cache_stats
+        
+        cost_summary = self.data_loader.bq.get_cost_summary()
+        if cost_summary:
+            logger.info(f"Query cost: {cost_summary['run_gb_estimate']:,.2f} GB scanned (estimated) "
+                       f"across {cost_summary['queries_checked']} dry-run queries, "
+                       f"{cost_summary['queries_routed']} routed to fallback tables")
+            self.results['query_summary']['cost'] = cost_summary
+    
+    def _finalize_lineage(self):
+        """Finalize lineage tracking and add it to the results (once per run)"""
+        if self.lineage_tracker.lineage['execution_metrics']['end_time']:
+            return
+        
+        if self._bq_analyzer is not None:
+            self._record_query_summary()
+        
+        # Record which steps ran and which were restored from the step cache
+        self.results['pipeline_steps'] = dict(self._runner.status)
+        for name, status in self._runner.status.items():
+            self.lineage_tracker.add_pipeline_step(name, status)
+        
+        self.lineage_tracker.finalize()
+        
+        # Include query summary in lineage if available
+        lineage_data = {
+            'markdown': self.lineage_tracker.generate_lineage_markdown(),
+            'summary': self.lineage_tracker.get_summary(),
+            'full_lineage': self.lineage_tracker.get_lineage()
+        }
+        
+        # Add query summary if using BigQuery approach
+        if 'query_summary' in self.results:
+            lineage_data['query_summary'] = self.results['query_summary']
+            
+        self.results['data_lineage'] = lineage_data
+        
+        # Save lineage to file
+        lineage_path = self.lineage_tracker.save_lineage()
+        self.results['lineage_path'] = str(lineage_path)
+    
     def _load_and_validate_data(self, force_reload: bool) -> Dict[str, Any]:
         """Load and validate all required data"""
         data = {}
@@ -297,16 +468,31 @@ class FullAnalysisPipeline:
         
         return results
     
-    def _generate_visualizations(self):
-        """Generate visualization charts"""
-        viz_gen = VisualizationGenerator()
+    def _generate_visualizations(self) -> Dict[str, Optional[str]]:
+        """
+        Generate visualization charts
+        
+        Each health system renders into its own reports/figures/<short_name>
+        directory, so clients never overwrite each other's figures.
+        
+        Returns:
+            Figure path -> manifest fingerprint (checked before a cached output is reused)
+        """
+        config = self.data_loader.config
+        viz_settings = (config.get('reports') or {}).get('visualizations')
+        output_dir = Path('reports/figures') / config['health_system']['short_name']
+        viz_gen = VisualizationGenerator.from_config(viz_settings, output_dir=str(output_dir))
         figures = viz_gen.generate_all_visualizations(self.results)
         
         logger.info(f"Generated {len(figures)} visualizations")
-        return figures
+        return viz_gen.figure_fingerprints(figures)
     
     def _generate_report(self, report_style: str, output_format: str) -> str:
         """Generate final report"""
+        # Lineage data must be available to the report
+        self._finalize_lineage()
+        
+        logger.info("\n[Final Step] Generating report...")
         report_gen = ReportGenerator(self.config_path)
         report_path = report_gen.generate_report(
             self.results,
@@ -317,7 +503,7 @@ class FullAnalysisPipeline:
         logger.info(f"Report generated: {report_path}")
         return report_path
     
-    def _create_bigquery_tables(self, force_reload: bool):
+    def _create_bigquery_tables(self, force_reload: bool) -> Dict[str, Optional[str]]:
         """Create tables in BigQuery temp dataset without downloading data"""
         # Pass lineage tracker to data loader
         self.data_loader.set_lineage_tracker(self.lineage_tracker)
@@ -345,6 +531,9 @@ class FullAnalysisPipeline:
         )
         
         logger.info("All BigQuery tables created successfully")
+        
+        # Downstream steps are invalidated when a table is rebuilt or refreshed
+        return self._temp_table_versions()
     
     def _print_summary(self):
         """Print analysis summary"""
@@ -391,22 +580,30 @@ def main():
     parser.add_argument('--config', default='config/config.yaml', help='Config file path')
     parser.add_argument('--force-reload', action='store_true', help='Force reload from BigQuery')
     parser.add_argument('--no-viz', action='store_true', help='Skip visualizations')
+    parser.add_argument('--draft-charts', action='store_true',
+                       help='Render charts in the lightweight draft mode')
     parser.add_argument('--style', default='investigative', 
                        choices=['investigative', 'compliance', 'executive'],
                        help='Report style')
     parser.add_argument('--format', default='markdown',
                        choices=['markdown', 'html'],
                        help='Output format')
+    parser.add_argument('--step', action='append', dest='steps',
+                       help='Only (re)run this step and what it depends on (repeatable)')
+    parser.add_argument('--no-step-cache', action='store_true',
+                       help='Re-execute every step instead of reusing unchanged outputs')
     
     args = parser.parse_args()
     
     # Run pipeline
-    pipeline = FullAnalysisPipeline(args.config)
+    pipeline = FullAnalysisPipeline(args.config, draft_charts=args.draft_charts)
     results = pipeline.run(
         force_reload=args.force_reload,
         generate_visualizations=not args.no_viz,
         report_style=args.style,
-        output_format=args.format
+        output_format=args.format,
+        steps=args.steps,
+        use_step_cache=not args.no_step_cache
     )
     
     return 0 if results else 1
@@ -0,0 +1,316 @@
+"""
+Pipeline Step Cache
+Declared pipeline steps with content-addressed, resumable outputs
+
+Each PipelineStep declares its upstream steps, the config sections it reads,
+whether it depends on the NPI roster, and the source files that implement it.
+Its fingerprint hashes all of those together with the hashes of its upstream
+outputs and any run parameters, so a step is only re-executed when something
+it actually depends on changed. Outputs are pickled to the step cache; a
+rerun after a failure resumes from the first invalidated step.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Project root; code versions hash source files relative to it
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def code_version(patterns: List[str]) -> str:
+    """Hash of the source files matching the given globs (relative to the project root)"""
+    digest = hashlib.sha256()
+    for pattern in patterns:
+        for path in sorted(glob.glob(str(_ROOT / pattern), recursive=True)):
+            if os.path.isfile(path):
+                digest.update(os.path.relpath(path, _ROOT).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+class PipelineStep:
+    """A named pipeline step and everything its output depends on"""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Any]], Any],
+        depends_on: Optional[List[str]] = None,
+        config_keys: Optional[List[str]] = None,
+        code: Optional[List[str]] = None,
+        uses_npis: bool = False,
+        params: Optional[Dict[str, Any]] = None,
+        validate: Optional[Callable[[Any], bool]] = None,
+        result_key: Optional[str] = None
+    ):
+        """
+        Declare a pipeline step
+
+        Args:
+            name: Step name (unique within the pipeline)
+            run: Called with {upstream step name: output}; returns the step output
+            depends_on: Upstream step names
+            config_keys: Dotted config paths the step reads (e.g. 'bigquery.tables')
+            code: Globs of the source files implementing the step
+            uses_npis: Whether the NPI roster is an input
+            params: Run parameters that change the output (e.g. report style)
+            validate: Called with a cached output; False forces a rerun (e.g. the
+                files or tables it points to no longer exist)
+            result_key: Key of FullAnalysisPipeline.results the output is stored under
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on or [])
+        self.config_keys = list(config_keys or [])
+        self.code = list(code or [])
+        self.uses_npis = uses_npis
+        self.params = dict(params or {})
+        self.validate = validate
+        self.result_key = result_key
+
+
+class StepCache:
+    """Pickled step outputs keyed by step name and fingerprint"""
+
+    def __init__(self, cache_dir: str = "data/cache/pipeline_steps", keep_versions: int = 3):
+        """
+        Initialize step cache
+
+        Args:
+            cache_dir: Directory for cached step outputs
+            keep_versions: Cached outputs kept per step (oldest removed first)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.keep_versions = keep_versions
+
+    def _paths(self, step: str, fingerprint: str):
+        step_dir = self.cache_dir / step
+        return step_dir / f"{fingerprint}.pkl", step_dir / f"{fingerprint}.json"
+
+    def meta(self, step: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Metadata of a cached output ({'output_hash', 'created_at', ...}) or None"""
+        data_path, meta_path = self._paths(step, fingerprint)
+        if not data_path.exists() or not meta_path.exists():
+            return None
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def get(self, step: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached entry {'output', 'output_hash', ...} or None"""
+        meta = self.meta(step, fingerprint)
+        if meta is None:
+            return None
+        data_path, meta_path = self._paths(step, fingerprint)
+        try:
+            with open(data_path, 'rb') as f:
+                meta['output'] = pickle.load(f)
+            os.utime(meta_path)
+            return meta
+        except Exception as e:
+            logger.warning(f"Discarding unreadable step cache entry {step}/{fingerprint[:12]}: {e}")
+            return None
+
+    def put(self, step: str, fingerprint: str, output: Any, duration_seconds: float) -> str:
+        """Store a step output; returns its content hash"""
+        data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        output_hash = hashlib.sha256(data).hexdigest()
+        data_path, meta_path = self._paths(step, fingerprint)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename so an interrupted run never leaves a truncated entry
+        tmp_path = data_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, data_path)
+        with open(meta_path, 'w') as f:
+            json.dump({
+                'step': step,
+                'fingerprint': fingerprint,
+                'output_hash': output_hash,
+                'output_bytes': len(data),
+                'duration_seconds': round(duration_seconds, 3),
+                'created_at': datetime.now().isoformat()
+            }, f, indent=2)
+
+        self._prune(step)
+        return output_hash
+
+    def _prune(self, step: str):
+        metas = sorted((self.cache_dir / step).glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for meta_path in metas[self.keep_versions:]:
+            meta_path.unlink(missing_ok=True)
+            meta_path.with_suffix('.pkl').unlink(missing_ok=True)
+
+    def clear(self, step: Optional[str] = None) -> int:
+        """Remove cached outputs (of one step, or all); returns the number removed"""
+        removed = 0
+        for meta_path in self.cache_dir.glob(f"{step or '*'}/*.json"):
+            meta_path.unlink(missing_ok=True)
+            meta_path.with_suffix('.pkl').unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+class StepRunner:
+    """Runs declared steps in dependency order, reusing cached outputs"""
+
+    def __init__(
+        self,
+        steps: List[PipelineStep],
+        config: Dict[str, Any],
+        npi_hash: str = "",
+        cache: Optional[StepCache] = None
+    ):
+        """
+        Initialize step runner
+
+        Args:
+            steps: Pipeline steps (any order; dependencies must be declared)
+            config: Full pipeline configuration (steps hash only their config_keys)
+            npi_hash: Hash of the current NPI roster
+            cache: Step cache, or None to run every step
+        """
+        self.steps = {step.name: step for step in steps}
+        self.config = config
+        self.npi_hash = npi_hash
+        self.cache = cache
+        self.outputs: Dict[str, Any] = {}
+        self.status: Dict[str, Dict[str, Any]] = {}
+        self._code_versions: Dict[str, str] = {}
+        for step in steps:
+            missing = [name for name in step.depends_on if name not in self.steps]
+            if missing:
+                raise ValueError(f"Step {step.name!r} depends on undeclared steps: {missing}")
+
+    def order(self, targets: Optional[List[str]] = None) -> List[str]:
+        """Topological order of the targets and their upstream steps (all steps by default)"""
+        unknown = [name for name in (targets or []) if name not in self.steps]
+        if unknown:
+            raise ValueError(f"Unknown pipeline steps: {unknown} (available: {', '.join(self.steps)})")
+
+        ordered, visiting = [], set()
+
+        def visit(name):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline step cycle through {name!r}")
+            visiting.add(name)
+            for upstream in self.steps[name].depends_on:
+                visit(upstream)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in targets or self.steps:
+            visit(name)
+        return ordered
+
+    def _config_subset(self, keys: List[str]) -> Dict[str, Any]:
+        subset = {}
+        for key in keys:
+            value = self.config
+            for part in key.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            subset[key] = value
+        return subset
+
+    def fingerprint(self, name: str, output_hashes: Dict[str, str]) -> str:
+        """Fingerprint of a step from its declared inputs and upstream output hashes"""
+        step = self.steps[name]
+        if name not in self._code_versions:
+            self._code_versions[name] = code_version(step.code)
+        inputs = {
+            'step': name,
+            'config': self._config_subset(step.config_keys),
+            'npi_hash': self.npi_hash if step.uses_npis else None,
+            'upstream': {upstream: output_hashes[upstream] for upstream in step.depends_on},
+            'code': self._code_versions[name],
+            'params': step.params
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def pending(self, targets: Optional[List[str]] = None, force: Optional[List[str]] = None) -> List[str]:
+        """
+        Steps expected to execute rather than be served from cache
+
+        Conservative: a step below a pending step counts as pending, although
+        it still hits the cache if the upstream output comes out unchanged.
+        """
+        force = set(force or [])
+        output_hashes, pending = {}, []
+        for name in self.order(targets):
+            step = self.steps[name]
+            meta = None
+            if self.cache and name not in force and not any(upstream in pending for upstream in step.depends_on):
+                meta = self.cache.meta(name, self.fingerprint(name, output_hashes))
+            if meta is None:
+                pending.append(name)
+            else:
+                output_hashes[name] = meta['output_hash']
+        return pending
+
+    def run(self, targets: Optional[List[str]] = None, force: Optional[List[str]] = None,
+            on_output: Optional[Callable[[PipelineStep, Any], None]] = None,
+            on_start: Optional[Callable[[PipelineStep], None]] = None) -> Dict[str, Any]:
+        """
+        Run the targets (all steps by default) and whatever they depend on
+
+        Args:
+            targets: Steps to bring up to date
+            force: Steps to re-execute even when a valid cached output exists
+            on_output: Called with (step, output) as each step completes or is
+                restored, before any downstream step runs
+            on_start: Called with the step before it is executed (not when restored)
+
+        Returns:
+            Mapping of step name -> output
+        """
+        force = set(force or [])
+        output_hashes: Dict[str, str] = {}
+        for name in self.order(targets):
+            step = self.steps[name]
+            fingerprint = self.fingerprint(name, output_hashes)
+            entry = self.cache.get(name, fingerprint) if self.cache and name not in force else None
+            if entry is not None and step.validate is not None and not step.validate(entry['output']):
+                logger.info(f"Cached output of step {name} is no longer valid")
+                entry = None
+
+            if entry is not None:
+                logger.info(f"[{name}] unchanged - reusing cached output ({fingerprint[:12]})")
+                output, output_hash = entry['output'], entry['output_hash']
+                self.status[name] = {'status': 'cached', 'fingerprint': fingerprint,
+                                     'cached_at': entry.get('created_at')}
+            else:
+                logger.info(f"[{name}] running ({'forced' if name in force else 'inputs changed or not cached'})")
+                if on_start:
+                    on_start(step)
+                start = time.perf_counter()
+                output = step.run({upstream: self.outputs[upstream] for upstream in step.depends_on})
+                duration = time.perf_counter() - start
+                if self.cache:
+                    output_hash = self.cache.put(name, fingerprint, output, duration)
+                else:
+                    output_hash = hashlib.sha256(pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+                self.status[name] = {'status': 'ran', 'fingerprint': fingerprint,
+                                     'duration_seconds': round(duration, 3)}
+
+            self.outputs[name] = output
+            output_hashes[name] = output_hash
+            if on_output:
+                on_output(step, output)
+        return self.outputs
@@ -20,7 +20,7 @@ from src.analysis import (
     RiskScorer,
     SpecialtyAnalyzer
 )
-from src.reporting import ClaudeLLMClient, SectionDataMapper
+from src.reporting import ClaudeLLMClient, SectionDataMapper, NarrativeCache
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -58,14 +58,16 @@ def extract_sections_from_report(report_path: str) -> dict:
 
 
 def run_full_analysis():
-    """Run the complete analysis pipeline to get fresh data"""
+    """Run the complete analysis pipeline to get fresh data (returns results and config)"""
     logger.info("Running full analysis pipeline...")
     
     # Load data
     loader = DataLoader()
     providers = loader.load_provider_npis()
-    payments = loader.load_open_payments()
-    prescriptions = loader.load_prescriptions()
+    # Detailed tables stream to partitioned Parquet (reused while unchanged);
+    # the analyzers take DataFrames, so the downloads are read back from disk
+    payments = loader.load_open_payments().to_pandas()
+    prescriptions = loader.load_prescriptions().to_pandas()
     
     # Run analyses
     results = {}
@@ -92,11 +94,16 @@ def run_full_analysis():
     spec_analyzer = SpecialtyAnalyzer(payments, prescriptions)
     results['specialty_analysis'] = spec_analyzer.analyze_all()
     
-    return results
+    return results, config
 
 
-def regenerate_section(section_name: str, report_path: str, output_path: str = None):
-    """Regenerate a specific section and update the report"""
+def regenerate_section(section_name: str, report_path: str, output_path: str = None, refresh: bool = False):
+    """
+    Regenerate a specific section and update the report
+    
+    Unless refresh is set, a narrative cached for the same prompt and data is
+    reused; pass refresh=True (--refresh) to request a new one from the API.
+    """
     
     logger.info(f"Regenerating section: {section_name}")
     
@@ -104,14 +111,17 @@ def regenerate_section(section_name: str, report_path: str, output_path: str = N
     existing_sections = extract_sections_from_report(report_path)
     
     # Run analysis to get data
-    analysis_results = run_full_analysis()
+    analysis_results, config = run_full_analysis()
     
     # Load prompts
     with open('src/reporting/section_prompts.yaml', 'r') as f:
         prompts_config = yaml.safe_load(f)
     
     # Initialize LLM client and data mapper
-    llm_client = ClaudeLLMClient()
+    cache_settings = config.get('reports', {}).get('llm', {}).get('narrative_cache', {})
+    cache = NarrativeCache(cache_settings.get('cache_dir', 'data/cache/narratives')) \
+        if cache_settings.get('enabled', True) else None
+    llm_client = ClaudeLLMClient(cache=cache)
     
     # Prepare report data (similar to ReportGenerator._prepare_report_data)
     report_data = {
@@ -146,7 +156,8 @@ def regenerate_section(section_name: str, report_path: str, output_path: str = N
         new_content = llm_client.generate_section(
             section_config,
             section_data,
-            previous_sections=previous_sections
+            previous_sections=previous_sections,
+            refresh=refresh
         )
         logger.info(f"Generated {len(new_content)} characters for {section_name}")
     except Exception as e:
@@ -203,10 +214,12 @@ def main():
     parser.add_argument('section', help='Section name to regenerate (e.g., executive_summary)')
     parser.add_argument('report', help='Path to the existing report file')
     parser.add_argument('--output', help='Output path (default: overwrite input file)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Generate a new narrative even if one is cached for the same prompt and data')
     
     args = parser.parse_args()
     
-    regenerate_section(args.section, args.report, args.output)
+    regenerate_section(args.section, args.report, args.output, refresh=args.refresh)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Execution Backend Benchmark for Healthcare COI Analytics
+Runs the BigQuery analysis queries on BigQuery and on the local DuckDB backend,
+then compares per-query timings and results
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data import DataLoader
+from src.analysis.bigquery_analysis import BigQueryAnalyzer
+
+
+def run_backend(config_path: str, backend: str, build_tables: bool = False) -> Dict[str, Any]:
+    """
+    Build the temp tables (optionally) and run every analysis query on one backend
+
+    Returns:
+        Dictionary with table build time, per-query (DataFrame, milliseconds)
+        results, and the analyzer that produced them
+    """
+    loader = DataLoader(config_path, backend=backend)
+    # Time execution, not the result cache
+    loader.bq.cache_enabled = False
+    config = loader.config
+
+    build_seconds = None
+    if build_tables:
+        start = time.perf_counter()
+        loader.load_open_payments(create_only=True, force_reload=True)
+        loader.load_prescriptions(create_only=True, force_reload=True)
+        build_seconds = time.perf_counter() - start
+
+    analyzer = BigQueryAnalyzer(
+        loader.bq, config, config['analysis']['start_year'], config['analysis']['end_year']
+    )
+    queries = {}
+    queries.update(analyzer._open_payments_queries())
+    queries.update(analyzer._prescriptions_queries())
+    queries.update(analyzer._correlations_queries())
+    queries.update(analyzer._risk_assessment_queries())
+
+    results = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        df, status = analyzer._run_query(query, name)
+        results[name] = (df, status, (time.perf_counter() - start) * 1000)
+
+    return {'build_seconds': build_seconds, 'results': results, 'analyzer': analyzer}
+
+
+def _metric_frames(analyzer: BigQueryAnalyzer, name: str, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Fan compiled metric groups out into their metrics; other queries pass through"""
+    for group in (analyzer._open_payments_metric_group(), analyzer._correlations_metric_group()):
+        if group.name == name:
+            return group.fan_out(df)
+    return {name: df}
+
+
+def compare_frames(left: pd.DataFrame, right: pd.DataFrame, rtol: float) -> Tuple[bool, str]:
+    """Compare two results ignoring row order; numeric columns within rtol"""
+    if list(left.columns) != list(right.columns):
+        return False, "columns differ"
+    if len(left) != len(right):
+        return False, f"{len(left)} vs {len(right)} rows"
+    if left.empty:
+        return True, "match"
+
+    columns = list(left.columns)
+    left = left.sort_values(columns).reset_index(drop=True)
+    right = right.sort_values(columns).reset_index(drop=True)
+    for column in columns:
+        a, b = left[column], right[column]
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            if not np.allclose(a.astype(float), b.astype(float), rtol=rtol, equal_nan=True):
+                diff = (a.astype(float) - b.astype(float)).abs().max()
+                return False, f"{column} differs (max abs diff {diff:.4g})"
+        elif not a.astype(str).equals(b.astype(str)):
+            return False, f"{column} differs"
+    return True, "match"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the BigQuery and DuckDB execution backends',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/benchmark_backends.py --config config/corewell.yaml
+  python scripts/benchmark_backends.py --config config/corewell.yaml --build-tables --output data/output/backend_benchmark.csv
+
+The DuckDB backend reads the Parquet extract written by scripts/export_parquet_extract.py.
+        """
+    )
+
+    parser.add_argument('--config',
+                       default='config/config.yaml',
+                       help='Configuration file path')
+
+    parser.add_argument('--backends',
+                       nargs='+',
+                       default=['bigquery', 'duckdb'],
+                       choices=['bigquery', 'duckdb'],
+                       help='Backends to run (default: both)')
+
+    parser.add_argument('--build-tables',
+                       action='store_true',
+                       help='Rebuild and time the temp tables on each backend first')
+
+    parser.add_argument('--rtol',
+                       type=float,
+                       default=1e-6,
+                       help='Relative tolerance for numeric comparisons (APPROX_QUANTILES medians may need more)')
+
+    parser.add_argument('--output',
+                       help='Write per-query timings and comparison to this CSV file')
+
+    args = parser.parse_args()
+
+    runs = {}
+    for backend in args.backends:
+        print(f"Running analysis queries on {backend}...")
+        runs[backend] = run_backend(args.config, backend, args.build_tables)
+        if runs[backend]['build_seconds'] is not None:
+            print(f"  Temp tables built in {runs[backend]['build_seconds']:.1f}s")
+
+    rows = []
+    first = runs[args.backends[0]]
+    for name in first['results']:
+        row = {'query': name}
+        for backend, run in runs.items():
+            df, status, ms = run['results'][name]
+            row[f'{backend}_ms'] = round(ms)
+            row[f'{backend}_status'] = status
+        if len(runs) == 2:
+            (left_backend, left), (right_backend, right) = runs.items()
+            left_frames = _metric_frames(left['analyzer'], name, left['results'][name][0])
+            right_frames = _metric_frames(right['analyzer'], name, right['results'][name][0])
+            mismatches = []
+            for metric, frame in left_frames.items():
+                same, detail = compare_frames(frame, right_frames.get(metric, pd.DataFrame()), args.rtol)
+                if not same:
+                    mismatches.append(f"{metric}: {detail}")
+            row['result'] = 'match' if not mismatches else '; '.join(mismatches)
+        rows.append(row)
+
+    report = pd.DataFrame(rows)
+    print()
+    print(report.to_string(index=False))
+    for backend in args.backends:
+        print(f"\n{backend}: {report[f'{backend}_ms'].sum() / 1000:.1f}s total query time")
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        report.to_csv(args.output, index=False)
+        print(f"\nWrote {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
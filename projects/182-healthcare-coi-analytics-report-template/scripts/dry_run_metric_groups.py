@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Metric Group Dry-Run Comparison for Healthcare COI Analytics
+Dry-runs each compiled metric group script and the per-metric queries it
+replaces, and compares total_bytes_processed
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data import DataLoader, QueryCostGuard
+from src.data.query_guard import GB
+from src.analysis.bigquery_analysis import BigQueryAnalyzer
+
+
+def compare_groups(analyzer: BigQueryAnalyzer, guard: QueryCostGuard) -> List[Dict[str, Any]]:
+    """
+    Dry-run every metric group of the analyzer
+
+    Returns:
+        One row per group with the bytes of the compiled script, the summed
+        bytes of its metrics run as separate queries, and the metric count
+    """
+    rows = []
+    for group in (analyzer._open_payments_metric_group(), analyzer._correlations_metric_group()):
+        compiled_bytes = guard.estimate(group.compile())
+        per_metric_bytes = sum(guard.estimate(group.compile_metric(metric)) for metric in group.metrics)
+        rows.append({
+            'group': group.name,
+            'metrics': len(group.metrics),
+            'compiled_bytes': compiled_bytes,
+            'per_metric_bytes': per_metric_bytes
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare dry-run bytes of compiled metric groups and per-metric queries',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/dry_run_metric_groups.py --config config/corewell.yaml
+
+The summary temp tables must exist (run the pipeline, or DataLoader with create_only=True, first).
+Dry runs are free; nothing is executed.
+        """
+    )
+
+    parser.add_argument('--config',
+                       default='config/config.yaml',
+                       help='Configuration file path')
+
+    args = parser.parse_args()
+
+    loader = DataLoader(args.config, backend='bigquery')
+    config = loader.config
+    analyzer = BigQueryAnalyzer(loader.bq, config, config['analysis']['start_year'], config['analysis']['end_year'])
+    # No limits: used for its dry runs only
+    guard = QueryCostGuard(loader.bq.client)
+
+    report = pd.DataFrame(compare_groups(analyzer, guard))
+    report['compiled_gb'] = (report['compiled_bytes'] / GB).round(3)
+    report['per_metric_gb'] = (report['per_metric_bytes'] / GB).round(3)
+    report['reduction'] = (1 - report['compiled_bytes'] / report['per_metric_bytes'].clip(lower=1)).map('{:.0%}'.format)
+    print(report[['group', 'metrics', 'compiled_gb', 'per_metric_gb', 'reduction']].to_string(index=False))
+
+    total_compiled, total_per_metric = report['compiled_bytes'].sum(), report['per_metric_bytes'].sum()
+    print(f"\nTotal: {total_compiled / GB:.3f} GB compiled vs {total_per_metric / GB:.3f} GB per metric")
+    return 0 if total_compiled <= total_per_metric else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Parquet Extract Exporter for Healthcare COI Analytics
+Copies the source-table rows of a health system's roster from BigQuery to
+local Parquet files for the DuckDB execution backend
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data import DataLoader
+
+
+def export_extract(config_path: str, output_dir: str = None) -> Path:
+    """
+    Export roster rows of the source tables to <output_dir>/<dataset>/<table>.parquet
+
+    Args:
+        config_path: Health system configuration file
+        output_dir: Extract directory (default: bigquery.backend.source_dir or data/extracts)
+
+    Returns:
+        Extract directory
+    """
+    loader = DataLoader(config_path, backend='bigquery')
+    config = loader.config
+    project = config['bigquery']['project_id']
+    dataset = config['bigquery']['dataset']
+    temp_dataset = config['bigquery'].get('temp_dataset', 'temp')
+    start_year = config['analysis']['start_year']
+    end_year = config['analysis']['end_year']
+    output_dir = Path(output_dir or (config['bigquery'].get('backend') or {}).get('source_dir', 'data/extracts'))
+
+    # Uploads the roster to <short_name>_provider_npis
+    providers = loader.load_provider_npis()
+    npi_table = f"`{project}.{temp_dataset}.{config['health_system']['short_name']}_provider_npis`"
+    print(f"Exporting source rows for {len(providers):,} providers ({start_year}-{end_year})")
+
+    # (table, NPI column, year column)
+    sources = [
+        (config['bigquery']['tables']['open_payments'], 'covered_recipient_npi', 'program_year'),
+        (config['bigquery']['tables']['prescriptions'], 'NPI', 'CLAIM_YEAR'),
+        ('PHYSICIANS_OVERVIEW_optimized', 'NPI', None)
+    ]
+    for table, npi_column, year_column in sources:
+        where = f"{npi_column} IN (SELECT CAST(NPI AS INT64) FROM {npi_table})"
+        if year_column:
+            where += f" AND {year_column} BETWEEN {start_year} AND {end_year}"
+        df = loader.bq.query(
+            f"SELECT * FROM `{project}.{dataset}.{table}` WHERE {where}",
+            use_cache=False,
+            query_name=f"extract_{table}"
+        )
+
+        path = output_dir / dataset / f"{table}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, index=False)
+        print(f"✓ {table}: {len(df):,} rows -> {path}")
+
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export Parquet extracts of the source tables for the DuckDB backend',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/export_parquet_extract.py --config config/corewell.yaml
+  python scripts/export_parquet_extract.py --config config/corewell.yaml --output-dir data/extracts
+
+Then run locally with bigquery.backend.engine set to duckdb (or DataLoader(backend='duckdb')).
+        """
+    )
+
+    parser.add_argument('--config',
+                       default='config/config.yaml',
+                       help='Configuration file path')
+
+    parser.add_argument('--output-dir',
+                       help='Extract directory (default: bigquery.backend.source_dir or data/extracts)')
+
+    args = parser.parse_args()
+
+    output_dir = export_extract(args.config, args.output_dir)
+    print(f"\n✅ Extract written to {output_dir}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,10 @@
 """Analysis modules for Healthcare COI Analytics"""
 
-from .open_payments import OpenPaymentsAnalyzer
+from .open_payments import OpenPaymentsAnalyzer, provider_tenure
 from .prescriptions import PrescriptionAnalyzer
 from .correlations import CorrelationAnalyzer
 from .risk_scoring import RiskScorer
+from .risk_model import RiskModel
 from .specialty_analysis import SpecialtyAnalyzer
 
 __all__ = [
@@ -11,5 +12,7 @@ __all__ = [
     'PrescriptionAnalyzer', 
     'CorrelationAnalyzer',
     'RiskScorer',
-    'SpecialtyAnalyzer'
+    'RiskModel',
+    'SpecialtyAnalyzer',
+    'provider_tenure'
 ]
\ No newline at end of file
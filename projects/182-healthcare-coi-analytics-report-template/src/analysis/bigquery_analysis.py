@@ -10,6 +10,11 @@ import logging
 from google.cloud import bigquery
 from datetime import datetime
 
+from .query_scheduler import QueryScheduler
+from ..data.job_telemetry import job_telemetry
+from .metric_compiler import MetricGroup, MetricSet
+from ..data.query_guard import QueryBudgetExceeded
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,29 +24,44 @@ class QueryTracker:
     def __init__(self):
         self.queries = []
         
-    def add_query(self, name: str, status: str, rows: int = 0):
-        """Add a query result to tracking"""
-        self.queries.append({
+    def add_query(self, name: str, status: str, rows: int = 0, duration_ms: Optional[int] = None, **details):
+        """Add a query result to tracking (optional timing and job details)"""
+        entry = {
             'name': name,
             'status': status,
             'rows': rows,
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        if duration_ms is not None:
+            entry['duration_ms'] = duration_ms
+        entry.update(details)
+        self.queries.append(entry)
         
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of all queries"""
-        total = len(self.queries)
-        successful = sum(1 for q in self.queries if q['status'] == 'success')
-        empty = sum(1 for q in self.queries if q['status'] == 'empty')
-        failed = sum(1 for q in self.queries if q['status'] == 'failed')
+        # A compiled metric group is one job whose metrics are tracked as separate results
+        results = [q for q in self.queries if 'metrics' not in q]
+        total = len(results)
+        successful = sum(1 for q in results if q['status'] == 'success')
+        empty = sum(1 for q in results if q['status'] == 'empty')
+        failed = sum(1 for q in results if q['status'] == 'failed')
+        blocked = sum(1 for q in self.queries if q['status'] == 'blocked')
+        jobs = sum(1 for q in self.queries if 'compiled_into' not in q)
         
         return {
             'total_queries': total,
             'successful_with_data': successful,
             'successful_empty': empty,
             'failed': failed,
+            'blocked_by_budget': blocked,
+            'bigquery_jobs': jobs,
             'success_rate': (successful + empty) / total * 100 if total > 0 else 0,
             'data_completeness': successful / total * 100 if total > 0 else 0,
+            'total_query_time_ms': sum(q.get('duration_ms') or 0 for q in self.queries),
+            'total_bytes_processed_estimate': sum(q.get('bytes_processed_estimate') or 0 for q in self.queries
+                                                  if q['status'] != 'blocked'),
+            'total_bytes_billed': sum(q.get('bytes_billed') or 0 for q in self.queries),
+            'total_slot_ms': sum(q.get('slot_ms') or 0 for q in self.queries),
             'queries': self.queries
         }
 
@@ -79,6 +99,10 @@ class BigQueryAnalyzer:
         self.lineage_tracker = lineage_tracker
         self.query_tracker = QueryTracker()  # Track query execution results
         
+        # Independent queries are prefetched concurrently; _run_query consumes the results
+        self.max_concurrent_queries = config['bigquery'].get('max_concurrent_queries', 8)
+        self._prefetched = {}
+        
         # Table references
         temp_dataset = config['bigquery'].get('temp_dataset', 'temp')
         # Use 'springfield' instead of 'springfieldhealth' for table names
@@ -102,185 +126,47 @@ class BigQueryAnalyzer:
         from datetime import datetime
         results = {}
         start_time = datetime.now()
+        queries = self._open_payments_queries()
+        self.prefetch(queries)
+        metric_results = self._run_metric_group(self._open_payments_metric_group(), queries)
         
         # Overall metrics (1 row)
-        # Fixed: Aggregate by physician first to get correct statistics
-        metrics_query = f"""
-        WITH physician_totals AS (
-            SELECT
-                physician_id,
-                SUM(total_amount) as physician_total,
-                SUM(payment_count) as physician_transactions
-            FROM {self.op_summary}
-            GROUP BY physician_id
-        )
-        SELECT
-            COUNT(DISTINCT physician_id) as unique_providers,
-            SUM(physician_transactions) as total_transactions,
-            SUM(physician_total) as total_payments,
-            AVG(physician_total) as avg_payment,
-            APPROX_QUANTILES(physician_total, 2)[OFFSET(1)] as median_payment,
-            MAX(physician_total) as max_payment,
-            MIN(physician_total) as min_payment,
-            STDDEV(physician_total) as std_payment
-        FROM physician_totals
-        """
-        metrics_df, status = self._run_query(metrics_query, "open_payments_metrics")
+        metrics_df, status = metric_results['open_payments_metrics']
         if status == "failed":
             raise Exception("Failed to query open payments metrics")
         results['overall_metrics'] = metrics_df.iloc[0].to_dict() if not metrics_df.empty else {}
         logger.info(f"Open Payments: {results['overall_metrics']['unique_providers']:,} providers, ${results['overall_metrics']['total_payments']:,.0f} total")
         
         # Yearly trends (5 rows)
-        # Fixed: Aggregate by physician first to get correct averages
-        yearly_query = f"""
-        WITH physician_yearly AS (
-            SELECT
-                physician_id,
-                payment_year,
-                SUM(total_amount) as physician_year_total,
-                SUM(payment_count) as physician_year_transactions
-            FROM {self.op_summary}
-            GROUP BY physician_id, payment_year
-        )
-        SELECT
-            payment_year,
-            COUNT(DISTINCT physician_id) as providers,
-            SUM(physician_year_total) as total_payments,
-            AVG(physician_year_total) as avg_payment,
-            SUM(physician_year_transactions) as transaction_count
-        FROM physician_yearly
-        GROUP BY payment_year
-        ORDER BY payment_year
-        """
-        yearly_df, status = self._run_query(yearly_query, "open_payments_yearly_trends")
+        yearly_df, status = metric_results['open_payments_yearly_trends']
         if status == "failed":
             logger.error("Failed to query yearly trends")
             yearly_df = pd.DataFrame()
         results['yearly_trends'] = yearly_df
         
         # Payment categories (10-20 rows)
-        # Fixed: Aggregate by physician-category first to get correct averages
-        categories_query = f"""
-        WITH physician_category AS (
-            SELECT
-                physician_id,
-                payment_category,
-                SUM(total_amount) as physician_category_total,
-                SUM(payment_count) as physician_category_transactions
-            FROM {self.op_summary}
-            GROUP BY physician_id, payment_category
-        )
-        SELECT
-            payment_category,
-            SUM(physician_category_total) as total_amount,
-            AVG(physician_category_total) as avg_amount,
-            SUM(physician_category_transactions) as transaction_count,
-            COUNT(DISTINCT physician_id) as unique_providers,
-            ROUND(100.0 * SUM(physician_category_total) / 
-                (SELECT SUM(physician_category_total) FROM physician_category), 1) as pct_of_total
-        FROM physician_category
-        GROUP BY payment_category
-        ORDER BY total_amount DESC
-        """
-        categories_df, status = self._run_query(categories_query, "payment_categories")
+        categories_df, status = metric_results['payment_categories']
         if status == "failed":
             logger.error("Failed to query payment categories")
             categories_df = pd.DataFrame()
         results['payment_categories'] = categories_df
         
         # Top manufacturers (20 rows)
-        manufacturers_query = f"""
-        SELECT
-            manufacturer,
-            SUM(total_amount) as total_payments,
-            COUNT(DISTINCT physician_id) as unique_providers,
-            SUM(payment_count) as transaction_count,
-            ROUND(SUM(total_amount) / COUNT(DISTINCT physician_id), 2) as avg_per_provider,
-            ROUND(100.0 * SUM(total_amount) / (SELECT SUM(total_amount) FROM {self.op_summary}), 2) as market_share
-        FROM {self.op_summary}
-        GROUP BY manufacturer
-        ORDER BY total_payments DESC
-        LIMIT 20
-        """
-        manufacturers_df, status = self._run_query(manufacturers_query, "top_manufacturers")
+        manufacturers_df, status = metric_results['top_manufacturers']
         if status == "failed":
             logger.error("Failed to query top manufacturers")
             manufacturers_df = pd.DataFrame()
         results['top_manufacturers'] = manufacturers_df
         
         # Payment distribution tiers (5 rows)
-        distribution_query = f"""
-        WITH provider_totals AS (
-            SELECT 
-                physician_id,
-                SUM(total_amount) as provider_total
-            FROM {self.op_summary}
-            GROUP BY physician_id
-        )
-        SELECT
-            CASE 
-                WHEN provider_total < 100 THEN '$0-100'
-                WHEN provider_total < 500 THEN '$100-500'
-                WHEN provider_total < 1000 THEN '$500-1K'
-                WHEN provider_total < 5000 THEN '$1K-5K'
-                WHEN provider_total < 10000 THEN '$5K-10K'
-                ELSE '$10K+'
-            END as payment_tier,
-            COUNT(*) as provider_count,
-            SUM(provider_total) as tier_total,
-            AVG(provider_total) as tier_avg
-        FROM provider_totals
-        GROUP BY payment_tier
-        ORDER BY 
-            CASE payment_tier
-                WHEN '$0-100' THEN 1
-                WHEN '$100-500' THEN 2
-                WHEN '$500-1K' THEN 3
-                WHEN '$1K-5K' THEN 4
-                WHEN '$5K-10K' THEN 5
-                ELSE 6
-            END
-        """
-        distribution_df, status = self._run_query(distribution_query, "payment_distribution")
+        distribution_df, status = metric_results['payment_distribution']
         if status == "failed":
             logger.error("Failed to query payment distribution")
             distribution_df = pd.DataFrame()
         results['payment_distribution'] = distribution_df
         
         # Consecutive years analysis - return as DataFrame for table display
-        consecutive_query = f"""
-        WITH provider_years AS (
-            SELECT 
-                physician_id,
-                COUNT(DISTINCT payment_year) as years_received,
-                STRING_AGG(CAST(payment_year AS STRING), ',' ORDER BY payment_year) as years_list,
-                SUM(total_amount) as total_payments
-            FROM {self.op_summary}
-            GROUP BY physician_id
-        ),
-        year_groups AS (
-            SELECT
-                years_received as consecutive_years,
-                COUNT(*) as provider_count,
-                AVG(total_payments) as avg_total_payment,
-                SUM(total_payments) as total_payment_amount,
-                MAX(total_payments) as max_payment,
-                MIN(total_payments) as min_payment
-            FROM provider_years
-            GROUP BY years_received
-        )
-        SELECT
-            consecutive_years,
-            provider_count,
-            avg_total_payment,
-            total_payment_amount,
-            max_payment,
-            min_payment
-        FROM year_groups
-        ORDER BY consecutive_years
-        """
-        consecutive_df, status = self._run_query(consecutive_query, "consecutive_years_payments")
+        consecutive_df, status = metric_results['consecutive_years_payments']
         if status == "failed":
             logger.error("Failed to query consecutive years")
             consecutive_df = pd.DataFrame()
@@ -309,10 +195,355 @@ class BigQueryAnalyzer:
             Dictionary with analysis results
         """
         results = {}
+        queries = self._prescriptions_queries()
+        self.prefetch(queries)
+        
+        # Overall metrics (1 row)
+        metrics_df, status = self._run_query(queries['prescription_metrics'], "prescription_metrics")
+        if status == "failed":
+            raise Exception("Failed to query prescription metrics")
+        results['overall_metrics'] = metrics_df.iloc[0].to_dict() if not metrics_df.empty else {}
+        logger.info(f"Prescriptions: {results['overall_metrics']['unique_prescribers']:,} prescribers, ${results['overall_metrics']['total_prescription_value']:,.0f} total")
+        
+        # Yearly trends (5 rows)
+        yearly_df, status = self._run_query(queries['prescription_yearly_trends'], "prescription_yearly_trends")
+        if status == "failed":
+            logger.error("Failed to query prescription yearly trends")
+            yearly_df = pd.DataFrame()
+        results['yearly_trends'] = yearly_df
+        
+        # Top drugs by cost (20 rows)
+        top_drugs_df, status = self._run_query(queries['top_drugs_by_cost'], "top_drugs_by_cost")
+        if status == "failed":
+            logger.error("Failed to query top drugs")
+            top_drugs_df = pd.DataFrame()
+        results['top_drugs_by_cost'] = top_drugs_df
+        
+        # Provider type analysis (4-5 rows)
+        provider_types_df, status = self._run_query(queries['prescription_provider_types'], "prescription_provider_types")
+        if status == "failed":
+            logger.error("Failed to query provider types")
+            provider_types_df = pd.DataFrame()
+        results['provider_types'] = provider_types_df
+        
+        # Specialty analysis (top 10 rows)
+        specialties_df, status = self._run_query(queries['top_specialties'], "top_specialties")
+        if status == "failed":
+            logger.error("Failed to query top specialties")
+            specialties_df = pd.DataFrame()
+        results['top_specialties'] = specialties_df
+        
+        # Also store as by_specialty for compatibility
+        results['by_specialty'] = results['top_specialties'].copy() if not results['top_specialties'].empty else pd.DataFrame()
+        
+        # Provider type analysis
+        provider_type_df, status = self._run_query(queries['prescription_by_provider_type'], "prescription_by_provider_type")
+        if status == "failed":
+            logger.error("Failed to query prescriptions by provider type")
+            provider_type_df = pd.DataFrame()
+        results['by_provider_type'] = provider_type_df
+        
+        # Drug-specific analysis (top drugs by cost)
+        drug_df, status = self._run_query(queries['drug_specific_analysis'], "drug_specific_analysis")
+        if status == "failed":
+            logger.error("Failed to query drug specific analysis")
+            drug_df = pd.DataFrame()
+        if drug_df.empty:
+            logger.warning("Drug specific query returned no data")
+        else:
+            logger.info(f"Drug specific query returned {len(drug_df)} rows")
+        results['drug_specific'] = drug_df
+        
+        return results
+    
+    def analyze_correlations(self) -> Dict[str, Any]:
+        """
+        Analyze payment-prescription correlations directly in BigQuery
+        
+        Returns:
+            Dictionary with correlation results
+        """
+        results = {}
+        queries = self._correlations_queries()
+        self.prefetch(queries)
+        metric_results = self._run_metric_group(self._correlations_metric_group(), queries)
+        
+        # Overall correlation metrics (1 row)
+        correlation_df, status = metric_results['payment_prescription_correlation']
+        if status == "failed":
+            logger.error("Failed to query payment-prescription correlation")
+            correlation_df = pd.DataFrame()
+        results['overall_metrics'] = correlation_df.iloc[0].to_dict() if not correlation_df.empty else {}
+        
+        # ROI analysis (1 row)
+        roi_df, status = metric_results['roi_metrics']
+        if status == "failed" or roi_df.empty:
+            logger.error("Failed to query ROI metrics or empty result")
+            results['roi_metrics'] = {}
+        else:
+            results['roi_metrics'] = roi_df.iloc[0].to_dict()
+        
+        # Provider type influence (4-5 rows)
+        provider_influence_df, status = self._run_query(queries['provider_type_influence'], "provider_type_influence")
+        if status == "failed":
+            logger.error("Failed to query provider type influence")
+            provider_influence_df = pd.DataFrame()
+        results['provider_type_influence'] = provider_influence_df
+        
+        # Top drug correlations (20 rows)
+        drug_corr_df, status = self._run_query(queries['drug_correlations'], "drug_correlations")
+        if status == "failed":
+            logger.error("Failed to query drug correlations")
+            drug_corr_df = pd.DataFrame()
+        results['drug_correlations'] = drug_corr_df
+        
+        # Also store as drug_specific for compatibility
+        results['drug_specific'] = results['drug_correlations'].copy() if not results['drug_correlations'].empty else pd.DataFrame()
+        
+        # Payment tier analysis
+        payment_tiers_df, status = metric_results['payment_tiers']
+        if status == "failed":
+            logger.error("Failed to query payment tiers")
+            payment_tiers_df = pd.DataFrame()
+        results['payment_tiers'] = payment_tiers_df
+        
+        # Provider vulnerability DataFrame with proper thresholds and categorization
+        provider_vuln_df, status = metric_results['provider_type_vulnerability']
+        if status == "failed":
+            logger.error("Failed to query provider type vulnerability")
+            provider_vuln_df = pd.DataFrame()
+        results['provider_type_vulnerability'] = provider_vuln_df
+        
+        # Consecutive years analysis with prescription correlation
+        consecutive_df, status = metric_results['consecutive_years_correlation']
+        if consecutive_df.empty:
+            logger.warning("Consecutive years query returned no data")
+            # Create a default DataFrame with expected structure
+            consecutive_df = pd.DataFrame({
+                'years_of_payments': ['1 Year', '2 Consecutive', '3 Consecutive', '4 Consecutive', '5 Consecutive'],
+                'provider_count': [0, 0, 0, 0, 0],
+                'avg_total_payments': [0, 0, 0, 0, 0],
+                'avg_total_rx_value': [0, 0, 0, 0, 0],
+                'multiplier_vs_single_year': ['Baseline', '0x', '0x', '0x', '0x']
+            })
+        else:
+            logger.info(f"Consecutive years query returned {len(consecutive_df)} rows")
+        results['consecutive_years'] = consecutive_df
+        
+        return results
+    
+    def analyze_risk_assessment(self) -> Dict[str, Any]:
+        """
+        Perform risk assessment directly in BigQuery
+        
+        Returns:
+            Dictionary with risk metrics
+        """
+        results = {}
+        queries = self._risk_assessment_queries()
+        self.prefetch(queries)
+        
+        # High-risk providers (providers with high payments and high prescribing)
+        risk_df, status = self._run_query(queries['risk_assessment_summary'], "risk_assessment_summary")
+        if status == "failed":
+            logger.error("Failed to query risk assessment summary")
+            risk_df = pd.DataFrame()
+        results['summary'] = risk_df.iloc[0].to_dict()
+        
+        # Top risk providers (20 rows)
+        high_risk_df, status = self._run_query(queries['high_risk_providers'], "high_risk_providers")
+        if status == "failed":
+            logger.error("Failed to query high risk providers")
+            high_risk_df = pd.DataFrame()
+        results['high_risk_providers'] = high_risk_df
+        
+        # Risk distribution for table display
+        risk_dist_df, status = self._run_query(queries['risk_distribution'], "risk_distribution")
+        if status == "failed":
+            logger.error("Failed to query risk distribution")
+            risk_dist_df = pd.DataFrame()
+        if risk_dist_df.empty:
+            logger.warning("Risk distribution query returned no data")
+            # Create a default DataFrame with expected structure
+            risk_dist_df = pd.DataFrame({
+                'risk_level': ['High Risk', 'Medium Risk', 'Low Risk'],
+                'provider_count': [0, 0, 0],
+                'percent_of_total': [0.0, 0.0, 0.0],
+                'key_risk_indicators': ['High payments + prescriptions', 'Moderate payments + prescriptions', 'Low payments or prescriptions'],
+                'avg_risk_score': [0.0, 0.0, 0.0]
+            })
+        else:
+            logger.info(f"Risk distribution query returned {len(risk_dist_df)} rows")
+        results['risk_distribution'] = risk_dist_df
+        
+        return results
+    
+    def _open_payments_queries(self) -> Dict[str, str]:
+        """Build the Open Payments analysis queries, keyed by query name"""
+        group = self._open_payments_metric_group()
+        return {group.name: group.compile()}
+    
+    def _open_payments_metric_group(self) -> MetricGroup:
+        """
+        Open Payments metrics compiled into one script over op_summary
+        
+        Every metric aggregates by physician first (so averages are per
+        provider), at the physician, physician-year, physician-category or
+        physician-manufacturer grain. One GROUPING SETS rollup produces all four;
+        it is materialized as a temp table so op_summary is scanned once.
+        """
+        temp_tables = {'op_rollup': f"""
+            SELECT
+                physician_id,
+                payment_year,
+                payment_category,
+                manufacturer,
+                GROUPING(payment_year) as all_years,
+                GROUPING(payment_category) as all_categories,
+                GROUPING(manufacturer) as all_manufacturers,
+                SUM(total_amount) as total_amount,
+                SUM(payment_count) as payment_count,
+                COUNT(DISTINCT payment_year) as years_received
+            FROM {self.op_summary}
+            GROUP BY GROUPING SETS (
+                (physician_id),
+                (physician_id, payment_year),
+                (physician_id, payment_category),
+                (physician_id, manufacturer)
+            )
+        """}
+        
+        rollup_ctes = """
+        physician_totals AS (
+            SELECT * FROM op_rollup
+            WHERE all_years = 1 AND all_categories = 1 AND all_manufacturers = 1
+        ),
+        physician_yearly AS (
+            SELECT * FROM op_rollup WHERE all_years = 0
+        ),
+        physician_category AS (
+            SELECT * FROM op_rollup WHERE all_categories = 0
+        ),
+        physician_manufacturer AS (
+            SELECT * FROM op_rollup WHERE all_manufacturers = 0
+        )
+        """
+        
+        metrics = [
+            # Overall metrics (1 row)
+            MetricSet('open_payments_metrics', """
+            SELECT
+                COUNT(DISTINCT physician_id) as unique_providers,
+                SUM(payment_count) as total_transactions,
+                SUM(total_amount) as total_payments,
+                AVG(total_amount) as avg_payment,
+                APPROX_QUANTILES(total_amount, 2)[OFFSET(1)] as median_payment,
+                MAX(total_amount) as max_payment,
+                MIN(total_amount) as min_payment,
+                STDDEV(total_amount) as std_payment
+            FROM physician_totals
+            """, {'unique_providers': 'INT64', 'total_transactions': 'INT64', 'total_payments': 'FLOAT64',
+                  'avg_payment': 'FLOAT64', 'median_payment': 'FLOAT64', 'max_payment': 'FLOAT64',
+                  'min_payment': 'FLOAT64', 'std_payment': 'FLOAT64'}),
+            
+            # Yearly trends (5 rows)
+            MetricSet('open_payments_yearly_trends', """
+            SELECT
+                payment_year,
+                COUNT(DISTINCT physician_id) as providers,
+                SUM(total_amount) as total_payments,
+                AVG(total_amount) as avg_payment,
+                SUM(payment_count) as transaction_count
+            FROM physician_yearly
+            GROUP BY payment_year
+            """, {'payment_year': 'INT64', 'providers': 'INT64', 'total_payments': 'FLOAT64',
+                  'avg_payment': 'FLOAT64', 'transaction_count': 'INT64'},
+                order_by="payment_year"),
+            
+            # Payment categories (10-20 rows)
+            MetricSet('payment_categories', """
+            SELECT
+                payment_category,
+                SUM(total_amount) as total_amount,
+                AVG(total_amount) as avg_amount,
+                SUM(payment_count) as transaction_count,
+                COUNT(DISTINCT physician_id) as unique_providers,
+                ROUND(100.0 * SUM(total_amount) / 
+                    (SELECT SUM(total_amount) FROM physician_category), 1) as pct_of_total
+            FROM physician_category
+            GROUP BY payment_category
+            """, {'payment_category': 'STRING', 'total_amount': 'FLOAT64', 'avg_amount': 'FLOAT64',
+                  'transaction_count': 'INT64', 'unique_providers': 'INT64', 'pct_of_total': 'FLOAT64'},
+                order_by="total_amount DESC"),
+            
+            # Top manufacturers (20 rows)
+            MetricSet('top_manufacturers', """
+            SELECT
+                manufacturer,
+                SUM(total_amount) as total_payments,
+                COUNT(DISTINCT physician_id) as unique_providers,
+                SUM(payment_count) as transaction_count,
+                ROUND(SUM(total_amount) / COUNT(DISTINCT physician_id), 2) as avg_per_provider,
+                ROUND(100.0 * SUM(total_amount) / (SELECT SUM(total_amount) FROM physician_totals), 2) as market_share
+            FROM physician_manufacturer
+            GROUP BY manufacturer
+            """, {'manufacturer': 'STRING', 'total_payments': 'FLOAT64', 'unique_providers': 'INT64',
+                  'transaction_count': 'INT64', 'avg_per_provider': 'FLOAT64', 'market_share': 'FLOAT64'},
+                order_by="total_payments DESC", limit=20),
+            
+            # Payment distribution tiers (5 rows)
+            MetricSet('payment_distribution', """
+            SELECT
+                CASE 
+                    WHEN total_amount < 100 THEN '$0-100'
+                    WHEN total_amount < 500 THEN '$100-500'
+                    WHEN total_amount < 1000 THEN '$500-1K'
+                    WHEN total_amount < 5000 THEN '$1K-5K'
+                    WHEN total_amount < 10000 THEN '$5K-10K'
+                    ELSE '$10K+'
+                END as payment_tier,
+                COUNT(*) as provider_count,
+                SUM(total_amount) as tier_total,
+                AVG(total_amount) as tier_avg
+            FROM physician_totals
+            GROUP BY payment_tier
+            """, {'payment_tier': 'STRING', 'provider_count': 'INT64', 'tier_total': 'FLOAT64',
+                  'tier_avg': 'FLOAT64'},
+                order_by="""
+                CASE payment_tier
+                    WHEN '$0-100' THEN 1
+                    WHEN '$100-500' THEN 2
+                    WHEN '$500-1K' THEN 3
+                    WHEN '$1K-5K' THEN 4
+                    WHEN '$5K-10K' THEN 5
+                    ELSE 6
+                END"""),
+            
+            # Consecutive years analysis - return as DataFrame for table display
+            MetricSet('consecutive_years_payments', """
+            SELECT
+                years_received as consecutive_years,
+                COUNT(*) as provider_count,
+                AVG(total_amount) as avg_total_payment,
+                SUM(total_amount) as total_payment_amount,
+                MAX(total_amount) as max_payment,
+                MIN(total_amount) as min_payment
+            FROM physician_totals
+            GROUP BY years_received
+            """, {'consecutive_years': 'INT64', 'provider_count': 'INT64', 'avg_total_payment': 'FLOAT64',
+                  'total_payment_amount': 'FLOAT64', 'max_payment': 'FLOAT64', 'min_payment': 'FLOAT64'},
+                order_by="consecutive_years"),
+        ]
+        
+        return MetricGroup('open_payments_rollup', rollup_ctes, metrics, temp_tables)
+    
+    def _prescriptions_queries(self) -> Dict[str, str]:
+        """Build the prescription analysis queries, keyed by query name"""
+        queries = {}
         
         # Overall metrics (1 row)
         # Fixed: Aggregate by NPI first to get correct per-prescriber averages
-        metrics_query = f"""
+        queries['prescription_metrics'] = f"""
         WITH prescriber_totals AS (
             SELECT
                 NPI,
@@ -330,15 +561,10 @@ class BigQueryAnalyzer:
             SUM(npi_beneficiaries) as total_beneficiaries
         FROM prescriber_totals
         """
-        metrics_df, status = self._run_query(metrics_query, "prescription_metrics")
-        if status == "failed":
-            raise Exception("Failed to query prescription metrics")
-        results['overall_metrics'] = metrics_df.iloc[0].to_dict() if not metrics_df.empty else {}
-        logger.info(f"Prescriptions: {results['overall_metrics']['unique_prescribers']:,} prescribers, ${results['overall_metrics']['total_prescription_value']:,.0f} total")
         
         # Yearly trends (5 rows)
         # Fixed: Use weighted average for cost per claim
-        yearly_query = f"""
+        queries['prescription_yearly_trends'] = f"""
         SELECT
             rx_year,
             COUNT(DISTINCT NPI) as prescribers,
@@ -349,15 +575,10 @@ class BigQueryAnalyzer:
         GROUP BY rx_year
         ORDER BY rx_year
         """
-        yearly_df, status = self._run_query(yearly_query, "prescription_yearly_trends")
-        if status == "failed":
-            logger.error("Failed to query prescription yearly trends")
-            yearly_df = pd.DataFrame()
-        results['yearly_trends'] = yearly_df
         
         # Top drugs by cost (20 rows)
         # Fixed: Use weighted average for cost per prescription
-        top_drugs_query = f"""
+        queries['top_drugs_by_cost'] = f"""
         SELECT
             BRAND_NAME,
             SUM(total_cost) as total_cost,
@@ -370,15 +591,10 @@ class BigQueryAnalyzer:
         ORDER BY total_cost DESC
         LIMIT 20
         """
-        top_drugs_df, status = self._run_query(top_drugs_query, "top_drugs_by_cost")
-        if status == "failed":
-            logger.error("Failed to query top drugs")
-            top_drugs_df = pd.DataFrame()
-        results['top_drugs_by_cost'] = top_drugs_df
         
         # Provider type analysis (4-5 rows)
         # Fixed: Use weighted average for cost per prescription
-        provider_type_query = f"""
+        queries['prescription_provider_types'] = f"""
         SELECT
             provider_type,
             COUNT(DISTINCT NPI) as provider_count,
@@ -389,15 +605,10 @@ class BigQueryAnalyzer:
         GROUP BY provider_type
         ORDER BY total_cost DESC
         """
-        provider_types_df, status = self._run_query(provider_type_query, "prescription_provider_types")
-        if status == "failed":
-            logger.error("Failed to query provider types")
-            provider_types_df = pd.DataFrame()
-        results['provider_types'] = provider_types_df
         
         # Specialty analysis (top 10 rows)
         # Fixed: Use weighted average for cost per prescription
-        specialty_query = f"""
+        queries['top_specialties'] = f"""
         SELECT
             specialty,
             COUNT(DISTINCT NPI) as provider_count,
@@ -410,18 +621,10 @@ class BigQueryAnalyzer:
         ORDER BY total_cost DESC
         LIMIT 10
         """
-        specialties_df, status = self._run_query(specialty_query, "top_specialties")
-        if status == "failed":
-            logger.error("Failed to query top specialties")
-            specialties_df = pd.DataFrame()
-        results['top_specialties'] = specialties_df
-        
-        # Also store as by_specialty for compatibility
-        results['by_specialty'] = results['top_specialties'].copy() if not results['top_specialties'].empty else pd.DataFrame()
         
         # Provider type analysis
         # Fixed: Aggregate by NPI first to get correct per-provider averages
-        provider_type_query = f"""
+        queries['prescription_by_provider_type'] = f"""
         WITH provider_totals AS (
             SELECT
                 COALESCE(provider_type, 'Unknown') as provider_type,
@@ -441,14 +644,9 @@ class BigQueryAnalyzer:
         GROUP BY provider_type
         ORDER BY total_cost DESC
         """
-        provider_type_df, status = self._run_query(provider_type_query, "prescription_by_provider_type")
-        if status == "failed":
-            logger.error("Failed to query prescriptions by provider type")
-            provider_type_df = pd.DataFrame()
-        results['by_provider_type'] = provider_type_df
         
         # Drug-specific analysis (top drugs by cost)
-        drug_specific_query = f"""
+        queries['drug_specific_analysis'] = f"""
         SELECT
             COALESCE(BRAND_NAME, GENERIC_NAME, 'Unknown') as drug_name,
             SUM(total_cost) as total_cost,
@@ -461,101 +659,17 @@ class BigQueryAnalyzer:
         ORDER BY total_cost DESC
         LIMIT 20
         """
-        drug_df, status = self._run_query(drug_specific_query, "drug_specific_analysis")
-        if status == "failed":
-            logger.error("Failed to query drug specific analysis")
-            drug_df = pd.DataFrame()
-        if drug_df.empty:
-            logger.warning("Drug specific query returned no data")
-        else:
-            logger.info(f"Drug specific query returned {len(drug_df)} rows")
-        results['drug_specific'] = drug_df
         
-        return results
+        return queries
     
-    def analyze_correlations(self) -> Dict[str, Any]:
-        """
-        Analyze payment-prescription correlations directly in BigQuery
-        
-        Returns:
-            Dictionary with correlation results
-        """
-        results = {}
-        
-        # Overall correlation metrics (1 row)
-        correlation_query = f"""
-        WITH provider_summary AS (
-            SELECT
-                COALESCE(op.physician_id, rx.NPI) as provider_id,
-                COALESCE(op_total, 0) as total_payments,
-                COALESCE(op_count, 0) as payment_transactions,
-                COALESCE(rx_cost, 0) as total_rx_cost,
-                COALESCE(rx_claims, 0) as total_rx_claims
-            FROM (
-                SELECT 
-                    physician_id,
-                    SUM(total_amount) as op_total,
-                    SUM(payment_count) as op_count
-                FROM {self.op_summary}
-                GROUP BY physician_id
-            ) op
-            FULL OUTER JOIN (
-                SELECT
-                    NPI,
-                    SUM(total_cost) as rx_cost,
-                    SUM(total_claims) as rx_claims
-                FROM {self.rx_summary}
-                GROUP BY NPI
-            ) rx
-            ON op.physician_id = rx.NPI
-        )
-        SELECT
-            COUNT(*) as total_providers,
-            COUNT(CASE WHEN total_payments > 0 AND total_rx_cost > 0 THEN 1 END) as providers_with_both,
-            AVG(CASE WHEN total_payments > 0 THEN total_rx_cost ELSE NULL END) as avg_rx_with_payments,
-            AVG(CASE WHEN total_payments = 0 THEN total_rx_cost ELSE NULL END) as avg_rx_without_payments,
-            SAFE_DIVIDE(
-                AVG(CASE WHEN total_payments > 0 THEN total_rx_cost ELSE NULL END),
-                AVG(CASE WHEN total_payments = 0 THEN total_rx_cost ELSE NULL END)
-            ) as rx_cost_influence,
-            CORR(total_payments, total_rx_cost) as payment_rx_correlation
-        FROM provider_summary
-        """
-        correlation_df, status = self._run_query(correlation_query, "payment_prescription_correlation")
-        if status == "failed":
-            logger.error("Failed to query payment-prescription correlation")
-            correlation_df = pd.DataFrame()
-        results['overall_metrics'] = correlation_df.iloc[0].to_dict() if not correlation_df.empty else {}
-        
-        # ROI analysis (1 row)
-        roi_query = f"""
-        WITH matched_providers AS (
-            SELECT
-                op.physician_id,
-                SUM(op.total_amount) as total_payments,
-                SUM(rx.total_cost) as total_rx_cost
-            FROM {self.op_summary} op
-            INNER JOIN {self.rx_summary} rx
-            ON op.physician_id = rx.NPI
-            GROUP BY op.physician_id
-            HAVING SUM(op.total_amount) > 0
-        )
-        SELECT
-            SUM(total_rx_cost) / SUM(total_payments) as overall_roi,
-            AVG(total_rx_cost / total_payments) as avg_provider_roi,
-            APPROX_QUANTILES(total_rx_cost / total_payments, 2)[OFFSET(1)] as median_provider_roi
-        FROM matched_providers
-        """
-        roi_df, status = self._run_query(roi_query, "roi_metrics")
-        if status == "failed" or roi_df.empty:
-            logger.error("Failed to query ROI metrics or empty result")
-            results['roi_metrics'] = {}
-        else:
-            results['roi_metrics'] = roi_df.iloc[0].to_dict()
+    def _correlations_queries(self) -> Dict[str, str]:
+        """Build the correlation analysis queries, keyed by query name"""
+        group = self._correlations_metric_group()
+        queries = {group.name: group.compile()}
         
         # Provider type influence (4-5 rows)
         # Fixed to handle year dimension in summary table
-        provider_influence_query = f"""
+        queries['provider_type_influence'] = f"""
         WITH provider_summary AS (
             SELECT
                 rx.provider_type,
@@ -580,15 +694,10 @@ class BigQueryAnalyzer:
         FROM provider_summary
         GROUP BY provider_type
         """
-        provider_influence_df, status = self._run_query(provider_influence_query, "provider_type_influence")
-        if status == "failed":
-            logger.error("Failed to query provider type influence")
-            provider_influence_df = pd.DataFrame()
-        results['provider_type_influence'] = provider_influence_df
         
         # Top drug correlations (20 rows)
         # Fixed to handle year dimension in summary table
-        drug_correlation_query = f"""
+        queries['drug_correlations'] = f"""
         WITH drug_summary AS (
             SELECT
                 rx.BRAND_NAME,
@@ -626,258 +735,264 @@ class BigQueryAnalyzer:
         ORDER BY total_rx_cost DESC
         LIMIT 20
         """
-        drug_corr_df, status = self._run_query(drug_correlation_query, "drug_correlations")
-        if status == "failed":
-            logger.error("Failed to query drug correlations")
-            drug_corr_df = pd.DataFrame()
-        results['drug_correlations'] = drug_corr_df
         
-        # Also store as drug_specific for compatibility
-        results['drug_specific'] = results['drug_correlations'].copy() if not results['drug_correlations'].empty else pd.DataFrame()
+        return queries
+    
+    def _correlations_metric_group(self) -> MetricGroup:
+        """
+        Correlation metrics compiled into one script over op_summary and rx_summary
         
-        # Payment tier analysis
-        payment_tier_query = f"""
-        WITH provider_totals AS (
-            SELECT 
-                op.physician_id,
-                SUM(op.total_amount) as payment_total,
-                COUNT(*) as payment_count
-            FROM {self.op_summary} op
-            GROUP BY op.physician_id
-        ),
-        provider_rx AS (
-            SELECT
-                NPI,
-                SUM(total_cost) as rx_total,
-                SUM(total_claims) as rx_claims
-            FROM {self.rx_summary}
-            GROUP BY NPI
-        ),
-        tiered_providers AS (
-            SELECT
-                pt.physician_id,
-                CASE 
-                    WHEN pt.payment_total < 100 THEN '<$100'
-                    WHEN pt.payment_total < 500 THEN '$100-500'
-                    WHEN pt.payment_total < 1000 THEN '$500-1K'
-                    WHEN pt.payment_total < 5000 THEN '$1K-5K'
-                    WHEN pt.payment_total < 10000 THEN '$5K-10K'
-                    ELSE '$10K+'
-                END as payment_tier,
-                pt.payment_total,
-                pt.payment_count,
-                COALESCE(pr.rx_total, 0) as rx_total,
-                COALESCE(pr.rx_claims, 0) as rx_claims
-            FROM provider_totals pt
-            LEFT JOIN provider_rx pr ON pt.physician_id = pr.NPI
-        )
-        SELECT
-            payment_tier as tier,
-            COUNT(*) as provider_count,
-            AVG(payment_total) as avg_payment,
-            AVG(rx_total) as avg_rx_cost,
-            SUM(rx_total) as total_rx_cost,
-            AVG(rx_claims) as avg_claims,
-            SAFE_DIVIDE(SUM(rx_total), SUM(payment_total)) as tier_roi
-        FROM tiered_providers
-        GROUP BY payment_tier
-        ORDER BY 
-            CASE payment_tier
-                WHEN '<$100' THEN 1
-                WHEN '$100-500' THEN 2
-                WHEN '$500-1K' THEN 3
-                WHEN '$1K-5K' THEN 4
-                WHEN '$5K-10K' THEN 5
-                ELSE 6
-            END
+        All of these compare payment and prescription totals per provider, so
+        they share one per-provider rollup of both summary tables, materialized
+        as a temp table so each summary table is scanned once. Row counts
+        per provider are kept so metrics defined on a row-level join of the
+        summary tables (ROI, consecutive years) produce the same totals.
         """
-        payment_tiers_df, status = self._run_query(payment_tier_query, "payment_tiers")
-        if status == "failed":
-            logger.error("Failed to query payment tiers")
-            payment_tiers_df = pd.DataFrame()
-        results['payment_tiers'] = payment_tiers_df
+        min_rx = self.config.get('analysis_thresholds', {}).get('min_rx_for_analysis', 1000)
+        min_payment = self.config.get('analysis_thresholds', {}).get('min_payment_for_influence', 1000)
         
-        # Provider vulnerability DataFrame with proper thresholds and categorization
-        provider_vulnerability_query = f"""
-        -- Provider Type Analysis with proper thresholds and categorization
-        WITH all_providers AS (
-            -- Get all unique NPIs from both rx and payment tables
-            SELECT DISTINCT NPI 
-            FROM {self.rx_summary}
-            UNION DISTINCT
-            SELECT DISTINCT physician_id as NPI 
-            FROM {self.op_summary}
-        ),
-        provider_info AS (
-            -- Get provider types from PHYSICIANS_OVERVIEW
-            SELECT
-                ap.NPI,
-                CASE
-                    WHEN po.ROLE_NAME = 'Physician' THEN 'Physician'
-                    WHEN po.ROLE_NAME = 'Hospitalist' THEN 'Physician'
-                    WHEN po.ROLE_NAME = 'Nurse Practitioner' THEN 'Nurse Practitioner'
-                    WHEN po.ROLE_NAME = 'Physician Assistant' THEN 'Physician Assistant'
-                    WHEN po.ROLE_NAME IN ('Certified Registered Nurse Anesthetist', 'Certified Nurse Midwife') THEN 'Advanced Practice Nurse'
-                    WHEN po.ROLE_NAME = 'Dentist' THEN 'Dentist'
-                    WHEN po.NPI IS NULL THEN 'Provider Type Unknown'
-                    WHEN po.ROLE_NAME IS NULL THEN 'No Role Specified'
-                    ELSE 'Other Healthcare Professional'
-                END AS base_provider_type
-            FROM all_providers ap
-            LEFT JOIN `{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.PHYSICIANS_OVERVIEW_optimized` po
-                ON po.NPI = ap.NPI
-        ),
-        provider_metrics AS (
-            -- Get payment and prescription totals
+        temp_tables = {'provider_rollup': f"""
             SELECT
-                pi.NPI,
-                pi.base_provider_type,
-                COALESCE(rx.total_rx_cost, 0) as total_rx_cost,
-                COALESCE(op.total_payments, 0) as total_payments
-            FROM provider_info pi
-            LEFT JOIN (
-                SELECT NPI, SUM(total_cost) as total_rx_cost
-                FROM {self.rx_summary}
-                GROUP BY NPI
-            ) rx ON pi.NPI = rx.NPI
-            LEFT JOIN (
-                SELECT physician_id as NPI, SUM(total_amount) as total_payments
+                COALESCE(op.physician_id, rx.NPI) as provider_id,
+                op.op_rows IS NOT NULL as in_op,
+                rx.rx_rows IS NOT NULL as in_rx,
+                op_total, op_count, op_rows, op_years,
+                rx_cost, rx_claims, rx_rows
+            FROM (
+                SELECT
+                    physician_id,
+                    SUM(total_amount) as op_total,
+                    SUM(payment_count) as op_count,
+                    COUNT(*) as op_rows,
+                    COUNT(DISTINCT payment_year) as op_years
                 FROM {self.op_summary}
                 GROUP BY physician_id
-            ) op ON pi.NPI = op.NPI
-        ),
-        categorized_providers AS (
+            ) op
+            FULL OUTER JOIN (
+                SELECT
+                    NPI,
+                    SUM(total_cost) as rx_cost,
+                    SUM(total_claims) as rx_claims,
+                    COUNT(*) as rx_rows
+                FROM {self.rx_summary}
+                GROUP BY NPI
+            ) rx
+            ON op.physician_id = rx.NPI
+        """}
+        
+        metrics = [
+            # Overall correlation metrics (1 row)
+            MetricSet('payment_prescription_correlation', """
             SELECT
-                -- Categorize based on prescription threshold
+                COUNT(*) as total_providers,
+                COUNT(CASE WHEN total_payments > 0 AND total_rx_cost > 0 THEN 1 END) as providers_with_both,
+                AVG(CASE WHEN total_payments > 0 THEN total_rx_cost ELSE NULL END) as avg_rx_with_payments,
+                AVG(CASE WHEN total_payments = 0 THEN total_rx_cost ELSE NULL END) as avg_rx_without_payments,
+                SAFE_DIVIDE(
+                    AVG(CASE WHEN total_payments > 0 THEN total_rx_cost ELSE NULL END),
+                    AVG(CASE WHEN total_payments = 0 THEN total_rx_cost ELSE NULL END)
+                ) as rx_cost_influence,
+                CORR(total_payments, total_rx_cost) as payment_rx_correlation
+            FROM (
+                SELECT
+                    COALESCE(op_total, 0) as total_payments,
+                    COALESCE(rx_cost, 0) as total_rx_cost
+                FROM provider_rollup
+            )
+            """, {'total_providers': 'INT64', 'providers_with_both': 'INT64',
+                  'avg_rx_with_payments': 'FLOAT64', 'avg_rx_without_payments': 'FLOAT64',
+                  'rx_cost_influence': 'FLOAT64', 'payment_rx_correlation': 'FLOAT64'}),
+            
+            # ROI analysis (1 row)
+            # Totals match an inner join of the summary tables: each side repeated per matching row
+            MetricSet('roi_metrics', """
+            SELECT
+                SUM(total_rx_cost) / SUM(total_payments) as overall_roi,
+                AVG(total_rx_cost / total_payments) as avg_provider_roi,
+                APPROX_QUANTILES(total_rx_cost / total_payments, 2)[OFFSET(1)] as median_provider_roi
+            FROM (
+                SELECT
+                    op_total * rx_rows as total_payments,
+                    rx_cost * op_rows as total_rx_cost
+                FROM provider_rollup
+                WHERE in_op AND in_rx
+            )
+            WHERE total_payments > 0
+            """, {'overall_roi': 'FLOAT64', 'avg_provider_roi': 'FLOAT64',
+                  'median_provider_roi': 'FLOAT64'}),
+            
+            # Payment tier analysis
+            MetricSet('payment_tiers', """
+            SELECT
+                payment_tier as tier,
+                COUNT(*) as provider_count,
+                AVG(payment_total) as avg_payment,
+                AVG(rx_total) as avg_rx_cost,
+                SUM(rx_total) as total_rx_cost,
+                AVG(rx_claims) as avg_claims,
+                SAFE_DIVIDE(SUM(rx_total), SUM(payment_total)) as tier_roi
+            FROM (
+                SELECT
+                    CASE 
+                        WHEN op_total < 100 THEN '<$100'
+                        WHEN op_total < 500 THEN '$100-500'
+                        WHEN op_total < 1000 THEN '$500-1K'
+                        WHEN op_total < 5000 THEN '$1K-5K'
+                        WHEN op_total < 10000 THEN '$5K-10K'
+                        ELSE '$10K+'
+                    END as payment_tier,
+                    op_total as payment_total,
+                    COALESCE(rx_cost, 0) as rx_total,
+                    COALESCE(rx_claims, 0) as rx_claims
+                FROM provider_rollup
+                WHERE in_op
+            )
+            GROUP BY payment_tier
+            """, {'tier': 'STRING', 'provider_count': 'INT64', 'avg_payment': 'FLOAT64',
+                  'avg_rx_cost': 'FLOAT64', 'total_rx_cost': 'FLOAT64', 'avg_claims': 'FLOAT64',
+                  'tier_roi': 'FLOAT64'},
+                order_by="""
+                CASE tier
+                    WHEN '<$100' THEN 1
+                    WHEN '$100-500' THEN 2
+                    WHEN '$500-1K' THEN 3
+                    WHEN '$1K-5K' THEN 4
+                    WHEN '$5K-10K' THEN 5
+                    ELSE 6
+                END"""),
+            
+            # Provider vulnerability DataFrame with proper thresholds and categorization
+            MetricSet('provider_type_vulnerability', f"""
+            SELECT
+                provider_type,
+                COUNT(DISTINCT NPI) as provider_count,
+                COUNT(DISTINCT CASE WHEN has_significant_payments = 1 THEN NPI END) as providers_with_payments,
+                COUNT(DISTINCT CASE WHEN has_significant_payments = 0 THEN NPI END) as providers_without_payments,
+                
+                -- Payment metrics
+                ROUND(SUM(CASE WHEN has_significant_payments = 1 THEN total_payments END), 0) as total_payments_sum,
+                ROUND(AVG(CASE WHEN has_significant_payments = 1 THEN total_payments END), 0) as avg_payments,
+                
+                -- Prescription metrics
+                ROUND(SUM(CASE WHEN has_significant_payments = 0 THEN total_rx_cost END), 0) as total_rx_no_payments,
+                ROUND(SUM(CASE WHEN has_significant_payments = 1 THEN total_rx_cost END), 0) as total_rx_with_payments,
+                ROUND(AVG(CASE WHEN has_significant_payments = 0 THEN total_rx_cost END), 0) as avg_rx_without_payments,
+                ROUND(AVG(CASE WHEN has_significant_payments = 1 THEN total_rx_cost END), 0) as avg_rx_with_payments,
+                
+                -- Influence factor (special handling for low prescriber categories)
                 CASE
-                    WHEN total_rx_cost <= {self.config.get('analysis_thresholds', {}).get('min_rx_for_analysis', 1000)} THEN
+                    WHEN provider_type = 'Low-Prescribers NO Payments' THEN 0.0  -- No influence possible
+                    WHEN provider_type = 'Low-Prescribers WITH Payments' THEN -1.0  -- Special marker for baseline group
+                    ELSE ROUND(
+                        SAFE_DIVIDE(
+                            AVG(CASE WHEN has_significant_payments = 1 THEN total_rx_cost END),
+                            AVG(CASE WHEN has_significant_payments = 0 THEN total_rx_cost END)
+                        ), 1)
+                END as influence_factor
+            FROM (
+                -- Categorize based on prescription threshold
+                SELECT
+                    CASE
+                        WHEN total_rx_cost <= {min_rx} THEN
+                            CASE
+                                WHEN total_payments > {min_payment} THEN 'Low-Prescribers WITH Payments'
+                                ELSE 'Low-Prescribers NO Payments'
+                            END
+                        ELSE base_provider_type
+                    END AS provider_type,
+                    NPI,
+                    total_rx_cost,
+                    total_payments,
+                    CASE 
+                        WHEN total_payments > {min_payment} THEN 1 
+                        ELSE 0 
+                    END as has_significant_payments
+                FROM (
+                    -- Provider types from PHYSICIANS_OVERVIEW for every provider in either table
+                    SELECT
+                        pr.provider_id as NPI,
                         CASE
-                            WHEN total_payments > {self.config.get('analysis_thresholds', {}).get('min_payment_for_influence', 1000)} THEN 'Low-Prescribers WITH Payments'
-                            ELSE 'Low-Prescribers NO Payments'
-                        END
-                    ELSE base_provider_type
-                END AS provider_type,
-                NPI,
-                total_rx_cost,
-                total_payments,
+                            WHEN po.ROLE_NAME = 'Physician' THEN 'Physician'
+                            WHEN po.ROLE_NAME = 'Hospitalist' THEN 'Physician'
+                            WHEN po.ROLE_NAME = 'Nurse Practitioner' THEN 'Nurse Practitioner'
+                            WHEN po.ROLE_NAME = 'Physician Assistant' THEN 'Physician Assistant'
+                            WHEN po.ROLE_NAME IN ('Certified Registered Nurse Anesthetist', 'Certified Nurse Midwife') THEN 'Advanced Practice Nurse'
+                            WHEN po.ROLE_NAME = 'Dentist' THEN 'Dentist'
+                            WHEN po.NPI IS NULL THEN 'Provider Type Unknown'
+                            WHEN po.ROLE_NAME IS NULL THEN 'No Role Specified'
+                            ELSE 'Other Healthcare Professional'
+                        END AS base_provider_type,
+                        COALESCE(pr.rx_cost, 0) as total_rx_cost,
+                        COALESCE(pr.op_total, 0) as total_payments
+                    FROM provider_rollup pr
+                    LEFT JOIN `{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.PHYSICIANS_OVERVIEW_optimized` po
+                        ON po.NPI = pr.provider_id
+                )
+            )
+            GROUP BY provider_type
+            """, {'provider_type': 'STRING', 'provider_count': 'INT64', 'providers_with_payments': 'INT64',
+                  'providers_without_payments': 'INT64', 'total_payments_sum': 'FLOAT64',
+                  'avg_payments': 'FLOAT64', 'total_rx_no_payments': 'FLOAT64',
+                  'total_rx_with_payments': 'FLOAT64', 'avg_rx_without_payments': 'FLOAT64',
+                  'avg_rx_with_payments': 'FLOAT64', 'influence_factor': 'FLOAT64'},
+                order_by="""
                 CASE 
-                    WHEN total_payments > {self.config.get('analysis_thresholds', {}).get('min_payment_for_influence', 1000)} THEN 1 
-                    ELSE 0 
-                END as has_significant_payments
-            FROM provider_metrics
-        )
-        SELECT
-            provider_type,
-            COUNT(DISTINCT NPI) as provider_count,
-            COUNT(DISTINCT CASE WHEN has_significant_payments = 1 THEN NPI END) as providers_with_payments,
-            COUNT(DISTINCT CASE WHEN has_significant_payments = 0 THEN NPI END) as providers_without_payments,
-            
-            -- Payment metrics
-            ROUND(SUM(CASE WHEN has_significant_payments = 1 THEN total_payments END), 0) as total_payments_sum,
-            ROUND(AVG(CASE WHEN has_significant_payments = 1 THEN total_payments END), 0) as avg_payments,
+                    WHEN provider_type LIKE 'Low-Prescribers%' THEN 999
+                    ELSE 0
+                END,
+                provider_count DESC"""),
             
-            -- Prescription metrics
-            ROUND(SUM(CASE WHEN has_significant_payments = 0 THEN total_rx_cost END), 0) as total_rx_no_payments,
-            ROUND(SUM(CASE WHEN has_significant_payments = 1 THEN total_rx_cost END), 0) as total_rx_with_payments,
-            ROUND(AVG(CASE WHEN has_significant_payments = 0 THEN total_rx_cost END), 0) as avg_rx_without_payments,
-            ROUND(AVG(CASE WHEN has_significant_payments = 1 THEN total_rx_cost END), 0) as avg_rx_with_payments,
-            
-            -- Influence factor (special handling for low prescriber categories)
-            CASE
-                WHEN provider_type = 'Low-Prescribers NO Payments' THEN 0.0  -- No influence possible
-                WHEN provider_type = 'Low-Prescribers WITH Payments' THEN -1.0  -- Special marker for baseline group
-                ELSE ROUND(
-                    SAFE_DIVIDE(
-                        AVG(CASE WHEN has_significant_payments = 1 THEN total_rx_cost END),
-                        AVG(CASE WHEN has_significant_payments = 0 THEN total_rx_cost END)
-                    ), 1)
-            END as influence_factor
-        FROM categorized_providers
-        GROUP BY provider_type
-        ORDER BY
-            CASE 
-                WHEN provider_type LIKE 'Low-Prescribers%' THEN 999
-                ELSE 0
-            END,
-            provider_count DESC
-        """
-        provider_vuln_df, status = self._run_query(provider_vulnerability_query, "provider_type_vulnerability")
-        if status == "failed":
-            logger.error("Failed to query provider type vulnerability")
-            provider_vuln_df = pd.DataFrame()
-        results['provider_type_vulnerability'] = provider_vuln_df
-        
-        # Consecutive years analysis with prescription correlation
-        consecutive_years_query = f"""
-        WITH provider_years AS (
-            SELECT 
-                op.physician_id,
-                COUNT(DISTINCT op.payment_year) as years_of_payments,
-                SUM(op.total_amount) as total_payments,
-                SUM(rx.total_cost) as total_rx_value
-            FROM {self.op_summary} op
-            LEFT JOIN {self.rx_summary} rx ON op.physician_id = rx.NPI
-            GROUP BY op.physician_id
-        ),
-        year_groups AS (
+            # Consecutive years analysis with prescription correlation
+            # Totals match a left join of the summary tables: each side repeated per matching row
+            MetricSet('consecutive_years_correlation', """
             SELECT
-                years_of_payments,
-                COUNT(*) as provider_count,
-                AVG(total_payments) as avg_total_payments,
-                AVG(total_rx_value) as avg_total_rx_value,
-                SAFE_DIVIDE(AVG(total_rx_value), AVG(total_payments)) as multiplier_vs_single_year
-            FROM provider_years
-            WHERE years_of_payments > 0
-            GROUP BY years_of_payments
-        )
-        SELECT
-            CASE years_of_payments
-                WHEN 1 THEN '1 Year'
-                WHEN 2 THEN '2 Consecutive'
-                WHEN 3 THEN '3 Consecutive'
-                WHEN 4 THEN '4 Consecutive'
-                WHEN 5 THEN '5 Consecutive'
-                ELSE CAST(years_of_payments AS STRING) || ' Years'
-            END as years_of_payments,
-            provider_count,
-            avg_total_payments,
-            avg_total_rx_value,
-            CASE 
-                WHEN years_of_payments = 1 THEN 'Baseline'
-                ELSE CAST(ROUND(multiplier_vs_single_year, 2) AS STRING) || 'x'
-            END as multiplier_vs_single_year
-        FROM year_groups
-        ORDER BY years_of_payments
-        LIMIT 5
-        """
-        consecutive_df, status = self._run_query(consecutive_years_query, "consecutive_years_correlation")
-        if consecutive_df.empty:
-            logger.warning("Consecutive years query returned no data")
-            # Create a default DataFrame with expected structure
-            consecutive_df = pd.DataFrame({
-                'years_of_payments': ['1 Year', '2 Consecutive', '3 Consecutive', '4 Consecutive', '5 Consecutive'],
-                'provider_count': [0, 0, 0, 0, 0],
-                'avg_total_payments': [0, 0, 0, 0, 0],
-                'avg_total_rx_value': [0, 0, 0, 0, 0],
-                'multiplier_vs_single_year': ['Baseline', '0x', '0x', '0x', '0x']
-            })
-        else:
-            logger.info(f"Consecutive years query returned {len(consecutive_df)} rows")
-        results['consecutive_years'] = consecutive_df
+                CASE years_of_payments
+                    WHEN 1 THEN '1 Year'
+                    WHEN 2 THEN '2 Consecutive'
+                    WHEN 3 THEN '3 Consecutive'
+                    WHEN 4 THEN '4 Consecutive'
+                    WHEN 5 THEN '5 Consecutive'
+                    ELSE CAST(years_of_payments AS STRING) || ' Years'
+                END as years_of_payments,
+                provider_count,
+                avg_total_payments,
+                avg_total_rx_value,
+                CASE 
+                    WHEN years_of_payments = 1 THEN 'Baseline'
+                    ELSE CAST(ROUND(multiplier_vs_single_year, 2) AS STRING) || 'x'
+                END as multiplier_vs_single_year
+            FROM (
+                SELECT
+                    years_of_payments,
+                    COUNT(*) as provider_count,
+                    AVG(total_payments) as avg_total_payments,
+                    AVG(total_rx_value) as avg_total_rx_value,
+                    SAFE_DIVIDE(AVG(total_rx_value), AVG(total_payments)) as multiplier_vs_single_year
+                FROM (
+                    SELECT
+                        op_years as years_of_payments,
+                        op_total * COALESCE(rx_rows, 1) as total_payments,
+                        rx_cost * op_rows as total_rx_value
+                    FROM provider_rollup
+                    WHERE in_op
+                )
+                WHERE years_of_payments > 0
+                GROUP BY years_of_payments
+            )
+            """, {'years_of_payments': 'STRING', 'provider_count': 'INT64',
+                  'avg_total_payments': 'FLOAT64', 'avg_total_rx_value': 'FLOAT64',
+                  'multiplier_vs_single_year': 'STRING'},
+                order_by="years_of_payments", limit=5),
+        ]
         
-        return results
+        return MetricGroup('correlations_rollup', '', metrics, temp_tables)
     
-    def analyze_risk_assessment(self) -> Dict[str, Any]:
-        """
-        Perform risk assessment directly in BigQuery
-        
-        Returns:
-            Dictionary with risk metrics
-        """
-        results = {}
+    def _risk_assessment_queries(self) -> Dict[str, str]:
+        """Build the risk assessment analysis queries, keyed by query name"""
+        queries = {}
         
         # High-risk providers (providers with high payments and high prescribing)
-        risk_query = f"""
+        queries['risk_assessment_summary'] = f"""
         WITH provider_risk AS (
             SELECT
                 COALESCE(op.physician_id, rx.NPI) as provider_id,
@@ -911,14 +1026,9 @@ class BigQueryAnalyzer:
             AVG(CASE WHEN payment_percentile >= 0.9 AND rx_percentile >= 0.9 THEN rx_total ELSE NULL END) as avg_high_risk_rx_cost
         FROM provider_risk
         """
-        risk_df, status = self._run_query(risk_query, "risk_assessment_summary")
-        if status == "failed":
-            logger.error("Failed to query risk assessment summary")
-            risk_df = pd.DataFrame()
-        results['summary'] = risk_df.iloc[0].to_dict()
         
         # Top risk providers (20 rows)
-        top_risk_query = f"""
+        queries['high_risk_providers'] = f"""
         WITH provider_risk AS (
             SELECT
                 COALESCE(op.physician_id, rx.NPI) as provider_id,
@@ -954,14 +1064,9 @@ class BigQueryAnalyzer:
         ORDER BY combined_total DESC
         LIMIT 20
         """
-        high_risk_df, status = self._run_query(top_risk_query, "high_risk_providers")
-        if status == "failed":
-            logger.error("Failed to query high risk providers")
-            high_risk_df = pd.DataFrame()
-        results['high_risk_providers'] = high_risk_df
         
         # Risk distribution for table display
-        risk_distribution_query = f"""
+        queries['risk_distribution'] = f"""
         WITH provider_risk AS (
             SELECT
                 COALESCE(op.physician_id, rx.NPI) as provider_id,
@@ -1011,30 +1116,81 @@ class BigQueryAnalyzer:
                 ELSE 3
             END
         """
-        risk_dist_df, status = self._run_query(risk_distribution_query, "risk_distribution")
-        if status == "failed":
-            logger.error("Failed to query risk distribution")
-            risk_dist_df = pd.DataFrame()
-        if risk_dist_df.empty:
-            logger.warning("Risk distribution query returned no data")
-            # Create a default DataFrame with expected structure
-            risk_dist_df = pd.DataFrame({
-                'risk_level': ['High Risk', 'Medium Risk', 'Low Risk'],
-                'provider_count': [0, 0, 0],
-                'percent_of_total': [0.0, 0.0, 0.0],
-                'key_risk_indicators': ['High payments + prescriptions', 'Moderate payments + prescriptions', 'Low payments or prescriptions'],
-                'avg_risk_score': [0.0, 0.0, 0.0]
-            })
-        else:
-            logger.info(f"Risk distribution query returned {len(risk_dist_df)} rows")
-        results['risk_distribution'] = risk_dist_df
         
+        return queries
+    
+    def prefetch(self, queries: Dict[str, str]):
+        """
+        Run queries concurrently ahead of the analysis code that consumes them
+        
+        Args:
+            queries: Mapping of query name -> SQL; names already prefetched are skipped
+        """
+        todo = {name: query for name, query in queries.items() if name not in self._prefetched}
+        if not todo or self.max_concurrent_queries <= 1:
+            return
+        
+        scheduler = QueryScheduler(
+            self.client,
+            max_concurrent=self.max_concurrent_queries,
+            timeout_seconds=self.config['bigquery'].get('timeout_seconds'),
+            query_tracker=self.query_tracker,
+            query_steps=self.query_steps()
+        )
+        for name, (df, status) in scheduler.run(todo).items():
+            self._prefetched[name] = (todo[name], df, status)
+    
+    def query_steps(self) -> Dict[str, str]:
+        """Pipeline step (analysis) of every query name"""
+        builders = {
+            'open_payments': self._open_payments_queries,
+            'prescriptions': self._prescriptions_queries,
+            'correlations': self._correlations_queries,
+            'risk_assessment': self._risk_assessment_queries
+        }
+        return {name: step for step, build in builders.items() for name in build()}
+    
+    def prefetch_all(self):
+        """Prefetch the queries of every analysis step in one concurrent batch"""
+        queries = {}
+        queries.update(self._open_payments_queries())
+        queries.update(self._prescriptions_queries())
+        queries.update(self._correlations_queries())
+        queries.update(self._risk_assessment_queries())
+        self.prefetch(queries)
+    
+    def _run_metric_group(self, group: MetricGroup, queries: Dict[str, str]) -> Dict[str, tuple]:
+        """
+        Run a compiled metric group and fan its rows out per metric
+        
+        If the compiled script fails, every metric is run as its own query
+        (tracked as separate jobs), so a failure in one metric leaves the
+        others intact.
+        
+        Returns:
+            Mapping of metric name -> (DataFrame, status), as from _run_query
+        """
+        df, status = self._run_query(queries[group.name], group.name)
+        for entry in self.query_tracker.queries:
+            if entry['name'] == group.name:
+                entry['metrics'] = group.metric_names
+        if status == "failed":
+            # Run each metric on its own so only a broken metric degrades
+            logger.warning(f"[{group.name}] Compiled query failed; running its {len(group.metrics)} metrics separately")
+            return {metric.name: self._run_query(group.compile_metric(metric), metric.name) for metric in group.metrics}
+        results = group.split_results(df, status)
+        for name, (metric_df, metric_status) in results.items():
+            self.query_tracker.add_query(name, metric_status, len(metric_df), compiled_into=group.name)
         return results
     
     def get_query_summary(self) -> Dict[str, Any]:
         """Get summary of all query executions"""
         return self.query_tracker.get_summary()
     
+    @staticmethod
+    def _elapsed_ms(start: datetime) -> int:
+        return int((datetime.now() - start).total_seconds() * 1000)
+    
     def _run_query(self, query: str, query_name: str = "unnamed") -> tuple[pd.DataFrame, str]:
         """
         Execute query and return results as DataFrame with status
@@ -1048,28 +1204,50 @@ class BigQueryAnalyzer:
             - "success": Query executed and returned data
             - "empty": Query executed successfully but returned 0 rows
             - "failed": Query failed to execute
+            
+        Raises:
+            QueryBudgetExceeded: If the dry run exceeds the bytes budget (not swallowed)
         """
+        # Result already fetched by the scheduler (tracked there)
+        prefetched = self._prefetched.pop(query_name, None)
+        if prefetched is not None and prefetched[0] == query:
+            return prefetched[1], prefetched[2]
+        
+        start = datetime.now()
+        details = {}
         try:
             # Handle both BigQueryConnector and raw bigquery.Client
             if hasattr(self.client, 'query') and hasattr(self.client, 'client'):
                 # This is a BigQueryConnector - use its query method which returns DataFrame
-                df = self.client.query(query)
+                df = self.client.query(query, query_name=query_name)
+                details = dict(getattr(self.client, 'last_query_stats', None) or {})
             else:
                 # This is a raw bigquery.Client - need to call to_dataframe()
                 job = self.client.query(query)
                 df = job.to_dataframe()
+                details = job_telemetry(job)
+                if self.lineage_tracker:
+                    self.lineage_tracker.add_bigquery_job(
+                        details['job_id'], 'analysis', table_name=query_name,
+                        **{key: value for key, value in details.items() if key != 'job_id'}
+                    )
             
             if df.empty:
                 logger.info(f"[{query_name}] Query executed successfully but returned 0 rows")
-                self.query_tracker.add_query(query_name, "empty", 0)
+                self.query_tracker.add_query(query_name, "empty", 0, self._elapsed_ms(start), **details)
                 return df, "empty"
             else:
                 logger.info(f"[{query_name}] Query executed successfully, returned {len(df)} rows")
-                self.query_tracker.add_query(query_name, "success", len(df))
+                self.query_tracker.add_query(query_name, "success", len(df), self._elapsed_ms(start), **details)
                 return df, "success"
                 
+        except QueryBudgetExceeded as e:
+            logger.error(f"[{query_name}] Query blocked by cost guard: {e}")
+            self.query_tracker.add_query(query_name, "blocked", 0, self._elapsed_ms(start),
+                                         bytes_processed_estimate=e.bytes_estimate)
+            raise
         except Exception as e:
             logger.error(f"[{query_name}] Query failed with error: {str(e)}")
             logger.error(f"Failed query was:\n{query[:500]}...")  # Log first 500 chars
-            self.query_tracker.add_query(query_name, "failed", 0)
+            self.query_tracker.add_query(query_name, "failed", 0, self._elapsed_ms(start))
             return pd.DataFrame(), "failed"
\ No newline at end of file
@@ -135,78 +135,84 @@ class CorrelationAnalyzer:
         logger.info("Calculated basic correlations")
         return correlations
     
-    def analyze_drug_specific_correlations(self, top_n: int = 20) -> pd.DataFrame:
+    def analyze_drug_specific_correlations(
+        self,
+        top_n: Optional[int] = None,
+        min_prescribers: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         Analyze correlations for specific drugs
         
+        Prescriber costs are aggregated once per (drug, provider) and split by
+        payment status; Welch's t-test and Cohen's d are then computed for
+        every drug at once from the grouped counts, means and variances.
+        Drugs with fewer than min_prescribers prescribers in either group are
+        left out, so a 1 vs 1 comparison can't top the influence rankings.
+        
         Args:
-            top_n: Number of top drugs to analyze
+            top_n: Number of top drugs (by total cost) to analyze (default: all)
+            min_prescribers: Minimum prescribers with and without payments per drug
+                (default: ANALYSIS_THRESHOLDS['min_prescribers_per_group'])
             
         Returns:
             DataFrame with drug-specific correlations
         """
-        # Get top drugs by total cost
-        top_drugs = self.prescriptions.groupby('BRAND_NAME')['total_cost'].sum().nlargest(top_n).index
-        
-        drug_correlations = []
-        
-        for drug in top_drugs:
-            # Get prescribers of this drug
-            drug_rx = self.prescriptions[self.prescriptions['BRAND_NAME'] == drug].groupby('NPI').agg({
-                'total_cost': 'sum',
-                'total_claims': 'sum'
-            }).reset_index()
-            
-            # Merge with payment data
-            drug_merged = pd.merge(
-                drug_rx,
-                self.merged_data[['NPI', 'total_payments', 'received_payments']],
-                on='NPI',
-                how='left'
-            )
-            drug_merged['total_payments'] = drug_merged['total_payments'].fillna(0)
-            drug_merged['received_payments'] = drug_merged['received_payments'].fillna(0)
+        if min_prescribers is None:
+            try:
+                from src.config.analysis_config import ANALYSIS_THRESHOLDS
+                min_prescribers = ANALYSIS_THRESHOLDS.get('min_prescribers_per_group', 10)
+            except ImportError:
+                min_prescribers = 10
+        min_prescribers = max(int(min_prescribers), 1)
+        
+        # Prescriber cost per drug, flagged by payment status
+        drug_rx = self.prescriptions.groupby(['BRAND_NAME', 'NPI'], observed=True, sort=False)['total_cost'].sum()
+        drug_rx = drug_rx.reset_index()
+        if top_n is not None:
+            top_drugs = drug_rx.groupby('BRAND_NAME', observed=True)['total_cost'].sum().nlargest(top_n).index
+            drug_rx = drug_rx[drug_rx['BRAND_NAME'].isin(top_drugs)]
+        paid = self.merged_data.set_index('NPI')['received_payments']
+        drug_rx['received_payments'] = drug_rx['NPI'].map(paid).fillna(0).astype(int)
+        
+        # Group sizes, means and variances per drug and payment status
+        grouped = drug_rx.groupby(['BRAND_NAME', 'received_payments'], observed=True)['total_cost'].agg(
+            ['count', 'mean', 'var']
+        ).unstack('received_payments')
+        grouped = grouped.reindex(columns=pd.MultiIndex.from_product([['count', 'mean', 'var'], [0, 1]]))
+        
+        # Drugs prescribed by enough providers both with and without payments
+        grouped = grouped[(grouped[('count', 1)] >= min_prescribers) & (grouped[('count', 0)] >= min_prescribers)]
+        
+        n1, n0 = grouped[('count', 1)].to_numpy(float), grouped[('count', 0)].to_numpy(float)
+        mean1, mean0 = grouped[('mean', 1)].to_numpy(float), grouped[('mean', 0)].to_numpy(float)
+        var1, var0 = grouped[('var', 1)].to_numpy(float), grouped[('var', 0)].to_numpy(float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Welch's t-test (unequal variances), as scipy.stats.ttest_ind(equal_var=False)
+            se1, se0 = var1 / n1, var0 / n0
+            t_stat = (mean1 - mean0) / np.sqrt(se1 + se0)
+            dof = (se1 + se0) ** 2 / (se1 ** 2 / (n1 - 1) + se0 ** 2 / (n0 - 1))
+            dof = np.where(np.isnan(dof), 1, dof)
+            p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
             
-            # Calculate metrics
-            with_payments = drug_merged[drug_merged['received_payments'] == 1]
-            without_payments = drug_merged[drug_merged['received_payments'] == 0]
-            
-            if len(with_payments) > 0 and len(without_payments) > 0:
-                # T-test for difference in means
-                t_stat, p_value = stats.ttest_ind(
-                    with_payments['total_cost'],
-                    without_payments['total_cost'],
-                    equal_var=False
-                )
-                
-                # Effect size (Cohen's d)
-                pooled_std = np.sqrt(
-                    (with_payments['total_cost'].std()**2 + without_payments['total_cost'].std()**2) / 2
-                )
-                cohens_d = (with_payments['total_cost'].mean() - without_payments['total_cost'].mean()) / pooled_std
-                
-                # Influence factor
-                influence_factor = (
-                    with_payments['total_cost'].mean() / 
-                    max(without_payments['total_cost'].mean(), 1)  # Avoid division by zero
-                )
-                
-                drug_correlations.append({
-                    'drug': drug,
-                    'prescribers_with_payments': len(with_payments),
-                    'prescribers_without_payments': len(without_payments),
-                    'avg_rx_value_with_payments': with_payments['total_cost'].mean(),
-                    'avg_rx_value_without_payments': without_payments['total_cost'].mean(),
-                    'influence_factor': influence_factor,
-                    't_statistic': t_stat,
-                    'p_value': p_value,
-                    'cohens_d': cohens_d
-                })
-        
-        drug_corr_df = pd.DataFrame(drug_correlations)
-        drug_corr_df = drug_corr_df.sort_values('influence_factor', ascending=False)
-        
-        logger.info(f"Analyzed correlations for {len(drug_corr_df)} drugs")
+            # Effect size (Cohen's d)
+            cohens_d = (mean1 - mean0) / np.sqrt((var1 + var0) / 2)
+        
+        drug_corr_df = pd.DataFrame({
+            'drug': grouped.index,
+            'prescribers_with_payments': n1.astype(int),
+            'prescribers_without_payments': n0.astype(int),
+            'avg_rx_value_with_payments': mean1,
+            'avg_rx_value_without_payments': mean0,
+            'influence_factor': mean1 / np.maximum(mean0, 1),  # Avoid division by zero
+            't_statistic': t_stat,
+            'p_value': p_value,
+            'cohens_d': cohens_d
+        })
+        drug_corr_df = drug_corr_df.sort_values('influence_factor', ascending=False).reset_index(drop=True)
+        
+        logger.info(f"Analyzed correlations for {len(drug_corr_df)} drugs "
+                   f"(min {min_prescribers} prescribers per group)")
         return drug_corr_df
     
     def analyze_payment_tier_effects(self) -> pd.DataFrame:
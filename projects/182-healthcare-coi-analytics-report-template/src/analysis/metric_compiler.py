@@ -0,0 +1,243 @@
+"""
+Metric Compiler Module
+Compiles metrics that share a grain into a single BigQuery script over one
+rollup, then fans the result rows back out into one DataFrame per metric
+
+The rollups that read source tables are materialized once as script temp
+tables; each metric is a SELECT over those tables and the group's CTEs. The
+final statement serializes every metric's rows with TO_JSON_STRING, so
+metrics with different column sets can be returned together in one job:
+
+    CREATE TEMP TABLE <rollup> AS SELECT ... FROM <source table>;
+    WITH <CTEs over the rollup>,
+    metric_rows AS (
+        SELECT 'metric_a' AS metric_set, ROW_NUMBER() OVER (ORDER BY ...) AS row_num,
+               TO_JSON_STRING(t) AS row_json
+        FROM (<metric_a SELECT>) t
+        UNION ALL
+        ...
+    )
+    SELECT metric_set, row_num, row_json FROM metric_rows
+
+BigQuery does not materialize non-recursive CTEs: a rollup CTE referenced by
+several metrics may be evaluated (and its source read) once per reference.
+Temp tables are written once per script and read back at their own (much
+smaller) size, so each source table is scanned once per group.
+
+JSON carries no column types (whole-number floats read back as integers,
+DATE and NUMERIC as strings), so every metric declares the BigQuery type of
+each output column and the fanned-out frames are cast to the dtypes
+QueryJob.to_dataframe() returns for those types.
+
+If the compiled script fails, each metric can still be run on its own
+(compile_metric), with the temp tables inlined as CTEs, so one broken metric
+does not take down the rest of the group.
+"""
+
+import json
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Non-finite FLOAT64 values are serialized as JSON strings by TO_JSON_STRING
+_NON_FINITE = {'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf')}
+
+# Column types a metric may declare
+COLUMN_TYPES = ('INT64', 'FLOAT64', 'NUMERIC', 'BIGNUMERIC', 'BOOL', 'STRING', 'DATE', 'TIMESTAMP')
+
+
+class MetricSet:
+    """One result table computed from a metric group's shared rollup"""
+
+    def __init__(
+        self,
+        name: str,
+        select_sql: str,
+        columns: Dict[str, str],
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None
+    ):
+        """
+        Define a metric
+
+        Args:
+            name: Result name (the query name used in tracking)
+            select_sql: SELECT over the group's CTEs producing the result columns
+            columns: Output columns, in order, mapped to their BigQuery types
+                (one of COLUMN_TYPES)
+            order_by: Optional ORDER BY expression over the output columns
+            limit: Optional row limit applied after ordering
+        """
+        unknown = {column: sql_type for column, sql_type in columns.items() if sql_type not in COLUMN_TYPES}
+        if unknown:
+            raise ValueError(f"Unsupported column types in metric {name}: {unknown}")
+        self.name = name
+        self.select_sql = select_sql.strip()
+        self.columns = list(columns)
+        self.types = dict(columns)
+        self.order_by = order_by
+        self.limit = limit
+
+    def compile(self) -> str:
+        """Subquery emitting (metric_set, row_num, row_json) rows for this metric"""
+        inner = self.select_sql
+        if self.limit is not None:
+            inner += f"\nORDER BY {self.order_by or '1'}\nLIMIT {self.limit}"
+        order = f"ORDER BY {self.order_by}" if self.order_by else ""
+        return (
+            f"SELECT '{self.name}' AS metric_set, ROW_NUMBER() OVER ({order}) AS row_num, "
+            f"TO_JSON_STRING(t) AS row_json\n"
+            f"FROM (\n{inner}\n) t"
+        )
+
+
+class MetricGroup:
+    """Metrics sharing a grain, compiled into one query over one rollup"""
+
+    def __init__(
+        self,
+        name: str,
+        rollup_ctes: str,
+        metrics: List[MetricSet],
+        temp_tables: Optional[Dict[str, str]] = None
+    ):
+        """
+        Define a metric group
+
+        Args:
+            name: Query name of the compiled group
+            rollup_ctes: Comma-separated CTE definitions (without WITH) shared by
+                the metrics; may be empty
+            metrics: Metrics computed from the temp tables and CTEs
+            temp_tables: Rollups materialized once per script, as table name ->
+                SELECT, in creation order (later ones may read earlier ones)
+        """
+        names = [metric.name for metric in metrics]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate metric names in group {name}: {names}")
+        self.name = name
+        self.rollup_ctes = rollup_ctes.strip().rstrip(',')
+        self.metrics = metrics
+        self.temp_tables = {table: select.strip() for table, select in (temp_tables or {}).items()}
+
+    @property
+    def metric_names(self) -> List[str]:
+        return [metric.name for metric in self.metrics]
+
+    def compile(self) -> str:
+        """Single script returning the rows of every metric in the group"""
+        statements = "".join(
+            f"CREATE TEMP TABLE {table} AS\n{select};\n" for table, select in self.temp_tables.items()
+        )
+        ctes = f"{self.rollup_ctes},\n" if self.rollup_ctes else ""
+        unions = "\nUNION ALL\n".join(metric.compile() for metric in self.metrics)
+        return (
+            f"{statements}"
+            f"WITH {ctes}"
+            f"metric_rows AS (\n{unions}\n)\n"
+            f"SELECT metric_set, row_num, row_json\n"
+            f"FROM metric_rows\n"
+            f"ORDER BY metric_set, row_num"
+        )
+
+    def compile_metric(self, metric: MetricSet) -> str:
+        """
+        Standalone query for one metric, returning its columns directly
+
+        The temp tables are inlined as CTEs, so the query re-reads the source
+        tables (one scan per metric, as before the metrics were compiled).
+        """
+        ctes = [f"{table} AS (\n{select}\n)" for table, select in self.temp_tables.items()]
+        if self.rollup_ctes:
+            ctes.append(self.rollup_ctes)
+        query = ("WITH " + ",\n".join(ctes) + "\n" if ctes else "") + metric.select_sql
+        if metric.order_by or metric.limit is not None:
+            query += f"\nORDER BY {metric.order_by or '1'}"
+        if metric.limit is not None:
+            query += f"\nLIMIT {metric.limit}"
+        return query
+
+    @staticmethod
+    def _restore_non_finite(df: pd.DataFrame) -> pd.DataFrame:
+        """Turn 'NaN'/'Infinity' strings back into floats in otherwise numeric columns"""
+        for column in df.columns:
+            values = df[column]
+            if values.dtype != object or not values.isin(list(_NON_FINITE)).any():
+                continue
+            restored = values.map(lambda v: _NON_FINITE.get(v, v) if isinstance(v, str) else v)
+            if restored.map(lambda v: v is None or isinstance(v, (int, float))).all():
+                df[column] = pd.to_numeric(restored)
+        return df
+
+    @staticmethod
+    def _cast(values: pd.Series, sql_type: str) -> pd.Series:
+        """Cast a column parsed from JSON to the dtype to_dataframe() returns for its BigQuery type"""
+        if sql_type == 'INT64':
+            return pd.to_numeric(values).astype('Int64')
+        if sql_type == 'FLOAT64':
+            return pd.to_numeric(values.map(lambda v: _NON_FINITE.get(v, v) if isinstance(v, str) else v)).astype('float64')
+        if sql_type in ('NUMERIC', 'BIGNUMERIC'):
+            return values.map(lambda v: None if pd.isna(v) else Decimal(str(v))).astype(object)
+        if sql_type == 'BOOL':
+            return values.astype('boolean')
+        if sql_type == 'DATE':
+            import db_dtypes  # noqa: F401  (registers dbdate; installed with google-cloud-bigquery)
+            return values.astype('dbdate')
+        if sql_type == 'TIMESTAMP':
+            return pd.to_datetime(values, utc=True)
+        return values.astype(object).where(values.notna(), None)
+
+    def _typed(self, frame: pd.DataFrame, metric: MetricSet) -> pd.DataFrame:
+        """Cast every column of a metric's frame to its declared type"""
+        return pd.DataFrame(
+            {column: self._cast(frame[column], metric.types[column]) for column in metric.columns},
+            index=frame.index
+        )
+
+    def fan_out(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Split the compiled query's rows into one DataFrame per metric
+
+        Args:
+            df: Result of the compiled query (metric_set, row_num, row_json)
+
+        Returns:
+            Mapping of metric name -> DataFrame with the metric's columns,
+            cast to their declared types
+        """
+        frames = {}
+        grouped = {} if df.empty else {
+            name: rows.sort_values('row_num') for name, rows in df.groupby('metric_set', sort=False)
+        }
+        for metric in self.metrics:
+            rows = grouped.get(metric.name)
+            if rows is None or rows.empty:
+                frames[metric.name] = self._typed(pd.DataFrame(columns=metric.columns), metric)
+                continue
+            records = [json.loads(row_json) for row_json in rows['row_json']]
+            frame = self._restore_non_finite(pd.DataFrame.from_records(records, columns=metric.columns))
+            frames[metric.name] = self._typed(frame, metric)
+        return frames
+
+    def split_results(self, df: pd.DataFrame, status: str) -> Dict[str, Tuple[pd.DataFrame, str]]:
+        """
+        Fan out a compiled result with per-metric statuses
+
+        Args:
+            df: Result of the compiled query
+            status: Status of the compiled query ("success", "empty", "failed")
+
+        Returns:
+            Mapping of metric name -> (DataFrame, status) with the same status
+            values as BigQueryAnalyzer._run_query
+        """
+        if status == "failed":
+            return {metric.name: (pd.DataFrame(), "failed") for metric in self.metrics}
+        return {
+            name: (frame, "empty" if frame.empty else "success")
+            for name, frame in self.fan_out(df).items()
+        }
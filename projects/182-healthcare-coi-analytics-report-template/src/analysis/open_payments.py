@@ -12,6 +12,49 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 
+def provider_tenure(
+    payments: pd.DataFrame,
+    id_col: str = 'physician_id',
+    year_col: str = 'payment_year',
+    amount_col: str = 'total_amount'
+) -> pd.DataFrame:
+    """
+    Per-provider payment tenure features
+    
+    Consecutive-year runs are found by sorting (provider, year) pairs and
+    starting a new run wherever the provider changes or the year gap is not 1.
+    
+    Args:
+        payments: Payment rows (one or more per provider and year)
+        id_col: Provider id column
+        year_col: Payment year column
+        amount_col: Payment amount column
+        
+    Returns:
+        DataFrame indexed by provider with first_year, last_year, years_active,
+        longest_streak, gap_years (years without payments between the first and
+        last) and total_received
+    """
+    columns = ['first_year', 'last_year', 'years_active', 'longest_streak', 'gap_years', 'total_received']
+    provider_years = payments.groupby([id_col, year_col], sort=True)[amount_col].sum().reset_index()
+    if provider_years.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name=id_col))
+    
+    # Label consecutive-year runs and measure their lengths
+    new_run = (provider_years[id_col] != provider_years[id_col].shift()) | (provider_years[year_col].diff() != 1)
+    run_length = provider_years.groupby(new_run.cumsum())[year_col].transform('size')
+    
+    tenure = provider_years.assign(run_length=run_length).groupby(id_col).agg(
+        first_year=(year_col, 'min'),
+        last_year=(year_col, 'max'),
+        years_active=(year_col, 'size'),
+        longest_streak=('run_length', 'max'),
+        total_received=(amount_col, 'sum')
+    )
+    tenure['gap_years'] = tenure['last_year'] - tenure['first_year'] + 1 - tenure['years_active']
+    return tenure[columns]
+
+
 class OpenPaymentsAnalyzer:
     """Comprehensive Open Payments analysis"""
     
@@ -40,6 +83,7 @@ class OpenPaymentsAnalyzer:
         self.results['top_manufacturers'] = self.identify_top_manufacturers()
         self.results['payment_distribution'] = self.analyze_payment_distribution()
         self.results['provider_concentration'] = self.analyze_provider_concentration()
+        self.results['provider_tenure'] = self.provider_tenure()
         self.results['consecutive_years'] = self.analyze_consecutive_years()
         
         logger.info("Open Payments analysis complete")
@@ -229,60 +273,21 @@ class OpenPaymentsAnalyzer:
         logger.info(f"Analyzed concentration for {len(provider_summary)} providers")
         return tier_summary
     
+    def provider_tenure(self) -> pd.DataFrame:
+        """Per-provider first/last year, years active, longest streak, gap years and total received"""
+        if 'provider_tenure' not in self.results:
+            self.results['provider_tenure'] = provider_tenure(self.data)
+        return self.results['provider_tenure']
+    
     def analyze_consecutive_years(self) -> pd.DataFrame:
         """Analyze providers receiving payments in consecutive years"""
-        # Get unique years per provider
-        provider_years = self.data.groupby('physician_id')['payment_year'].apply(set)
-        
-        # Count consecutive year patterns
-        consecutive_counts = {}
-        for years in provider_years:
-            years_list = sorted(list(years))
-            max_consecutive = 1
-            current_consecutive = 1
-            
-            for i in range(1, len(years_list)):
-                if years_list[i] == years_list[i-1] + 1:
-                    current_consecutive += 1
-                    max_consecutive = max(max_consecutive, current_consecutive)
-                else:
-                    current_consecutive = 1
-            
-            if max_consecutive not in consecutive_counts:
-                consecutive_counts[max_consecutive] = 0
-            consecutive_counts[max_consecutive] += 1
-        
-        # Create summary DataFrame
-        consecutive_df = pd.DataFrame([
-            {'consecutive_years': k, 'provider_count': v}
-            for k, v in consecutive_counts.items()
-        ]).sort_values('consecutive_years')
-        
-        # Add payment statistics for each group
-        for years in consecutive_df['consecutive_years'].unique():
-            providers = []
-            for pid, pid_years in provider_years.items():
-                years_list = sorted(list(pid_years))
-                max_consecutive = 1
-                current_consecutive = 1
-                
-                for i in range(1, len(years_list)):
-                    if years_list[i] == years_list[i-1] + 1:
-                        current_consecutive += 1
-                        max_consecutive = max(max_consecutive, current_consecutive)
-                    else:
-                        current_consecutive = 1
-                
-                if max_consecutive == years:
-                    providers.append(pid)
-            
-            if providers:
-                provider_data = self.data[self.data['physician_id'].isin(providers)]
-                avg_payment = provider_data.groupby('physician_id')['total_amount'].sum().mean()
-                consecutive_df.loc[
-                    consecutive_df['consecutive_years'] == years, 
-                    'avg_total_payment'
-                ] = avg_payment
+        # Longest consecutive-year run per provider, with their payment totals
+        tenure = self.provider_tenure()
+        
+        consecutive_df = tenure.groupby('longest_streak').agg(
+            provider_count=('total_received', 'size'),
+            avg_total_payment=('total_received', 'mean')
+        ).reset_index().rename(columns={'longest_streak': 'consecutive_years'})
         
         logger.info(f"Analyzed consecutive year patterns")
         return consecutive_df
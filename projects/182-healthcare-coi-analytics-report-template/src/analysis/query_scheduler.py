@@ -0,0 +1,223 @@
+"""
+Query Scheduler Module
+Runs independent BigQuery analysis queries concurrently as asynchronous jobs
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from ..data.job_telemetry import job_telemetry
+from ..data.query_guard import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class QueryScheduler:
+    """Submit independent queries as BigQuery jobs up front and poll them together"""
+
+    def __init__(
+        self,
+        client,
+        max_concurrent: int = 8,
+        poll_interval: float = 0.5,
+        timeout_seconds: Optional[float] = None,
+        max_retries: int = 1,
+        retry_delay: float = 1.0,
+        query_tracker=None,
+        query_steps: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize query scheduler
+
+        Args:
+            client: BigQueryConnector (results go through its cache) or raw bigquery.Client
+            max_concurrent: Maximum number of jobs running at once
+            poll_interval: Maximum seconds between polling sweeps
+            timeout_seconds: Cancel and fail a job running longer than this
+            max_retries: Resubmissions of a failed query before giving up
+            retry_delay: Seconds before the first resubmission, doubled per attempt;
+                other queries keep running meanwhile
+            query_tracker: Optional QueryTracker receiving per-query status and timing
+            query_steps: Pipeline step of each query name, for job telemetry in the lineage
+        """
+        # Same detection as BigQueryAnalyzer._run_query
+        if hasattr(client, 'query') and hasattr(client, 'client'):
+            self.connector = client
+            self.bq_client = client.client
+        else:
+            self.connector = None
+            self.bq_client = client
+        self.cost_guard = getattr(self.connector, 'cost_guard', None)
+        # Execution backend reported as the source of executed queries
+        self.source = getattr(client, 'backend', 'bigquery')
+
+        self.max_concurrent = max(1, max_concurrent)
+        self.poll_interval = poll_interval
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.query_tracker = query_tracker
+        self.query_steps = query_steps or {}
+
+    def _cache_lookup(self, query: str) -> Tuple[Optional[pd.DataFrame], Any]:
+        """Cached result for a query (connector only), plus its cache key"""
+        if self.connector is None:
+            return None, None
+        try:
+            return self.connector.get_cached_result(query)
+        except Exception as e:
+            logger.debug(f"Cache lookup failed: {e}")
+            return None, None
+
+    def _track(self, name: str, status: str, rows: int, duration_ms: int, **details):
+        if self.query_tracker is not None:
+            self.query_tracker.add_query(name, status, rows, duration_ms=duration_ms, **details)
+
+    @staticmethod
+    def _status(df: pd.DataFrame) -> str:
+        return "empty" if df.empty else "success"
+
+    def run(self, queries: Dict[str, str]) -> Dict[str, Tuple[pd.DataFrame, str]]:
+        """
+        Execute independent queries concurrently
+
+        Args:
+            queries: Mapping of query name -> SQL
+
+        Returns:
+            Mapping of query name -> (DataFrame, status) with the same status
+            values as BigQueryAnalyzer._run_query ("success", "empty", "failed")
+
+        Raises:
+            QueryBudgetExceeded: If any uncached query is over the bytes budget;
+                all queries are dry-run before the first job is submitted
+        """
+        results = {}
+        pending = deque()
+        wall_start = time.perf_counter()
+
+        for name, query in queries.items():
+            lookup_start = time.perf_counter()
+            cached, cache_key = self._cache_lookup(query)
+            if cached is not None:
+                status = self._status(cached)
+                results[name] = (cached, status)
+                self._track(name, status, len(cached),
+                            int((time.perf_counter() - lookup_start) * 1000), source='cache')
+                continue
+            pending.append((name, query, cache_key, 0, time.perf_counter(), 0.0))
+
+        # Dry-run every uncached query up front so an over-budget batch fails before spending anything
+        estimates = {}
+        if pending and self.cost_guard:
+            try:
+                checked = self.cost_guard.check_many({name: query for name, query, *_ in pending})
+            except QueryBudgetExceeded as e:
+                self._track(e.query_name, "blocked", 0, 0, source='dry_run',
+                            bytes_processed_estimate=e.bytes_estimate, error=str(e)[:200])
+                raise
+            routed = deque()
+            for name, query, cache_key, attempt, queued_at, ready_at in pending:
+                checked_query, estimates[name] = checked[name]
+                if checked_query != query:
+                    # Routed to a fallback table; don't store under the original query's key
+                    query, cache_key = checked_query, None
+                routed.append((name, query, cache_key, attempt, queued_at, ready_at))
+            pending = routed
+
+        if pending:
+            logger.info(f"Scheduling {len(pending)} queries ({len(results)} served from cache), "
+                       f"up to {self.max_concurrent} concurrent")
+
+        running = {}
+        poll_delay = 0.05
+        while pending or running:
+            # Keep up to max_concurrent jobs in flight
+            now = time.perf_counter()
+            for _ in range(len(pending)):
+                if len(running) >= self.max_concurrent:
+                    break
+                name, query, cache_key, attempt, queued_at, ready_at = pending.popleft()
+                if ready_at > now:
+                    # Still backing off after a failed attempt
+                    pending.append((name, query, cache_key, attempt, queued_at, ready_at))
+                    continue
+                try:
+                    if self.cost_guard:
+                        job = self.bq_client.query(query, job_config=self.cost_guard.job_config())
+                    else:
+                        job = self.bq_client.query(query)
+                except Exception as e:
+                    self._handle_failure(results, pending, name, query, cache_key, attempt, queued_at, e)
+                    continue
+                running[name] = (job, query, cache_key, attempt, queued_at, time.perf_counter())
+
+            finished = False
+            for name in list(running):
+                job, query, cache_key, attempt, queued_at, submitted_at = running[name]
+                try:
+                    if not job.done():
+                        if self.timeout_seconds and time.perf_counter() - submitted_at > self.timeout_seconds:
+                            job.cancel()
+                            raise TimeoutError(f"Query exceeded {self.timeout_seconds}s")
+                        continue
+                    df = job.to_dataframe()
+                except Exception as e:
+                    del running[name]
+                    finished = True
+                    self._handle_failure(results, pending, name, query, cache_key, attempt, queued_at, e)
+                    continue
+
+                del running[name]
+                finished = True
+                status = self._status(df)
+                results[name] = (df, status)
+                if cache_key is not None:
+                    self.connector.store_result(cache_key, df)
+
+                if self.connector is not None:
+                    telemetry = self.connector.record_job(job, name, 'analysis', step=self.query_steps.get(name))
+                else:
+                    telemetry = job_telemetry(job)
+                self._track(
+                    name, status, len(df),
+                    int((time.perf_counter() - submitted_at) * 1000),
+                    source=self.source,
+                    queued_ms=int((submitted_at - queued_at) * 1000),
+                    attempts=attempt + 1,
+                    bytes_processed_estimate=estimates.get(name),
+                    **telemetry
+                )
+                logger.info(f"[{name}] Query executed successfully, returned {len(df)} rows")
+
+            # Poll quickly while jobs are finishing, backing off to poll_interval otherwise
+            if finished:
+                poll_delay = 0.05
+            elif running:
+                time.sleep(poll_delay)
+                poll_delay = min(poll_delay * 2, self.poll_interval)
+            elif pending:
+                # Every remaining query is waiting out its retry backoff
+                time.sleep(max(0.0, min(item[5] for item in pending) - time.perf_counter()))
+
+        wall_ms = int((time.perf_counter() - wall_start) * 1000)
+        logger.info(f"Completed {len(queries)} queries in {wall_ms / 1000:.1f}s")
+        return results
+
+    def _handle_failure(self, results, pending, name, query, cache_key, attempt, queued_at, error):
+        """Requeue a failed query or record it as failed"""
+        if attempt < self.max_retries:
+            delay = self.retry_delay * 2 ** attempt
+            logger.warning(f"[{name}] Query attempt {attempt + 1} failed, retrying in {delay:.1f}s: {error}")
+            pending.append((name, query, cache_key, attempt + 1, queued_at, time.perf_counter() + delay))
+            return
+
+        logger.error(f"[{name}] Query failed with error: {str(error)}")
+        logger.error(f"Failed query was:\n{query[:500]}...")
+        results[name] = (pd.DataFrame(), "failed")
+        self._track(name, "failed", 0, int((time.perf_counter() - queued_at) * 1000),
+                    source=self.source, attempts=attempt + 1, error=str(error)[:200])
@@ -0,0 +1,190 @@
+"""
+Risk Model Module
+Persisted risk scoring model and per-provider score store
+
+A RiskModel holds everything a provider's score depends on besides its own
+features: the population thresholds (percentiles) the risk components
+compare against, and the feature scaler and IsolationForest fitted on a
+sample of providers. It is fitted once, saved under a content hash, and
+reused, so any chunk of providers can be scored independently - in parallel,
+or incrementally when only some providers' inputs changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+LATEST_FILE = "latest.json"
+SCORES_FILE = "provider_scores.parquet"
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class RiskModel:
+    """Population thresholds and anomaly detector for provider risk scoring"""
+
+    def __init__(
+        self,
+        features: List[str],
+        stats: Dict[str, float],
+        scaler: StandardScaler,
+        detector: IsolationForest,
+        population_size: int,
+        sample_size: int
+    ):
+        """
+        Initialize risk model (use RiskModel.fit or RiskModel.load)
+
+        Args:
+            features: Anomaly detection features
+            stats: Population thresholds used by the risk components
+            scaler: Feature scaler fitted on the sample
+            detector: IsolationForest fitted on the scaled sample
+            population_size: Providers in the population at fit time
+            sample_size: Providers the detector was fitted on
+        """
+        self.features = list(features)
+        self.stats = dict(stats)
+        self.scaler = scaler
+        self.detector = detector
+        self.population_size = population_size
+        self.sample_size = sample_size
+        self.fitted_at = datetime.now().isoformat()
+        self.version = hashlib.sha256(pickle.dumps(
+            (self.features, sorted(self.stats.items()), scaler, detector),
+            protocol=pickle.HIGHEST_PROTOCOL
+        )).hexdigest()[:16]
+
+    @classmethod
+    def fit(
+        cls,
+        providers: pd.DataFrame,
+        features: List[str],
+        stats: Dict[str, float],
+        sample_size: int = 250_000,
+        n_estimators: int = 100,
+        max_samples: Union[int, float, str] = 'auto',
+        contamination: float = 0.05,
+        n_jobs: int = -1,
+        random_state: int = 42
+    ) -> 'RiskModel':
+        """
+        Fit the scaler and IsolationForest on a sample of providers
+
+        Args:
+            providers: Provider feature table (one row per provider)
+            features: Anomaly detection features
+            stats: Population thresholds (computed by the caller over all providers)
+            sample_size: Providers sampled for fitting
+            n_estimators: Trees in the forest
+            max_samples: Rows drawn per tree (IsolationForest semantics)
+            contamination: Expected share of anomalies
+            n_jobs: Cores used to build the trees (-1 = all)
+            random_state: Seed for sampling and the forest
+        """
+        sample = providers
+        if len(providers) > sample_size:
+            sample = providers.sample(n=sample_size, random_state=random_state)
+        X = sample[features].fillna(0).to_numpy(dtype=np.float64)
+
+        scaler = StandardScaler().fit(X)
+        detector = IsolationForest(
+            n_estimators=n_estimators,
+            max_samples=max_samples,
+            contamination=contamination,
+            n_jobs=n_jobs,
+            random_state=random_state
+        ).fit(scaler.transform(X))
+
+        model = cls(features, stats, scaler, detector, len(providers), len(sample))
+        logger.info(f"Fitted risk model {model.version} on {len(sample):,} of {len(providers):,} providers")
+        return model
+
+    def anomalies(self, providers: pd.DataFrame) -> np.ndarray:
+        """Anomaly flags for a chunk of providers"""
+        if len(providers) == 0:
+            return np.zeros(0, dtype=bool)
+        X = providers[self.features].fillna(0).to_numpy(dtype=np.float64)
+        return self.detector.predict(self.scaler.transform(X)) == -1
+
+    def save(self, model_dir: Union[str, Path]) -> Path:
+        """Persist the model and mark it as the latest version"""
+        model_dir = Path(model_dir)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        path = model_dir / f"risk_model_{self.version}.pkl"
+        _atomic_write(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+        _atomic_write(model_dir / LATEST_FILE, json.dumps({
+            'version': self.version,
+            'path': path.name,
+            'features': self.features,
+            'population_size': self.population_size,
+            'sample_size': self.sample_size,
+            'fitted_at': self.fitted_at
+        }, indent=2).encode())
+        return path
+
+    @classmethod
+    def load(cls, model_dir: Union[str, Path]) -> Optional['RiskModel']:
+        """Latest persisted model, or None"""
+        model_dir = Path(model_dir)
+        try:
+            with open(model_dir / LATEST_FILE) as f:
+                latest = json.load(f)
+            with open(model_dir / latest['path'], 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable risk model in {model_dir}: {e}")
+            return None
+
+
+class ProviderScoreStore:
+    """Last computed score of every provider, with the input hash it was computed from"""
+
+    def __init__(self, model_dir: Union[str, Path]):
+        """
+        Initialize score store
+
+        Args:
+            model_dir: Directory of the persisted risk model
+        """
+        self.path = Path(model_dir) / SCORES_FILE
+
+    @staticmethod
+    def input_hashes(providers: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        """Row hashes of the scoring inputs"""
+        return pd.util.hash_pandas_object(providers[columns], index=False).to_numpy()
+
+    def load(self) -> Optional[pd.DataFrame]:
+        if not self.path.exists():
+            return None
+        try:
+            return pd.read_parquet(self.path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable provider score store {self.path}: {e}")
+            return None
+
+    def save(self, scores: pd.DataFrame):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        scores.to_parquet(tmp_path, index=False, compression='zstd')
+        os.replace(tmp_path, self.path)
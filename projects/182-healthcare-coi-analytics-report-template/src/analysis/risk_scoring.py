@@ -3,13 +3,21 @@ Risk Scoring Module
 Advanced risk assessment for healthcare providers
 """
 
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import IsolationForest
 from typing import Dict, List, Optional, Tuple, Any
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from .open_payments import provider_tenure
+from .risk_model import RiskModel, ProviderScoreStore
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +25,46 @@ logger = logging.getLogger(__name__)
 class RiskScorer:
     """Multi-factor risk scoring and anomaly detection"""
     
+    RISK_COMPONENTS = [
+        ('payment_risk', 0.25),
+        ('prescription_risk', 0.25),
+        ('relationship_risk', 0.20),
+        ('behavioral_risk', 0.15),
+        ('correlation_risk', 0.15)
+    ]
+    
+    ANOMALY_FEATURES = [
+        'total_payments', 'payment_count', 'total_rx_claims',
+        'total_rx_cost', 'unique_manufacturers', 'unique_drugs'
+    ]
+    
+    # Methods a stored score was computed with (part of the incremental scoring key)
+    SCORING_METHODS = [
+        '_score_frame', '_calculate_payment_risk', '_calculate_prescription_risk',
+        '_calculate_relationship_risk', '_calculate_behavioral_risk', '_calculate_correlation_risk'
+    ]
+    
+    PROVIDER_COLUMNS = [
+        'total_rx_claims', 'total_rx_cost', 'unique_drugs', 'total_beneficiaries',
+        'total_payments', 'payment_count', 'unique_manufacturers',
+        'payment_categories', 'payment_years', 'max_single_payment',
+        'longest_streak', 'gap_years'
+    ]
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize risk scorer with configuration
         
         Args:
             config: Configuration dictionary with risk thresholds
+                (analysis.risk_scoring enables the persisted, chunked model)
         """
         self.config = config
         self.thresholds = config.get('thresholds', {})
+        self.settings = config.get('analysis', {}).get('risk_scoring', {}) or {}
         self.risk_scores = None
         self.anomaly_detector = None
+        self.risk_model = None
         
     def score_providers(
         self, 
@@ -51,51 +88,174 @@ class RiskScorer:
         # Prepare base data
         risk_df = self._prepare_provider_data(payments_data, prescription_data)
         
-        # Calculate individual risk components
-        risk_df['payment_risk'] = self._calculate_payment_risk(risk_df)
-        risk_df['prescription_risk'] = self._calculate_prescription_risk(risk_df)
-        risk_df['relationship_risk'] = self._calculate_relationship_risk(risk_df)
-        risk_df['behavioral_risk'] = self._calculate_behavioral_risk(risk_df)
+        if self.settings.get('persist_model', False):
+            # Fitted model reused across runs, providers scored in chunks
+            risk_df = self._score_with_model(risk_df, correlation_data)
+        else:
+            stats = self._population_stats(risk_df)
+            risk_df = self._score_frame(risk_df, stats, correlation_data)
+            
+            # Detect anomalies
+            risk_df['is_anomaly'] = self._detect_anomalies(risk_df)
+        
+        # Sort by risk score
+        risk_df = risk_df.sort_values('composite_risk_score', ascending=False)
+        
+        self.risk_scores = risk_df
+        logger.info(f"Calculated risk scores for {len(risk_df)} providers")
+        
+        return risk_df
+    
+    def _score_frame(
+        self,
+        df: pd.DataFrame,
+        stats: Dict[str, float],
+        correlation_data: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """Risk components, composite score and level of a provider frame (or chunk)"""
+        df['payment_risk'] = self._calculate_payment_risk(df)
+        df['prescription_risk'] = self._calculate_prescription_risk(df, stats)
+        df['relationship_risk'] = self._calculate_relationship_risk(df, stats)
+        df['behavioral_risk'] = self._calculate_behavioral_risk(df, stats)
         
         # Add correlation-based risk if available
         if correlation_data is not None:
-            risk_df['correlation_risk'] = self._calculate_correlation_risk(
-                risk_df, correlation_data
+            df['correlation_risk'] = self._calculate_correlation_risk(
+                df, correlation_data, stats
             )
         else:
-            risk_df['correlation_risk'] = 50  # Default medium risk
+            df['correlation_risk'] = 50  # Default medium risk
         
         # Calculate composite risk score
-        risk_components = [
-            ('payment_risk', 0.25),
-            ('prescription_risk', 0.25),
-            ('relationship_risk', 0.20),
-            ('behavioral_risk', 0.15),
-            ('correlation_risk', 0.15)
-        ]
-        
-        risk_df['composite_risk_score'] = sum(
-            risk_df[component] * weight 
-            for component, weight in risk_components
+        df['composite_risk_score'] = sum(
+            df[component] * weight 
+            for component, weight in self.RISK_COMPONENTS
         )
         
         # Categorize risk levels
-        risk_df['risk_level'] = pd.cut(
-            risk_df['composite_risk_score'],
+        df['risk_level'] = pd.cut(
+            df['composite_risk_score'],
             bins=[0, 30, 60, 80, 90, 100],
             labels=['Low', 'Medium', 'High', 'Critical', 'Extreme']
         )
         
-        # Detect anomalies
-        risk_df['is_anomaly'] = self._detect_anomalies(risk_df)
-        
-        # Sort by risk score
-        risk_df = risk_df.sort_values('composite_risk_score', ascending=False)
-        
-        self.risk_scores = risk_df
-        logger.info(f"Calculated risk scores for {len(risk_df)} providers")
+        return df
+    
+    def _population_stats(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Population percentiles the risk components compare providers against"""
+        claims = df['total_rx_claims'].replace(0, 1)
+        return {
+            'rx_claims_p75': df['total_rx_claims'].quantile(0.75),
+            'rx_claims_p90': df['total_rx_claims'].quantile(0.90),
+            'rx_cost_p75': df['total_rx_cost'].quantile(0.75),
+            'rx_cost_p90': df['total_rx_cost'].quantile(0.90),
+            'payments_p75': df['total_payments'].quantile(0.75),
+            'cost_per_claim_p90': (df['total_rx_cost'] / claims).quantile(0.90),
+            'claims_per_beneficiary_p95': (
+                df['total_rx_claims'] / df['total_beneficiaries'].replace(0, 1)
+            ).quantile(0.95),
+            'payment_rx_ratio_p95': (
+                df['total_payments'] / df['total_rx_cost'].replace(0, 1)
+            ).quantile(0.95)
+        }
+    
+    def _score_with_model(
+        self,
+        risk_df: pd.DataFrame,
+        correlation_data: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Score providers against a persisted RiskModel
+        
+        The model (population percentiles, scaler, IsolationForest fitted on a
+        sample) is loaded from model_dir or fitted once and saved. Providers are
+        scored in chunks across threads; with incremental scoring, providers
+        whose inputs hash the same as in the last run under the same model,
+        thresholds and scoring code keep their stored scores and only changed
+        or new providers are scored. Models and scores are kept per health
+        system (model_dir/<short_name>).
+        """
+        model_dir = self._model_dir()
+        sample_size = int(self.settings.get('sample_size', 250_000))
+        chunk_size = int(self.settings.get('chunk_size', 100_000))
+        n_jobs = int(self.settings.get('n_jobs', -1))
+        workers = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+        
+        model = None if self.settings.get('refit', False) else RiskModel.load(model_dir)
+        if model is not None and model.features != self.ANOMALY_FEATURES:
+            logger.info(f"Risk model {model.version} uses other features; refitting")
+            model = None
+        if model is None:
+            model = RiskModel.fit(
+                risk_df, self.ANOMALY_FEATURES, self._population_stats(risk_df),
+                sample_size=sample_size,
+                n_estimators=int(self.settings.get('n_estimators', 100)),
+                max_samples=self.settings.get('max_samples', 'auto'),
+                n_jobs=n_jobs
+            )
+            model.save(model_dir)
+        else:
+            logger.info(f"Using risk model {model.version} (fitted {model.fitted_at})")
+        self.risk_model = model
+        self.anomaly_detector = model.detector
+        
+        # Inputs of a stored score: provider features, the model, thresholds, scoring code and correlation mode
+        scoring_key = f"{model.version}:{self._scoring_fingerprint()}:{int(correlation_data is not None)}"
+        store = ProviderScoreStore(model_dir)
+        risk_df = risk_df.reset_index(drop=True)
+        risk_df['input_hash'] = store.input_hashes(risk_df, ['NPI'] + self.PROVIDER_COLUMNS)
+        
+        reused = None
+        pending = risk_df
+        if self.settings.get('incremental', True):
+            previous = store.load()
+            if previous is not None and len(previous) > 0:
+                previous = previous[previous['scoring_key'] == scoring_key]
+                unchanged = risk_df['input_hash'].isin(previous['input_hash'])
+                reused = previous[previous['input_hash'].isin(risk_df['input_hash'])]
+                pending = risk_df[~unchanged]
+        
+        chunks = [pending.iloc[start:start + chunk_size]
+                  for start in range(0, len(pending), chunk_size)] or [pending]
+        
+        def score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+            chunk = self._score_frame(chunk.copy(), model.stats, correlation_data)
+            chunk['is_anomaly'] = model.anomalies(chunk)
+            return chunk
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+            scored = list(executor.map(score_chunk, chunks))
+        
+        if reused is not None and len(reused) > 0:
+            scored = [reused.drop(columns=['scoring_key'])] + scored
+        result = pd.concat(scored, ignore_index=True)
+        result['risk_level'] = pd.Categorical(
+            result['risk_level'], categories=['Low', 'Medium', 'High', 'Critical', 'Extreme'], ordered=True
+        )
+        logger.info(f"Scored {len(pending):,} changed/new providers in {len(chunks)} chunk(s), "
+                    f"reused {len(result) - len(pending):,} stored scores")
         
-        return risk_df
+        store.save(result.assign(scoring_key=scoring_key))
+        return result.drop(columns=['input_hash'])
+    
+    def _model_dir(self) -> Path:
+        """Persisted model directory of this health system"""
+        model_dir = Path(self.settings.get('model_dir', 'data/cache/risk_model'))
+        short_name = (self.config.get('health_system') or {}).get('short_name')
+        # Percentiles and the forest describe one client's population
+        return model_dir / short_name if short_name else model_dir
+    
+    def _scoring_fingerprint(self) -> str:
+        """Hash of the thresholds and the source of the scoring methods"""
+        digest = hashlib.sha256(json.dumps(self.thresholds, sort_keys=True, default=str).encode())
+        digest.update(repr(self.RISK_COMPONENTS).encode())
+        for name in self.SCORING_METHODS:
+            method = getattr(type(self), name)
+            try:
+                digest.update(inspect.getsource(method).encode())
+            except (OSError, TypeError):
+                digest.update(method.__code__.co_code)
+        return digest.hexdigest()[:16]
     
     def _prepare_provider_data(
         self, 
@@ -111,29 +271,35 @@ class RiskScorer:
             'payment_category': 'nunique',
             'payment_year': 'nunique',
             'max_amount': 'max'
-        }).reset_index()
+        })
         
-        payment_agg.columns = ['NPI', 'total_payments', 'payment_count',
+        payment_agg.columns = ['total_payments', 'payment_count',
                                'unique_manufacturers', 'payment_categories',
                                'payment_years', 'max_single_payment']
         
+        # Tenure features (longest consecutive-year run, gap years)
+        tenure = provider_tenure(payments)[['longest_streak', 'gap_years']]
+        
         # Aggregate prescriptions by provider
         rx_agg = prescriptions.groupby('NPI').agg({
             'total_claims': 'sum',
             'total_cost': 'sum',
             'BRAND_NAME': 'nunique',
             'total_beneficiaries': 'sum'
-        }).reset_index()
+        })
         
-        rx_agg.columns = ['NPI', 'total_rx_claims', 'total_rx_cost',
+        rx_agg.columns = ['total_rx_claims', 'total_rx_cost',
                           'unique_drugs', 'total_beneficiaries']
         
-        # Merge data
-        risk_df = pd.merge(rx_agg, payment_agg, on='NPI', how='outer')
+        # Join on the provider index (union of prescribers and payment recipients)
+        risk_df = pd.concat([rx_agg, payment_agg, tenure], axis=1, join='outer').sort_index()
+        risk_df.index.name = 'NPI'
+        risk_df = risk_df.reset_index()
         
         # Fill missing values
         payment_cols = ['total_payments', 'payment_count', 'unique_manufacturers',
-                       'payment_categories', 'payment_years', 'max_single_payment']
+                       'payment_categories', 'payment_years', 'max_single_payment',
+                       'longest_streak', 'gap_years']
         risk_df[payment_cols] = risk_df[payment_cols].fillna(0)
         
         rx_cols = ['total_rx_claims', 'total_rx_cost', 'unique_drugs', 'total_beneficiaries']
@@ -143,7 +309,7 @@ class RiskScorer:
     
     def _calculate_payment_risk(self, df: pd.DataFrame) -> pd.Series:
         """Calculate payment-based risk component (0-100)"""
-        risk = pd.Series(index=df.index, dtype=float)
+        risk = pd.Series(0.0, index=df.index)
         
         # High single payment risk
         high_payment_threshold = self.thresholds.get('payment', {}).get('high_single_payment', 5000)
@@ -155,7 +321,7 @@ class RiskScorer:
         
         # Payment frequency risk (many small payments)
         avg_payment = df['total_payments'] / df['payment_count'].replace(0, 1)
-        risk += (avg_payment < 100) & (df['payment_count'] > 50) * 15
+        risk += ((avg_payment < 100) & (df['payment_count'] > 50)) * 15
         
         # Multiple manufacturer relationships
         risk += np.clip(df['unique_manufacturers'] / 10 * 15, 0, 15)
@@ -168,37 +334,35 @@ class RiskScorer:
         
         return np.clip(risk, 0, 100)
     
-    def _calculate_prescription_risk(self, df: pd.DataFrame) -> pd.Series:
+    def _calculate_prescription_risk(self, df: pd.DataFrame, stats: Optional[Dict[str, float]] = None) -> pd.Series:
         """Calculate prescription-based risk component (0-100)"""
-        risk = pd.Series(index=df.index, dtype=float)
+        stats = stats or self._population_stats(df)
+        risk = pd.Series(0.0, index=df.index)
         
         # High volume prescribing
-        volume_percentile = df['total_rx_claims'].quantile(0.90)
-        risk += (df['total_rx_claims'] > volume_percentile) * 20
+        risk += (df['total_rx_claims'] > stats['rx_claims_p90']) * 20
         
         # High cost prescribing
-        cost_percentile = df['total_rx_cost'].quantile(0.90)
-        risk += (df['total_rx_cost'] > cost_percentile) * 25
+        risk += (df['total_rx_cost'] > stats['rx_cost_p90']) * 25
         
         # Cost per claim (expensive drugs)
         avg_cost_per_claim = df['total_rx_cost'] / df['total_rx_claims'].replace(0, 1)
-        high_cost_threshold = avg_cost_per_claim.quantile(0.90)
-        risk += (avg_cost_per_claim > high_cost_threshold) * 20
+        risk += (avg_cost_per_claim > stats['cost_per_claim_p90']) * 20
         
         # Limited drug diversity (potential favoritism)
         drug_diversity = df['unique_drugs'] / df['total_rx_claims'].replace(0, 1)
-        risk += (drug_diversity < 0.01) & (df['total_rx_claims'] > 100) * 15
+        risk += ((drug_diversity < 0.01) & (df['total_rx_claims'] > 100)) * 15
         
         # Unusual beneficiary patterns
         claims_per_beneficiary = df['total_rx_claims'] / df['total_beneficiaries'].replace(0, 1)
-        unusual_threshold = claims_per_beneficiary.quantile(0.95)
-        risk += (claims_per_beneficiary > unusual_threshold) * 20
+        risk += (claims_per_beneficiary > stats['claims_per_beneficiary_p95']) * 20
         
         return np.clip(risk, 0, 100)
     
-    def _calculate_relationship_risk(self, df: pd.DataFrame) -> pd.Series:
+    def _calculate_relationship_risk(self, df: pd.DataFrame, stats: Optional[Dict[str, float]] = None) -> pd.Series:
         """Calculate relationship pattern risk (0-100)"""
-        risk = pd.Series(index=df.index, dtype=float)
+        stats = stats or self._population_stats(df)
+        risk = pd.Series(0.0, index=df.index)
         
         # Concentration risk (few manufacturers dominate)
         # This would require more detailed data, so using proxy
@@ -207,23 +371,25 @@ class RiskScorer:
         
         # Payment to prescription ratio
         payment_rx_ratio = df['total_payments'] / df['total_rx_cost'].replace(0, 1)
-        suspicious_ratio = payment_rx_ratio.quantile(0.95)
-        risk += (payment_rx_ratio > suspicious_ratio) * 30
+        risk += (payment_rx_ratio > stats['payment_rx_ratio_p95']) * 30
         
-        # Sustained high-value relationships
-        multi_year_high_payment = (df['payment_years'] >= 3) & (df['total_payments'] > 5000)
+        # Sustained high-value relationships (3+ payment years, consecutive only if configured)
+        consecutive = self.thresholds.get('relationship', {}).get('consecutive_years', False)
+        sustained_years = df['longest_streak'] if consecutive else df['payment_years']
+        multi_year_high_payment = (sustained_years >= 3) & (df['total_payments'] > 5000)
         risk += multi_year_high_payment * 40
         
         return np.clip(risk, 0, 100)
     
-    def _calculate_behavioral_risk(self, df: pd.DataFrame) -> pd.Series:
+    def _calculate_behavioral_risk(self, df: pd.DataFrame, stats: Optional[Dict[str, float]] = None) -> pd.Series:
         """Calculate behavioral pattern risk (0-100)"""
-        risk = pd.Series(index=df.index, dtype=float)
+        stats = stats or self._population_stats(df)
+        risk = pd.Series(0.0, index=df.index)
         
         # Sudden changes in prescribing volume
         # This would require time series data, using proxy
-        high_volume = df['total_rx_claims'] > df['total_rx_claims'].quantile(0.75)
-        high_payment = df['total_payments'] > df['total_payments'].quantile(0.75)
+        high_volume = df['total_rx_claims'] > stats['rx_claims_p75']
+        high_payment = df['total_payments'] > stats['payments_p75']
         risk += (high_volume & high_payment) * 30
         
         # Unusual payment patterns (many small payments)
@@ -243,10 +409,12 @@ class RiskScorer:
     def _calculate_correlation_risk(
         self, 
         df: pd.DataFrame,
-        correlation_data: pd.DataFrame
+        correlation_data: pd.DataFrame,
+        stats: Optional[Dict[str, float]] = None
     ) -> pd.Series:
         """Calculate correlation-based risk (0-100)"""
-        risk = pd.Series(index=df.index, dtype=float)
+        stats = stats or self._population_stats(df)
+        risk = pd.Series(0.0, index=df.index)
         
         # This would use correlation analysis results
         # For now, using payment presence as proxy
@@ -254,8 +422,8 @@ class RiskScorer:
         risk += has_payments * 50
         
         # High payment correlation
-        high_payment_providers = df['total_payments'] > df['total_payments'].quantile(0.75)
-        high_rx_providers = df['total_rx_cost'] > df['total_rx_cost'].quantile(0.75)
+        high_payment_providers = df['total_payments'] > stats['payments_p75']
+        high_rx_providers = df['total_rx_cost'] > stats['rx_cost_p75']
         risk += (high_payment_providers & high_rx_providers) * 50
         
         return np.clip(risk, 0, 100)
@@ -270,14 +438,8 @@ class RiskScorer:
         Returns:
             Series with anomaly flags
         """
-        # Select features for anomaly detection
-        features = [
-            'total_payments', 'payment_count', 'total_rx_claims',
-            'total_rx_cost', 'unique_manufacturers', 'unique_drugs'
-        ]
-        
         # Prepare data
-        X = df[features].fillna(0)
+        X = df[self.ANOMALY_FEATURES].fillna(0)
         
         # Standardize features
         scaler = StandardScaler()
@@ -286,6 +448,7 @@ class RiskScorer:
         # Train Isolation Forest
         self.anomaly_detector = IsolationForest(
             contamination=0.05,  # Expect 5% anomalies
+            n_jobs=-1,
             random_state=42
         )
         
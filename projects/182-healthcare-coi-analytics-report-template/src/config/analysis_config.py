@@ -6,6 +6,7 @@ Configuration for analysis thresholds and data quality checks
 ANALYSIS_THRESHOLDS = {
     'min_payment_for_influence': 1000,      # $1,000 minimum for "significant" payment
     'min_rx_for_analysis': 1000,            # $1,000 minimum for "significant" prescriber
+    'min_prescribers_per_group': 10,        # Drug influence factors need 10+ prescribers with and without payments
     'max_reasonable_influence': 10,         # Flag if influence factor > 10x
     'max_reasonable_avg_rx': 5_000_000,     # Flag if avg Rx > $5M (5-year total)
     'max_reasonable_avg_rx_annual': 1_000_000  # Flag if annual avg Rx > $1M
@@ -3,5 +3,10 @@
 from .bigquery_connector import BigQueryConnector
 from .data_loader import DataLoader
 from .data_validator import DataValidator
+from .validation_engine import ColumnarValidator
+from .query_cache import QueryResultCache
+from .query_guard import QueryCostGuard, QueryBudgetExceeded
+from .table_stream import StreamedDataset
+from .shared_tables import SharedTables
 
-__all__ = ['BigQueryConnector', 'DataLoader', 'DataValidator']
\ No newline at end of file
+__all__ = ['BigQueryConnector', 'DataLoader', 'DataValidator', 'ColumnarValidator', 'QueryResultCache', 'QueryCostGuard', 'QueryBudgetExceeded', 'StreamedDataset', 'SharedTables']
\ No newline at end of file
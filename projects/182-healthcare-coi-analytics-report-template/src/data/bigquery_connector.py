@@ -5,17 +5,20 @@ Handles all BigQuery connections and queries with proper error handling and cach
 
 import json
 import os
-import hashlib
-import pickle
 from pathlib import Path
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 import pandas as pd
 from google.cloud import bigquery
 from google.oauth2 import service_account
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from dotenv import load_dotenv
 
+from .query_cache import QueryResultCache, TableVersionResolver, referenced_tables
+from .query_guard import QueryCostGuard
+from .job_telemetry import job_telemetry
+from .table_stream import StreamedDataset, stream_table
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -25,24 +28,122 @@ logger = logging.getLogger(__name__)
 class BigQueryConnector:
     """Singleton BigQuery connection manager with caching and retry logic"""
     
-    _instance = None
+    # One connector per execution backend and its settings (e.g. DuckDB source_dir/database)
+    _instances: Dict[str, 'BigQueryConnector'] = {}
     _client = None
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    @staticmethod
+    def _instance_key(backend: Optional[Dict[str, Any]]) -> str:
+        options = dict(backend or {})
+        options.setdefault('engine', 'bigquery')
+        return json.dumps(options, sort_keys=True, default=str)
+    
+    def __new__(cls, backend: Optional[Dict[str, Any]] = None):
+        key = cls._instance_key(backend)
+        if key not in cls._instances:
+            cls._instances[key] = super().__new__(cls)
+        return cls._instances[key]
+    
+    @classmethod
+    def reset_instances(cls):
+        """Close and forget every shared connector (the next one starts fresh)"""
+        for instance in cls._instances.values():
+            if instance._client is not None and hasattr(instance._client, 'close'):
+                instance._client.close()
+        cls._instances.clear()
     
-    def __init__(self):
-        """Initialize BigQuery connector"""
+    def __init__(self, backend: Optional[Dict[str, Any]] = None):
+        """
+        Initialize BigQuery connector
+        
+        Args:
+            backend: Optional execution backend settings (bigquery.backend in the
+                config). {'engine': 'duckdb', 'source_dir': ..., 'database': ...}
+                runs the same SQL locally over Parquet extracts instead of BigQuery
+        """
         if self._client is None:
-            self._initialize_client()
-            self.cache_dir = Path("data/cache")
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            self.cache_ttl = timedelta(hours=24)
+            self.backend = (backend or {}).get('engine', 'bigquery')
+            self._initialize_client(backend)
+            self.configure_cache()
+            self.cost_guard = None
+            self.last_query_stats = {}
+            self.lineage_tracker = None
+    
+    def configure_cache(
+        self,
+        cache_dir: str = "data/cache/query_results",
+        max_size_mb: float = 2048,
+        ttl_hours: Optional[float] = None,
+        fallback_ttl_hours: float = 24,
+        validate_tables: bool = True,
+        enabled: bool = True
+    ):
+        """
+        Configure the persistent query result cache
+        
+        Args:
+            cache_dir: Directory for cached Parquet results
+            max_size_mb: Total cache size budget (LRU eviction beyond it)
+            ttl_hours: Optional hard expiry for all cached results
+            fallback_ttl_hours: Expiry for results whose source tables cannot be versioned
+            validate_tables: Key results on referenced tables' last_modified times
+            enabled: Whether query() uses the cache at all
+        """
+        if self.backend != 'bigquery':
+            # Keep results of different backends apart (e.g. when benchmarking)
+            cache_dir = str(Path(cache_dir) / self.backend)
+        self.cache_dir = Path(cache_dir)
+        self.cache_ttl = timedelta(hours=fallback_ttl_hours)
+        self.validate_tables = validate_tables
+        self.cache_enabled = enabled
+        self.result_cache = QueryResultCache(
+            cache_dir=cache_dir,
+            max_bytes=int(max_size_mb * 1024 ** 2),
+            ttl_seconds=ttl_hours * 3600 if ttl_hours is not None else None,
+            fallback_ttl_seconds=fallback_ttl_hours * 3600
+        )
+        self.table_versions = TableVersionResolver(self.client.get_table)
     
-    def _initialize_client(self):
-        """Initialize BigQuery client with credentials"""
+    def configure_cost_limits(
+        self,
+        max_gb_per_query: Optional[float] = None,
+        max_gb_per_run: Optional[float] = None,
+        on_exceed: str = "fail",
+        enabled: bool = True
+    ):
+        """
+        Configure pre-flight dry runs and bytes-billed budgets
+        
+        Args:
+            max_gb_per_query: Largest scan allowed per query (sent as maximum_bytes_billed)
+            max_gb_per_run: Total scan allowed per pipeline run
+            on_exceed: "fail" to raise QueryBudgetExceeded, "fallback" to route
+                to a registered cheaper table first
+            enabled: Whether queries are dry-run and budgeted at all
+        """
+        self.cost_guard = QueryCostGuard(
+            self.client,
+            max_gb_per_query=max_gb_per_query,
+            max_gb_per_run=max_gb_per_run,
+            on_exceed=on_exceed
+        ) if enabled else None
+    
+    def get_cost_summary(self) -> Dict[str, Any]:
+        """Get estimated bytes scanned and budget status for the current run"""
+        return self.cost_guard.get_summary() if self.cost_guard else {}
+    
+    def _initialize_client(self, backend: Optional[Dict[str, Any]] = None):
+        """Initialize BigQuery client with credentials (or the configured local backend)"""
+        engine = (backend or {}).get('engine', 'bigquery')
+        if engine == 'duckdb':
+            from .duckdb_backend import DuckDBClient
+            options = {k: v for k, v in backend.items() if k != 'engine'}
+            self._client = DuckDBClient(**options)
+            logger.info(f"DuckDB execution backend initialized ({self._client.database})")
+            return
+        if engine != 'bigquery':
+            raise ValueError(f"Unknown execution backend: {engine!r} (expected 'bigquery' or 'duckdb')")
+        
         try:
             service_account_json = os.getenv('GCP_SERVICE_ACCOUNT_KEY')
             if not service_account_json:
@@ -71,43 +172,54 @@ class BigQueryConnector:
             self._initialize_client()
         return self._client
     
-    def _get_cache_key(self, query: str, params: Optional[Dict] = None) -> str:
-        """Generate cache key for query"""
-        cache_string = query
-        if params:
-            cache_string += str(sorted(params.items()))
-        return hashlib.md5(cache_string.encode()).hexdigest()
-    
-    def _get_cached_result(self, cache_key: str) -> Optional[pd.DataFrame]:
-        """Retrieve cached query result if valid"""
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        if cache_file.exists():
-            try:
-                mod_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-                if datetime.now() - mod_time < self.cache_ttl:
-                    with open(cache_file, 'rb') as f:
-                        logger.debug(f"Using cached result for {cache_key}")
-                        return pickle.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache {cache_key}: {e}")
-        return None
+    def _get_cache_key(self, query: str, params: Optional[Dict] = None) -> tuple:
+        """
+        Generate cache key for query
+        
+        Returns:
+            Tuple of (cache_key, versioned) where versioned is False when the
+            referenced tables' last_modified times could not be resolved
+        """
+        versions = None
+        if self.validate_tables:
+            tables = referenced_tables(query)
+            versions = self.table_versions.versions(tables) if tables else None
+        return self.result_cache.make_key(query, params, versions), versions is not None
     
-    def _save_to_cache(self, cache_key: str, df: pd.DataFrame):
-        """Save query result to cache"""
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(df, f)
-            logger.debug(f"Saved result to cache: {cache_key}")
-        except Exception as e:
-            logger.warning(f"Failed to save cache {cache_key}: {e}")
+    def get_cached_result(self, query: str, params: Optional[Dict] = None) -> tuple:
+        """
+        Look up a cached query result
+        
+        Returns:
+            Tuple of (DataFrame or None, cache_key) where cache_key is passed
+            to store_result() after running the query (None if caching is off)
+        """
+        if not self.cache_enabled:
+            return None, None
+        cache_key = self._get_cache_key(query, params)
+        return self.result_cache.get(cache_key[0]), cache_key
+    
+    def store_result(self, cache_key: Optional[tuple], df: pd.DataFrame):
+        """Save a query result under a key from get_cached_result()"""
+        if cache_key is not None:
+            key, versioned = cache_key
+            self.result_cache.put(key, df, {'unversioned': not versioned})
+    
+    def invalidate_table_versions(self, table_id: Optional[str] = None):
+        """Forget memoized table versions after tables are (re)created"""
+        self.table_versions.invalidate(table_id)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get query result cache hit/miss/bytes metrics"""
+        return self.result_cache.get_stats()
     
     def query(
         self, 
         query: str, 
         params: Optional[Dict] = None,
         use_cache: bool = True,
-        max_retries: int = 3
+        max_retries: int = 3,
+        query_name: str = "query"
     ) -> pd.DataFrame:
         """
         Execute BigQuery query with caching and retry logic
@@ -117,17 +229,42 @@ class BigQueryConnector:
             params: Optional query parameters
             use_cache: Whether to use cached results
             max_retries: Maximum number of retry attempts
+            query_name: Name used for cost tracking and lineage
             
         Returns:
             Query results as DataFrame
+            
+        Raises:
+            QueryBudgetExceeded: If the dry run exceeds the configured budget
         """
+        self.last_query_stats = {'source': 'cache'}
+        
         # Check cache first
+        cache_key = None
         if use_cache:
-            cache_key = self._get_cache_key(query, params)
-            cached_result = self._get_cached_result(cache_key)
+            cached_result, cache_key = self.get_cached_result(query, params)
             if cached_result is not None:
+                logger.info(f"Query served from cache ({len(cached_result):,} rows)")
                 return cached_result
         
+        # Pre-flight dry run against the bytes budget (may route to a fallback table)
+        query_parameters = [
+            bigquery.ScalarQueryParameter(k, "STRING", v) 
+            for k, v in params.items()
+        ] if params else None
+        self.last_query_stats = {'source': self.backend}
+        if self.cost_guard:
+            routed_query, bytes_estimate = self.cost_guard.check(query, query_name, query_parameters)
+            self.last_query_stats['bytes_processed_estimate'] = bytes_estimate
+            if routed_query != query:
+                query = routed_query
+                self.last_query_stats['routed'] = True
+                if use_cache:
+                    cached_result, cache_key = self.get_cached_result(query, params)
+                    if cached_result is not None:
+                        self.last_query_stats['source'] = 'cache'
+                        return cached_result
+        
         # Execute query with retry logic
         for attempt in range(max_retries):
             try:
@@ -135,21 +272,20 @@ class BigQueryConnector:
                 
                 # Configure query
                 job_config = bigquery.QueryJobConfig()
-                if params:
-                    job_config.query_parameters = [
-                        bigquery.ScalarQueryParameter(k, "STRING", v) 
-                        for k, v in params.items()
-                    ]
+                if query_parameters:
+                    job_config.query_parameters = query_parameters
+                if self.cost_guard:
+                    job_config = self.cost_guard.job_config(job_config)
                 
                 # Execute query
                 query_job = self.client.query(query, job_config=job_config)
                 df = query_job.to_dataframe()
+                self.last_query_stats.update(self.record_job(query_job, query_name))
                 
                 logger.info(f"Query returned {len(df):,} rows")
                 
                 # Save to cache
-                if use_cache:
-                    self._save_to_cache(cache_key, df)
+                self.store_result(cache_key, df)
                 
                 return df
                 
@@ -159,6 +295,141 @@ class BigQueryConnector:
                     raise
                 continue
     
+    def preflight(self, sql: str, query_name: str = "statement"):
+        """
+        Dry-run a statement against the bytes budget without executing it
+        
+        Statements are never routed to fallback tables (they may write to
+        them); callers decide whether existing tables can be reused instead.
+        
+        Raises:
+            QueryBudgetExceeded: If the dry run exceeds the configured budget
+        """
+        if self.cost_guard:
+            self.cost_guard.check(sql, query_name, allow_fallback=False)
+    
+    def execute(self, sql: str, query_name: str = "statement", preflight: bool = True):
+        """
+        Run a statement (e.g. CREATE TABLE AS SELECT) through the cost guard
+        
+        Args:
+            sql: SQL statement
+            query_name: Name used for cost tracking and lineage
+            preflight: Dry-run first (False if preflight() was already called)
+            
+        Returns:
+            Completed QueryJob
+            
+        Raises:
+            QueryBudgetExceeded: If the dry run exceeds the configured budget
+        """
+        if preflight:
+            self.preflight(sql, query_name)
+        job_config = self.cost_guard.job_config() if self.cost_guard else None
+        job = self.client.query(sql, job_config=job_config)
+        job.result()
+        self.record_job(job, query_name, 'statement')
+        for table_id in referenced_tables(sql):
+            self.invalidate_table_versions(table_id)
+        return job
+    
+    def run_job(self, sql: str, query_name: str = "query"):
+        """
+        Run a small query or DDL statement (DROP, COUNT) without a dry run
+        
+        Args:
+            sql: SQL statement
+            query_name: Name used for lineage telemetry
+            
+        Returns:
+            Completed QueryJob
+        """
+        job = self.client.query(sql)
+        job.result()
+        self.record_job(job, query_name, 'query')
+        return job
+    
+    def record_job(self, job, query_name: str, query_type: str = 'query', step: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record the telemetry of a completed job in the lineage tracker
+        
+        Args:
+            job: Completed QueryJob / LoadJob
+            query_name: Name of the query or table
+            query_type: Job category (query, statement, load, analysis)
+            step: Pipeline step that needed the job (default: the tracker's current step)
+            
+        Returns:
+            Job telemetry (job_id, bytes, slot time, cache hit, queue/execution time, top stage)
+        """
+        telemetry = job_telemetry(job)
+        if self.lineage_tracker is not None:
+            details = {key: value for key, value in telemetry.items() if key != 'job_id'}
+            self.lineage_tracker.add_bigquery_job(
+                telemetry['job_id'], query_type, table_name=query_name, step=step, **details
+            )
+        return telemetry
+    
+    def stream_table(
+        self,
+        table_id: str,
+        output_dir: Union[str, Path],
+        columns: Optional[List[str]] = None,
+        row_filter: Optional[str] = None,
+        partition_by: Optional[List[str]] = None,
+        use_cache: bool = True,
+        **options
+    ) -> StreamedDataset:
+        """
+        Download a table as Arrow batches into partitioned Parquet
+        
+        Uses the BigQuery Storage Read API (DuckDB: batched cursor reads) with
+        columns and row_filter pushed down, so memory stays bounded on large
+        tables. A previous download in output_dir is reused while the source
+        table is unchanged and was read with the same columns, filter and
+        partitioning.
+        
+        Args:
+            table_id: project.dataset.table (backticks allowed)
+            output_dir: Dataset directory
+            columns: Columns to read (default: all)
+            row_filter: SQL boolean expression over the table's columns
+            partition_by: Columns to partition the Parquet files by
+            use_cache: Reuse an up-to-date previous download
+            **options: max_streams, batch_rows, max_rows_per_file
+        
+        Returns:
+            StreamedDataset (lazy handle; nothing is loaded into memory)
+        """
+        table_id = table_id.replace('`', '')
+        try:
+            version = self.client.get_table(table_id).modified
+            version = version.isoformat() if version else None
+        except Exception as e:
+            logger.warning(f"Could not version {table_id} for stream reuse: {e}")
+            version = None
+        
+        self.last_query_stats = {'source': 'cache'}
+        existing = StreamedDataset.open(output_dir) if use_cache else None
+        if (existing is not None and version is not None and
+                existing.manifest.get('source_table') == table_id and
+                existing.manifest.get('source_version') == version and
+                existing.manifest.get('columns') == columns and
+                existing.manifest.get('row_filter') == row_filter and
+                existing.partition_by == [name for name in (partition_by or []) if name in existing.schema.names]):
+            logger.info(f"Reusing streamed download of {table_id} ({len(existing):,} rows)")
+            return existing
+        
+        self.last_query_stats = {'source': self.backend}
+        return stream_table(
+            self.client, table_id, output_dir,
+            columns=columns,
+            row_filter=row_filter,
+            partition_by=partition_by,
+            source_version=version,
+            **options
+        )
+    
     def get_table_info(self, dataset_id: str, table_id: str) -> Dict[str, Any]:
         """Get information about a BigQuery table"""
         try:
@@ -207,6 +478,8 @@ class BigQueryConnector:
                 df, table_ref, job_config=job_config
             )
             job.result()  # Wait for job to complete
+            self.record_job(job, table_id, 'load')
+            self.invalidate_table_versions(table_ref)
             
             logger.info(f"Created/updated table {table_ref} with {len(df):,} rows")
             
@@ -217,15 +490,12 @@ class BigQueryConnector:
     def clear_cache(self, older_than: Optional[timedelta] = None):
         """Clear cached query results"""
         try:
-            if older_than:
-                cutoff = datetime.now() - older_than
-                for cache_file in self.cache_dir.glob("*.pkl"):
-                    if datetime.fromtimestamp(cache_file.stat().st_mtime) < cutoff:
-                        cache_file.unlink()
-                        logger.debug(f"Removed old cache file: {cache_file.name}")
-            else:
-                for cache_file in self.cache_dir.glob("*.pkl"):
-                    cache_file.unlink()
-                logger.info("Cleared all cache files")
+            removed = self.result_cache.clear(
+                older_than.total_seconds() if older_than else None
+            )
+            # Results pickled by earlier versions of the connector
+            for cache_file in Path("data/cache").glob("*.pkl"):
+                cache_file.unlink()
+            logger.info(f"Cleared {removed} cached query results")
         except Exception as e:
-            logger.error(f"Failed to clear cache: {e}")
\ No newline at end of file
+            logger.error(f"Failed to clear cache: {e}")
@@ -45,6 +45,7 @@ class DataLineageTracker:
         }
         
         self.start_time = datetime.now()
+        self.current_step = None
         logger.info(f"Initialized DataLineageTracker with pipeline_id: {self.pipeline_id}")
     
     def add_source_data(self, name: str, details: Dict[str, Any]):
@@ -105,6 +106,17 @@ class DataLineageTracker:
         self.lineage['analysis_steps'].append(step)
         logger.info(f"Added analysis step: {step_name}")
     
+    def add_pipeline_step(self, step_name: str, details: Dict[str, Any]):
+        """
+        Record whether a pipeline step ran or was restored from the step cache
+        
+        Args:
+            step_name: Name of the pipeline step
+            details: Dictionary with status ('ran' or 'cached'), fingerprint, timing
+        """
+        self.lineage.setdefault('pipeline_steps', {})[step_name] = details
+        logger.info(f"Added pipeline step: {step_name} ({details.get('status', 'unknown')})")
+    
     def add_validation_check(self, check_name: str, status: str, details: Optional[Dict] = None):
         """
         Add a data validation check result
@@ -141,14 +153,22 @@ class DataLineageTracker:
         """
         self.lineage['data_quality']['row_counts'][table_name] = row_count
     
-    def add_bigquery_job(self, job_id: str, query_type: str, table_name: Optional[str] = None):
+    def set_current_step(self, step_name: Optional[str]):
+        """Pipeline step that BigQuery jobs are attributed to by default"""
+        self.current_step = step_name
+    
+    def add_bigquery_job(self, job_id: str, query_type: str, table_name: Optional[str] = None,
+                         step: Optional[str] = None, **telemetry):
         """
-        Track BigQuery job IDs for audit trail
+        Track BigQuery job IDs and job telemetry for audit trail and performance profiling
         
         Args:
             job_id: BigQuery job ID
-            query_type: Type of query (create_table, analysis, etc.)
+            query_type: Type of query (statement, query, load, analysis, etc.)
             table_name: Optional table name associated with job
+            step: Pipeline step the job ran for (default: the current step)
+            **telemetry: Job statistics (bytes_processed, bytes_billed, slot_ms,
+                cache_hit, queue_ms, execution_ms, top_stage, top_stage_slot_ms)
         """
         if 'bigquery_jobs' not in self.lineage:
             self.lineage['bigquery_jobs'] = []
@@ -157,6 +177,84 @@ class DataLineageTracker:
             'job_id': job_id,
             'query_type': query_type,
             'table_name': table_name,
+            'step': step or self.current_step,
+            'timestamp': datetime.now().isoformat(),
+            **telemetry
+        })
+    
+    @staticmethod
+    def _job_totals(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        totals = {'jobs': len(jobs), 'cache_hits': sum(1 for job in jobs if job.get('cache_hit'))}
+        for field in ('bytes_processed', 'bytes_billed', 'slot_ms', 'queue_ms', 'execution_ms'):
+            totals[field] = sum(job.get(field) or 0 for job in jobs)
+        return totals
+    
+    def get_performance_profile(self, top_n: int = 5) -> Dict[str, Any]:
+        """
+        Aggregate BigQuery job telemetry into a per-run performance profile
+        
+        Args:
+            top_n: Number of most expensive jobs (by slot time) to list
+            
+        Returns:
+            Dictionary with run totals, totals per pipeline step and job type,
+            and the most expensive jobs with their heaviest query stage
+        """
+        jobs = self.lineage.get('bigquery_jobs', [])
+        by_step, by_type = {}, {}
+        for job in jobs:
+            by_step.setdefault(job.get('step') or 'unattributed', []).append(job)
+            by_type.setdefault(job.get('query_type') or 'unknown', []).append(job)
+        
+        def ranked(groups):
+            totals = {name: self._job_totals(group) for name, group in groups.items()}
+            return dict(sorted(totals.items(), key=lambda item: (item[1]['slot_ms'], item[1]['bytes_billed']),
+                               reverse=True))
+        
+        top_jobs = sorted(jobs, key=lambda job: (job.get('slot_ms') or 0, job.get('execution_ms') or 0),
+                          reverse=True)[:top_n]
+        return {
+            'totals': self._job_totals(jobs),
+            'by_step': ranked(by_step),
+            'by_query_type': ranked(by_type),
+            'top_jobs': [{
+                key: job.get(key) for key in (
+                    'table_name', 'step', 'job_id', 'slot_ms', 'bytes_billed',
+                    'queue_ms', 'execution_ms', 'top_stage', 'top_stage_slot_ms'
+                )
+            } for job in top_jobs]
+        }
+    
+    def load_previous_profile(self, lineage_dir: Path = Path("data/lineage")) -> Optional[Dict[str, Any]]:
+        """Performance profile of the most recent earlier run saved in lineage_dir"""
+        for path in sorted(Path(lineage_dir).glob("lineage_*.json"), reverse=True):
+            if path.stem == f"lineage_{self.pipeline_id}":
+                continue
+            try:
+                with open(path) as f:
+                    previous = json.load(f)
+            except Exception:
+                continue
+            if previous.get('performance_profile', {}).get('totals', {}).get('jobs'):
+                return {'pipeline_id': previous.get('pipeline_id'), **previous['performance_profile']}
+        return None
+    
+    def add_query_cost(self, query_name: str, bytes_processed: int, status: str):
+        """
+        Track the dry-run bytes estimate of a query for cost auditing
+        
+        Args:
+            query_name: Name of the query
+            bytes_processed: total_bytes_processed reported by the dry run
+            status: Budget decision (allowed, routed, blocked)
+        """
+        if 'query_costs' not in self.lineage:
+            self.lineage['query_costs'] = []
+        
+        self.lineage['query_costs'].append({
+            'query_name': query_name,
+            'bytes_processed': bytes_processed,
+            'status': status,
             'timestamp': datetime.now().isoformat()
         })
     
@@ -167,6 +265,7 @@ class DataLineageTracker:
         self.lineage['execution_metrics']['total_duration_seconds'] = (
             end_time - self.start_time
         ).total_seconds()
+        self.lineage['performance_profile'] = self.get_performance_profile()
         
         logger.info(f"Pipeline completed in {self.lineage['execution_metrics']['total_duration_seconds']:.1f} seconds")
     
@@ -194,6 +293,7 @@ class DataLineageTracker:
             output_dir.mkdir(parents=True, exist_ok=True)
             output_path = output_dir / f"lineage_{self.pipeline_id}.json"
         
+        self.lineage['performance_profile'] = self.get_performance_profile()
         with open(output_path, 'w') as f:
             json.dump(self.lineage, f, indent=2, default=str)
         
@@ -214,9 +314,13 @@ class DataLineageTracker:
             'source_tables': {},
             'intermediate_tables_count': len(self.lineage['intermediate_tables']),
             'analysis_steps_count': len(self.lineage['analysis_steps']),
+            'pipeline_steps_cached': [name for name, details in self.lineage.get('pipeline_steps', {}).items()
+                                      if details.get('status') == 'cached'],
             'total_rows_processed': 0,
             'validation_status': 'All Passed',
-            'execution_time': self.lineage['execution_metrics'].get('total_duration_seconds')
+            'execution_time': self.lineage['execution_metrics'].get('total_duration_seconds'),
+            'bytes_processed': sum(q['bytes_processed'] for q in self.lineage.get('query_costs', [])
+                                   if q['status'] != 'blocked')
         }
         
         # Add source table details
@@ -268,6 +372,8 @@ class DataLineageTracker:
         markdown += f"- **Total Rows Processed**: {summary['total_rows_processed']:,}\n"
         markdown += f"- **Intermediate Tables Created**: {summary['intermediate_tables_count']}\n"
         markdown += f"- **Analysis Steps Completed**: {summary['analysis_steps_count']}\n"
+        if summary['pipeline_steps_cached']:
+            markdown += f"- **Steps Reused From Earlier Runs**: {', '.join(summary['pipeline_steps_cached'])}\n"
         
         # Add data quality section
         if self.lineage['data_quality']['validation_checks']:
@@ -287,5 +393,60 @@ class DataLineageTracker:
             markdown += f"\n### Audit Trail\n"
             markdown += f"- **BigQuery Jobs Executed**: {len(self.lineage['bigquery_jobs'])}\n"
             markdown += f"- **Job IDs Available**: Yes (stored for reproducibility)\n"
+            markdown += self._performance_markdown()
+        
+        # Add query cost tracking if available
+        if self.lineage.get('query_costs'):
+            costs = self.lineage['query_costs']
+            markdown += "\n### Query Costs\n"
+            markdown += f"- **Queries Dry-Run**: {len(costs)}\n"
+            markdown += f"- **Estimated Data Scanned**: {summary['bytes_processed'] / 1024 ** 3:,.2f} GB\n"
+            routed = sum(1 for q in costs if q['status'] == 'routed')
+            blocked = sum(1 for q in costs if q['status'] == 'blocked')
+            if routed or blocked:
+                markdown += f"- **Over Budget**: {routed} routed to fallback tables, {blocked} blocked\n"
+        
+        return markdown
+    
+    def _performance_markdown(self) -> str:
+        """Per-run performance profile section (job telemetry by pipeline step)"""
+        profile = self.get_performance_profile()
+        totals = profile['totals']
+        if not totals['jobs']:
+            return ""
+        
+        markdown = "\n### Query Performance\n"
+        markdown += f"- **Jobs**: {totals['jobs']} ({totals['cache_hits']} served from the BigQuery cache)\n"
+        markdown += (f"- **Data Processed / Billed**: {totals['bytes_processed'] / 1024 ** 3:,.2f} GB / "
+                     f"{totals['bytes_billed'] / 1024 ** 3:,.2f} GB\n")
+        markdown += f"- **Slot Time**: {totals['slot_ms'] / 1000:,.1f} s\n"
+        markdown += (f"- **Queued / Executing**: {totals['queue_ms'] / 1000:,.1f} s / "
+                     f"{totals['execution_ms'] / 1000:,.1f} s\n")
+        
+        markdown += "\n| Step | Jobs | Billed (GB) | Slot Time (s) | Queued (s) | Executing (s) |\n"
+        markdown += "|------|------|-------------|---------------|------------|---------------|\n"
+        for step, step_totals in profile['by_step'].items():
+            markdown += (f"| {step} | {step_totals['jobs']} | {step_totals['bytes_billed'] / 1024 ** 3:,.2f} | "
+                         f"{step_totals['slot_ms'] / 1000:,.1f} | {step_totals['queue_ms'] / 1000:,.1f} | "
+                         f"{step_totals['execution_ms'] / 1000:,.1f} |\n")
+        
+        heaviest = profile['top_jobs'][0] if profile['top_jobs'] else None
+        if heaviest and heaviest.get('slot_ms'):
+            markdown += f"\n- **Heaviest Job**: {heaviest['table_name']} ({heaviest['step'] or 'unattributed'}), "
+            markdown += f"{heaviest['slot_ms'] / 1000:,.1f} s slot time"
+            if heaviest.get('top_stage'):
+                markdown += f", mostly in stage {heaviest['top_stage']} ({heaviest['top_stage_slot_ms'] / 1000:,.1f} s)"
+            markdown += "\n"
+        
+        previous = self.load_previous_profile()
+        if previous:
+            changes = []
+            for field, label in (('slot_ms', 'slot time'), ('bytes_billed', 'bytes billed'),
+                                 ('execution_ms', 'execution time')):
+                before = previous['totals'].get(field) or 0
+                if before:
+                    changes.append(f"{label} {(totals[field] - before) / before * 100:+.0f}%")
+            if changes:
+                markdown += f"- **Vs Previous Run** ({previous['pipeline_id']}): {', '.join(changes)}\n"
         
-        return markdown
\ No newline at end of file
+        return markdown
@@ -6,7 +6,7 @@ Handles loading and preprocessing of various data sources
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 import logging
 from datetime import datetime
 import yaml
@@ -17,6 +17,8 @@ import os
 
 from .bigquery_connector import BigQueryConnector
 from .data_lineage import DataLineageTracker
+from .query_guard import QueryBudgetExceeded
+from .table_stream import StreamedDataset
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +26,20 @@ logger = logging.getLogger(__name__)
 class DataLoader:
     """Unified data loading and preprocessing"""
     
-    def __init__(self, config_path: str = "config/config.yaml"):
-        """Initialize data loader with configuration"""
+    def __init__(self, config_path: str = "config/config.yaml", backend: Optional[str] = None):
+        """
+        Initialize data loader with configuration
+        
+        Args:
+            config_path: Path to configuration file
+            backend: Override bigquery.backend.engine ('bigquery' or 'duckdb')
+        """
         self.config = self._load_config(config_path)
-        self.bq = BigQueryConnector()
+        backend_config = dict(self.config.get('bigquery', {}).get('backend') or {})
+        if backend:
+            backend_config['engine'] = backend
+        self.bq = BigQueryConnector(backend_config)
+        self.apply_connector_settings()
         self.data_dir = Path("data")
         self.processed_dir = self.data_dir / "processed"
         self.processed_dir.mkdir(parents=True, exist_ok=True)
@@ -35,12 +47,62 @@ class DataLoader:
         # Lineage tracker (will be set by pipeline)
         self.lineage_tracker: Optional[DataLineageTracker] = None
         
+        # Shared (multi-client) tables this client's temp tables are cut from (batch mode)
+        self.shared_tables: Dict[str, Dict[str, str]] = {}
+        
         # Cache metadata file
         self.cache_metadata_file = self.processed_dir / '.cache_metadata.json'
         
+    def apply_connector_settings(self):
+        """
+        Apply this config's query cache and cost limits to the connector
+        
+        The connector is shared by every DataLoader on the same backend, so
+        each run (one per client in batch mode) applies its own settings first.
+        Without cost_limits the connector runs unguarded; a new guard also
+        starts without the fallback tables registered for another client.
+        """
+        bq_config = self.config.get('bigquery', {})
+        self.bq.configure_cache(**(bq_config.get('query_cache') or {}))
+        cost_config = bq_config.get('cost_limits')
+        if cost_config:
+            self.bq.configure_cost_limits(**cost_config)
+        else:
+            self.bq.cost_guard = None
+    
     def set_lineage_tracker(self, tracker: DataLineageTracker):
         """Set the lineage tracker for this data loader"""
         self.lineage_tracker = tracker
+        self.bq.lineage_tracker = tracker
+        if self.bq.cost_guard:
+            self.bq.cost_guard.lineage_tracker = tracker
+    
+    def use_shared_tables(self, tables: Dict[str, Dict[str, str]]):
+        """
+        Build this client's temp tables from shared client-tagged tables
+        
+        Args:
+            tables: Shared table ids by table family and grain
+                (SharedTables.build); empty to scan the source tables again
+        """
+        self.shared_tables = dict(tables or {})
+    
+    def _partition_query(self, shared_table: str) -> str:
+        """SELECT of this client's rows of a shared table (without the client column)"""
+        return f"""
+        SELECT * EXCEPT(client)
+        FROM `{shared_table}`
+        WHERE client = '{self.config['health_system']['short_name']}'
+        """
+    
+    def _partition_is_current(self, temp_dataset: str, table_name: str, shared_table: str) -> bool:
+        """Whether a client table was cut from the current version of its shared table"""
+        try:
+            table = self.bq.client.get_table(f"{self.config['bigquery']['project_id']}.{temp_dataset}.{table_name}")
+            shared = self.bq.client.get_table(shared_table)
+        except Exception:
+            return False
+        return bool(table.modified and shared.modified and table.modified >= shared.modified)
     
     def _calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA256 hash of a file"""
@@ -189,21 +251,30 @@ class DataLoader:
         
         return df
     
-    def _get_npi_hash_for_tables(self) -> str:
-        """Get the NPI hash that was used to create current BigQuery tables"""
+    def _get_npi_hash_for_tables(self, table_family: Optional[str] = None) -> str:
+        """
+        Get the NPI hash that was used to create current BigQuery tables
+        
+        Args:
+            table_family: 'open_payments' or 'prescriptions'; each family records
+                its own hash so refreshing one doesn't mask changes to the other
+        """
         metadata = self._load_cache_metadata()
         if 'bigquery_tables' in metadata:
-            return metadata['bigquery_tables'].get('npi_hash', '')
+            tables = metadata['bigquery_tables']
+            if table_family and f'{table_family}_npi_hash' in tables:
+                return tables[f'{table_family}_npi_hash']
+            return tables.get('npi_hash', '')
         return ''
     
-    def _npis_changed_since_table_creation(self) -> bool:
+    def _npis_changed_since_table_creation(self, table_family: Optional[str] = None) -> bool:
         """Check if NPIs have changed since BigQuery tables were created"""
         npi_file = Path(self.config['health_system']['npi_file'])
         if not npi_file.exists():
             return False
         
         current_hash = self._calculate_file_hash(npi_file)
-        stored_hash = self._get_npi_hash_for_tables()
+        stored_hash = self._get_npi_hash_for_tables(table_family)
         
         if stored_hash and current_hash != stored_hash:
             logger.warning(f"NPI file has changed since tables were created!")
@@ -253,6 +324,7 @@ class DataLoader:
             job_config=job_config
         )
         job.result()  # Wait for job to complete
+        self.bq.record_job(job, 'provider_npis_upload', 'load')
         
         logger.info(f"Successfully uploaded NPIs to {table_id}")
     
@@ -262,8 +334,11 @@ class DataLoader:
         end_year: Optional[int] = None,
         force_reload: bool = False,
         summary_only: bool = False,
-        create_only: bool = False
-    ) -> Optional[pd.DataFrame]:
+        create_only: bool = False,
+        stream: Optional[bool] = None,
+        columns: Optional[List[str]] = None,
+        row_filter: Optional[str] = None
+    ) -> Union[pd.DataFrame, StreamedDataset, None]:
         """
         Load Open Payments data for specified providers and years
         Uses BigQuery temp dataset to avoid memory issues
@@ -273,9 +348,17 @@ class DataLoader:
             end_year: End year for data (default from config)
             force_reload: Force reload from BigQuery
             summary_only: Return aggregated summary instead of detailed data
+            create_only: Only create tables in BigQuery, don't download data
+            stream: Stream the table through the Storage Read API into
+                partitioned Parquet (by payment_year) and return a lazy handle;
+                by default detailed loads stream and summary loads are queried
+            columns: Columns to download when streaming (default: all)
+            row_filter: SQL filter pushed down to the read session when streaming,
+                e.g. "payment_year >= 2022"
             
         Returns:
-            DataFrame with Open Payments data (summary or detailed)
+            DataFrame with Open Payments data (summary, or detailed with stream=False),
+            StreamedDataset if streamed, or None if create_only
         """
         start_year = start_year or self.config['analysis']['start_year']
         end_year = end_year or self.config['analysis']['end_year']
@@ -289,32 +372,55 @@ class DataLoader:
         detailed_table_path = f"`{self.config['bigquery']['project_id']}.{temp_dataset}.{detailed_table}`"
         summary_table_path = f"`{self.config['bigquery']['project_id']}.{temp_dataset}.{summary_table}`"
         
-        # Check if NPIs have changed
-        npis_changed = self._npis_changed_since_table_creation()
-        if npis_changed:
-            logger.warning("NPIs have changed - forcing table recreation")
-            force_reload = True
+        # Check if NPIs have changed; small roster changes are applied to the existing tables
+        npis_changed = self._npis_changed_since_table_creation('open_payments')
+        tables_exist = self._table_exists(temp_dataset, detailed_table)
         
-        # Check if tables exist and create if needed or force_reload
-        if force_reload or not self._table_exists(temp_dataset, detailed_table):
-            logger.info(f"Creating Open Payments tables in BigQuery temp dataset")
-            self._create_open_payments_tables(start_year, end_year, detailed_table_path, summary_table_path)
-        else:
-            logger.info(f"Using existing Open Payments tables in BigQuery")
-            # Track that we're using existing tables
-            if self.lineage_tracker:
-                self.lineage_tracker.add_intermediate_table('open_payments_existing', {
-                    'detailed_table': detailed_table_path.replace('`', ''),
-                    'summary_table': summary_table_path.replace('`', ''),
-                    'status': 'reused_existing',
-                    'npi_hash': self._get_npi_hash_for_tables()
-                })
+        # Tables cut from a shared table are stale once the shared table is rebuilt
+        shared = self.shared_tables.get('open_payments')
+        if shared:
+            npis_changed = not self._partition_is_current(temp_dataset, detailed_table, shared['detailed'])
+        
+        try:
+            if (npis_changed and tables_exist and not force_reload and not shared and
+                    self._refresh_tables_for_npi_delta('open_payments', start_year, end_year,
+                                                       temp_dataset, detailed_table, summary_table)):
+                logger.info(f"Refreshed existing Open Payments tables for NPI changes")
+            elif force_reload or npis_changed or not tables_exist:
+                if npis_changed and not shared:
+                    logger.warning("NPIs have changed - forcing table recreation")
+                logger.info(f"Creating Open Payments tables in BigQuery temp dataset")
+                self._create_open_payments_tables(start_year, end_year, detailed_table_path, summary_table_path)
+            else:
+                logger.info(f"Using existing Open Payments tables in BigQuery")
+                # Track that we're using existing tables
+                if self.lineage_tracker:
+                    self.lineage_tracker.add_intermediate_table('open_payments_existing', {
+                        'detailed_table': detailed_table_path.replace('`', ''),
+                        'summary_table': summary_table_path.replace('`', ''),
+                        'status': 'reused_existing',
+                        'npi_hash': self._get_npi_hash_for_tables('open_payments')
+                    })
+        except QueryBudgetExceeded as e:
+            if not self._reuse_tables_over_budget(e, temp_dataset, [detailed_table, summary_table],
+                                                  'open_payments_existing'):
+                raise
         
         # If create_only, we're done - don't download any data
         if create_only:
             logger.info("Tables created in BigQuery temp dataset, skipping data download")
             return None
         
+        # Detailed downloads stream to partitioned Parquet instead of one to_dataframe()
+        if stream is None:
+            stream = not summary_only
+        if stream:
+            return self._stream_temp_table(
+                summary_table if summary_only else detailed_table, temp_dataset,
+                partition_by=['payment_year'], columns=columns, row_filter=row_filter,
+                force_reload=force_reload
+            )
+        
         # Query from BigQuery table instead of loading all data
         if summary_only:
             logger.info(f"Querying summary table: {summary_table}")
@@ -323,10 +429,86 @@ class DataLoader:
             logger.info(f"Querying detailed table: {detailed_table}")
             query = f"SELECT * FROM {detailed_table_path}"
         
-        df = self.bq.query(query)
+        # Over budget, detailed reads are routed to the summary table (without Product_Name)
+        if self.bq.cost_guard:
+            self.bq.cost_guard.register_fallback(detailed_table_path, summary_table_path)
+        df = self.bq.query(query, query_name=f"open_payments_{'summary' if summary_only else 'detailed'}_load")
         logger.info(f"Loaded {len(df):,} Open Payments records from BigQuery")
         return df
     
+    def _stream_temp_table(
+        self,
+        table_name: str,
+        temp_dataset: str,
+        partition_by: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None,
+        row_filter: Optional[str] = None,
+        force_reload: bool = False
+    ) -> StreamedDataset:
+        """
+        Stream a temp table to data/processed/<table_name>/ as partitioned Parquet
+        
+        Returns:
+            StreamedDataset (lazy handle; reused while the table is unchanged)
+        """
+        table_id = f"{self.config['bigquery']['project_id']}.{temp_dataset}.{table_name}"
+        options = dict(self.config['bigquery'].get('streaming') or {})
+        
+        logger.info(f"Streaming {table_name} to {self.processed_dir / table_name}")
+        dataset = self.bq.stream_table(
+            table_id,
+            self.processed_dir / table_name,
+            columns=columns,
+            row_filter=row_filter,
+            partition_by=partition_by,
+            use_cache=not force_reload,
+            **options
+        )
+        logger.info(f"{len(dataset):,} records available in {dataset.path}")
+        
+        if self.lineage_tracker:
+            self.lineage_tracker.add_intermediate_table(f'{table_name}_stream', {
+                'source_table': table_id,
+                'path': str(dataset.path),
+                'status': 'streamed' if self.bq.last_query_stats.get('source') != 'cache' else 'reused_download',
+                'row_count': len(dataset),
+                'columns': columns or dataset.columns,
+                'row_filter': row_filter,
+                'partition_by': dataset.partition_by
+            })
+        return dataset
+    
+    def _reuse_tables_over_budget(
+        self,
+        error: QueryBudgetExceeded,
+        temp_dataset: str,
+        table_names: List[str],
+        lineage_name: str
+    ) -> bool:
+        """
+        Fall back to existing temp tables when recreating them is over budget
+        
+        Returns:
+            True if on_exceed is "fallback" and all tables exist (they are reused),
+            False if the caller should re-raise
+        """
+        guard = self.bq.cost_guard
+        if not guard or guard.on_exceed != 'fallback':
+            return False
+        if not all(self._table_exists(temp_dataset, name) for name in table_names):
+            return False
+        
+        logger.warning(f"{error} - reusing existing tables: {', '.join(table_names)}")
+        if self.lineage_tracker:
+            self.lineage_tracker.add_intermediate_table(lineage_name, {
+                'tables': [f"{self.config['bigquery']['project_id']}.{temp_dataset}.{name}" for name in table_names],
+                'status': 'reused_over_budget',
+                'blocked_query': error.query_name,
+                'bytes_processed_estimate': error.bytes_estimate,
+                'npi_hash': self._get_npi_hash_for_tables(lineage_name.replace('_existing', ''))
+            })
+        return True
+    
     def _table_exists(self, dataset: str, table_name: str) -> bool:
         """Check if a table exists in BigQuery"""
         try:
@@ -336,22 +518,184 @@ class DataLoader:
         except:
             return False
     
-    def _create_open_payments_tables(
+    @staticmethod
+    def _npi_array(npis, sql_type: str) -> str:
+        """BigQuery array literal of NPIs ('STRING' or 'INT64'); non-numeric values are skipped"""
+        values = sorted(int(npi) for npi in npis if str(npi).strip().isdigit())
+        if sql_type == 'INT64':
+            items = ", ".join(str(value) for value in values)
+        else:
+            items = ", ".join(f"'{value}'" for value in values)
+        return f"ARRAY<{sql_type}>[{items}]"
+    
+    @staticmethod
+    def _npi_list(npis) -> str:
+        """Parenthesized INT64 list of NPIs for IN (non-numeric values are skipped)"""
+        values = sorted(int(npi) for npi in npis if str(npi).strip().isdigit())
+        return "(" + ", ".join(str(value) for value in values) + ")"
+    
+    def _save_npi_snapshot(self, table_family: str, detailed_table_path: str):
+        """Record the NPI roster a detailed/summary table pair was built from"""
+        temp_dataset = self.config['bigquery'].get('temp_dataset', 'temp')
+        npi_table = f"{self.config['health_system']['short_name']}_provider_npis"
+        snapshot_path = f"{detailed_table_path.rstrip('`')}_npis`"
+        
+        query = f"""
+        CREATE OR REPLACE TABLE {snapshot_path} AS
+        SELECT DISTINCT NPI
+        FROM `{self.config['bigquery']['project_id']}.{temp_dataset}.{npi_table}`
+        """
+        self.bq.execute(query, f'{table_family}_npi_snapshot')
+    
+    def _refresh_tables_for_npi_delta(
         self,
+        table_family: str,
         start_year: int,
         end_year: int,
-        detailed_table_path: str,
-        summary_table_path: str
-    ):
-        """Create Open Payments tables in BigQuery temp dataset"""
-        # Load provider NPIs (this will create BigQuery table if needed)
+        temp_dataset: str,
+        detailed_table: str,
+        summary_table: str
+    ) -> bool:
+        """
+        Apply an NPI roster change to existing tables instead of rebuilding them
+        
+        The uploaded roster is diffed against the snapshot the tables were built
+        from. Each table is then MERGEd: rows of added and removed NPIs are
+        deleted, and rows of added NPIs are inserted from the source tables.
+        Because every changed NPI is deleted before insertion, re-running an
+        interrupted refresh is safe; the snapshot and stored hash are only
+        updated after both tables are merged.
+        
+        Args:
+            table_family: 'open_payments' or 'prescriptions'
+            start_year: Start year for data
+            end_year: End year for data
+            temp_dataset: BigQuery temp dataset
+            detailed_table: Detailed table name
+            summary_table: Summary table name
+        
+        Returns:
+            True if the tables were refreshed, False if a full rebuild is needed
+            (refresh disabled, no snapshot, or too many NPIs changed)
+        """
+        settings = self.config['bigquery'].get('incremental_refresh', {})
+        if not settings.get('enabled', True):
+            return False
+        
+        snapshot_table = f"{detailed_table}_npis"
+        if not all(self._table_exists(temp_dataset, name) for name in (summary_table, snapshot_table)):
+            logger.info(f"No NPI snapshot for {detailed_table} - full rebuild required")
+            return False
+        
+        project = self.config['bigquery']['project_id']
+        detailed_table_path = f"`{project}.{temp_dataset}.{detailed_table}`"
+        summary_table_path = f"`{project}.{temp_dataset}.{summary_table}`"
+        snapshot_path = f"`{project}.{temp_dataset}.{snapshot_table}`"
+        
+        # Diff the uploaded roster against the one the tables were built from
         providers = self.load_provider_npis()
+        current_npis = set(providers['NPI'].astype(str))
+        snapshot_job = self.bq.run_job(f"SELECT NPI FROM {snapshot_path}", f'{table_family}_npi_snapshot_read')
+        previous_npis = set(snapshot_job.to_dataframe()['NPI'].astype(str))
+        added = current_npis - previous_npis
+        removed = previous_npis - current_npis
+        changed = added | removed
+        
+        max_fraction = settings.get('max_changed_fraction', 0.25)
+        changed_fraction = len(changed) / max(len(previous_npis), 1)
+        if changed_fraction > max_fraction:
+            logger.info(f"{len(changed):,} NPIs changed ({changed_fraction:.1%} of roster, "
+                       f"limit {max_fraction:.0%}) - full rebuild required")
+            return False
         
-        # Use the NPI table for efficient querying
-        temp_dataset = self.config['bigquery'].get('temp_dataset', 'temp')
-        npi_table = f"{self.config['health_system']['short_name']}_provider_npis"
+        logger.info(f"Refreshing {table_family} tables for NPI changes: "
+                   f"{len(added):,} added, {len(removed):,} removed")
         
-        query = f"""
+        if table_family == 'open_payments':
+            key = 'physician_id'
+            detailed_query = self._open_payments_detailed_query
+            summary_query = self._open_payments_summary_query
+        else:
+            key = 'NPI'
+            detailed_query = self._prescriptions_detailed_query
+            summary_query = self._prescriptions_summary_query
+        
+        # Source rows for added NPIs only; the summary is re-aggregated from the merged detailed table
+        added_source = f"(SELECT NPI FROM UNNEST({self._npi_array(added, 'STRING')}) AS NPI)"
+        sources = [
+            (f'{table_family}_detailed_refresh', detailed_table_path,
+             detailed_query(start_year, end_year, added_source)),
+            (f'{table_family}_summary_refresh', summary_table_path,
+             summary_query(detailed_table_path, f"WHERE {key} IN UNNEST({self._npi_array(added, 'INT64')})"))
+        ]
+        # A plain IN list: DuckDB can't evaluate subqueries (IN UNNEST) in MERGE conditions
+        changed_keys = self._npi_list(changed)
+        statements = [
+            (name, f"""
+        MERGE {table_path} T
+        USING ({source}) S
+        ON FALSE
+        WHEN NOT MATCHED BY TARGET THEN
+            INSERT ROW
+        WHEN NOT MATCHED BY SOURCE AND T.{key} IN {changed_keys} THEN
+            DELETE
+        """)
+            for name, table_path, source in sources
+        ]
+        
+        rows_affected = {}
+        if changed:
+            # Dry-run both merges before changing either table
+            for name, statement in statements:
+                self.bq.preflight(statement, name)
+            for name, statement in statements:
+                job = self.bq.execute(statement, name, preflight=False)
+                rows_affected[name] = getattr(job, 'num_dml_affected_rows', None)
+                logger.info(f"[{name}] {rows_affected[name]} rows affected")
+        
+        self._save_npi_snapshot(table_family, detailed_table_path)
+        
+        # Update cache metadata so the refreshed tables match the current NPI file
+        npi_file = Path(self.config['health_system']['npi_file'])
+        current_npi_hash = self._calculate_file_hash(npi_file) if npi_file.exists() else 'unknown'
+        previous_npi_hash = self._get_npi_hash_for_tables(table_family)
+        
+        metadata = self._load_cache_metadata()
+        if 'bigquery_tables' not in metadata:
+            metadata['bigquery_tables'] = {}
+        metadata['bigquery_tables'].update({
+            'npi_hash': current_npi_hash,
+            f'{table_family}_npi_hash': current_npi_hash,
+            f'{table_family}_refreshed_at': datetime.now().isoformat()
+        })
+        self._save_cache_metadata(metadata)
+        
+        if self.lineage_tracker:
+            self.lineage_tracker.add_intermediate_table(f'{table_family}_npi_refresh', {
+                'detailed_table': detailed_table_path.replace('`', ''),
+                'summary_table': summary_table_path.replace('`', ''),
+                'status': 'incremental_refresh',
+                'npis_added': len(added),
+                'npis_removed': len(removed),
+                'rows_affected': rows_affected,
+                'previous_npi_hash': previous_npi_hash,
+                'npi_hash': current_npi_hash,
+                'refreshed_at': datetime.now().isoformat()
+            })
+        return True
+    
+    def _open_payments_detailed_query(self, start_year: int, end_year: int, npi_source: str) -> str:
+        """
+        SELECT producing detailed Open Payments rows for a set of NPIs
+        
+        Args:
+            start_year: Start year for data
+            end_year: End year for data
+            npi_source: Table or subquery with a STRING NPI column
+        """
+        project = self.config['bigquery']['project_id']
+        dataset = self.config['bigquery']['dataset']
+        return f"""
         WITH provider_payments AS (
             SELECT 
                 covered_recipient_npi as physician_id,
@@ -366,11 +710,11 @@ class DataLoader:
                 name_of_drug_or_biological_or_device_or_medical_supply_1 as Product_Name,
                 program_year as payment_year
             FROM 
-                `{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.{self.config['bigquery']['tables']['open_payments']}` op
+                `{project}.{dataset}.{self.config['bigquery']['tables']['open_payments']}` op
             WHERE 
                 EXISTS (
                     SELECT 1 
-                    FROM `{self.config['bigquery']['project_id']}.{temp_dataset}.{npi_table}` npi
+                    FROM {npi_source} npi
                     WHERE op.covered_recipient_npi = CAST(npi.NPI AS INT64)
                 )
                 AND program_year BETWEEN {start_year} AND {end_year}
@@ -394,14 +738,62 @@ class DataLoader:
         FROM provider_payments
         GROUP BY 1,2,3,4,5,6,7,8,9
         """
+    
+    @staticmethod
+    def _group_by(keys: int, by_client: bool = False) -> str:
+        """Positional GROUP BY over the leading key columns (plus a leading client column)"""
+        return ",".join(str(i) for i in range(1, keys + 1 + by_client))
+    
+    def _open_payments_summary_query(self, detailed_table_path: str, where: str = "", by_client: bool = False) -> str:
+        """
+        SELECT aggregating detailed Open Payments rows to the summary grain (no Product_Name)
         
-        # Drop existing table to ensure clean recreation with new schema
-        drop_query = f"DROP TABLE IF EXISTS {detailed_table_path}"
-        try:
-            self.bq.client.query(drop_query).result()
-            logger.info(f"Dropped existing detailed table")
-        except:
-            pass  # Table might not exist
+        Args:
+            detailed_table_path: Detailed table to aggregate
+            where: Optional WHERE clause
+            by_client: Keep the client column of a shared detailed table
+        """
+        client = "client, " if by_client else ""
+        return f"""
+        SELECT 
+            {client}physician_id, first_name, last_name,
+            provider_type, specialty, manufacturer,
+            payment_year, payment_category,
+            SUM(payment_count) as payment_count,
+            SUM(total_amount) as total_amount,
+            AVG(avg_amount) as avg_amount,
+            MIN(min_amount) as min_amount,
+            MAX(max_amount) as max_amount
+        FROM {detailed_table_path}
+        {where}
+        GROUP BY {self._group_by(8, by_client)}
+        """
+    
+    def _create_open_payments_tables(
+        self,
+        start_year: int,
+        end_year: int,
+        detailed_table_path: str,
+        summary_table_path: str
+    ):
+        """Create Open Payments tables in BigQuery temp dataset"""
+        # Load provider NPIs (this will create BigQuery table if needed)
+        providers = self.load_provider_npis()
+        
+        # Use the NPI table for efficient querying
+        temp_dataset = self.config['bigquery'].get('temp_dataset', 'temp')
+        npi_table = f"{self.config['health_system']['short_name']}_provider_npis"
+        
+        # In batch mode the client's rows are cut from the shared table instead of scanning the source
+        shared = self.shared_tables.get('open_payments')
+        source_table = f"{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.{self.config['bigquery']['tables']['open_payments']}"
+        if shared:
+            query = self._partition_query(shared['detailed'])
+            source_table = shared['detailed']
+        else:
+            query = self._open_payments_detailed_query(
+                start_year, end_year, f"`{self.config['bigquery']['project_id']}.{temp_dataset}.{npi_table}`"
+            )
         
         # Create detailed table query with full aggregation
         create_detailed_query = f"""
@@ -409,13 +801,23 @@ class DataLoader:
         {query}
         """
         
+        # Dry-run before dropping anything so an over-budget scan leaves existing tables intact
+        self.bq.preflight(create_detailed_query, 'open_payments_detailed_create')
+        
+        # Drop existing table to ensure clean recreation with new schema
+        drop_query = f"DROP TABLE IF EXISTS {detailed_table_path}"
+        try:
+            self.bq.run_job(drop_query, 'open_payments_detailed_drop')
+            logger.info(f"Dropped existing detailed table")
+        except:
+            pass  # Table might not exist
+        
         logger.info(f"Creating detailed Open Payments table for {len(providers):,} providers")
-        job = self.bq.client.query(create_detailed_query)
-        job.result()  # Wait for completion
+        self.bq.execute(create_detailed_query, 'open_payments_detailed_create', preflight=False)
         
         # Get row count
         count_query = f"SELECT COUNT(*) as count FROM {detailed_table_path}"
-        result = self.bq.client.query(count_query).result()
+        result = self.bq.run_job(count_query, 'open_payments_detailed_count').result()
         row_count = list(result)[0].count
         logger.info(f"Created detailed table with {row_count:,} rows")
         
@@ -429,6 +831,7 @@ class DataLoader:
             metadata['bigquery_tables'] = {}
         metadata['bigquery_tables'].update({
             'npi_hash': current_npi_hash,
+            'open_payments_npi_hash': current_npi_hash,
             'tables_created_at': datetime.now().isoformat(),
             'open_payments_detailed': detailed_table_path.replace('`', ''),
             'open_payments_summary': summary_table_path.replace('`', '')
@@ -440,7 +843,7 @@ class DataLoader:
             self.lineage_tracker.add_intermediate_table('open_payments_detailed', {
                 'table': detailed_table_path.replace('`', ''),
                 'rows': row_count,
-                'derived_from': f"{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.{self.config['bigquery']['tables']['open_payments']}",
+                'derived_from': source_table,
                 'date_range': f"{start_year}-{end_year}",
                 'npi_hash': current_npi_hash,
                 'created_at': datetime.now().isoformat()
@@ -451,39 +854,36 @@ class DataLoader:
                 'date_range': f"{start_year}-{end_year}"
             })
         
+        # Create summary table from detailed
+        create_summary_query = f"""
+        CREATE OR REPLACE TABLE {summary_table_path} AS
+        {self._partition_query(shared['summary']) if shared else self._open_payments_summary_query(detailed_table_path)}
+        """
+        
+        self.bq.preflight(create_summary_query, 'open_payments_summary_create')
+        
         # Drop existing summary table to ensure clean recreation
         drop_summary_query = f"DROP TABLE IF EXISTS {summary_table_path}"
         try:
-            self.bq.client.query(drop_summary_query).result()
+            self.bq.run_job(drop_summary_query, 'open_payments_summary_drop')
             logger.info(f"Dropped existing summary table")
         except:
             pass  # Table might not exist
         
-        # Create summary table from detailed
-        create_summary_query = f"""
-        CREATE OR REPLACE TABLE {summary_table_path} AS
-        SELECT 
-            physician_id, first_name, last_name,
-            provider_type, specialty, manufacturer,
-            payment_year, payment_category,
-            SUM(payment_count) as payment_count,
-            SUM(total_amount) as total_amount,
-            AVG(avg_amount) as avg_amount,
-            MIN(min_amount) as min_amount,
-            MAX(max_amount) as max_amount
-        FROM {detailed_table_path}
-        GROUP BY 1,2,3,4,5,6,7,8
-        """
-        
         logger.info("Creating summary Open Payments table")
-        job = self.bq.client.query(create_summary_query)
-        job.result()  # Wait for completion
+        self.bq.execute(create_summary_query, 'open_payments_summary_create', preflight=False)
         
         # Get summary row count
         count_query = f"SELECT COUNT(*) as count FROM {summary_table_path}"
-        result = self.bq.client.query(count_query).result()
+        result = self.bq.run_job(count_query, 'open_payments_summary_count').result()
         summary_count = list(result)[0].count
         logger.info(f"Created summary table with {summary_count:,} rows")
+        
+        # Roster the tables were built from, for incremental refreshes
+        self._save_npi_snapshot('open_payments', detailed_table_path)
+        
+        # Recreated tables have a new last_modified; don't reuse memoized versions
+        self.bq.invalidate_table_versions()
     
     def _create_open_payments_summary(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -529,19 +929,12 @@ class DataLoader:
         start_year = start_year or self.config['analysis']['start_year']
         end_year = end_year or self.config['analysis']['end_year']
         
-        detailed_cache = self.processed_dir / f"open_payments_detailed_{start_year}_{end_year}.parquet"
-        
-        if not detailed_cache.exists():
-            logger.info(f"Detailed cache not found, loading full data first")
-            self.load_open_payments(start_year, end_year, summary_only=False)
+        # Streamed once to partitioned Parquet, then reused while the table is unchanged
+        detailed = self.load_open_payments(start_year, end_year, summary_only=False, stream=True)
         
         logger.info(f"Loading Open Payments for drug: {drug_name}")
         # Use pyarrow filters for efficient loading
-        import pyarrow.parquet as pq
-        df = pd.read_parquet(
-            detailed_cache,
-            filters=[('Product_Name', '==', drug_name)]
-        )
+        df = detailed.to_pandas(filter=[('Product_Name', '==', drug_name)])
         
         logger.info(f"Loaded {len(df):,} records for {drug_name}")
         return df
@@ -552,8 +945,11 @@ class DataLoader:
         end_year: Optional[int] = None,
         force_reload: bool = False,
         summary_only: bool = False,
-        create_only: bool = False
-    ) -> Optional[pd.DataFrame]:
+        create_only: bool = False,
+        stream: Optional[bool] = None,
+        columns: Optional[List[str]] = None,
+        row_filter: Optional[str] = None
+    ) -> Union[pd.DataFrame, StreamedDataset, None]:
         """
         Load Medicare Part D prescription data
         Uses BigQuery temp dataset to avoid memory issues
@@ -564,9 +960,15 @@ class DataLoader:
             force_reload: Force reload from BigQuery
             summary_only: Return aggregated summary instead of detailed data
             create_only: Only create tables in BigQuery, don't download data
+            stream: Stream the table through the Storage Read API into
+                partitioned Parquet (by rx_year) and return a lazy handle;
+                by default detailed loads stream and summary loads are queried
+            columns: Columns to download when streaming (default: all)
+            row_filter: SQL filter pushed down to the read session when streaming
             
         Returns:
-            DataFrame with prescription data (summary or detailed), or None if create_only
+            DataFrame with prescription data (summary, or detailed with stream=False),
+            StreamedDataset if streamed, or None if create_only
         """
         start_year = start_year or self.config['analysis']['start_year']
         end_year = end_year or self.config['analysis']['end_year']
@@ -580,32 +982,55 @@ class DataLoader:
         detailed_table_path = f"`{self.config['bigquery']['project_id']}.{temp_dataset}.{detailed_table}`"
         summary_table_path = f"`{self.config['bigquery']['project_id']}.{temp_dataset}.{summary_table}`"
         
-        # Check if NPIs have changed
-        npis_changed = self._npis_changed_since_table_creation()
-        if npis_changed:
-            logger.warning("NPIs have changed - forcing prescription table recreation")
-            force_reload = True
+        # Check if NPIs have changed; small roster changes are applied to the existing tables
+        npis_changed = self._npis_changed_since_table_creation('prescriptions')
+        tables_exist = self._table_exists(temp_dataset, detailed_table)
         
-        # Check if tables exist and create if needed or force_reload
-        if force_reload or not self._table_exists(temp_dataset, detailed_table):
-            logger.info(f"Creating Prescriptions tables in BigQuery temp dataset")
-            self._create_prescriptions_tables(start_year, end_year, detailed_table_path, summary_table_path)
-        else:
-            logger.info(f"Using existing Prescriptions tables in BigQuery")
-            # Track that we're using existing tables
-            if self.lineage_tracker:
-                self.lineage_tracker.add_intermediate_table('prescriptions_existing', {
-                    'detailed_table': detailed_table_path.replace('`', ''),
-                    'summary_table': summary_table_path.replace('`', ''),
-                    'status': 'reused_existing',
-                    'npi_hash': self._get_npi_hash_for_tables()
-                })
+        # Tables cut from a shared table are stale once the shared table is rebuilt
+        shared = self.shared_tables.get('prescriptions')
+        if shared:
+            npis_changed = not self._partition_is_current(temp_dataset, detailed_table, shared['detailed'])
+        
+        try:
+            if (npis_changed and tables_exist and not force_reload and not shared and
+                    self._refresh_tables_for_npi_delta('prescriptions', start_year, end_year,
+                                                       temp_dataset, detailed_table, summary_table)):
+                logger.info(f"Refreshed existing Prescriptions tables for NPI changes")
+            elif force_reload or npis_changed or not tables_exist:
+                if npis_changed and not shared:
+                    logger.warning("NPIs have changed - forcing prescription table recreation")
+                logger.info(f"Creating Prescriptions tables in BigQuery temp dataset")
+                self._create_prescriptions_tables(start_year, end_year, detailed_table_path, summary_table_path)
+            else:
+                logger.info(f"Using existing Prescriptions tables in BigQuery")
+                # Track that we're using existing tables
+                if self.lineage_tracker:
+                    self.lineage_tracker.add_intermediate_table('prescriptions_existing', {
+                        'detailed_table': detailed_table_path.replace('`', ''),
+                        'summary_table': summary_table_path.replace('`', ''),
+                        'status': 'reused_existing',
+                        'npi_hash': self._get_npi_hash_for_tables('prescriptions')
+                    })
+        except QueryBudgetExceeded as e:
+            if not self._reuse_tables_over_budget(e, temp_dataset, [detailed_table, summary_table],
+                                                  'prescriptions_existing'):
+                raise
         
         # If create_only, we're done - don't download any data
         if create_only:
             logger.info("Tables created in BigQuery temp dataset, skipping data download")
             return None
         
+        # Detailed downloads stream to partitioned Parquet instead of one to_dataframe()
+        if stream is None:
+            stream = not summary_only
+        if stream:
+            return self._stream_temp_table(
+                summary_table if summary_only else detailed_table, temp_dataset,
+                partition_by=['rx_year'], columns=columns, row_filter=row_filter,
+                force_reload=force_reload
+            )
+        
         # Query from BigQuery table instead of loading all data
         if summary_only:
             logger.info(f"Querying summary table: {summary_table}")
@@ -614,26 +1039,25 @@ class DataLoader:
             logger.info(f"Querying detailed table: {detailed_table}")
             query = f"SELECT * FROM {detailed_table_path}"
         
-        df = self.bq.query(query)
+        # Over budget, detailed reads are routed to the summary table (without Product_Name)
+        if self.bq.cost_guard:
+            self.bq.cost_guard.register_fallback(detailed_table_path, summary_table_path)
+        df = self.bq.query(query, query_name=f"prescriptions_{'summary' if summary_only else 'detailed'}_load")
         logger.info(f"Loaded {len(df):,} prescription records from BigQuery")
         return df
     
-    def _create_prescriptions_tables(
-        self,
-        start_year: int,
-        end_year: int,
-        detailed_table_path: str,
-        summary_table_path: str
-    ):
-        """Create Prescriptions tables in BigQuery temp dataset"""
-        # Load provider NPIs (this will create BigQuery table if needed)
-        providers = self.load_provider_npis()
-        
-        # Use the NPI table for efficient querying
-        temp_dataset = self.config['bigquery'].get('temp_dataset', 'temp')
-        npi_table = f"{self.config['health_system']['short_name']}_provider_npis"
+    def _prescriptions_detailed_query(self, start_year: int, end_year: int, npi_source: str) -> str:
+        """
+        SELECT producing detailed prescription rows for a set of NPIs
         
-        query = f"""
+        Args:
+            start_year: Start year for data
+            end_year: End year for data
+            npi_source: Table or subquery with a STRING NPI column
+        """
+        project = self.config['bigquery']['project_id']
+        dataset = self.config['bigquery']['dataset']
+        return f"""
         WITH provider_rx AS (
             SELECT
                 rx.NPI,
@@ -649,9 +1073,9 @@ class DataLoader:
                 SUM(rx.UNIQUE_PATIENTS) as unique_patients,
                 AVG(rx.PAYMENTS / NULLIF(rx.PRESCRIPTIONS, 0)) as avg_cost_per_rx
             FROM 
-                `{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.{self.config['bigquery']['tables']['prescriptions']}` rx
+                `{project}.{dataset}.{self.config['bigquery']['tables']['prescriptions']}` rx
             INNER JOIN 
-                `{self.config['bigquery']['project_id']}.{temp_dataset}.{npi_table}` npi
+                {npi_source} npi
                 ON rx.NPI = CAST(npi.NPI AS INT64)
             WHERE 
                 rx.CLAIM_YEAR BETWEEN {start_year} AND {end_year}
@@ -672,9 +1096,9 @@ class DataLoader:
                     WHEN po.ROLE_NAME = 'Dentist' THEN 'Dentist'
                     ELSE 'Other Healthcare Professional'
                 END AS provider_type_category
-            FROM `{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.PHYSICIANS_OVERVIEW_optimized` po
+            FROM `{project}.{dataset}.PHYSICIANS_OVERVIEW_optimized` po
             INNER JOIN 
-                `{self.config['bigquery']['project_id']}.{temp_dataset}.{npi_table}` npi
+                {npi_source} npi
                 ON po.NPI = CAST(npi.NPI AS INT64)
         )
         SELECT 
@@ -696,14 +1120,56 @@ class DataLoader:
         LEFT JOIN provider_info p ON r.NPI = p.NPI
         GROUP BY 1,2,3,4,5,6,7,8,9
         """
+    
+    def _prescriptions_summary_query(self, detailed_table_path: str, where: str = "", by_client: bool = False) -> str:
+        """
+        SELECT aggregating detailed prescription rows to the summary grain
         
-        # Drop existing table to ensure clean recreation with new schema
-        drop_query = f"DROP TABLE IF EXISTS {detailed_table_path}"
-        try:
-            self.bq.client.query(drop_query).result()
-            logger.info(f"Dropped existing detailed prescriptions table")
-        except:
-            pass  # Table might not exist
+        Args:
+            detailed_table_path: Detailed table to aggregate
+            where: Optional WHERE clause
+            by_client: Keep the client column of a shared detailed table
+        """
+        client = "client, " if by_client else ""
+        return f"""
+        SELECT 
+            {client}NPI, PROVIDER_NAME, specialty, provider_type,
+            BRAND_NAME, GENERIC_NAME, rx_year,
+            SUM(total_claims) as total_claims,
+            SUM(total_days_supply) as total_days_supply,
+            SUM(total_cost) as total_cost,
+            SUM(total_beneficiaries) as total_beneficiaries,
+            AVG(avg_cost_per_claim) as avg_cost_per_claim
+        FROM {detailed_table_path}
+        {where}
+        GROUP BY {self._group_by(7, by_client)}
+        """
+    
+    def _create_prescriptions_tables(
+        self,
+        start_year: int,
+        end_year: int,
+        detailed_table_path: str,
+        summary_table_path: str
+    ):
+        """Create Prescriptions tables in BigQuery temp dataset"""
+        # Load provider NPIs (this will create BigQuery table if needed)
+        providers = self.load_provider_npis()
+        
+        # Use the NPI table for efficient querying
+        temp_dataset = self.config['bigquery'].get('temp_dataset', 'temp')
+        npi_table = f"{self.config['health_system']['short_name']}_provider_npis"
+        
+        # In batch mode the client's rows are cut from the shared table instead of scanning the source
+        shared = self.shared_tables.get('prescriptions')
+        source_table = f"{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.{self.config['bigquery']['tables']['prescriptions']}"
+        if shared:
+            query = self._partition_query(shared['detailed'])
+            source_table = shared['detailed']
+        else:
+            query = self._prescriptions_detailed_query(
+                start_year, end_year, f"`{self.config['bigquery']['project_id']}.{temp_dataset}.{npi_table}`"
+            )
         
         # Create detailed table with all prescription data
         create_detailed_query = f"""
@@ -711,13 +1177,23 @@ class DataLoader:
         {query}
         """
         
+        # Dry-run before dropping anything so an over-budget scan leaves existing tables intact
+        self.bq.preflight(create_detailed_query, 'prescriptions_detailed_create')
+        
+        # Drop existing table to ensure clean recreation with new schema
+        drop_query = f"DROP TABLE IF EXISTS {detailed_table_path}"
+        try:
+            self.bq.run_job(drop_query, 'prescriptions_detailed_drop')
+            logger.info(f"Dropped existing detailed prescriptions table")
+        except:
+            pass  # Table might not exist
+        
         logger.info(f"Creating detailed Prescriptions table for {len(providers):,} providers")
-        job = self.bq.client.query(create_detailed_query)
-        job.result()  # Wait for completion
+        self.bq.execute(create_detailed_query, 'prescriptions_detailed_create', preflight=False)
         
         # Get row count
         count_query = f"SELECT COUNT(*) as count FROM {detailed_table_path}"
-        result = self.bq.client.query(count_query).result()
+        result = self.bq.run_job(count_query, 'prescriptions_detailed_count').result()
         row_count = list(result)[0].count
         logger.info(f"Created detailed table with {row_count:,} rows")
         
@@ -731,6 +1207,7 @@ class DataLoader:
             metadata['bigquery_tables'] = {}
         metadata['bigquery_tables'].update({
             'npi_hash': current_npi_hash,
+            'prescriptions_npi_hash': current_npi_hash,
             'prescriptions_tables_created_at': datetime.now().isoformat(),
             'prescriptions_detailed': detailed_table_path.replace('`', ''),
             'prescriptions_summary': summary_table_path.replace('`', '')
@@ -742,7 +1219,7 @@ class DataLoader:
             self.lineage_tracker.add_intermediate_table('prescriptions_detailed', {
                 'table': detailed_table_path.replace('`', ''),
                 'rows': row_count,
-                'derived_from': f"{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}.{self.config['bigquery']['tables']['prescriptions']}",
+                'derived_from': source_table,
                 'date_range': f"{start_year}-{end_year}",
                 'npi_hash': current_npi_hash,
                 'created_at': datetime.now().isoformat()
@@ -753,38 +1230,36 @@ class DataLoader:
                 'date_range': f"{start_year}-{end_year}"
             })
         
+        # Create summary table from detailed
+        create_summary_query = f"""
+        CREATE OR REPLACE TABLE {summary_table_path} AS
+        {self._partition_query(shared['summary']) if shared else self._prescriptions_summary_query(detailed_table_path)}
+        """
+        
+        self.bq.preflight(create_summary_query, 'prescriptions_summary_create')
+        
         # Drop existing summary table to ensure clean recreation
         drop_summary_query = f"DROP TABLE IF EXISTS {summary_table_path}"
         try:
-            self.bq.client.query(drop_summary_query).result()
+            self.bq.run_job(drop_summary_query, 'prescriptions_summary_drop')
             logger.info(f"Dropped existing prescriptions summary table")
         except:
             pass  # Table might not exist
         
-        # Create summary table from detailed
-        create_summary_query = f"""
-        CREATE OR REPLACE TABLE {summary_table_path} AS
-        SELECT 
-            NPI, PROVIDER_NAME, specialty, provider_type,
-            BRAND_NAME, GENERIC_NAME, rx_year,
-            SUM(total_claims) as total_claims,
-            SUM(total_days_supply) as total_days_supply,
-            SUM(total_cost) as total_cost,
-            SUM(total_beneficiaries) as total_beneficiaries,
-            AVG(avg_cost_per_claim) as avg_cost_per_claim
-        FROM {detailed_table_path}
-        GROUP BY 1,2,3,4,5,6,7
-        """
-        
         logger.info("Creating summary Prescriptions table")
-        job = self.bq.client.query(create_summary_query)
-        job.result()  # Wait for completion
+        self.bq.execute(create_summary_query, 'prescriptions_summary_create', preflight=False)
         
         # Get summary row count
         count_query = f"SELECT COUNT(*) as count FROM {summary_table_path}"
-        result = self.bq.client.query(count_query).result()
+        result = self.bq.run_job(count_query, 'prescriptions_summary_count').result()
         summary_count = list(result)[0].count
         logger.info(f"Created summary table with {summary_count:,} rows")
+        
+        # Roster the tables were built from, for incremental refreshes
+        self._save_npi_snapshot('prescriptions', detailed_table_path)
+        
+        # Recreated tables have a new last_modified; don't reuse memoized versions
+        self.bq.invalidate_table_versions()
     
     def _create_prescriptions_summary(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -833,19 +1308,13 @@ class DataLoader:
         start_year = start_year or self.config['analysis']['start_year']
         end_year = end_year or self.config['analysis']['end_year']
         
-        detailed_cache = self.processed_dir / f"prescriptions_detailed_{start_year}_{end_year}.parquet"
-        
-        if not detailed_cache.exists():
-            logger.info(f"Detailed cache not found, loading full data first")
-            self.load_prescriptions(start_year, end_year, summary_only=False)
+        # Streamed once to partitioned Parquet, then reused while the table is unchanged
+        detailed = self.load_prescriptions(start_year, end_year, summary_only=False, stream=True)
         
         column = 'BRAND_NAME' if use_brand else 'GENERIC_NAME'
         logger.info(f"Loading prescriptions for {column}: {drug_name}")
         
-        df = pd.read_parquet(
-            detailed_cache,
-            filters=[(column, '==', drug_name)]
-        )
+        df = detailed.to_pandas(filter=[(column, '==', drug_name)])
         
         logger.info(f"Loaded {len(df):,} prescription records for {drug_name}")
         return df
@@ -914,7 +1383,7 @@ class DataLoader:
         """
         
         logger.info(f"Loading attribution data for {drug_name} from temp tables")
-        df = self.bq.query(query)
+        df = self.bq.query(query, query_name=f"drug_attribution_{drug_name}")
         
         # Convert to numeric
         for col in df.columns:
@@ -974,14 +1443,19 @@ class DataLoader:
         """
         
         logger.info(f"Creating monthly analysis table: {monthly_table}")
-        job = self.bq.client.query(query)
-        job.result()  # Wait for completion
+        try:
+            self.bq.execute(query, 'monthly_analysis_create')
+        except QueryBudgetExceeded as e:
+            if self._reuse_tables_over_budget(e, temp_dataset, [monthly_table], 'monthly_analysis_existing'):
+                return monthly_table
+            raise
         
         # Get row count
         count_query = f"SELECT COUNT(*) as count FROM {monthly_table_path}"
-        result = self.bq.client.query(count_query).result()
+        result = self.bq.run_job(count_query, 'monthly_analysis_count').result()
         row_count = list(result)[0].count
         logger.info(f"Created monthly analysis table with {row_count:,} rows")
+        self.bq.invalidate_table_versions()
         
         return monthly_table
     
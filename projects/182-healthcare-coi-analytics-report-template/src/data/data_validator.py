@@ -4,10 +4,15 @@ Validates data quality and integrity
 """
 
 import pandas as pd
-import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from typing import Dict, List, Optional, Tuple, Any
 import logging
 from datetime import datetime
+from .validation_engine import (
+    ColumnarValidator, is_datetime_type, is_numeric_type, iter_batches, validate_batches
+)
+from validation import is_valid_npi  # Shared package, on the path via validation_engine
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +20,21 @@ logger = logging.getLogger(__name__)
 class DataValidator:
     """Data quality validation and reporting"""
     
-    def __init__(self):
-        """Initialize data validator"""
+    def __init__(self, batch_size: int = 250_000):
+        """
+        Initialize data validator
+        
+        Args:
+            batch_size: Rows per batch when validating Parquet/streamed sources
+        """
+        self.batch_size = batch_size
         self.validation_results = []
         self.errors = []
         self.warnings = []
     
     def validate_dataframe(
         self, 
-        df: pd.DataFrame, 
+        df: Any, 
         name: str,
         required_columns: Optional[List[str]] = None,
         numeric_columns: Optional[List[str]] = None,
@@ -34,7 +45,8 @@ class DataValidator:
         Comprehensive DataFrame validation
         
         Args:
-            df: DataFrame to validate
+            df: DataFrame to validate (or an Arrow table, StreamedDataset or
+                Parquet path, which is validated batch by batch)
             name: Name of the dataset
             required_columns: Columns that must be present
             numeric_columns: Columns that should be numeric
@@ -44,17 +56,34 @@ class DataValidator:
         Returns:
             Validation report dictionary
         """
+        report, _ = self._validate(df, name, required_columns, numeric_columns, date_columns, id_columns)
+        return report
+    
+    def _validate(
+        self,
+        source: Any,
+        name: str,
+        required_columns: Optional[List[str]] = None,
+        numeric_columns: Optional[List[str]] = None,
+        date_columns: Optional[List[str]] = None,
+        id_columns: Optional[List[str]] = None,
+        **engine_options
+    ) -> Tuple[Dict[str, Any], ColumnarValidator]:
+        """Run every check in one pass over the source; returns the report and the column statistics"""
+        stats = validate_batches(iter_batches(source, self.batch_size), id_columns=id_columns, **engine_options)
+        columns = stats.schema.names if stats.schema is not None else []
+        
         report = {
             'dataset': name,
             'timestamp': datetime.now().isoformat(),
-            'rows': len(df),
-            'columns': len(df.columns),
+            'rows': stats.rows,
+            'columns': len(columns),
             'checks': [],
             'passed': True
         }
         
         # Check for empty DataFrame
-        if df.empty:
+        if stats.rows == 0:
             report['checks'].append({
                 'check': 'not_empty',
                 'passed': False,
@@ -62,11 +91,11 @@ class DataValidator:
             })
             report['passed'] = False
             self.errors.append(f"{name}: DataFrame is empty")
-            return report
+            return report, stats
         
         # Check required columns
         if required_columns:
-            missing = set(required_columns) - set(df.columns)
+            missing = set(required_columns) - set(columns)
             check = {
                 'check': 'required_columns',
                 'passed': len(missing) == 0,
@@ -78,55 +107,48 @@ class DataValidator:
                 self.errors.append(f"{name}: Missing columns {missing}")
         
         # Check numeric columns
-        if numeric_columns:
-            for col in numeric_columns:
-                if col in df.columns:
-                    is_numeric = pd.api.types.is_numeric_dtype(df[col])
-                    check = {
-                        'check': f'numeric_{col}',
-                        'passed': is_numeric,
-                        'dtype': str(df[col].dtype)
-                    }
-                    report['checks'].append(check)
-                    if not is_numeric:
-                        self.warnings.append(f"{name}: Column {col} is not numeric")
+        for col in numeric_columns or []:
+            if col in columns:
+                is_numeric = is_numeric_type(stats.schema.field(col).type)
+                report['checks'].append({
+                    'check': f'numeric_{col}',
+                    'passed': is_numeric,
+                    'dtype': stats.dtypes[col]
+                })
+                if not is_numeric:
+                    self.warnings.append(f"{name}: Column {col} is not numeric")
         
         # Check date columns
-        if date_columns:
-            for col in date_columns:
-                if col in df.columns:
-                    is_datetime = pd.api.types.is_datetime64_any_dtype(df[col])
-                    check = {
-                        'check': f'datetime_{col}',
-                        'passed': is_datetime,
-                        'dtype': str(df[col].dtype)
-                    }
-                    report['checks'].append(check)
-                    if not is_datetime:
-                        self.warnings.append(f"{name}: Column {col} is not datetime")
+        for col in date_columns or []:
+            if col in columns:
+                is_datetime = is_datetime_type(stats.schema.field(col).type)
+                report['checks'].append({
+                    'check': f'datetime_{col}',
+                    'passed': is_datetime,
+                    'dtype': stats.dtypes[col]
+                })
+                if not is_datetime:
+                    self.warnings.append(f"{name}: Column {col} is not datetime")
         
         # Check ID columns for uniqueness
-        if id_columns:
-            for col in id_columns:
-                if col in df.columns:
-                    duplicates = df[col].duplicated().sum()
-                    check = {
-                        'check': f'unique_{col}',
-                        'passed': duplicates == 0,
-                        'duplicates': int(duplicates)
-                    }
-                    report['checks'].append(check)
-                    if duplicates > 0:
-                        self.warnings.append(f"{name}: Column {col} has {duplicates} duplicates")
+        for col in id_columns or []:
+            if col in columns:
+                duplicates = stats.duplicates(col)
+                report['checks'].append({
+                    'check': f'unique_{col}',
+                    'passed': duplicates == 0,
+                    'duplicates': int(duplicates)
+                })
+                if duplicates > 0:
+                    self.warnings.append(f"{name}: Column {col} has {duplicates} duplicates")
         
         # Data quality checks
-        quality_checks = self._check_data_quality(df)
-        report['quality'] = quality_checks
+        report['quality'] = stats.quality()
         
         # Store validation result
         self.validation_results.append(report)
         
-        return report
+        return report, stats
     
     def _check_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -138,46 +160,7 @@ class DataValidator:
         Returns:
             Quality metrics dictionary
         """
-        quality = {
-            'null_counts': {},
-            'zero_counts': {},
-            'negative_counts': {},
-            'outliers': {}
-        }
-        
-        for col in df.columns:
-            # Null counts
-            null_count = df[col].isnull().sum()
-            if null_count > 0:
-                quality['null_counts'][col] = int(null_count)
-            
-            # For numeric columns
-            if pd.api.types.is_numeric_dtype(df[col]):
-                # Zero counts
-                zero_count = (df[col] == 0).sum()
-                if zero_count > 0:
-                    quality['zero_counts'][col] = int(zero_count)
-                
-                # Negative counts
-                negative_count = (df[col] < 0).sum()
-                if negative_count > 0:
-                    quality['negative_counts'][col] = int(negative_count)
-                
-                # Outlier detection using IQR
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                outliers = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-                if outliers > 0:
-                    quality['outliers'][col] = {
-                        'count': int(outliers),
-                        'lower_bound': float(lower_bound),
-                        'upper_bound': float(upper_bound)
-                    }
-        
-        return quality
+        return validate_batches(iter_batches(df, self.batch_size)).quality()
     
     def validate_npi(self, npi: str) -> bool:
         """
@@ -189,94 +172,63 @@ class DataValidator:
         Returns:
             True if valid NPI
         """
-        if not npi or len(npi) != 10:
-            return False
-        
-        try:
-            # NPI validation using Luhn algorithm
-            npi_digits = [int(d) for d in npi]
-            check_digit = npi_digits[-1]
-            
-            # Double every other digit starting from right
-            total = 0
-            for i in range(8, -1, -1):
-                if (8 - i) % 2 == 0:
-                    doubled = npi_digits[i] * 2
-                    total += doubled if doubled < 10 else doubled - 9
-                else:
-                    total += npi_digits[i]
-            
-            # Add constant 24 (per NPI standard)
-            total += 24
-            
-            # Check digit should make total divisible by 10
-            return (total + check_digit) % 10 == 0
-            
-        except (ValueError, IndexError):
-            return False
+        return is_valid_npi(npi)
     
-    def validate_provider_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def validate_provider_data(self, df: Any) -> Dict[str, Any]:
         """
         Validate provider-specific data
         
         Args:
-            df: Provider DataFrame
+            df: Provider DataFrame (or Arrow table, StreamedDataset, Parquet path)
             
         Returns:
             Validation report
         """
-        report = self.validate_dataframe(
+        report, stats = self._validate(
             df, 
             'Provider Data',
             required_columns=['NPI'],
-            id_columns=['NPI']
+            id_columns=['NPI'],
+            npi_columns=['NPI']
         )
         
-        # Validate NPIs
-        if 'NPI' in df.columns:
-            invalid_npis = []
-            for npi in df['NPI'].dropna().unique():
-                if not self.validate_npi(str(npi)):
-                    invalid_npis.append(npi)
-            
-            if invalid_npis:
-                report['invalid_npis'] = invalid_npis[:10]  # Show first 10
-                report['invalid_npi_count'] = len(invalid_npis)
-                self.warnings.append(f"Found {len(invalid_npis)} invalid NPIs")
+        # Validate NPIs (check digits of all distinct NPIs, computed in the same pass)
+        invalid_npis = stats.invalid_npis('NPI')
+        if invalid_npis:
+            report['invalid_npis'] = invalid_npis[:10]  # Show first 10
+            report['invalid_npi_count'] = len(invalid_npis)
+            self.warnings.append(f"Found {len(invalid_npis)} invalid NPIs")
         
         return report
     
-    def validate_payment_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def validate_payment_data(self, df: Any) -> Dict[str, Any]:
         """
         Validate Open Payments data
         
         Args:
-            df: Payments DataFrame
+            df: Payments DataFrame (or Arrow table, StreamedDataset, Parquet path)
             
         Returns:
             Validation report
         """
-        report = self.validate_dataframe(
+        report, stats = self._validate(
             df,
             'Payment Data',
             required_columns=['physician_id', 'payment_amount', 'payment_year'],
-            numeric_columns=['payment_amount', 'payment_year']
+            numeric_columns=['payment_amount', 'payment_year'],
+            ranges={'payment_amount': (0, 10000000)}
         )
         
         # Check for reasonable payment amounts
-        if 'payment_amount' in df.columns:
-            unreasonable = df[
-                (df['payment_amount'] < 0) | 
-                (df['payment_amount'] > 10000000)
-            ]
-            if not unreasonable.empty:
-                report['unreasonable_payments'] = len(unreasonable)
-                self.warnings.append(f"Found {len(unreasonable)} unreasonable payment amounts")
+        unreasonable = stats.range_violations.get('payment_amount', 0)
+        if unreasonable:
+            report['unreasonable_payments'] = unreasonable
+            self.warnings.append(f"Found {unreasonable} unreasonable payment amounts")
         
         # Check year range
-        if 'payment_year' in df.columns:
-            min_year = df['payment_year'].min()
-            max_year = df['payment_year'].max()
+        if 'payment_year' in stats.minimum:
+            min_year = stats.minimum['payment_year']
+            max_year = stats.maximum['payment_year']
             current_year = datetime.now().year
             
             if min_year < 2013 or max_year > current_year:
@@ -285,28 +237,30 @@ class DataValidator:
         
         return report
     
-    def validate_prescription_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def validate_prescription_data(self, df: Any) -> Dict[str, Any]:
         """
         Validate prescription data
         
         Args:
-            df: Prescription DataFrame
+            df: Prescription DataFrame (or Arrow table, StreamedDataset, Parquet path)
             
         Returns:
             Validation report
         """
-        report = self.validate_dataframe(
+        report, stats = self._validate(
             df,
             'Prescription Data',
             required_columns=['NPI', 'BRAND_NAME', 'total_claims', 'total_cost'],
-            numeric_columns=['total_claims', 'total_cost']
+            numeric_columns=['total_claims', 'total_cost'],
+            ranges={'cost_per_claim': (1, 100000)},
+            derived={'cost_per_claim': self._cost_per_claim}
         )
         
         # Check for reasonable values
-        if 'total_cost' in df.columns and 'total_claims' in df.columns:
+        if 'total_cost' in stats.dtypes and 'total_claims' in stats.dtypes:
             # Check for negative values
-            negative_cost = (df['total_cost'] < 0).sum()
-            negative_claims = (df['total_claims'] < 0).sum()
+            negative_cost = stats.negative_counts.get('total_cost', 0)
+            negative_claims = stats.negative_counts.get('total_claims', 0)
             
             if negative_cost > 0:
                 report['negative_costs'] = int(negative_cost)
@@ -317,17 +271,22 @@ class DataValidator:
                 self.errors.append(f"Found {negative_claims} negative claim counts")
             
             # Check cost per claim
-            df['cost_per_claim'] = df['total_cost'] / df['total_claims'].replace(0, np.nan)
-            unreasonable_cpp = df[
-                (df['cost_per_claim'] < 1) | 
-                (df['cost_per_claim'] > 100000)
-            ]
-            if not unreasonable_cpp.empty:
-                report['unreasonable_cost_per_claim'] = len(unreasonable_cpp)
-                self.warnings.append(f"Found {len(unreasonable_cpp)} unreasonable cost-per-claim values")
+            unreasonable_cpp = stats.range_violations.get('cost_per_claim', 0)
+            if unreasonable_cpp:
+                report['unreasonable_cost_per_claim'] = unreasonable_cpp
+                self.warnings.append(f"Found {unreasonable_cpp} unreasonable cost-per-claim values")
         
         return report
     
+    @staticmethod
+    def _cost_per_claim(table: pa.Table) -> pa.ChunkedArray:
+        """Cost per claim of a batch (null where there are no claims)"""
+        if 'total_cost' not in table.column_names or 'total_claims' not in table.column_names:
+            return pa.chunked_array([pa.nulls(table.num_rows, pa.float64())])
+        claims = pc.cast(table.column('total_claims'), pa.float64())
+        claims = pc.if_else(pc.equal(claims, 0), pa.scalar(None, pa.float64()), claims)
+        return pc.divide(pc.cast(table.column('total_cost'), pa.float64()), claims)
+    
     def get_validation_summary(self) -> Dict[str, Any]:
         """
         Get summary of all validation results
@@ -0,0 +1,651 @@
+"""
+DuckDB Execution Backend
+Runs the BigQuery SQL used by the pipeline locally with DuckDB, over Parquet
+extracts of the source tables
+
+DuckDBClient implements the subset of google.cloud.bigquery.Client used by
+BigQueryConnector, BigQueryAnalyzer, QueryScheduler and QueryCostGuard
+(query, get_table, load_table_from_dataframe), so the pipeline runs unchanged
+offline, in tests, or against a small roster on a laptop.
+
+Source tables are read from `<source_dir>/<dataset>/<table>.parquet` (or a
+directory of Parquet files at `<source_dir>/<dataset>/<table>/`) and exposed
+as views in a schema named after the dataset. The project part of
+`project.dataset.table` identifiers is ignored.
+"""
+
+import logging
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# BigQuery type names DuckDB doesn't accept
+_TYPES = {
+    'INT64': 'BIGINT',
+    'FLOAT64': 'DOUBLE',
+    'NUMERIC': 'DECIMAL(38, 9)',
+    'BIGNUMERIC': 'DECIMAL(38, 9)',
+    'STRING': 'VARCHAR',
+    'BOOL': 'BOOLEAN',
+    'BYTES': 'BLOB'
+}
+
+# Function/keyword renames applied outside literals
+_RENAMES = [
+    (re.compile(r'\bFLOAT64\b', re.IGNORECASE), 'DOUBLE'),
+    (re.compile(r'\bBIGNUMERIC\b', re.IGNORECASE), 'DECIMAL(38, 9)'),
+    (re.compile(r'\bNUMERIC\b', re.IGNORECASE), 'DECIMAL(38, 9)'),
+    (re.compile(r'\bSAFE_CAST\s*\(', re.IGNORECASE), 'TRY_CAST('),
+    (re.compile(r'\bCOUNTIF\s*\(', re.IGNORECASE), 'count_if('),
+    (re.compile(r'\bLOGICAL_OR\s*\(', re.IGNORECASE), 'bool_or('),
+    (re.compile(r'\bLOGICAL_AND\s*\(', re.IGNORECASE), 'bool_and('),
+    (re.compile(r'\bINSERT\s+ROW\b', re.IGNORECASE), 'INSERT *'),
+    (re.compile(r'\bMERGE\s+(?!INTO\b)', re.IGNORECASE), 'MERGE INTO '),
+    (re.compile(r'\*\s*EXCEPT\s*\(', re.IGNORECASE), '* EXCLUDE ('),
+    (re.compile(r'\bCLUSTER\s+BY\s+\w+(?:\s*,\s*\w+)*\s+(?=AS\b)', re.IGNORECASE), ''),
+    (re.compile(r'@(\w+)'), r'$\1')
+]
+
+# Macros for BigQuery functions without a DuckDB equivalent (CORR and the
+# STDDEV/VARIANCE family behave the same in both and need no translation)
+_MACROS = [
+    "CREATE OR REPLACE MACRO SAFE_DIVIDE(a, b) AS CASE WHEN b = 0 THEN NULL ELSE a / b END"
+]
+
+# Statements that write a table, with the target identifier
+_WRITE_TARGET = re.compile(
+    r'^\s*(?:CREATE\s+(?:OR\s+REPLACE\s+)?TABLE(?:\s+IF\s+NOT\s+EXISTS)?|INSERT\s+(?:INTO\s+)?|'
+    r'MERGE\s+(?:INTO\s+)?|DELETE\s+(?:FROM\s+)?|UPDATE|TRUNCATE\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)'
+    r'\s*`([^`]+)`',
+    re.IGNORECASE
+)
+_DML = {'INSERT', 'MERGE', 'DELETE', 'UPDATE'}
+_READ = {'SELECT', 'WITH'}
+
+# Script temp tables: CREATE [OR REPLACE] TEMP TABLE name AS <query>
+_TEMP_TABLE = re.compile(
+    r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?TEMP(?:ORARY)?\s+TABLE\s+(\w+)\s+AS\b(.*)$',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def _segments(sql: str) -> List[Tuple[str, str]]:
+    """Split SQL into ('code' | 'string' | 'identifier' | 'comment', text) segments"""
+    segments = []
+    i = start = 0
+    while i < len(sql):
+        ch = sql[i]
+        if ch in "'\"`" or sql.startswith('--', i):
+            if i > start:
+                segments.append(('code', sql[start:i]))
+            if ch in "'\"`":
+                j = i + 1
+                while j < len(sql) and sql[j] != ch:
+                    j += 2 if sql[j] == '\\' else 1
+                kind = 'identifier' if ch == '`' else 'string'
+            else:
+                j = sql.find('\n', i)
+                j = len(sql) - 1 if j < 0 else j
+                kind = 'comment'
+            segments.append((kind, sql[i:j + 1]))
+            i = start = j + 1
+            continue
+        i += 1
+    if start < len(sql):
+        segments.append(('code', sql[start:]))
+    return segments
+
+
+def _in_literal(prefix: str) -> bool:
+    """Whether SQL text ending with prefix is inside a literal or comment"""
+    segments = _segments(prefix)
+    if not segments or segments[-1][0] == 'code':
+        return False
+    kind, text = segments[-1]
+    if kind == 'comment':
+        return not text.endswith('\n')
+    return len(text) < 2 or text[-1] != text[0]
+
+
+def _statement_kind(sql: str) -> str:
+    """First keyword of a statement, ignoring leading comments and parentheses"""
+    code = ''.join(text for kind, text in _segments(sql) if kind != 'comment')
+    match = re.match(r'[\s(]*(\w+)', code)
+    return match.group(1).upper() if match else ''
+
+
+def _statements(sql: str) -> List[str]:
+    """Split a script on semicolons outside literals and comments (empty statements dropped)"""
+    statements, current = [], []
+    for kind, text in _segments(sql):
+        pieces = text.split(';') if kind == 'code' else [text]
+        current.append(pieces[0])
+        for piece in pieces[1:]:
+            statements.append(''.join(current))
+            current = [piece]
+    statements.append(''.join(current))
+    return [statement for statement in statements if _statement_kind(statement)] or [sql]
+
+
+def _bound(statement: str, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Named parameters a (translated) statement references"""
+    bound = {name: value for name, value in parameters.items() if re.search(rf'\${name}\b', statement)}
+    return bound or None
+
+
+def _identifier(text: str, catalog: Optional[str] = None) -> str:
+    """`project.dataset.table` -> "catalog"."dataset"."table" (project replaced)"""
+    parts = text.strip('`').split('.')
+    if len(parts) == 3:
+        parts = parts[1:]
+    if len(parts) == 2 and catalog:
+        # Qualified so datasets named like DuckDB catalogs (e.g. "temp") resolve
+        parts = [catalog] + parts
+    return '.'.join(f'"{part}"' for part in parts)
+
+
+def _string(text: str) -> str:
+    """BigQuery "..." string literal -> DuckDB '...' literal"""
+    if text.startswith('"'):
+        return "'" + text[1:-1].replace("\\\"", "\"").replace("'", "''") + "'"
+    return text.replace("\\'", "''")
+
+
+def _closing(sql: str, open_index: int) -> int:
+    """Index of the bracket closing the one at open_index, skipping literals"""
+    pairs = {'(': ')', '[': ']'}
+    stack = [pairs[sql[open_index]]]
+    i = open_index + 1
+    while i < len(sql):
+        ch = sql[i]
+        if ch in "'\"":
+            i = sql.index(ch, i + 1) + 1
+            continue
+        if ch in pairs:
+            stack.append(pairs[ch])
+        elif ch == stack[-1]:
+            stack.pop()
+            if not stack:
+                return i
+        i += 1
+    raise ValueError(f"Unbalanced brackets in SQL near: {sql[open_index:open_index + 80]}")
+
+
+def _split_args(args: str) -> List[str]:
+    """Split a function argument list on top-level commas"""
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(args):
+        ch = args[i]
+        if ch in "'\"":
+            i = args.index(ch, i + 1) + 1
+            continue
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(args[start:i])
+            start = i + 1
+        i += 1
+    parts.append(args[start:])
+    return [part.strip() for part in parts]
+
+
+def _rewrite_calls(sql: str, name: str, rewrite) -> str:
+    """Rewrite every NAME(...) call outside literals; rewrite(sql, match) -> (replacement, end)"""
+    pattern = re.compile(rf'\b{name}\s*(\(|<)', re.IGNORECASE)
+    pos = 0
+    while True:
+        match = pattern.search(sql, pos)
+        if not match:
+            return sql
+        if _in_literal(sql[:match.start()]):
+            pos = match.end()
+            continue
+        replacement, end = rewrite(sql, match)
+        sql = sql[:match.start()] + replacement + sql[end:]
+        pos = match.start() + len(replacement)
+
+
+def _approx_quantiles(sql: str, match) -> Tuple[str, int]:
+    """APPROX_QUANTILES(x, n)[OFFSET(k)] -> quantile_disc(x, k/n)"""
+    close = _closing(sql, match.end() - 1)
+    expr, buckets = _split_args(sql[match.end():close])[:2]
+    buckets = int(buckets)
+    subscript = re.match(r'\s*\[\s*(OFFSET|ORDINAL|SAFE_OFFSET|SAFE_ORDINAL)\s*\(\s*(\d+)\s*\)\s*\]',
+                         sql[close + 1:], re.IGNORECASE)
+    if subscript:
+        position = int(subscript.group(2)) - (1 if 'ORDINAL' in subscript.group(1).upper() else 0)
+        return f"quantile_disc({expr}, {position / buckets})", close + 1 + subscript.end()
+    fractions = ', '.join(str(k / buckets) for k in range(buckets + 1))
+    return f"quantile_disc({expr}, [{fractions}])", close + 1
+
+
+def _array_literal(sql: str, match) -> Tuple[str, int]:
+    """ARRAY<T>[...] -> CAST([...] AS T[])"""
+    type_end = sql.index('>', match.end())
+    element_type = sql[match.end():type_end].strip().upper()
+    open_index = sql.index('[', type_end)
+    close = _closing(sql, open_index)
+    duck_type = _TYPES.get(element_type, element_type)
+    return f"CAST({sql[open_index:close + 1]} AS {duck_type}[])", close + 1
+
+
+def _unnest(sql: str, match) -> Tuple[str, int]:
+    """x IN UNNEST(a) -> x IN (SELECT UNNEST(a)); FROM UNNEST(a) AS v -> FROM UNNEST(a) AS _v(v)"""
+    close = _closing(sql, match.end() - 1)
+    call = f"UNNEST({sql[match.end():close]})"
+    if re.search(r'\bIN\s*$', sql[:match.start()], re.IGNORECASE):
+        return f"(SELECT {call})", close + 1
+    alias = re.match(r'\s+AS\s+(\w+)(?!\s*\()', sql[close + 1:], re.IGNORECASE)
+    if alias:
+        return f"{call} AS _{alias.group(1)}({alias.group(1)})", close + 1 + alias.end()
+    return call, close + 1
+
+
+def _to_json_string(sql: str, match) -> Tuple[str, int]:
+    """TO_JSON_STRING(x) -> CAST(to_json(x) AS VARCHAR)"""
+    close = _closing(sql, match.end() - 1)
+    return f"CAST(to_json({sql[match.end():close]}) AS VARCHAR)", close + 1
+
+
+def translate_sql(query: str, catalog: Optional[str] = None) -> str:
+    """
+    Translate the BigQuery dialect used by the pipeline into DuckDB SQL
+
+    Handles backtick identifiers, double-quoted string literals, APPROX_QUANTILES,
+    ARRAY<T>[...] literals, UNNEST, TO_JSON_STRING, BigQuery type names,
+    MERGE ... INSERT ROW, SELECT * EXCEPT(...), CLUSTER BY (dropped) and
+    @named parameters. SAFE_DIVIDE is provided as a macro by DuckDBClient;
+    CORR and STDDEV/VARIANCE are native in DuckDB.
+
+    Args:
+        query: BigQuery SQL
+        catalog: DuckDB database that `project.dataset.table` ids resolve into
+    """
+    parts = []
+    for kind, text in _segments(query):
+        if kind == 'identifier':
+            parts.append(_identifier(text, catalog))
+        elif kind == 'string':
+            parts.append(_string(text))
+        elif kind == 'code':
+            for pattern, replacement in _RENAMES:
+                text = pattern.sub(replacement, text)
+            parts.append(text)
+        else:
+            parts.append(text)
+    sql = ''.join(parts)
+
+    sql = _rewrite_calls(sql, 'APPROX_QUANTILES', _approx_quantiles)
+    sql = _rewrite_calls(sql, 'ARRAY', lambda s, m: _array_literal(s, m) if m.group(1) == '<' else (m.group(0), m.end()))
+    sql = _rewrite_calls(sql, 'UNNEST', _unnest)
+    sql = _rewrite_calls(sql, 'TO_JSON_STRING', _to_json_string)
+    return sql
+
+
+def _table_key(table_id: str) -> Tuple[str, str]:
+    """(dataset, table) from a project.dataset.table or dataset.table id"""
+    parts = table_id.replace('`', '').split('.')
+    if len(parts) < 2:
+        raise ValueError(f"Table id must include a dataset: {table_id}")
+    return parts[-2], parts[-1]
+
+
+class DuckDBRow:
+    """Result row supporting attribute, key and index access (like bigquery.Row)"""
+
+    def __init__(self, values: Dict[str, Any]):
+        self._values = values
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, key) -> Any:
+        if isinstance(key, int):
+            return list(self._values.values())[key]
+        return self._values[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def keys(self):
+        return self._values.keys()
+
+    def values(self):
+        return self._values.values()
+
+    def items(self):
+        return self._values.items()
+
+
+class DuckDBQueryJob:
+    """QueryJob-like handle for a statement running on a DuckDB cursor"""
+
+    def __init__(self, future=None, cursor=None, dry_run: bool = False):
+        self.job_id = f"duckdb_{uuid.uuid4().hex[:12]}"
+        self._future = future
+        self._cursor = cursor
+        self.dry_run = dry_run
+        self.total_bytes_processed = 0
+        self.total_bytes_billed = 0
+        self.num_dml_affected_rows = None
+        self.started = datetime.now(timezone.utc)
+        self.ended = None if future else self.started
+        self._df: Optional[pd.DataFrame] = None
+
+    def _finish(self, df: pd.DataFrame, dml: bool) -> pd.DataFrame:
+        self.ended = datetime.now(timezone.utc)
+        if dml and not df.empty:
+            self.num_dml_affected_rows = int(df.iloc[0, 0])
+            df = pd.DataFrame()
+        # Nullable integers, as returned for INT64 columns by QueryJob.to_dataframe()
+        int_columns = df.columns[df.dtypes == 'int64']
+        return df.astype({column: 'Int64' for column in int_columns})
+
+    def done(self) -> bool:
+        return self._future is None or self._future.done()
+
+    def cancel(self) -> bool:
+        if self._cursor is not None:
+            try:
+                self._cursor.interrupt()
+            except Exception:
+                pass
+        return self._future.cancel() if self._future else False
+
+    def to_dataframe(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = self._future.result() if self._future else pd.DataFrame()
+        return self._df
+
+    def result(self) -> List[DuckDBRow]:
+        return [DuckDBRow(record) for record in self.to_dataframe().to_dict('records')]
+
+
+class DuckDBTable:
+    """Table metadata in the shape of bigquery.Table"""
+
+    def __init__(self, table_id: str, num_rows: int, num_bytes: Optional[int],
+                 created: Optional[datetime], modified: Optional[datetime], schema: List[Any]):
+        self.table_id = table_id
+        self.num_rows = num_rows
+        self.num_bytes = num_bytes
+        self.created = created
+        self.modified = modified
+        self.schema = schema
+
+
+class DuckDBField:
+    """Schema field in the shape of bigquery.SchemaField"""
+
+    def __init__(self, name: str, field_type: str):
+        self.name = name
+        self.field_type = field_type
+
+
+class DuckDBClient:
+    """Local stand-in for bigquery.Client running translated SQL on DuckDB"""
+
+    backend = 'duckdb'
+
+    def __init__(
+        self,
+        source_dir: str = "data/extracts",
+        database: str = ":memory:",
+        project: str = "local",
+        threads: Optional[int] = None,
+        max_concurrent_jobs: int = 4
+    ):
+        """
+        Initialize DuckDB client
+
+        Args:
+            source_dir: Directory of Parquet extracts laid out as <dataset>/<table>.parquet
+            database: DuckDB database file where created tables (the temp dataset)
+                persist between runs, or ":memory:"
+            project: Project id reported to callers (ignored in table ids)
+            threads: DuckDB worker threads (default: all cores)
+            max_concurrent_jobs: Statements executing at once
+        """
+        self.project = project
+        self.source_dir = Path(source_dir)
+        if database != ":memory:":
+            Path(database).parent.mkdir(parents=True, exist_ok=True)
+        self.database = database
+        self._conn = duckdb.connect(database)
+        self.catalog = self._conn.execute("SELECT current_database()").fetchone()[0]
+        if threads:
+            self._conn.execute(f"SET threads TO {int(threads)}")
+        for macro in _MACROS:
+            self._conn.execute(macro)
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrent_jobs))
+        self._lock = threading.Lock()
+        self._schemas = set()
+        self._modified: Dict[Tuple[str, str], datetime] = {}
+        self._sources: Dict[Tuple[str, str], Path] = {}
+        self._load_write_times()
+        self._register_sources()
+
+    def _load_write_times(self):
+        """Restore when each created table was last written (persisted with the database)"""
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.catalog}".main._table_versions '
+            '(dataset VARCHAR, table_name VARCHAR, modified DOUBLE, PRIMARY KEY (dataset, table_name))'
+        )
+        for dataset, table, modified in self._conn.execute(
+                f'SELECT dataset, table_name, modified FROM "{self.catalog}".main._table_versions').fetchall():
+            self._modified[(dataset, table)] = datetime.fromtimestamp(modified, timezone.utc)
+
+    def _record_write(self, key: Tuple[str, str]):
+        """Record a table write, so get_table().modified survives across processes"""
+        modified = datetime.now(timezone.utc)
+        with self._lock:
+            self._modified[key] = modified
+            cursor = self._conn.cursor()
+            try:
+                cursor.execute(
+                    f'INSERT OR REPLACE INTO "{self.catalog}".main._table_versions VALUES (?, ?, ?)',
+                    [key[0], key[1], modified.timestamp()]
+                )
+            finally:
+                cursor.close()
+
+    def _register_sources(self):
+        """Expose every Parquet extract under source_dir as a dataset.table view"""
+        if not self.source_dir.exists():
+            logger.warning(f"DuckDB source directory not found: {self.source_dir}")
+            return
+        for dataset_dir in sorted(p for p in self.source_dir.iterdir() if p.is_dir()):
+            for path in sorted(dataset_dir.iterdir()):
+                if path.is_dir() and any(path.glob('*.parquet')):
+                    table, pattern = path.name, str(path / '*.parquet')
+                elif path.suffix == '.parquet':
+                    table, pattern = path.stem, str(path)
+                else:
+                    continue
+                self._ensure_schema(dataset_dir.name)
+                self._conn.execute(
+                    f'CREATE OR REPLACE VIEW {self._name(dataset_dir.name, table)} AS '
+                    f"SELECT * FROM read_parquet('{pattern}')"
+                )
+                self._sources[(dataset_dir.name, table)] = path
+        logger.info(f"DuckDB backend: {len(self._sources)} source tables from {self.source_dir}")
+
+    def _name(self, dataset: str, table: str) -> str:
+        return f'"{self.catalog}"."{dataset}"."{table}"'
+
+    def _ensure_schema(self, schema: str):
+        with self._lock:
+            if schema in self._schemas:
+                return
+            self._conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{self.catalog}"."{schema}"')
+            self._schemas.add(schema)
+
+    def _prepare(self, query: str, job_config=None) -> Tuple[str, Dict[str, Any]]:
+        """Translated SQL and named parameters; creates schemas the statement references"""
+        for table_id in re.findall(r'`([^`]+\.[^`]+)`', query):
+            self._ensure_schema(_table_key(table_id)[0])
+        parameters = {
+            param.name: param.value
+            for param in (getattr(job_config, 'query_parameters', None) or [])
+        }
+        return translate_sql(query, self.catalog), parameters
+
+    def _run(self, sql: str, parameters: Dict[str, Any], target: Optional[Tuple[str, str]],
+             job: DuckDBQueryJob, cursor) -> pd.DataFrame:
+        statements = _statements(sql)
+        kind = _statement_kind(statements[-1])
+        try:
+            # Script statements share the cursor, so temp tables live until it closes
+            for statement in statements:
+                cursor.execute(statement, _bound(statement, parameters))
+            df = cursor.fetchdf() if kind in _READ or kind in _DML else pd.DataFrame()
+        finally:
+            cursor.close()
+        if target is not None:
+            self._record_write(target)
+        return job._finish(df, dml=kind in _DML)
+
+    def query(self, query: str, job_config=None, **kwargs) -> DuckDBQueryJob:
+        """
+        Start a query (like bigquery.Client.query)
+
+        Dry runs are validated with EXPLAIN and report 0 bytes processed.
+        Scripts (statements separated by ';') run on one cursor and return
+        the last statement's result; their temp tables are dropped with the
+        cursor, as BigQuery drops them when the script ends.
+        """
+        sql, parameters = self._prepare(query, job_config)
+        if getattr(job_config, 'dry_run', False):
+            cursor = self._conn.cursor()
+            try:
+                for statement in _statements(sql):
+                    temp_table = _TEMP_TABLE.match(statement)
+                    if temp_table:
+                        # Created empty, so later statements can be planned against it
+                        cursor.execute(
+                            f"CREATE OR REPLACE TEMP TABLE {temp_table.group(1)} AS "
+                            f"SELECT * FROM ({temp_table.group(2)}) LIMIT 0",
+                            _bound(statement, parameters)
+                        )
+                    else:
+                        cursor.execute(f"EXPLAIN {statement}", _bound(statement, parameters))
+            finally:
+                cursor.close()
+            return DuckDBQueryJob(dry_run=True)
+
+        target_match = _WRITE_TARGET.match(query)
+        target = _table_key(target_match.group(1)) if target_match else None
+        cursor = self._conn.cursor()
+        job = DuckDBQueryJob(cursor=cursor)
+        job._future = self._executor.submit(self._run, sql, parameters, target, job, cursor)
+        return job
+
+    def get_table(self, table_id: str) -> DuckDBTable:
+        """Table metadata (like bigquery.Client.get_table); raises KeyError if missing"""
+        dataset, table = _table_key(table_id)
+        cursor = self._conn.cursor()
+        try:
+            exists = cursor.execute(
+                "SELECT COUNT(*) FROM (SELECT database_name, schema_name, table_name FROM duckdb_tables() "
+                "UNION ALL SELECT database_name, schema_name, view_name FROM duckdb_views()) "
+                "WHERE database_name = ? AND schema_name = ? AND table_name = ?",
+                [self.catalog, dataset, table]
+            ).fetchone()[0]
+            if not exists:
+                raise KeyError(f"Not found: Table {table_id}")
+            columns = cursor.execute(f'DESCRIBE {self._name(dataset, table)}').fetchall()
+            num_rows = cursor.execute(f'SELECT COUNT(*) FROM {self._name(dataset, table)}').fetchone()[0]
+        finally:
+            cursor.close()
+
+        source = self._sources.get((dataset, table))
+        if source is not None:
+            files = list(source.glob('*.parquet')) if source.is_dir() else [source]
+            modified = datetime.fromtimestamp(max(f.stat().st_mtime for f in files), timezone.utc)
+            num_bytes = sum(f.stat().st_size for f in files)
+        else:
+            modified = self._modified.get((dataset, table))
+            if modified is None and self.database != ":memory:":
+                modified = datetime.fromtimestamp(Path(self.database).stat().st_mtime, timezone.utc)
+            num_bytes = None
+        return DuckDBTable(
+            table_id=f"{self.project}.{dataset}.{table}",
+            num_rows=num_rows,
+            num_bytes=num_bytes,
+            created=modified,
+            modified=modified,
+            schema=[DuckDBField(name, field_type) for name, field_type, *_ in columns]
+        )
+
+    def load_table_from_dataframe(self, dataframe: pd.DataFrame, destination: str, job_config=None,
+                                  **kwargs) -> DuckDBQueryJob:
+        """Write a DataFrame to a table (like bigquery.Client.load_table_from_dataframe)"""
+        dataset, table = _table_key(str(destination))
+        self._ensure_schema(dataset)
+        name = self._name(dataset, table)
+        append = getattr(job_config, 'write_disposition', None) == 'WRITE_APPEND'
+        cursor = self._conn.cursor()
+        try:
+            cursor.register('_load_frame', dataframe)
+            if append:
+                cursor.execute(f'CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM _load_frame LIMIT 0')
+                cursor.execute(f'INSERT INTO {name} SELECT * FROM _load_frame')
+            else:
+                cursor.execute(f'CREATE OR REPLACE TABLE {name} AS SELECT * FROM _load_frame')
+            cursor.unregister('_load_frame')
+        finally:
+            cursor.close()
+        self._record_write((dataset, table))
+        return DuckDBQueryJob()
+
+    def read_arrow_batches(self, table_id: str, columns: Optional[List[str]] = None,
+                           row_filter: Optional[str] = None, batch_rows: int = 100_000):
+        """
+        Arrow schema and record batch iterator for a projected, filtered table
+        (the DuckDB counterpart of a Storage Read API session)
+
+        Args:
+            table_id: project.dataset.table
+            columns: Columns to read (default: all)
+            row_filter: BigQuery SQL boolean expression over the table's columns
+            batch_rows: Rows per batch
+        """
+        dataset, table = _table_key(table_id)
+        select = ", ".join(f"`{column}`" for column in columns) if columns else "*"
+        sql = f"SELECT {select} FROM `{self.project}.{dataset}.{table}`"
+        if row_filter:
+            sql += f" WHERE {row_filter}"
+        cursor = self._conn.cursor()
+        try:
+            reader = cursor.execute(self._prepare(sql)[0]).fetch_record_batch(batch_rows)
+        except Exception:
+            cursor.close()
+            raise
+
+        def batches():
+            try:
+                yield from reader
+            finally:
+                cursor.close()
+
+        return reader.schema, batches()
+
+    def close(self):
+        """Wait for running statements and close the database"""
+        self._executor.shutdown(wait=True)
+        self._conn.close()
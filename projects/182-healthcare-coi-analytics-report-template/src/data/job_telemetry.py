@@ -0,0 +1,67 @@
+"""
+Job Telemetry Module
+Performance and cost statistics of completed BigQuery jobs
+
+Read from the job resource after completion: bytes processed and billed,
+slot time, whether BigQuery served the result from its cache, time spent
+queued (created -> started) versus executing (started -> ended), and the query
+plan stage that used the most slot time. Fields a job type or execution
+backend does not report (load jobs, DuckDB) are None.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_FIELDS = (
+    'bytes_processed', 'bytes_billed', 'slot_ms', 'cache_hit',
+    'queue_ms', 'execution_ms', 'top_stage', 'top_stage_slot_ms'
+)
+
+
+def _elapsed_ms(start: Optional[datetime], end: Optional[datetime]) -> Optional[int]:
+    if start is None or end is None:
+        return None
+    return int((end - start).total_seconds() * 1000)
+
+
+def _attribute(job: Any, name: str) -> Any:
+    try:
+        return getattr(job, name, None)
+    except Exception:
+        # Some properties raise on job types that don't carry the statistic
+        return None
+
+
+def job_telemetry(job: Any) -> Dict[str, Any]:
+    """
+    Telemetry of a completed query or load job
+
+    Args:
+        job: bigquery.QueryJob / LoadJob (or the DuckDB backend's job handle)
+
+    Returns:
+        Dictionary with job_id and TELEMETRY_FIELDS
+    """
+    created, started, ended = (_attribute(job, name) for name in ('created', 'started', 'ended'))
+    telemetry = {
+        'job_id': _attribute(job, 'job_id'),
+        'bytes_processed': _attribute(job, 'total_bytes_processed'),
+        'bytes_billed': _attribute(job, 'total_bytes_billed'),
+        'slot_ms': _attribute(job, 'slot_millis'),
+        'cache_hit': _attribute(job, 'cache_hit'),
+        'queue_ms': _elapsed_ms(created, started),
+        'execution_ms': _elapsed_ms(started, ended),
+        'top_stage': None,
+        'top_stage_slot_ms': None
+    }
+
+    stages = [stage for stage in (_attribute(job, 'query_plan') or [])
+              if getattr(stage, 'slot_ms', None) is not None]
+    if stages:
+        top = max(stages, key=lambda stage: stage.slot_ms)
+        telemetry['top_stage'] = getattr(top, 'name', None)
+        telemetry['top_stage_slot_ms'] = top.slot_ms
+    return telemetry
@@ -0,0 +1,300 @@
+"""
+Query Result Cache Module
+Persistent on-disk cache of BigQuery query results stored as Parquet
+
+Cache keys are built from the normalized SQL (comments and insignificant
+whitespace removed), the query parameters and the last_modified time of every
+table the query references, so a result is invalidated as soon as one of its
+source tables changes. The cache directory is bounded by a total size budget;
+least recently used entries are evicted first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Fully qualified `project.dataset.table` references (backtick quoted or bare after FROM/JOIN)
+_QUOTED_TABLE = re.compile(r'`([\w\-]+\.[\w\-]+\.[\w\-$*]+)`')
+_BARE_TABLE = re.compile(r'\b(?:FROM|JOIN)\s+([\w\-]+\.[\w\-]+\.[\w\-$*]+)\b', re.IGNORECASE)
+
+# String literals, quoted identifiers and comments, in one scanning pass
+_SQL_TOKENS = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)"""  # literals / quoted identifiers (kept)
+    r"""|(--[^\n]*|\#[^\n]*|/\*.*?\*/)""",               # comments (dropped)
+    re.DOTALL
+)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Canonical form of a SQL string for cache keying
+
+    Removes comments, collapses whitespace and strips trailing semicolons;
+    string literals and quoted identifiers are left untouched.
+    """
+    parts = []
+    last = 0
+    for match in _SQL_TOKENS.finditer(query):
+        parts.append(' '.join(query[last:match.start()].split()))
+        if match.group(1):
+            parts.append(match.group(1))
+        else:
+            parts.append(' ')
+        last = match.end()
+    parts.append(' '.join(query[last:].split()))
+
+    normalized = ' '.join(part for part in (p.strip() for p in parts) if part)
+    return normalized.rstrip('; ').strip()
+
+
+def referenced_tables(query: str) -> List[str]:
+    """Sorted fully qualified table ids referenced by a query"""
+    tables = set(_QUOTED_TABLE.findall(query)) | set(_BARE_TABLE.findall(query))
+    return sorted(tables)
+
+
+class QueryResultCache:
+    """Size-bounded LRU cache of query results as zstd-compressed Parquet files"""
+
+    def __init__(
+        self,
+        cache_dir: str = "data/cache/query_results",
+        max_bytes: int = 2 * 1024 ** 3,
+        ttl_seconds: Optional[float] = None,
+        fallback_ttl_seconds: float = 24 * 3600,
+        compression: str = "zstd"
+    ):
+        """
+        Initialize query result cache
+
+        Args:
+            cache_dir: Directory for cached Parquet files
+            max_bytes: Total size budget; LRU entries are evicted beyond it
+            ttl_seconds: Optional hard expiry for every entry
+            fallback_ttl_seconds: Expiry for queries whose source tables could
+                not be versioned (no table references or metadata lookup failed)
+            compression: Parquet compression codec
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.fallback_ttl_seconds = fallback_ttl_seconds
+        self.compression = compression
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'bytes_read': 0,
+            'bytes_written': 0,
+            'evictions': 0,
+            'write_failures': 0
+        }
+
+    def make_key(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        table_versions: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the cache key for a query
+
+        Args:
+            query: SQL query string
+            params: Optional query parameters
+            table_versions: Mapping of table id -> last_modified for referenced tables
+
+        Returns:
+            Hex digest identifying the query result
+        """
+        payload = {
+            'sql': normalize_sql(query),
+            'params': sorted((str(k), str(v)) for k, v in (params or {}).items()),
+            'tables': sorted((table, str(version)) for table, version in (table_versions or {}).items())
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached result for a key, or None on a miss"""
+        data_path, meta_path = self._paths(key)
+        try:
+            if not data_path.exists():
+                raise FileNotFoundError
+            meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+            ttl = self.fallback_ttl_seconds if meta.get('unversioned') else self.ttl_seconds
+            if ttl is not None and time.time() - meta.get('created_at', 0) > ttl:
+                self._remove(key)
+                raise FileNotFoundError
+
+            df = pd.read_parquet(data_path)
+            size = data_path.stat().st_size
+            # Touch for LRU ordering
+            os.utime(data_path, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to load cached result {key[:12]}: {e}")
+            self._remove(key)
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_read'] += size
+        logger.debug(f"Query cache hit {key[:12]} ({len(df):,} rows)")
+        return df
+
+    def put(self, key: str, df: pd.DataFrame, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Store a result (atomic rename) and evict LRU entries beyond the budget
+
+        Returns:
+            True if the result was cached
+        """
+        data_path, meta_path = self._paths(key)
+        tmp_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            df.to_parquet(tmp_path, compression=self.compression, index=False)
+            os.replace(tmp_path, data_path)
+            meta_path.write_text(json.dumps({
+                **(metadata or {}),
+                'rows': len(df),
+                'created_at': time.time()
+            }, default=str))
+        except Exception as e:
+            logger.warning(f"Failed to cache query result {key[:12]}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            with self._lock:
+                self.stats['write_failures'] += 1
+            return False
+
+        with self._lock:
+            self.stats['bytes_written'] += data_path.stat().st_size
+        self.evict()
+        return True
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def size_bytes(self) -> int:
+        """Total size of cached results on disk"""
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def evict(self) -> int:
+        """Evict least recently used entries until the cache fits max_bytes"""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        evicted = 0
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path.stem)
+            total -= stat.st_size
+            evicted += 1
+        if evicted:
+            logger.info(f"Query cache evicted {evicted} entries (now {total / 1024 ** 2:,.1f} MB)")
+            with self._lock:
+                self.stats['evictions'] += evicted
+        return evicted
+
+    def clear(self, older_than_seconds: Optional[float] = None) -> int:
+        """Remove cached results (optionally only those not used for a while)"""
+        cutoff = time.time() - older_than_seconds if older_than_seconds is not None else None
+        removed = 0
+        for path, stat in self._entries():
+            if cutoff is None or stat.st_mtime < cutoff:
+                self._remove(path.stem)
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/bytes metrics for this process plus the current cache size"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups * 100 if lookups else 0
+        stats['size_bytes'] = self.size_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+class TableVersionResolver:
+    """Looks up and memoizes last_modified times of BigQuery tables"""
+
+    def __init__(self, get_table: Callable[[str], Any], refresh_seconds: float = 60):
+        """
+        Args:
+            get_table: Callable returning a table object with a `modified` attribute
+            refresh_seconds: How long a looked-up version is trusted
+        """
+        self.get_table = get_table
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, table_id: Optional[str] = None):
+        """Forget a memoized version (e.g. after writing to the table)"""
+        with self._lock:
+            if table_id is None:
+                self._versions.clear()
+            else:
+                self._versions.pop(table_id.replace('`', ''), None)
+
+    def versions(self, tables: List[str]) -> Optional[Dict[str, str]]:
+        """
+        last_modified per table, or None if any table could not be resolved
+        (callers then fall back to time-based expiry)
+        """
+        now = time.time()
+        versions = {}
+        for table_id in tables:
+            with self._lock:
+                cached = self._versions.get(table_id)
+            if cached and now - cached[1] < self.refresh_seconds:
+                versions[table_id] = cached[0]
+                continue
+            if '*' in table_id:
+                return None
+            try:
+                modified = self.get_table(table_id).modified
+            except Exception as e:
+                logger.debug(f"Could not resolve version of {table_id}: {e}")
+                return None
+            version = modified.isoformat() if modified is not None else 'unknown'
+            with self._lock:
+                self._versions[table_id] = (version, now)
+            versions[table_id] = version
+        return versions
@@ -0,0 +1,238 @@
+"""
+Query Cost Guard Module
+Dry-runs BigQuery queries before execution and enforces bytes-billed budgets
+per query and per pipeline run
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.cloud import bigquery
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a query would exceed the per-query or per-run bytes budget"""
+
+    def __init__(self, query_name: str, bytes_estimate: int, limit: int, scope: str):
+        self.query_name = query_name
+        self.bytes_estimate = bytes_estimate
+        self.limit = limit
+        self.scope = scope
+        super().__init__(
+            f"[{query_name}] would scan {bytes_estimate / GB:,.2f} GB, "
+            f"exceeding the {scope} budget of {limit / GB:,.2f} GB"
+        )
+
+
+class QueryCostGuard:
+    """Pre-flight dry runs with per-query and per-run bytes budgets"""
+
+    def __init__(
+        self,
+        client: bigquery.Client,
+        max_gb_per_query: Optional[float] = None,
+        max_gb_per_run: Optional[float] = None,
+        on_exceed: str = "fail",
+        dry_run_workers: int = 8
+    ):
+        """
+        Initialize query cost guard
+
+        Args:
+            client: BigQuery client used for dry runs
+            max_gb_per_query: Largest scan allowed for a single query (also sent
+                to BigQuery as maximum_bytes_billed)
+            max_gb_per_run: Total scan allowed across one pipeline run
+            on_exceed: "fail" to raise QueryBudgetExceeded, or "fallback" to
+                route the query to a registered cheaper table first
+            dry_run_workers: Parallel dry runs in check_many()
+        """
+        if on_exceed not in ("fail", "fallback"):
+            raise ValueError(f"on_exceed must be 'fail' or 'fallback', got {on_exceed!r}")
+
+        self.client = client
+        self.max_bytes_per_query = int(max_gb_per_query * GB) if max_gb_per_query else None
+        self.max_bytes_per_run = int(max_gb_per_run * GB) if max_gb_per_run else None
+        self.on_exceed = on_exceed
+        self.dry_run_workers = dry_run_workers
+        self.lineage_tracker = None
+
+        # Cheaper substitutes for expensive tables, e.g. detailed -> summary
+        self.fallback_tables: Dict[str, str] = {}
+
+        self._lock = threading.Lock()
+        self.start_run()
+
+    def start_run(self):
+        """Reset the per-run budget (call at the start of each pipeline run)"""
+        with self._lock:
+            self.run_bytes = 0
+            self.records: List[Dict[str, Any]] = []
+
+    def register_fallback(self, table: str, substitute: str):
+        """Route queries on `table` to `substitute` when they exceed the budget"""
+        self.fallback_tables[table.replace('`', '')] = substitute.replace('`', '')
+
+    def estimate(self, query: str, query_parameters: Optional[List] = None) -> int:
+        """Bytes the query would process, from a BigQuery dry run"""
+        job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        if query_parameters:
+            job_config.query_parameters = query_parameters
+        job = self.client.query(query, job_config=job_config)
+        return int(job.total_bytes_processed or 0)
+
+    def job_config(self, job_config: Optional[bigquery.QueryJobConfig] = None) -> bigquery.QueryJobConfig:
+        """Job config with maximum_bytes_billed set to the per-query limit"""
+        job_config = job_config or bigquery.QueryJobConfig()
+        if self.max_bytes_per_query:
+            job_config.maximum_bytes_billed = self.max_bytes_per_query
+        return job_config
+
+    def _violation(self, bytes_estimate: int, reserved: int) -> Optional[Tuple[int, str]]:
+        if self.max_bytes_per_query and bytes_estimate > self.max_bytes_per_query:
+            return self.max_bytes_per_query, "per-query"
+        if self.max_bytes_per_run and reserved + bytes_estimate > self.max_bytes_per_run:
+            return self.max_bytes_per_run, "per-run"
+        return None
+
+    def _route(self, query: str) -> Optional[str]:
+        """Query rewritten onto fallback tables, or None if none apply"""
+        routed = query
+        for table, substitute in self.fallback_tables.items():
+            routed = routed.replace(f"`{table}`", f"`{substitute}`")
+        return routed if routed != query else None
+
+    def check(
+        self,
+        query: str,
+        query_name: str = "unnamed",
+        query_parameters: Optional[List] = None,
+        allow_fallback: bool = True
+    ) -> Tuple[str, int]:
+        """
+        Dry-run a query and reserve its bytes against the run budget
+
+        Args:
+            query: SQL to check
+            query_name: Name used in logs, tracking and lineage
+            query_parameters: Optional BigQuery query parameters
+            allow_fallback: Whether the query may be routed to fallback tables
+                (statements that write tables should not be)
+
+        Returns:
+            Tuple of (query to execute, estimated bytes); the query differs from
+            the input when it was routed to a fallback table
+
+        Raises:
+            QueryBudgetExceeded: If the query (or its fallback) is over budget
+        """
+        bytes_estimate = self.estimate(query, query_parameters)
+        routed_from = None
+
+        with self._lock:
+            violation = self._violation(bytes_estimate, self.run_bytes)
+        if violation and allow_fallback and self.on_exceed == "fallback":
+            routed = self._route(query)
+            if routed is not None:
+                try:
+                    routed_estimate = self.estimate(routed, query_parameters)
+                except Exception as e:
+                    logger.warning(f"[{query_name}] Fallback query failed dry run: {e}")
+                    routed = None
+            if routed is not None:
+                with self._lock:
+                    if self._violation(routed_estimate, self.run_bytes) is None:
+                        logger.warning(f"[{query_name}] {bytes_estimate / GB:,.2f} GB over budget; "
+                                     f"routed to fallback table ({routed_estimate / GB:,.2f} GB)")
+                        routed_from, query, bytes_estimate, violation = bytes_estimate, routed, routed_estimate, None
+
+        with self._lock:
+            if violation is None:
+                violation = self._violation(bytes_estimate, self.run_bytes)
+            if violation is None:
+                self.run_bytes += bytes_estimate
+            record = {
+                'name': query_name,
+                'bytes_processed_estimate': bytes_estimate,
+                'status': 'blocked' if violation else ('routed' if routed_from is not None else 'allowed'),
+                'run_bytes': self.run_bytes,
+                'timestamp': datetime.now().isoformat()
+            }
+            if routed_from is not None:
+                record['original_bytes_estimate'] = routed_from
+            self.records.append(record)
+
+        if self.lineage_tracker:
+            self.lineage_tracker.add_query_cost(query_name, bytes_estimate, record['status'])
+
+        if violation:
+            limit, scope = violation
+            raise QueryBudgetExceeded(query_name, bytes_estimate, limit, scope)
+
+        logger.debug(f"[{query_name}] dry run: {bytes_estimate / GB:,.3f} GB "
+                    f"(run total {self.run_bytes / GB:,.2f} GB)")
+        return query, bytes_estimate
+
+    def check_many(self, queries: Dict[str, str]) -> Dict[str, Tuple[str, int]]:
+        """
+        Check independent queries with parallel dry runs
+
+        All queries are checked before any is executed. If any check fails,
+        the bytes reserved by the others are released, so an over-budget
+        batch fails fast without spending anything.
+
+        Returns:
+            Mapping of query name -> (query to execute, estimated bytes)
+
+        Raises:
+            QueryBudgetExceeded: If any query is over budget (the first failure
+                in query order is raised)
+        """
+        if not queries:
+            return {}
+        with ThreadPoolExecutor(max_workers=self.dry_run_workers) as executor:
+            futures = {name: executor.submit(self.check, query, name) for name, query in queries.items()}
+
+        checked, error = {}, None
+        for name, future in futures.items():
+            try:
+                checked[name] = future.result()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            self._release(checked)
+            raise error
+        return checked
+
+    def _release(self, checked: Dict[str, Tuple[str, int]]):
+        """Give back the run budget reserved by checked queries that will not run"""
+        with self._lock:
+            for name, (_, bytes_estimate) in checked.items():
+                self.run_bytes -= bytes_estimate
+                for record in reversed(self.records):
+                    if record['name'] == name and record['status'] in ('allowed', 'routed'):
+                        record['status'] = 'released'
+                        break
+        logger.info(f"Released the run budget of {len(checked)} queries in a blocked batch")
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Bytes scanned (estimated) and budget status for the current run"""
+        with self._lock:
+            records = list(self.records)
+        return {
+            'run_bytes_estimate': self.run_bytes,
+            'run_gb_estimate': self.run_bytes / GB,
+            'max_gb_per_query': self.max_bytes_per_query / GB if self.max_bytes_per_query else None,
+            'max_gb_per_run': self.max_bytes_per_run / GB if self.max_bytes_per_run else None,
+            'queries_checked': len(records),
+            'queries_blocked': sum(1 for r in records if r['status'] == 'blocked'),
+            'queries_routed': sum(1 for r in records if r['status'] == 'routed'),
+            'queries': records
+        }
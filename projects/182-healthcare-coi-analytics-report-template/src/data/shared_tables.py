@@ -0,0 +1,220 @@
+"""
+Shared Tables Module
+Detailed and summary temp tables shared by several health systems
+
+The NPI rosters of all clients are uploaded into one NPI -> client mapping
+table, and each source table is scanned once for the union of the rosters;
+every output row carries the client it belongs to, clustered by client. The
+per-client tables the analyzers read are then cut from these shared tables
+(DataLoader.use_shared_tables), so source scan cost no longer grows with the
+number of clients.
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Tuple
+
+import pandas as pd
+from google.cloud import bigquery
+
+from .data_loader import DataLoader
+
+logger = logging.getLogger(__name__)
+
+TABLE_FAMILIES = ('open_payments', 'prescriptions')
+
+# Config keys that must match for health systems to share a scan
+SOURCE_KEYS = (
+    ('bigquery', 'project_id'),
+    ('bigquery', 'dataset'),
+    ('bigquery', 'temp_dataset'),
+    ('bigquery', 'tables', 'open_payments'),
+    ('bigquery', 'tables', 'prescriptions'),
+    ('analysis', 'start_year'),
+    ('analysis', 'end_year')
+)
+
+
+def source_signature(config: Dict) -> Tuple:
+    """Values of SOURCE_KEYS in a config (temp_dataset defaults to 'temp')"""
+    signature = []
+    for path in SOURCE_KEYS:
+        value = config
+        for key in path:
+            value = (value or {}).get(key)
+        if path == ('bigquery', 'temp_dataset'):
+            value = value or 'temp'
+        signature.append(value)
+    return tuple(signature)
+
+
+class SharedTables:
+    """Builds the client-tagged tables for the health systems of one source signature"""
+
+    def __init__(self, loader: DataLoader):
+        """
+        Initialize shared table builder
+
+        Args:
+            loader: DataLoader of any client in the group (provides the
+                source config, the query builders and the connector)
+        """
+        self.loader = loader
+        self.config = loader.config
+        self.bq = loader.bq
+
+        # Tables of different source signatures must not overwrite each other
+        digest = hashlib.sha256(repr(source_signature(self.config)).encode()).hexdigest()[:8]
+        self.prefix = f"batch_{digest}"
+        self.start_year = self.config['analysis']['start_year']
+        self.end_year = self.config['analysis']['end_year']
+        self.temp_dataset = self.config['bigquery'].get('temp_dataset', 'temp')
+
+    def _table_id(self, table_name: str) -> str:
+        return f"{self.config['bigquery']['project_id']}.{self.temp_dataset}.{table_name}"
+
+    @property
+    def mapping_table(self) -> str:
+        return f"{self.prefix}_client_npis"
+
+    def table_ids(self) -> Dict[str, Dict[str, str]]:
+        """Shared table ids by table family and grain"""
+        years = f"{self.start_year}_{self.end_year}"
+        return {
+            family: {grain: self._table_id(f"{self.prefix}_{family}_{grain}_{years}")
+                     for grain in ('detailed', 'summary')}
+            for family in TABLE_FAMILIES
+        }
+
+    @staticmethod
+    def roster_mapping(rosters: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Distinct (NPI, client) pairs of the client rosters"""
+        mapping = pd.concat(
+            [pd.DataFrame({'NPI': roster['NPI'].astype(str).str.strip(), 'client': client})
+             for client, roster in rosters.items()],
+            ignore_index=True
+        )
+        return mapping.drop_duplicates().sort_values(['client', 'NPI']).reset_index(drop=True)
+
+    @staticmethod
+    def mapping_hash(mapping: pd.DataFrame) -> str:
+        return hashlib.sha256(
+            pd.util.hash_pandas_object(mapping, index=False).to_numpy().tobytes()
+        ).hexdigest()
+
+    def build(self, rosters: Dict[str, pd.DataFrame], force_reload: bool = False) -> Dict[str, Dict[str, str]]:
+        """
+        Create (or reuse) the mapping table and the shared tables
+
+        The shared tables are reused while the combined roster is unchanged
+        and all of them exist.
+
+        Args:
+            rosters: {client short_name: provider NPI DataFrame}
+            force_reload: Rebuild even if the combined roster is unchanged
+
+        Returns:
+            Shared table ids by table family and grain
+        """
+        mapping = self.roster_mapping(rosters)
+        current_hash = self.mapping_hash(mapping)
+        tables = self.table_ids()
+
+        stored = self.loader._load_cache_metadata().get('shared_tables', {}).get(self.prefix, {})
+        tables_exist = all(
+            self.loader._table_exists(self.temp_dataset, table_id.rsplit('.', 1)[1])
+            for grains in tables.values() for table_id in grains.values()
+        )
+        if not force_reload and tables_exist and stored.get('mapping_hash') == current_hash:
+            logger.info(f"Using existing shared tables {self.prefix}_* for {len(rosters)} clients")
+            return tables
+
+        logger.info(f"Building shared tables for {len(rosters)} clients "
+                    f"({len(mapping):,} NPI-client pairs, {mapping['NPI'].nunique():,} distinct NPIs)")
+        self._upload_mapping(mapping)
+        row_counts = {}
+        for family in TABLE_FAMILIES:
+            row_counts.update(self._create_family(family, tables[family]))
+
+        metadata = self.loader._load_cache_metadata()
+        metadata.setdefault('shared_tables', {})[self.prefix] = {
+            'mapping_hash': current_hash,
+            'clients': sorted(rosters),
+            'tables': tables,
+            'row_counts': row_counts,
+            'created_at': datetime.now().isoformat()
+        }
+        self.loader._save_cache_metadata(metadata)
+
+        # Per-client partitions compare against the new last_modified times
+        self.bq.invalidate_table_versions()
+        return tables
+
+    def _upload_mapping(self, mapping: pd.DataFrame):
+        """Upload the NPI -> client mapping table"""
+        table_id = self._table_id(self.mapping_table)
+        job_config = bigquery.LoadJobConfig(
+            write_disposition="WRITE_TRUNCATE",
+            schema=[bigquery.SchemaField("NPI", "STRING"), bigquery.SchemaField("client", "STRING")]
+        )
+        job = self.bq.client.load_table_from_dataframe(mapping, table_id, job_config=job_config)
+        job.result()
+        self.bq.record_job(job, 'client_npis_upload', 'load')
+        logger.info(f"Uploaded {len(mapping):,} NPI-client pairs to {table_id}")
+
+    def _create_family(self, family: str, table_ids: Dict[str, str]) -> Dict[str, int]:
+        """Create the shared detailed table (one source scan) and its summary"""
+        mapping_path = f"`{self._table_id(self.mapping_table)}`"
+        detailed_path = f"`{table_ids['detailed']}`"
+        summary_path = f"`{table_ids['summary']}`"
+
+        # One scan for the union of the rosters; rows are then fanned out to every
+        # client listing the provider (detailed rows are per provider)
+        npi_source = f"(SELECT DISTINCT NPI FROM {mapping_path})"
+        if family == 'open_payments':
+            detailed_query = self.loader._open_payments_detailed_query(self.start_year, self.end_year, npi_source)
+            summary_query = self.loader._open_payments_summary_query(detailed_path, by_client=True)
+            provider_column = 'physician_id'
+        else:
+            detailed_query = self.loader._prescriptions_detailed_query(self.start_year, self.end_year, npi_source)
+            summary_query = self.loader._prescriptions_summary_query(detailed_path, by_client=True)
+            provider_column = 'NPI'
+
+        statements = [
+            (f'{family}_shared_detailed_create', detailed_path, f"""
+        CREATE OR REPLACE TABLE {detailed_path}
+        CLUSTER BY client
+        AS
+        SELECT m.client, d.*
+        FROM ({detailed_query}) d
+        INNER JOIN (SELECT DISTINCT CAST(NPI AS INT64) AS NPI, client FROM {mapping_path}) m
+            ON d.{provider_column} = m.NPI
+        """),
+            (f'{family}_shared_summary_create', summary_path, f"""
+        CREATE OR REPLACE TABLE {summary_path}
+        CLUSTER BY client
+        AS
+        {summary_query}
+        """)
+        ]
+
+        row_counts = {}
+        for query_name, table_path, sql in statements:
+            self.bq.execute(sql, query_name)
+            result = self.bq.run_job(f"SELECT COUNT(*) as count FROM {table_path}",
+                                     query_name.replace('_create', '_count')).result()
+            row_counts[table_path.strip('`')] = list(result)[0].count
+            logger.info(f"Created {table_path} with {row_counts[table_path.strip('`')]:,} rows")
+
+            if self.loader.lineage_tracker:
+                self.loader.lineage_tracker.add_intermediate_table(query_name.replace('_create', ''), {
+                    'table': table_path.strip('`'),
+                    'rows': row_counts[table_path.strip('`')],
+                    'derived_from': (f"{self.config['bigquery']['project_id']}.{self.config['bigquery']['dataset']}."
+                                     f"{self.config['bigquery']['tables'][family]}"),
+                    'date_range': f"{self.start_year}-{self.end_year}",
+                    'clients': self.mapping_table,
+                    'created_at': datetime.now().isoformat()
+                })
+        return row_counts
@@ -0,0 +1,326 @@
+"""
+Table Streaming Module
+Downloads large tables as Arrow record batches into partitioned Parquet
+
+BigQuery tables are read with the BigQuery Storage Read API: the column
+projection and row filter are pushed down to the read session, and the
+session's streams are read in parallel. On the DuckDB backend the same
+projection and filter run as a query whose result is fetched batch by batch.
+Batches are written to a hive-partitioned Parquet directory as they arrive,
+so memory stays bounded by a few batches rather than the whole table, and
+callers get a StreamedDataset: a lazy handle that reads back only the
+columns, rows and partitions they ask for.
+"""
+
+import base64
+import json
+import logging
+import queue
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "_manifest.json"
+
+# Nullable pandas dtypes, matching what bigquery's to_dataframe() returns
+_PANDAS_TYPES = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}
+
+# pandas/pyarrow style row filters: an Expression or DNF list of (column, op, value) tuples
+RowFilter = Union[ds.Expression, List[Tuple[str, str, Any]], List[List[Tuple[str, str, Any]]], None]
+
+
+class StreamedDataset:
+    """Lazy handle on a streamed Parquet directory"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a directory written by stream_table
+
+        Args:
+            path: Dataset directory (contains _manifest.json)
+        """
+        self.path = Path(path)
+        with open(self.path / MANIFEST_FILE) as f:
+            self.manifest = json.load(f)
+        self.schema = pa.ipc.read_schema(pa.py_buffer(base64.b64decode(self.manifest['schema'])))
+        self.partition_by = self.manifest.get('partition_by') or []
+        self._dataset = None
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> Optional['StreamedDataset']:
+        """Open a streamed dataset, or None if the directory has no manifest"""
+        try:
+            return cls(path)
+        except Exception:
+            return None
+
+    @property
+    def columns(self) -> List[str]:
+        return self.schema.names
+
+    @property
+    def num_rows(self) -> int:
+        return self.manifest['num_rows']
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        return self.iter_frames()
+
+    def dataset(self) -> ds.Dataset:
+        """Underlying pyarrow dataset (partition columns keep their source types)"""
+        if self._dataset is None:
+            partitioning = ds.partitioning(
+                pa.schema([self.schema.field(name) for name in self.partition_by]), flavor='hive'
+            ) if self.partition_by else None
+            self._dataset = ds.dataset(self.path, schema=self.schema, format='parquet',
+                                       partitioning=partitioning)
+        return self._dataset
+
+    @staticmethod
+    def _expression(filter: RowFilter) -> Optional[ds.Expression]:
+        if filter is None or isinstance(filter, ds.Expression):
+            return filter
+        return pq.filters_to_expression(filter)
+
+    def iter_batches(
+        self,
+        columns: Optional[List[str]] = None,
+        filter: RowFilter = None,
+        batch_size: int = 100_000
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Iterate over record batches
+
+        Args:
+            columns: Columns to read (default: all)
+            filter: Row filter; filters on partition columns skip whole files
+            batch_size: Maximum rows per batch
+        """
+        yield from self.dataset().to_batches(
+            columns=columns, filter=self._expression(filter), batch_size=batch_size
+        )
+
+    def iter_frames(
+        self,
+        columns: Optional[List[str]] = None,
+        filter: RowFilter = None,
+        batch_size: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """Iterate over DataFrame chunks (see iter_batches)"""
+        for batch in self.iter_batches(columns, filter, batch_size):
+            yield batch.to_pandas(types_mapper=_PANDAS_TYPES.get)
+
+    def to_pandas(self, columns: Optional[List[str]] = None, filter: RowFilter = None) -> pd.DataFrame:
+        """Materialize the (projected, filtered) dataset as one DataFrame"""
+        table = self.dataset().to_table(columns=columns, filter=self._expression(filter))
+        return table.to_pandas(types_mapper=_PANDAS_TYPES.get)
+
+    def count_rows(self, filter: RowFilter = None) -> int:
+        return self.dataset().count_rows(filter=self._expression(filter))
+
+
+def _interleave(iterators: List[Iterator], max_buffered: int) -> Iterator:
+    """Drain several iterators on background threads through a bounded queue"""
+    if len(iterators) <= 1:
+        for iterator in iterators:
+            yield from iterator
+        return
+
+    buffer = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def pump(iterator):
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    return
+                put(item)
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    threads = [threading.Thread(target=pump, args=(it,), daemon=True) for it in iterators]
+    for thread in threads:
+        thread.start()
+    remaining = len(threads)
+    try:
+        while remaining:
+            item = buffer.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+
+
+def _storage_read_batches(
+    client,
+    table_id: str,
+    columns: Optional[List[str]],
+    row_filter: Optional[str],
+    max_streams: int
+) -> Tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    """Open a Storage Read API session on a BigQuery table"""
+    try:
+        from google.cloud import bigquery_storage
+    except ImportError as e:
+        raise ImportError(
+            "Streaming BigQuery tables requires google-cloud-bigquery-storage "
+            "(pip install google-cloud-bigquery-storage)"
+        ) from e
+
+    project, dataset, table = table_id.replace('`', '').split('.')
+    read_client = bigquery_storage.BigQueryReadClient(credentials=getattr(client, '_credentials', None))
+    requested = bigquery_storage.types.ReadSession(
+        table=f"projects/{project}/datasets/{dataset}/tables/{table}",
+        data_format=bigquery_storage.types.DataFormat.ARROW,
+        read_options=bigquery_storage.types.ReadSession.TableReadOptions(
+            selected_fields=list(columns or []),
+            row_restriction=row_filter or ""
+        )
+    )
+    session = read_client.create_read_session(
+        parent=f"projects/{client.project}",
+        read_session=requested,
+        max_stream_count=max_streams
+    )
+    schema = pa.ipc.read_schema(pa.py_buffer(session.arrow_schema.serialized_schema))
+    logger.info(f"Read session on {table_id}: {len(session.streams)} streams, "
+                f"{session.estimated_total_bytes_scanned / 1024 ** 2:,.1f} MB to scan")
+
+    def read_stream(name):
+        for page in read_client.read_rows(name).rows(session).pages:
+            yield page.to_arrow()
+
+    batches = _interleave([read_stream(stream.name) for stream in session.streams], 2 * max_streams)
+    return schema, batches
+
+
+def read_arrow_batches(
+    client,
+    table_id: str,
+    columns: Optional[List[str]] = None,
+    row_filter: Optional[str] = None,
+    max_streams: int = 4,
+    batch_rows: int = 100_000
+) -> Tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    """
+    Arrow schema and record batch iterator for a (projected, filtered) table
+
+    Args:
+        client: bigquery.Client or DuckDBClient
+        table_id: project.dataset.table
+        columns: Columns to read (default: all)
+        row_filter: SQL boolean expression over the table's columns
+        max_streams: Parallel read streams (BigQuery)
+        batch_rows: Rows per batch (DuckDB; BigQuery pages are sized by the server)
+    """
+    if getattr(client, 'backend', 'bigquery') == 'duckdb':
+        return client.read_arrow_batches(table_id, columns, row_filter, batch_rows)
+    return _storage_read_batches(client, table_id, columns, row_filter, max_streams)
+
+
+def stream_table(
+    client,
+    table_id: str,
+    output_dir: Union[str, Path],
+    columns: Optional[List[str]] = None,
+    row_filter: Optional[str] = None,
+    partition_by: Optional[List[str]] = None,
+    max_streams: int = 4,
+    batch_rows: int = 100_000,
+    max_rows_per_file: int = 1_000_000,
+    source_version: Optional[str] = None
+) -> StreamedDataset:
+    """
+    Stream a table into a hive-partitioned Parquet directory
+
+    The directory is written next to output_dir and swapped in once complete,
+    so an interrupted download never leaves a partial dataset behind.
+
+    Args:
+        client: bigquery.Client or DuckDBClient
+        table_id: project.dataset.table
+        output_dir: Dataset directory (replaced)
+        columns: Columns to read (default: all)
+        row_filter: SQL boolean expression pushed down to the read
+        partition_by: Columns to partition files by (ignored if not projected)
+        max_streams: Parallel read streams (BigQuery)
+        batch_rows: Rows per batch (DuckDB)
+        max_rows_per_file: Rows per Parquet file within a partition
+        source_version: Source table version recorded in the manifest (for reuse checks)
+
+    Returns:
+        StreamedDataset on output_dir
+    """
+    output_dir = Path(output_dir)
+    partial_dir = output_dir.with_name(output_dir.name + '.partial')
+    shutil.rmtree(partial_dir, ignore_errors=True)
+
+    schema, batches = read_arrow_batches(client, table_id, columns, row_filter, max_streams, batch_rows)
+    partition_by = [name for name in (partition_by or []) if name in schema.names]
+
+    stats = {'rows': 0, 'batches': 0}
+
+    def counted():
+        for batch in batches:
+            stats['rows'] += batch.num_rows
+            stats['batches'] += 1
+            yield batch
+
+    ds.write_dataset(
+        pa.RecordBatchReader.from_batches(schema, counted()),
+        partial_dir,
+        format='parquet',
+        partitioning=ds.partitioning(
+            pa.schema([schema.field(name) for name in partition_by]), flavor='hive'
+        ) if partition_by else None,
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+        max_rows_per_file=max_rows_per_file,
+        max_rows_per_group=min(max_rows_per_file, 128 * 1024),
+        existing_data_behavior='overwrite_or_ignore'
+    )
+
+    manifest = {
+        'source_table': table_id.replace('`', ''),
+        'source_version': source_version,
+        'columns': columns,
+        'row_filter': row_filter,
+        'partition_by': partition_by,
+        'num_rows': stats['rows'],
+        'num_batches': stats['batches'],
+        'schema': base64.b64encode(schema.serialize().to_pybytes()).decode('ascii'),
+        'created': datetime.now().isoformat()
+    }
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    with open(partial_dir / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    partial_dir.rename(output_dir)
+    logger.info(f"Streamed {stats['rows']:,} rows ({stats['batches']} batches) from {table_id} to {output_dir}")
+    return StreamedDataset(output_dir)
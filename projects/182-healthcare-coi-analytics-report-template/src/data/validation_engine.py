@@ -0,0 +1,254 @@
+"""
+Columnar Validation Engine
+Single-pass data quality statistics over DataFrames and Arrow record batches
+
+Every batch is converted to Arrow once; null, zero, negative, min/max, range
+and NPI check-digit statistics for all columns are accumulated from the
+column arrays with Arrow compute kernels, so a chunked Parquet extract is
+validated batch by batch without materializing it as a DataFrame. Checks that
+need the whole column (IQR outliers, duplicate ids) keep only the numeric
+values or ids they need and are resolved when the result is requested.
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+# Shared NPI check-digit kernel: the validation package in the repository's src
+REPO_SRC = str(Path(__file__).resolve().parents[4] / "src")
+if REPO_SRC not in sys.path:
+    sys.path.append(REPO_SRC)
+from validation.npi import NPI_LENGTH, digits_from_codes, luhn_valid, valid_npis
+
+logger = logging.getLogger(__name__)
+
+Batch = Union[pa.RecordBatch, pa.Table, pd.DataFrame]
+
+# Derived per-batch arrays that are range checked but not profiled
+Derivation = Callable[[pa.Table], pa.Array]
+
+
+def _to_table(batch: Batch) -> pa.Table:
+    if isinstance(batch, pa.Table):
+        return batch
+    if isinstance(batch, pa.RecordBatch):
+        return pa.Table.from_batches([batch])
+
+    arrays = {}
+    for col in batch.columns:
+        try:
+            arrays[str(col)] = pa.array(batch[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type object columns are profiled as text
+            arrays[str(col)] = pa.array(batch[col].astype('string'), from_pandas=True)
+    return pa.table(arrays)
+
+
+def _valid_npi_strings(values: pa.Array) -> np.ndarray:
+    """NPI check of a string array, reading the 10-byte values straight from its data buffer"""
+    valid = np.zeros(len(values), dtype=bool)
+    candidates = np.flatnonzero(pc.equal(pc.binary_length(values), NPI_LENGTH).to_numpy(zero_copy_only=False))
+    if len(candidates) == 0:
+        return valid
+
+    # Offsets of the filtered array are exactly NPI_LENGTH bytes apart
+    subset = values.take(pa.array(candidates))
+    offsets = np.frombuffer(subset.buffers()[1], dtype=np.int32)[subset.offset:subset.offset + len(subset) + 1]
+    codes = np.frombuffer(subset.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]].reshape(-1, NPI_LENGTH)
+    digits, well_formed = digits_from_codes(codes)
+    valid[candidates] = well_formed & luhn_valid(digits)
+    return valid
+
+
+def iter_batches(source: Any, batch_size: int = 250_000) -> Iterator[Batch]:
+    """
+    Batches of a DataFrame, Arrow table, StreamedDataset or Parquet path
+
+    Args:
+        source: DataFrame / pa.Table / StreamedDataset / Parquet file or directory
+        batch_size: Rows per batch for Parquet sources
+    """
+    if isinstance(source, (pd.DataFrame, pa.RecordBatch)):
+        yield source
+    elif isinstance(source, pa.Table):
+        yield from source.to_batches(max_chunksize=batch_size)
+    elif hasattr(source, 'iter_batches'):
+        yield from source.iter_batches(batch_size=batch_size)
+    else:
+        yield from ds.dataset(str(source), format='parquet').to_batches(batch_size=batch_size)
+
+
+def is_numeric_type(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type)
+
+
+def is_datetime_type(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type)
+
+
+class ColumnarValidator:
+    """Accumulates column statistics batch by batch"""
+
+    def __init__(
+        self,
+        id_columns: Optional[List[str]] = None,
+        npi_columns: Optional[List[str]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        derived: Optional[Dict[str, Derivation]] = None,
+        outliers: bool = True
+    ):
+        """
+        Initialize validator
+
+        Args:
+            id_columns: Columns whose duplicate values are counted
+            npi_columns: Columns whose distinct values are NPI check-digit validated
+            ranges: {column: (low, high)} - values outside count as violations
+                (column may also name a derived array)
+            derived: {name: function(batch table) -> array} computed per batch
+                for range checks only (e.g. cost per claim)
+            outliers: Count IQR outliers of numeric columns (keeps their values)
+        """
+        self.id_columns = list(id_columns or [])
+        self.npi_columns = list(npi_columns or [])
+        self.ranges = dict(ranges or {})
+        self.derived = dict(derived or {})
+        self.outliers = outliers
+
+        self.rows = 0
+        self.schema: Optional[pa.Schema] = None
+        self.dtypes: Dict[str, str] = {}
+        self.null_counts: Dict[str, int] = {}
+        self.zero_counts: Dict[str, int] = {}
+        self.negative_counts: Dict[str, int] = {}
+        self.minimum: Dict[str, Any] = {}
+        self.maximum: Dict[str, Any] = {}
+        self.range_violations: Dict[str, int] = {}
+        self._numeric_values: Dict[str, List[np.ndarray]] = {}
+        self._id_values: Dict[str, List[pa.Array]] = {}
+        self._invalid_npis: Dict[str, List[pa.Array]] = {name: [] for name in self.npi_columns}
+
+    def update(self, batch: Batch) -> 'ColumnarValidator':
+        """Add one batch to the statistics"""
+        pandas_dtypes = {str(col): str(dtype) for col, dtype in batch.dtypes.items()} \
+            if isinstance(batch, pd.DataFrame) else {}
+        table = _to_table(batch)
+        if self.schema is None:
+            self.schema = table.schema
+            self.dtypes = {name: pandas_dtypes.get(name, str(table.schema.field(name).type))
+                           for name in table.column_names}
+        self.rows += table.num_rows
+
+        for name in table.column_names:
+            column = table.column(name)
+            self.null_counts[name] = self.null_counts.get(name, 0) + column.null_count
+
+            if is_numeric_type(column.type):
+                self._numeric(name, column)
+            if name in self.id_columns:
+                self._id_values.setdefault(name, []).extend(column.chunks)
+            if name in self._invalid_npis:
+                self._npis(name, column)
+            if name in self.ranges:
+                self._range(name, column)
+
+        for name, derive in self.derived.items():
+            if name in self.ranges:
+                self._range(name, derive(table))
+        return self
+
+    def _numeric(self, name: str, column: pa.ChunkedArray):
+        if pa.types.is_floating(column.type):
+            # NaN is missing in pandas terms
+            nans = pc.sum(pc.is_nan(column)).as_py() or 0
+            self.null_counts[name] += nans
+        zeros = pc.sum(pc.equal(column, 0)).as_py() or 0
+        negatives = pc.sum(pc.less(column, 0)).as_py() or 0
+        self.zero_counts[name] = self.zero_counts.get(name, 0) + zeros
+        self.negative_counts[name] = self.negative_counts.get(name, 0) + negatives
+
+        bounds = pc.min_max(column)
+        low, high = bounds['min'].as_py(), bounds['max'].as_py()
+        if low is not None:
+            self.minimum[name] = low if name not in self.minimum else min(self.minimum[name], low)
+            self.maximum[name] = high if name not in self.maximum else max(self.maximum[name], high)
+
+        if self.outliers:
+            values = pc.drop_null(column).to_numpy().astype(np.float64)
+            self._numeric_values.setdefault(name, []).append(values[~np.isnan(values)])
+
+    def _npis(self, name: str, column: pa.ChunkedArray):
+        distinct = pc.unique(pc.drop_null(column))
+        if pa.types.is_string(distinct.type) or pa.types.is_binary(distinct.type):
+            valid = _valid_npi_strings(distinct)
+        else:
+            valid = valid_npis(distinct.to_numpy(zero_copy_only=False))
+        self._invalid_npis[name].append(distinct.filter(pa.array(~valid)))
+
+    def _range(self, name: str, values: Union[pa.Array, pa.ChunkedArray]):
+        low, high = self.ranges[name]
+        outside = None
+        if low is not None:
+            outside = pc.less(values, low)
+        if high is not None:
+            above = pc.greater(values, high)
+            outside = above if outside is None else pc.or_(outside, above)
+        if outside is not None:
+            count = pc.sum(outside).as_py() or 0
+            self.range_violations[name] = self.range_violations.get(name, 0) + count
+
+    def duplicates(self, name: str) -> int:
+        """Rows repeating an earlier value of an id column (nulls count as one value)"""
+        chunks = self._id_values.get(name)
+        if not chunks:
+            return 0
+        values = pa.chunked_array(chunks)
+        return len(values) - pc.count_distinct(values, mode='all').as_py()
+
+    def invalid_npis(self, name: str) -> List[Any]:
+        """Distinct values of an NPI column that fail the check-digit test"""
+        chunks = self._invalid_npis.get(name)
+        if not chunks:
+            return []
+        return pc.unique(pa.chunked_array(chunks)).to_pylist()
+
+    def quality(self) -> Dict[str, Any]:
+        """Null, zero, negative and IQR outlier counts (DataValidator quality format)"""
+        quality = {
+            'null_counts': {name: count for name, count in self.null_counts.items() if count > 0},
+            'zero_counts': {name: count for name, count in self.zero_counts.items() if count > 0},
+            'negative_counts': {name: count for name, count in self.negative_counts.items() if count > 0},
+            'outliers': {}
+        }
+
+        for name, chunks in self._numeric_values.items():
+            values = np.concatenate(chunks) if chunks else np.empty(0)
+            if len(values) == 0:
+                continue
+            q1, q3 = np.quantile(values, [0.25, 0.75])
+            iqr = q3 - q1
+            lower_bound, upper_bound = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            outliers = int(np.count_nonzero((values < lower_bound) | (values > upper_bound)))
+            if outliers > 0:
+                quality['outliers'][name] = {
+                    'count': outliers,
+                    'lower_bound': float(lower_bound),
+                    'upper_bound': float(upper_bound)
+                }
+        return quality
+
+
+def validate_batches(batches: Iterable[Batch], **options) -> ColumnarValidator:
+    """Run a ColumnarValidator over batches (options as ColumnarValidator)"""
+    validator = ColumnarValidator(**options)
+    for batch in batches:
+        validator.update(batch)
+    logger.debug(f"Validated {validator.rows:,} rows")
+    return validator
@@ -3,11 +3,13 @@
 from .report_generator import ReportGenerator
 from .visualizations import VisualizationGenerator
 from .llm_client import ClaudeLLMClient
+from .narrative_cache import NarrativeCache
 from .data_mapper import SectionDataMapper
 
 __all__ = [
     'ReportGenerator', 
     'VisualizationGenerator',
     'ClaudeLLMClient',
+    'NarrativeCache',
     'SectionDataMapper'
 ]
\ No newline at end of file
@@ -43,7 +43,8 @@ class SectionDataMapper:
             data_map['payment_distribution'] = op.get('payment_distribution', {})
             data_map['consecutive_years'] = op.get('consecutive_years', pd.DataFrame())
             data_map['consecutive_year_stats'] = self._calculate_consecutive_year_stats(
-                op.get('consecutive_years', pd.DataFrame())
+                op.get('consecutive_years', pd.DataFrame()),
+                op.get('provider_tenure')
             )
         
         # Prescription mappings
@@ -172,8 +173,24 @@ class SectionDataMapper:
         
         return section_data
     
-    def _calculate_consecutive_year_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_consecutive_year_stats(
+        self,
+        df: pd.DataFrame,
+        tenure: Optional[pd.DataFrame] = None
+    ) -> Dict[str, Any]:
         """Calculate statistics for consecutive year payments"""
+        if tenure is not None and not tenure.empty:
+            # Per-provider tenure features (OpenPaymentsAnalyzer.provider_tenure)
+            period_years = int(tenure['last_year'].max() - tenure['first_year'].min() + 1)
+            all_years = tenure['longest_streak'] >= period_years
+            return {
+                'providers_all_years': int(all_years.sum()),
+                'average_total': float(tenure.loc[all_years, 'total_received'].mean()) if all_years.any() else 0,
+                'max_consecutive': int(tenure['longest_streak'].max()),
+                'avg_longest_streak': float(tenure['longest_streak'].mean()),
+                'providers_with_gaps': int((tenure['gap_years'] > 0).sum())
+            }
+        
         if df.empty:
             return {'providers_all_years': 0, 'average_total': 0}
         
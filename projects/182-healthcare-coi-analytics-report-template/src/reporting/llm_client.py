@@ -10,7 +10,9 @@ from typing import Dict, Any, Optional, List
 import pandas as pd
 from anthropic import Anthropic
 from dotenv import load_dotenv
+import threading
 import time
+from .narrative_cache import NarrativeCache
 
 # Load environment variables
 load_dotenv()
@@ -21,29 +23,44 @@ logger = logging.getLogger(__name__)
 class ClaudeLLMClient:
     """Client for interacting with Claude API for report generation"""
     
-    def __init__(self, model: str = "claude-sonnet-4-20250514"):
+    def __init__(self, model: str = "claude-sonnet-4-20250514", cache: Optional[NarrativeCache] = None):
         """
         Initialize Claude client
         
         Args:
             model: Claude model to use
+            cache: Narrative cache consulted before each API call (None disables caching)
         """
-        api_key = os.getenv('CLAUDE_API_KEY')
-        if not api_key:
+        self.api_key = os.getenv('CLAUDE_API_KEY')
+        if not self.api_key and cache is None:
             raise ValueError("CLAUDE_API_KEY not found in environment")
         
-        self.client = Anthropic(api_key=api_key)
+        # Created on first API call, so fully cached reports need no API key
+        self._client = None
+        self._client_lock = threading.Lock()
         self.model = model
+        self.cache = cache
         self.max_retries = 3
         self.retry_delay = 2
         
         logger.info(f"Initialized Claude LLM client with model: {model}")
     
+    @property
+    def client(self) -> Anthropic:
+        """Anthropic API client"""
+        with self._client_lock:
+            if self._client is None:
+                if not self.api_key:
+                    raise ValueError("CLAUDE_API_KEY not found in environment")
+                self._client = Anthropic(api_key=self.api_key)
+            return self._client
+    
     def generate_section(
         self,
         section_config: Dict[str, Any],
         section_data: Dict[str, Any],
-        previous_sections: Optional[Dict[str, str]] = None
+        previous_sections: Optional[Dict[str, str]] = None,
+        refresh: bool = False
     ) -> str:
         """
         Generate narrative for a report section
@@ -52,6 +69,7 @@ class ClaudeLLMClient:
             section_config: Configuration for this section from prompts YAML
             section_data: Data required for this section
             previous_sections: Previously generated sections (for context)
+            refresh: Call the API even if a cached narrative exists (the result is still cached)
             
         Returns:
             Generated narrative text
@@ -116,13 +134,31 @@ class ClaudeLLMClient:
         
         Remember: Compelling narrative using ONLY real data. No fiction, no estimates, no guesses."""
         
+        max_tokens = section_config.get('constraints', {}).get('max_length', 500) * 4  # Approximate tokens
+        temperature = 0.1
+        
+        # Reuse the narrative of an identical request
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(
+                self.model,
+                section_config['prompt'],
+                formatted_data + sections_summary,
+                {'system': system_message, 'max_tokens': max_tokens, 'temperature': temperature}
+            )
+            if not refresh:
+                narrative = self.cache.get(cache_key)
+                if narrative is not None:
+                    logger.info(f"Reusing cached narrative for {section_config.get('context', 'section')} ({cache_key[:12]})")
+                    return narrative
+        
         # Generate with retries
         for attempt in range(self.max_retries):
             try:
                 response = self.client.messages.create(
                     model=self.model,
-                    max_tokens=section_config.get('constraints', {}).get('max_length', 500) * 4,  # Approximate tokens
-                    temperature=0.1,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
                     system=system_message,
                     messages=[
                         {"role": "user", "content": prompt}
@@ -132,6 +168,8 @@ class ClaudeLLMClient:
                 narrative = response.content[0].text
                 logger.info(f"Generated {section_config.get('context', 'section')} ({len(narrative)} chars)")
                 
+                if cache_key is not None:
+                    self.cache.put(cache_key, narrative, section=section_config.get('context'), model=self.model)
                 return narrative
                 
             except Exception as e:
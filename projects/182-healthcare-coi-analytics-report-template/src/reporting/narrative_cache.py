@@ -0,0 +1,100 @@
+"""
+Narrative Cache Module
+On-disk cache of LLM-generated section narratives
+
+A narrative is keyed by the model, the generation settings, the system
+message, the section's prompt template and a hash of the data rendered into
+it. Rerunning a report over unchanged analysis results, or regenerating a
+single section, returns the stored narrative without an API call.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class NarrativeCache:
+    """JSON files of generated narratives keyed by prompt and data hash"""
+
+    def __init__(self, cache_dir: str = "data/cache/narratives"):
+        """
+        Initialize narrative cache
+
+        Args:
+            cache_dir: Directory for cached narratives
+        """
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, prompt_template: str, prompt_data: str, settings: Dict[str, Any]) -> str:
+        """
+        Cache key of a section narrative
+
+        Args:
+            model: Model name
+            prompt_template: Section prompt from section_prompts.yaml
+            prompt_data: Data (and previous section summary) rendered into the prompt
+            settings: Remaining generation inputs (system message, max_tokens, temperature)
+        """
+        return _sha256(json.dumps({
+            'model': model,
+            'prompt': _sha256(prompt_template),
+            'data': _sha256(prompt_data),
+            'settings': settings
+        }, sort_keys=True, default=str))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached narrative or None"""
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            self.hits += 1
+            return entry['narrative']
+        except Exception as e:
+            logger.warning(f"Discarding unreadable narrative cache entry {key[:12]}: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, narrative: str, section: Optional[str] = None, model: Optional[str] = None):
+        """Store a narrative"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename: sections are generated concurrently
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'section': section,
+                'model': model,
+                'narrative': narrative,
+                'created_at': datetime.now().isoformat()
+            }, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def clear(self) -> int:
+        """Remove all cached narratives; returns the number removed"""
+        removed = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
@@ -10,8 +10,10 @@ from typing import Dict, List, Optional, Any
 import logging
 from datetime import datetime
 import yaml
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from jinja2 import Environment, FileSystemLoader
 from .llm_client import ClaudeLLMClient
+from .narrative_cache import NarrativeCache
 from .data_mapper import SectionDataMapper
 
 logger = logging.getLogger(__name__)
@@ -224,57 +226,62 @@ class ReportGenerator:
             prompts_config = yaml.safe_load(f)
         
         # Initialize LLM client and data mapper
-        llm_client = ClaudeLLMClient()
+        llm_settings = self.config.get('reports', {}).get('llm', {})
+        cache_settings = llm_settings.get('narrative_cache', {})
+        cache = NarrativeCache(cache_settings.get('cache_dir', 'data/cache/narratives')) \
+            if cache_settings.get('enabled', True) else None
+        llm_client = ClaudeLLMClient(cache=cache)
         data_mapper = SectionDataMapper(self.report_data)
         
-        # Process sections in order
-        generated_sections = {}
+        # Sections that don't build on earlier narratives are generated concurrently
         section_order = prompts_config.get('section_order', [])
+        dependencies = self._section_dependencies(prompts_config, section_order)
+        max_workers = max(1, llm_settings.get('max_concurrent_sections', 4))
         
-        for section_name in section_order:
-            if section_name == 'executive_summary':
-                # Skip executive summary for now, generate it last
-                continue
-            
+        generated_sections = {}
+        pending = list(section_order)
+        running = {}
+        
+        def submit(section_name):
             logger.info(f"Generating section: {section_name}")
             
             # Get section configuration
             section_config = prompts_config.get(section_name, {})
             
-            # Get required data for this section
+            # Get required data for this section (mapped here, not on the worker threads)
             required_data = section_config.get('data_required', [])
             section_data = data_mapper.get_section_data(section_name, required_data)
             
-            # Generate narrative for this section
-            try:
-                narrative = llm_client.generate_section(
-                    section_config,
-                    section_data,
-                    previous_sections=generated_sections
-                )
-                generated_sections[section_name] = narrative
-            except Exception as e:
-                logger.error(f"Failed to generate {section_name}: {e}")
-                # Fallback to template-based generation
-                generated_sections[section_name] = self._generate_fallback_section(section_name)
-        
-        # Generate executive summary last with all sections complete
-        logger.info("Generating executive summary")
-        exec_config = prompts_config.get('executive_summary', {})
-        exec_data = data_mapper.get_section_data('executive_summary', exec_config.get('data_required', []))
-        
-        # Add all section summaries to exec data
-        exec_data['all_section_summaries'] = generated_sections
-        
-        try:
-            executive_summary = llm_client.generate_section(
-                exec_config,
-                exec_data,
-                previous_sections=generated_sections
-            )
-        except Exception as e:
-            logger.error(f"Failed to generate executive summary: {e}")
-            executive_summary = self._generate_fallback_executive_summary()
+            previous_sections = {name: generated_sections[name] for name in dependencies[section_name]}
+            if 'all_section_summaries' in required_data:
+                section_data['all_section_summaries'] = previous_sections
+            
+            running[executor.submit(
+                llm_client.generate_section, section_config, section_data, previous_sections=previous_sections
+            )] = section_name
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                for section_name in [name for name in pending
+                                     if all(dep in generated_sections for dep in dependencies[name])]:
+                    pending.remove(section_name)
+                    submit(section_name)
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    section_name = running.pop(future)
+                    try:
+                        generated_sections[section_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to generate {section_name}: {e}")
+                        # Fallback to template-based generation
+                        generated_sections[section_name] = self._generate_fallback_executive_summary() \
+                            if section_name == 'executive_summary' else self._generate_fallback_section(section_name)
+        
+        if cache is not None:
+            logger.info(f"Narrative cache: {cache.hits} reused, {cache.misses} generated")
+        
+        executive_summary = generated_sections.get('executive_summary') or self._generate_fallback_executive_summary()
         
         # Assemble final report
         report_parts = [
@@ -309,6 +316,24 @@ class ReportGenerator:
         
         return "\n".join(report_parts)
     
+    def _section_dependencies(self, prompts_config: Dict[str, Any], section_order: List[str]) -> Dict[str, List[str]]:
+        """
+        Earlier sections each section's prompt builds on
+        
+        A section depends on every section before it when its prompt references
+        {previous_sections} or it requires all_section_summaries; all other
+        sections are independent of each other.
+        """
+        dependencies = {}
+        for position, section_name in enumerate(section_order):
+            section_config = prompts_config.get(section_name, {})
+            if '{previous_sections}' in section_config.get('prompt', '') \
+                    or 'all_section_summaries' in section_config.get('data_required', []):
+                dependencies[section_name] = [name for name in section_order[:position] if name != section_name]
+            else:
+                dependencies[section_name] = []
+        return dependencies
+    
     def _generate_fallback_section(self, section_name: str) -> str:
         """Generate fallback content when LLM fails"""
         return f"[Section {section_name} - Data analysis in progress]"
@@ -1,6 +1,10 @@
 """
 Visualization Generator Module
 Creates charts and graphs for reports
+
+Each chart is an independent task (name, render method, input data). Charts
+whose input data and style are unchanged since they were last written are
+skipped, and the remaining charts are rendered in a process pool.
 """
 
 import pandas as pd
@@ -9,7 +13,14 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
+import hashlib
+import inspect
+import json
 import logging
+import os
+import pickle
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -19,19 +30,64 @@ sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 plt.rcParams['font.size'] = 10
 
+MANIFEST_FILE = ".chart_manifest.json"
+
+# (chart name, render method, input data)
+ChartTask = Tuple[str, str, Any]
+
+# Methods every render method goes through; their code is part of each chart's fingerprint
+RENDER_HELPERS = ('_save', '_figure_path')
+
+
+def _read_manifest(output_dir: Path) -> Dict[str, str]:
+    """Chart name -> fingerprint of the figures written to output_dir"""
+    try:
+        with open(output_dir / MANIFEST_FILE) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _render_chart(settings: Dict[str, Any], method: str, data: Any) -> Optional[str]:
+    """Render one chart in a worker process"""
+    generator = VisualizationGenerator(**settings)
+    return getattr(generator, method)(data)
+
 
 class VisualizationGenerator:
     """Generate visualizations for healthcare COI analysis"""
     
-    def __init__(self, output_dir: str = "reports/figures"):
+    def __init__(
+        self,
+        output_dir: str = "reports/figures",
+        dpi: int = 300,
+        chart_format: str = "png",
+        draft: bool = False,
+        draft_dpi: int = 72,
+        max_workers: Optional[int] = None,
+        skip_unchanged: bool = True
+    ):
         """
         Initialize visualization generator
         
         Args:
             output_dir: Directory to save generated figures
+            dpi: Resolution of saved figures
+            chart_format: Image format (file extension)
+            draft: Lightweight rendering - low resolution, no layout tightening,
+                value labels or heatmap annotations
+            draft_dpi: Resolution of draft figures
+            max_workers: Render processes (None = CPU count, 1 = render serially)
+            skip_unchanged: Skip charts whose data and style match the written figure
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self.chart_format = chart_format
+        self.draft = draft
+        self.draft_dpi = draft_dpi
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.skip_unchanged = skip_unchanged
         
         # Conflixis color palette
         self.colors = {
@@ -44,6 +100,20 @@ class VisualizationGenerator:
             'gradient': ['#0c343a', '#1a4d55', '#2a6670', '#4c94ed', '#eab96d']
         }
     
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]], output_dir: str = "reports/figures") -> 'VisualizationGenerator':
+        """Generator configured from the reports.visualizations settings"""
+        settings = settings or {}
+        return cls(
+            output_dir=output_dir,
+            dpi=settings.get('chart_dpi', 300),
+            chart_format=settings.get('chart_format', 'png'),
+            draft=settings.get('draft', False),
+            draft_dpi=settings.get('draft_dpi', 72),
+            max_workers=settings.get('max_workers'),
+            skip_unchanged=settings.get('skip_unchanged', True)
+        )
+    
     def generate_all_visualizations(self, analysis_results: Dict[str, Any]) -> List[str]:
         """
         Generate all standard visualizations
@@ -54,116 +124,250 @@ class VisualizationGenerator:
         Returns:
             List of paths to generated figures
         """
-        figures = []
+        charts = []
         
         # Open Payments visualizations
         if 'open_payments' in analysis_results:
-            figures.extend(self.generate_payment_visualizations(analysis_results['open_payments']))
+            charts.extend(self._payment_charts(analysis_results['open_payments']))
         
         # Prescription visualizations
         if 'prescriptions' in analysis_results:
-            figures.extend(self.generate_prescription_visualizations(analysis_results['prescriptions']))
+            charts.extend(self._prescription_charts(analysis_results['prescriptions']))
         
         # Correlation visualizations
         if 'correlations' in analysis_results:
-            figures.extend(self.generate_correlation_visualizations(analysis_results['correlations']))
+            charts.extend(self._correlation_charts(analysis_results['correlations']))
         
         # Risk visualizations
         if 'risk_assessment' in analysis_results:
-            figures.extend(self.generate_risk_visualizations(analysis_results['risk_assessment']))
+            charts.extend(self._risk_charts(analysis_results['risk_assessment']))
+        
+        figures = self.render_charts(charts)
         
         logger.info(f"Generated {len(figures)} visualizations")
         return figures
     
     def generate_payment_visualizations(self, payment_data: Dict[str, Any]) -> List[str]:
         """Generate Open Payments visualizations"""
-        figures = []
+        return self.render_charts(self._payment_charts(payment_data))
+    
+    def generate_prescription_visualizations(self, rx_data: Dict[str, Any]) -> List[str]:
+        """Generate prescription visualizations"""
+        return self.render_charts(self._prescription_charts(rx_data))
+    
+    def generate_correlation_visualizations(self, corr_data: Dict[str, Any]) -> List[str]:
+        """Generate correlation visualizations"""
+        return self.render_charts(self._correlation_charts(corr_data))
+    
+    def generate_risk_visualizations(self, risk_data: Dict[str, Any]) -> List[str]:
+        """Generate risk assessment visualizations"""
+        return self.render_charts(self._risk_charts(risk_data))
+    
+    def _payment_charts(self, payment_data: Dict[str, Any]) -> List[ChartTask]:
+        """Open Payments chart tasks"""
+        charts = []
         
         # Payment distribution histogram
         if 'payment_distribution' in payment_data:
-            fig_path = self._create_payment_distribution_chart(payment_data['payment_distribution'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('payment_distribution', '_create_payment_distribution_chart',
+                           payment_data['payment_distribution']))
         
         # Yearly trends line chart
         if 'yearly_trends' in payment_data and not payment_data['yearly_trends'].empty:
-            fig_path = self._create_yearly_trends_chart(payment_data['yearly_trends'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('yearly_trends', '_create_yearly_trends_chart', payment_data['yearly_trends']))
         
         # Top manufacturers bar chart
         if 'top_manufacturers' in payment_data and not payment_data['top_manufacturers'].empty:
-            fig_path = self._create_manufacturers_chart(payment_data['top_manufacturers'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('top_manufacturers', '_create_manufacturers_chart', payment_data['top_manufacturers']))
         
         # Payment categories pie chart
         if 'payment_categories' in payment_data and not payment_data['payment_categories'].empty:
-            fig_path = self._create_categories_pie_chart(payment_data['payment_categories'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('payment_categories', '_create_categories_pie_chart', payment_data['payment_categories']))
         
-        return figures
+        return charts
     
-    def generate_prescription_visualizations(self, rx_data: Dict[str, Any]) -> List[str]:
-        """Generate prescription visualizations"""
-        figures = []
+    def _prescription_charts(self, rx_data: Dict[str, Any]) -> List[ChartTask]:
+        """Prescription chart tasks"""
+        charts = []
         
         # Top drugs bar chart
         if 'top_drugs' in rx_data and not rx_data['top_drugs'].empty:
-            fig_path = self._create_top_drugs_chart(rx_data['top_drugs'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('top_drugs', '_create_top_drugs_chart', rx_data['top_drugs']))
         
         # Prescription trends over time
         if 'yearly_trends' in rx_data and not rx_data['yearly_trends'].empty:
-            fig_path = self._create_rx_trends_chart(rx_data['yearly_trends'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('rx_trends', '_create_rx_trends_chart', rx_data['yearly_trends']))
         
-        return figures
+        return charts
     
-    def generate_correlation_visualizations(self, corr_data: Dict[str, Any]) -> List[str]:
-        """Generate correlation visualizations"""
-        figures = []
+    def _correlation_charts(self, corr_data: Dict[str, Any]) -> List[ChartTask]:
+        """Correlation chart tasks"""
+        charts = []
         
         # Influence factors bar chart
         if 'drug_specific' in corr_data and not corr_data['drug_specific'].empty:
-            fig_path = self._create_influence_factors_chart(corr_data['drug_specific'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('influence_factors', '_create_influence_factors_chart', corr_data['drug_specific']))
         
         # Payment tier effects
         if 'payment_tiers' in corr_data and not corr_data['payment_tiers'].empty:
-            fig_path = self._create_payment_tier_chart(corr_data['payment_tiers'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('payment_tier_effects', '_create_payment_tier_chart', corr_data['payment_tiers']))
         
         # Provider vulnerability comparison
         if 'provider_type_vulnerability' in corr_data and not corr_data['provider_type_vulnerability'].empty:
-            fig_path = self._create_vulnerability_chart(corr_data['provider_type_vulnerability'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('provider_vulnerability', '_create_vulnerability_chart',
+                           corr_data['provider_type_vulnerability']))
         
-        return figures
+        return charts
     
-    def generate_risk_visualizations(self, risk_data: Dict[str, Any]) -> List[str]:
-        """Generate risk assessment visualizations"""
-        figures = []
+    def _risk_charts(self, risk_data: Dict[str, Any]) -> List[ChartTask]:
+        """Risk assessment chart tasks"""
+        charts = []
         
         # Risk distribution
         if 'distribution' in risk_data:
-            fig_path = self._create_risk_distribution_chart(risk_data['distribution'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('risk_distribution', '_create_risk_distribution_chart', risk_data['distribution']))
         
         # Risk heatmap
         if 'top_risks' in risk_data:
-            fig_path = self._create_risk_heatmap(risk_data['top_risks'])
-            if fig_path:
-                figures.append(fig_path)
+            charts.append(('risk_heatmap', '_create_risk_heatmap', risk_data['top_risks']))
         
-        return figures
+        return charts
+    
+    def render_charts(self, charts: List[ChartTask]) -> List[str]:
+        """
+        Render chart tasks, skipping charts whose figure is up to date
+        
+        Args:
+            charts: (chart name, render method, input data) tasks
+            
+        Returns:
+            Paths of the rendered and reused figures, in task order
+        """
+        manifest = self._load_manifest()
+        paths = {}
+        pending = []
+        for name, method, data in charts:
+            fingerprint = self._fingerprint(method, data)
+            fig_path = self._figure_path(name)
+            if self.skip_unchanged and fingerprint and manifest.get(name) == fingerprint and fig_path.exists():
+                paths[name] = str(fig_path)
+            else:
+                pending.append((name, method, data, fingerprint))
+        
+        reused = len(paths)
+        if self.max_workers > 1 and len(pending) > 1:
+            rendered = self._render_parallel(pending)
+        else:
+            rendered = {name: getattr(self, method)(data) for name, method, data, _ in pending}
+        
+        for name, method, data, fingerprint in pending:
+            if rendered.get(name):
+                paths[name] = rendered[name]
+                if fingerprint:
+                    manifest[name] = fingerprint
+            else:
+                manifest.pop(name, None)
+        if pending:
+            self._save_manifest(manifest)
+        
+        if reused:
+            logger.info(f"Reused {reused} unchanged charts, rendered {len(pending)}")
+        return [paths[name] for name, _, _ in charts if name in paths]
+    
+    def _render_parallel(self, pending: List[Tuple[str, str, Any, str]]) -> Dict[str, Optional[str]]:
+        """Render charts in worker processes (serially if the pool fails)"""
+        settings = {
+            'output_dir': str(self.output_dir),
+            'dpi': self.dpi,
+            'chart_format': self.chart_format,
+            'draft': self.draft,
+            'draft_dpi': self.draft_dpi,
+            'max_workers': 1,
+            'skip_unchanged': False
+        }
+        rendered = {}
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                futures = {
+                    executor.submit(_render_chart, settings, method, data): name
+                    for name, method, data, _ in pending
+                }
+                for future in as_completed(futures):
+                    rendered[futures[future]] = future.result()
+        except Exception as e:
+            logger.warning(f"Parallel chart rendering failed ({e}); rendering remaining charts serially")
+            for name, method, data, _ in pending:
+                if name not in rendered:
+                    rendered[name] = getattr(self, method)(data)
+        return rendered
+    
+    def _fingerprint(self, method: str, data: Any) -> Optional[str]:
+        """Hash of a chart's input data, render code and style"""
+        digest = hashlib.sha256()
+        try:
+            digest.update(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return None
+        for name in (method,) + RENDER_HELPERS:
+            digest.update(inspect.getsource(getattr(type(self), name)).encode())
+        digest.update(json.dumps({
+            'colors': self.colors,
+            'dpi': self.draft_dpi if self.draft else self.dpi,
+            'format': self.chart_format,
+            'draft': self.draft
+        }, sort_keys=True).encode())
+        return digest.hexdigest()
+    
+    def _figure_path(self, name: str) -> Path:
+        return self.output_dir / f"{name}.{self.chart_format}"
+    
+    def _load_manifest(self) -> Dict[str, str]:
+        return _read_manifest(self.output_dir)
+    
+    def figure_fingerprints(self, paths: List[str]) -> Dict[str, Optional[str]]:
+        """Manifest fingerprint of each written figure, by path (None if not recorded)"""
+        manifest = self._load_manifest()
+        return {path: manifest.get(Path(path).stem) for path in paths}
+    
+    @staticmethod
+    def figures_unchanged(fingerprints: Dict[str, Optional[str]]) -> bool:
+        """
+        Whether figures still hold the charts they were written with
+        
+        Args:
+            fingerprints: Result of figure_fingerprints
+            
+        Returns:
+            True if every figure exists and its manifest records the same fingerprint
+        """
+        manifests = {}
+        for path, fingerprint in fingerprints.items():
+            path = Path(path)
+            if fingerprint is None or not path.exists():
+                return False
+            if path.parent not in manifests:
+                manifests[path.parent] = _read_manifest(path.parent)
+            if manifests[path.parent].get(path.stem) != fingerprint:
+                return False
+        return True
+    
+    def _save_manifest(self, manifest: Dict[str, str]):
+        path = self.output_dir / MANIFEST_FILE
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    def _save(self, fig, name: str) -> str:
+        """Save and close a chart figure"""
+        fig_path = self._figure_path(name)
+        if self.draft:
+            fig.savefig(fig_path, dpi=self.draft_dpi)
+        else:
+            fig.tight_layout()
+            fig.savefig(fig_path, dpi=self.dpi, bbox_inches='tight')
+        plt.close(fig)
+        return str(fig_path)
     
     def _create_payment_distribution_chart(self, distribution_data: Dict) -> Optional[str]:
         """Create payment distribution histogram"""
@@ -186,20 +390,15 @@ class VisualizationGenerator:
             ax.set_title('Distribution of Industry Payments by Amount', fontsize=14, fontweight='bold')
             
             # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{int(height):,}',
-                       ha='center', va='bottom')
+            if not self.draft:
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                           f'{int(height):,}',
+                           ha='center', va='bottom')
             
             plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'payment_distribution.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'payment_distribution')
             
         except Exception as e:
             logger.error(f"Failed to create payment distribution chart: {e}")
@@ -231,13 +430,7 @@ class VisualizationGenerator:
             ax2.set_title('Providers Receiving Payments Over Time', fontsize=14, fontweight='bold')
             ax2.grid(True, alpha=0.3)
             
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'yearly_trends.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'yearly_trends')
             
         except Exception as e:
             logger.error(f"Failed to create yearly trends chart: {e}")
@@ -262,19 +455,14 @@ class VisualizationGenerator:
             ax.set_title('Top 10 Manufacturers by Payment Volume', fontsize=14, fontweight='bold')
             
             # Add value labels
-            for i, bar in enumerate(bars):
-                width = bar.get_width()
-                ax.text(width, bar.get_y() + bar.get_height()/2.,
-                       f'${width/1e6:.1f}M',
-                       ha='left', va='center')
-            
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'top_manufacturers.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            if not self.draft:
+                for i, bar in enumerate(bars):
+                    width = bar.get_width()
+                    ax.text(width, bar.get_y() + bar.get_height()/2.,
+                           f'${width/1e6:.1f}M',
+                           ha='left', va='center')
             
-            return str(fig_path)
+            return self._save(fig, 'top_manufacturers')
             
         except Exception as e:
             logger.error(f"Failed to create manufacturers chart: {e}")
@@ -304,20 +492,15 @@ class VisualizationGenerator:
             ax.set_title('Payment Distribution by Category', fontsize=14, fontweight='bold')
             
             # Enhance text
-            for text in texts:
-                text.set_fontsize(10)
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontsize(10)
-                autotext.set_fontweight('bold')
+            if not self.draft:
+                for text in texts:
+                    text.set_fontsize(10)
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontsize(10)
+                    autotext.set_fontweight('bold')
             
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'payment_categories.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'payment_categories')
             
         except Exception as e:
             logger.error(f"Failed to create categories pie chart: {e}")
@@ -344,20 +527,16 @@ class VisualizationGenerator:
             ax.axvline(x=1, color='gray', linestyle='--', alpha=0.5, label='No influence')
             
             # Add value labels
-            for i, bar in enumerate(bars):
-                width = bar.get_width()
-                ax.text(width, bar.get_y() + bar.get_height()/2.,
-                       f'{width:.0f}x',
-                       ha='left', va='center')
+            if not self.draft:
+                for i, bar in enumerate(bars):
+                    width = bar.get_width()
+                    ax.text(width, bar.get_y() + bar.get_height()/2.,
+                           f'{width:.0f}x',
+                           ha='left', va='center')
             
             ax.legend()
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'influence_factors.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
             
-            return str(fig_path)
+            return self._save(fig, 'influence_factors')
             
         except Exception as e:
             logger.error(f"Failed to create influence factors chart: {e}")
@@ -392,13 +571,7 @@ class VisualizationGenerator:
                 ax2.set_title('ROI by Payment Tier', fontsize=14, fontweight='bold')
                 ax2.tick_params(axis='x', rotation=45)
             
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'payment_tier_effects.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'payment_tier_effects')
             
         except Exception as e:
             logger.error(f"Failed to create payment tier chart: {e}")
@@ -422,7 +595,7 @@ class VisualizationGenerator:
             title: Chart title
             xlabel: X-axis label
             ylabel: Y-axis label
-            filename: Output filename
+            filename: Output filename (the extension follows chart_format)
             
         Returns:
             Path to saved figure
@@ -438,7 +611,7 @@ class VisualizationGenerator:
                 ax.scatter(data.iloc[:, 0], data.iloc[:, 1], 
                           color=self.colors['primary'], alpha=0.6)
         elif chart_type == 'heatmap':
-            sns.heatmap(data, annot=True, fmt='.2f', cmap='RdYlBu_r', ax=ax)
+            sns.heatmap(data, annot=not self.draft, fmt='.2f', cmap='RdYlBu_r', ax=ax)
         
         ax.set_title(title, fontsize=14, fontweight='bold')
         if xlabel:
@@ -446,16 +619,11 @@ class VisualizationGenerator:
         if ylabel:
             ax.set_ylabel(ylabel, fontsize=12)
         
-        plt.tight_layout()
-        
         if not filename:
-            filename = f"custom_{chart_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            filename = f"custom_{chart_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        fig_path = self.output_dir / filename
-        plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return str(fig_path)
+        # Saved in the configured chart format (and draft mode) like every other chart
+        return self._save(fig, str(Path(filename).with_suffix('')))
     
     def _create_vulnerability_chart(self, vuln_df: pd.DataFrame) -> Optional[str]:
         """Create provider vulnerability comparison chart"""
@@ -477,13 +645,7 @@ class VisualizationGenerator:
             ax.set_xticklabels(vuln_df['provider_type'])
             ax.legend()
             
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'provider_vulnerability.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'provider_vulnerability')
             
         except Exception as e:
             logger.error(f"Failed to create vulnerability chart: {e}")
@@ -508,19 +670,14 @@ class VisualizationGenerator:
             ax.set_title('Top 10 Prescribed Drugs by Value', fontsize=14, fontweight='bold')
             
             # Add value labels
-            for i, bar in enumerate(bars):
-                width = bar.get_width()
-                ax.text(width, bar.get_y() + bar.get_height()/2.,
-                       f'${width/1e6:.1f}M',
-                       ha='left', va='center')
-            
-            plt.tight_layout()
+            if not self.draft:
+                for i, bar in enumerate(bars):
+                    width = bar.get_width()
+                    ax.text(width, bar.get_y() + bar.get_height()/2.,
+                           f'${width/1e6:.1f}M',
+                           ha='left', va='center')
             
-            fig_path = self.output_dir / 'top_drugs.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'top_drugs')
             
         except Exception as e:
             logger.error(f"Failed to create top drugs chart: {e}")
@@ -553,13 +710,7 @@ class VisualizationGenerator:
             ax2.set_title('Prescription Volume Over Time', fontsize=14, fontweight='bold')
             ax2.grid(True, alpha=0.3)
             
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'rx_trends.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'rx_trends')
             
         except Exception as e:
             logger.error(f"Failed to create prescription trends chart: {e}")
@@ -594,19 +745,14 @@ class VisualizationGenerator:
             ax.set_title('Provider Risk Distribution', fontsize=14, fontweight='bold')
             
             # Add value labels and percentages
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{int(height):,}\n({dist_df.iloc[i]["percentage"]:.1f}%)',
-                       ha='center', va='bottom')
-            
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'risk_distribution.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            if not self.draft:
+                for i, bar in enumerate(bars):
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                           f'{int(height):,}\n({dist_df.iloc[i]["percentage"]:.1f}%)',
+                           ha='center', va='bottom')
             
-            return str(fig_path)
+            return self._save(fig, 'risk_distribution')
             
         except Exception as e:
             logger.error(f"Failed to create risk distribution chart: {e}")
@@ -637,7 +783,7 @@ class VisualizationGenerator:
             
             sns.heatmap(
                 data_matrix,
-                annot=True,
+                annot=not self.draft,
                 fmt='.0f',
                 cmap='RdYlBu_r',
                 xticklabels=risk_components,
@@ -651,13 +797,7 @@ class VisualizationGenerator:
             ax.set_xlabel('Risk Components', fontsize=12)
             ax.set_ylabel('Provider NPI', fontsize=12)
             
-            plt.tight_layout()
-            
-            fig_path = self.output_dir / 'risk_heatmap.png'
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return str(fig_path)
+            return self._save(fig, 'risk_heatmap')
             
         except Exception as e:
             logger.error(f"Failed to create risk heatmap: {e}")
@@ -0,0 +1,129 @@
+"""Shared fixtures for the healthcare COI analytics tests"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+# Modules are imported as src.* from the project root, as in the pipelines
+sys.path.insert(0, str(PROJECT_DIR))
+
+
+@pytest.fixture
+def payments_data() -> pd.DataFrame:
+    """Synthetic Open Payments rows (provider x year x manufacturer x category)"""
+    rng = np.random.default_rng(7)
+    rows = 4000
+    return pd.DataFrame({
+        'physician_id': rng.integers(1_000_000_000, 1_000_000_400, rows),
+        'payment_year': rng.integers(2019, 2024, rows),
+        'manufacturer': rng.choice([f'Manufacturer {i}' for i in range(12)], rows),
+        'payment_category': rng.choice(['Food and Beverage', 'Travel', 'Consulting Fee', 'Education'], rows),
+        'total_amount': rng.lognormal(5, 1.5, rows).round(2),
+        'payment_count': rng.integers(1, 30, rows),
+        'max_amount': rng.lognormal(4, 1.5, rows).round(2)
+    })
+
+
+@pytest.fixture
+def prescription_data() -> pd.DataFrame:
+    """Synthetic prescription rows (provider x drug)"""
+    rng = np.random.default_rng(11)
+    rows = 3000
+    return pd.DataFrame({
+        'NPI': rng.integers(1_000_000_100, 1_000_000_600, rows),
+        'BRAND_NAME': rng.choice([f'Drug {i}' for i in range(40)], rows),
+        'total_claims': rng.integers(1, 500, rows),
+        'total_cost': rng.lognormal(8, 1.2, rows).round(2),
+        'total_beneficiaries': rng.integers(1, 200, rows)
+    })
+
+
+@pytest.fixture
+def duckdb_config(tmp_path, monkeypatch) -> dict:
+    """Config of a client on the DuckDB backend over synthetic Parquet extracts (not written)"""
+    duckdb = pytest.importorskip('duckdb')  # Optional backend
+    del duckdb
+    from src.data.bigquery_connector import BigQueryConnector
+
+    rng = np.random.default_rng(1)
+    rows = 20_000
+    npis = np.arange(1_000_000_000, 1_000_000_300)
+    extracts = tmp_path / 'extracts' / 'ds'
+    extracts.mkdir(parents=True)
+    pd.DataFrame({
+        'covered_recipient_npi': rng.choice(npis, rows),
+        'covered_recipient_first_name': 'First',
+        'covered_recipient_last_name': 'Last',
+        'physician': rng.choice(['MD', 'DO'], rows),
+        'covered_recipient_specialty_1': rng.choice(['Cardiology', 'Oncology', 'Family Medicine'], rows),
+        'applicable_manufacturer_or_applicable_gpo_making_payment_name': rng.choice(
+            [f'Manufacturer {i}' for i in range(30)], rows),
+        'total_amount_of_payment_usdollars': rng.gamma(1, 200, rows).round(2),
+        'date_of_payment': pd.to_datetime('2020-01-01') + pd.to_timedelta(rng.integers(0, 1800, rows), 'D'),
+        'nature_of_payment_or_transfer_of_value': rng.choice(['Food and Beverage', 'Travel', 'Consulting Fee'], rows),
+        'name_of_drug_or_biological_or_device_or_medical_supply_1': rng.choice(['Eliquis', 'Humira', 'Ozempic'], rows),
+        'program_year': rng.integers(2020, 2025, rows)
+    }).to_parquet(extracts / 'op.parquet')
+    pd.DataFrame({
+        'NPI': rng.choice(npis, rows),
+        'physician': 'p',
+        'PAYOR_NAME': rng.choice(['Medicare', 'Commercial'], rows),
+        'BRAND_NAME': rng.choice(['ELIQUIS', 'HUMIRA', 'OZEMPIC', 'XARELTO'], rows),
+        'GENERIC_NAME': 'generic',
+        'CLAIM_YEAR': rng.integers(2020, 2025, rows),
+        'CLAIM_MONTH': rng.integers(1, 13, rows),
+        'PRESCRIPTIONS': rng.integers(0, 5, rows),
+        'DAYS_SUPPLY': 30,
+        'PAYMENTS': rng.gamma(2, 100, rows),
+        'UNIQUE_PATIENTS': 1
+    }).to_parquet(extracts / 'rx.parquet')
+    pd.DataFrame({
+        'NPI': npis,
+        'CREDENTIAL': 'MD',
+        'SPECIALTY_PRIMARY': 'Internal Medicine',
+        'ROLE_NAME': rng.choice(['Physician', 'Dentist', 'Nurse Practitioner', None], len(npis))
+    }).to_parquet(extracts / 'PHYSICIANS_OVERVIEW_optimized.parquet')
+    pd.DataFrame({'NPI': npis[:250].astype(str)}).to_csv(tmp_path / 'npis.csv', index=False)
+
+    config = {
+        'health_system': {'name': 'Test Health', 'short_name': 'test', 'npi_file': str(tmp_path / 'npis.csv')},
+        'analysis': {'start_year': 2020, 'end_year': 2024},
+        'bigquery': {
+            'project_id': 'test-project', 'dataset': 'ds', 'temp_dataset': 'temp',
+            'tables': {'open_payments': 'op', 'prescriptions': 'rx'},
+            'query_cache': {'enabled': False},
+            'backend': {'engine': 'duckdb', 'source_dir': str(tmp_path / 'extracts'), 'database': ':memory:'}
+        }
+    }
+
+    # Caches and lineage are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    BigQueryConnector.reset_instances()
+    yield config
+    BigQueryConnector.reset_instances()
+
+
+@pytest.fixture
+def duckdb_loader(duckdb_config, tmp_path):
+    """DataLoader on the DuckDB backend over synthetic Parquet extracts, temp tables created"""
+    import yaml
+    from src.data.data_loader import DataLoader
+
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(duckdb_config))
+    loader = DataLoader(str(config_path))
+    loader.load_open_payments(create_only=True)
+    loader.load_prescriptions(create_only=True)
+    return loader
+
+
+@pytest.fixture
+def duckdb_analyzer(duckdb_loader):
+    """BigQueryAnalyzer running its queries on the DuckDB backend"""
+    from src.analysis.bigquery_analysis import BigQueryAnalyzer
+    return BigQueryAnalyzer(duckdb_loader.bq, duckdb_loader.config, 2020, 2024)
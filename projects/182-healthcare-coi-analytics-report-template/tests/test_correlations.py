@@ -0,0 +1,99 @@
+"""Drug-level influence statistics of CorrelationAnalyzer"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.analysis.correlations import CorrelationAnalyzer
+
+
+def reference_drug_correlations(analyzer: CorrelationAnalyzer) -> pd.DataFrame:
+    """Per-drug loop with scipy.stats.ttest_ind, as before vectorization"""
+    rows = []
+    for drug in analyzer.prescriptions['BRAND_NAME'].unique():
+        drug_rx = analyzer.prescriptions[analyzer.prescriptions['BRAND_NAME'] == drug].groupby('NPI').agg(
+            {'total_cost': 'sum'}
+        ).reset_index()
+        drug_rx = drug_rx.merge(analyzer.merged_data[['NPI', 'received_payments']], on='NPI', how='left')
+        drug_rx['received_payments'] = drug_rx['received_payments'].fillna(0)
+        with_payments = drug_rx.loc[drug_rx['received_payments'] == 1, 'total_cost']
+        without_payments = drug_rx.loc[drug_rx['received_payments'] == 0, 'total_cost']
+        if len(with_payments) == 0 or len(without_payments) == 0:
+            continue
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            t_stat, p_value = stats.ttest_ind(with_payments, without_payments, equal_var=False)
+        pooled_std = np.sqrt((with_payments.std() ** 2 + without_payments.std() ** 2) / 2)
+        rows.append({
+            'drug': drug,
+            'prescribers_with_payments': len(with_payments),
+            'prescribers_without_payments': len(without_payments),
+            'avg_rx_value_with_payments': with_payments.mean(),
+            'avg_rx_value_without_payments': without_payments.mean(),
+            't_statistic': t_stat,
+            'p_value': p_value,
+            'cohens_d': (with_payments.mean() - without_payments.mean()) / pooled_std
+        })
+    return pd.DataFrame(rows).set_index('drug').sort_index()
+
+
+@pytest.fixture
+def analyzer(payments_data, prescription_data) -> CorrelationAnalyzer:
+    # Small groups: one prescriber without payments, and identical costs on both sides
+    paid_npi = int(payments_data['physician_id'].iloc[0])
+    unpaid_npis = [1_000_000_590, 1_000_000_591]
+    edge_cases = pd.DataFrame({
+        'NPI': [paid_npi, paid_npi, unpaid_npis[0], paid_npi, unpaid_npis[0], unpaid_npis[1]],
+        'BRAND_NAME': ['Single', 'Single', 'Single', 'Constant', 'Constant', 'Constant'],
+        'total_claims': [5, 3, 4, 1, 1, 1],
+        'total_cost': [100.0, 50.0, 80.0, 10.0, 10.0, 10.0],
+        'total_beneficiaries': [1, 1, 1, 1, 1, 1]
+    })
+    analyzer = CorrelationAnalyzer(payments_data, pd.concat([prescription_data, edge_cases], ignore_index=True))
+    analyzer.prepare_data()
+    return analyzer
+
+
+def test_drug_statistics_match_scipy_loop(analyzer):
+    # The reference loop keeps every drug with at least one prescriber per group
+    result = analyzer.analyze_drug_specific_correlations(min_prescribers=1).set_index('drug').sort_index()
+    expected = reference_drug_correlations(analyzer)
+
+    assert list(result.index) == list(expected.index)
+    for column in expected.columns:
+        np.testing.assert_allclose(result[column].to_numpy(float), expected[column].to_numpy(float),
+                                   rtol=1e-9, equal_nan=True, err_msg=column)
+
+
+def test_top_n_keeps_costliest_drugs(analyzer):
+    top_drugs = analyzer.prescriptions.groupby('BRAND_NAME')['total_cost'].sum().nlargest(5).index
+    result = analyzer.analyze_drug_specific_correlations(top_n=5)
+    assert set(result['drug']) <= set(top_drugs)
+    assert result['influence_factor'].is_monotonic_decreasing
+
+
+def test_tiny_groups_do_not_top_the_influence_ranking(payments_data, prescription_data):
+    # One paid prescriber with a huge cost against one unpaid prescriber
+    tiny = pd.DataFrame({
+        'NPI': [int(payments_data['physician_id'].iloc[0]), 1_000_000_590],
+        'BRAND_NAME': ['Tiny', 'Tiny'],
+        'total_claims': [1, 1],
+        'total_cost': [1_000_000.0, 10.0],
+        'total_beneficiaries': [1, 1]
+    })
+    analyzer = CorrelationAnalyzer(payments_data, pd.concat([prescription_data, tiny], ignore_index=True))
+    analyzer.prepare_data()
+
+    unfiltered = analyzer.analyze_drug_specific_correlations(min_prescribers=1)
+    assert unfiltered.loc[0, 'drug'] == 'Tiny'
+
+    result = analyzer.analyze_drug_specific_correlations()
+    assert 'Tiny' not in set(result['drug'])
+    assert (result[['prescribers_with_payments', 'prescribers_without_payments']] >= 10).all().all()
+    assert result['influence_factor'].is_monotonic_decreasing
+
+    strict = analyzer.analyze_drug_specific_correlations(min_prescribers=40)
+    assert set(strict['drug']) < set(result['drug'])
@@ -0,0 +1,115 @@
+"""BigQuery -> DuckDB SQL translation and the analyzer queries on the DuckDB backend"""
+
+import numpy as np
+import pytest
+
+duckdb = pytest.importorskip('duckdb')  # Optional backend
+
+from src.data.duckdb_backend import translate_sql  # noqa: E402
+
+ANALYSIS_STEPS = ['_open_payments_queries', '_prescriptions_queries', '_correlations_queries',
+                  '_risk_assessment_queries']
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    connection.execute("CREATE TABLE t AS SELECT range AS x, range % 3 AS g, 'row ' || range AS label FROM range(101)")
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize('bigquery_sql, duckdb_sql', [
+    ("SELECT * FROM `proj.ds.table`", 'SELECT * FROM "ds"."table"'),
+    ('SELECT "it\'s" AS s', "SELECT 'it''s' AS s"),
+    ("SELECT CAST(x AS FLOAT64), SAFE_CAST(y AS INT64)", "SELECT CAST(x AS DOUBLE), TRY_CAST(y AS INT64)"),
+    ("SELECT COUNTIF(x > 1), LOGICAL_OR(b)", "SELECT count_if(x > 1), bool_or(b)"),
+    ("SELECT * EXCEPT(client) FROM t", "SELECT * EXCLUDE (client) FROM t"),
+    ("CREATE TABLE t CLUSTER BY client AS SELECT 1", "CREATE TABLE t AS SELECT 1"),
+    ("SELECT APPROX_QUANTILES(x, 100)[OFFSET(50)]", "SELECT quantile_disc(x, 0.5)"),
+    ("SELECT ARRAY<STRING>['a', 'b']", "SELECT CAST(['a', 'b'] AS VARCHAR[])"),
+    ("WHERE x IN UNNEST(@ids)", "WHERE x IN (SELECT UNNEST($ids))"),
+    ("SELECT TO_JSON_STRING(t) FROM t", "SELECT CAST(to_json(t) AS VARCHAR) FROM t"),
+])
+def test_translations(bigquery_sql, duckdb_sql):
+    assert translate_sql(bigquery_sql) == duckdb_sql
+
+
+def test_literals_and_comments_are_left_alone():
+    sql = "SELECT 'COUNTIF(x) FLOAT64 `a.b.c`' AS s -- SAFE_CAST(x AS FLOAT64)\nFROM t"
+    assert translate_sql(sql) == sql
+
+
+def test_catalog_qualifies_dataset_identifiers():
+    assert translate_sql("SELECT * FROM `proj.temp.op_summary`", catalog='memory') == \
+        'SELECT * FROM "memory"."temp"."op_summary"'
+
+
+def test_translated_functions_match_bigquery_semantics(conn):
+    median, quartiles = conn.execute(translate_sql(
+        "SELECT APPROX_QUANTILES(x, 100)[OFFSET(50)], APPROX_QUANTILES(x, 4) FROM t"
+    )).fetchone()
+    assert median == 50
+    assert quartiles == [0, 25, 50, 75, 100]
+
+    rows = conn.execute(translate_sql(
+        "SELECT TO_JSON_STRING(r) FROM ("
+        "SELECT g, COUNTIF(x > 50) AS high FROM t WHERE g IN UNNEST(ARRAY<INT64>[0, 2]) GROUP BY g"
+        ") r ORDER BY g"
+    )).fetchall()
+    values = np.arange(101)
+    assert [row[0] for row in rows] == [
+        f'{{"g":{g},"high":{int(((values % 3 == g) & (values > 50)).sum())}}}' for g in (0, 2)
+    ]
+
+
+@pytest.mark.parametrize('step', ANALYSIS_STEPS)
+def test_analyzer_queries_run_on_duckdb(duckdb_analyzer, step):
+    queries = getattr(duckdb_analyzer, step)()
+    assert queries
+    for name, query in queries.items():
+        translated = translate_sql(query)
+        assert '`' not in translated, name
+        df, status = duckdb_analyzer._run_query(query, name)
+        assert status == 'success', f"{name} returned {status}"
+        assert len(df) > 0, name
+
+
+def test_analyzer_totals_match_source_extract(duckdb_loader, duckdb_analyzer):
+    summary = duckdb_loader.load_open_payments(summary_only=True)
+    overall = duckdb_analyzer.analyze_open_payments()['overall_metrics']
+    assert overall['unique_providers'] == summary['physician_id'].nunique()
+    assert overall['total_payments'] == pytest.approx(summary['total_amount'].sum())
+
+
+def test_connectors_are_shared_per_backend_settings(duckdb_loader, tmp_path):
+    from src.data.bigquery_connector import BigQueryConnector
+
+    backend = duckdb_loader.config['bigquery']['backend']
+    assert BigQueryConnector(dict(backend)) is duckdb_loader.bq
+
+    other = BigQueryConnector(dict(backend, source_dir=str(tmp_path / 'other')))
+    assert other is not duckdb_loader.bq
+    assert other.client.source_dir == tmp_path / 'other'
+    assert duckdb_loader.bq.client.source_dir == tmp_path / 'extracts'
+
+
+def test_scripts_return_the_last_statement_and_scope_temp_tables(tmp_path):
+    from google.cloud import bigquery
+    from src.data.duckdb_backend import DuckDBClient
+
+    client = DuckDBClient(source_dir=str(tmp_path))
+    script = ("CREATE TEMP TABLE rollup AS SELECT range AS x FROM range(10);\n"
+              "SELECT COUNT(*) AS n, 'a;b' AS s FROM rollup WHERE x >= @low")
+    config = bigquery.QueryJobConfig(query_parameters=[bigquery.ScalarQueryParameter('low', 'INT64', 4)])
+    assert client.query(script, job_config=config).to_dataframe().to_dict('records') == [{'n': 6, 's': 'a;b'}]
+
+    # Temp tables end with their script, as in BigQuery
+    with pytest.raises(duckdb.CatalogException):
+        client.query("SELECT * FROM rollup").to_dataframe()
+
+    dry_run = bigquery.QueryJobConfig(dry_run=True)
+    assert client.query(script.replace('@low', '4'), job_config=dry_run).total_bytes_processed == 0
+    with pytest.raises(duckdb.BinderException):
+        client.query(script.replace('@low', 'no_such_column'), job_config=dry_run)
+    client.close()
@@ -0,0 +1,93 @@
+"""Incremental NPI-delta refresh of the per-client temp tables on the DuckDB backend"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')  # Optional backend
+
+FAMILIES = {
+    'open_payments': ('physician_id', 'load_open_payments', '_create_open_payments_tables'),
+    'prescriptions': ('NPI', 'load_prescriptions', '_create_prescriptions_tables'),
+}
+
+
+def read_tables(loader, family):
+    """Detailed and summary tables of a table family, in a stable order"""
+    frames = {}
+    for grain in ('detailed', 'summary'):
+        table = f"test-project.temp.test_{family}_{grain}_2020_2024"
+        df = loader.bq.run_job(f"SELECT * FROM `{table}`", f'{family}_{grain}_read').to_dataframe()
+        frames[grain] = df.sort_values(list(df.columns)).reset_index(drop=True)
+    return frames
+
+
+def snapshot_npis(loader, family):
+    job = loader.bq.run_job(f"SELECT NPI FROM `test-project.temp.test_{family}_detailed_2020_2024_npis`",
+                            f'{family}_snapshot_read')
+    return set(job.to_dataframe()['NPI'].astype(str))
+
+
+def write_roster(loader, npis):
+    pd.DataFrame({'NPI': sorted(npis)}).to_csv(loader.config['health_system']['npi_file'], index=False)
+
+
+@pytest.fixture
+def rebuilds(duckdb_loader, monkeypatch):
+    """Count full table rebuilds per family"""
+    counts = {family: 0 for family in FAMILIES}
+    for family, (_, _, create) in FAMILIES.items():
+        original = getattr(duckdb_loader, create)
+
+        def counted(*args, family=family, original=original, **kwargs):
+            counts[family] += 1
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(duckdb_loader, create, counted)
+    return counts
+
+
+@pytest.mark.parametrize('family', list(FAMILIES))
+def test_refresh_matches_full_rebuild(duckdb_loader, rebuilds, family):
+    key, load, _ = FAMILIES[family]
+    roster = pd.read_csv(duckdb_loader.config['health_system']['npi_file'])['NPI'].astype(str)
+    all_npis = [str(npi) for npi in range(1_000_000_000, 1_000_000_300)]
+    removed = set(roster[:20])
+    added = set(all_npis[250:270])
+    write_roster(duckdb_loader, (set(roster) - removed) | added)
+
+    getattr(duckdb_loader, load)(create_only=True)
+    assert rebuilds[family] == 0
+
+    refreshed = read_tables(duckdb_loader, family)
+    detailed_npis = set(refreshed['detailed'][key].astype(str))
+    assert not detailed_npis & removed
+    assert detailed_npis & added
+
+    # Snapshot and stored hash now describe the new roster
+    assert snapshot_npis(duckdb_loader, family) == (set(roster) - removed) | added
+    assert not duckdb_loader._npis_changed_since_table_creation(family)
+    assert f'{family}_refreshed_at' in duckdb_loader._load_cache_metadata()['bigquery_tables']
+
+    getattr(duckdb_loader, load)(create_only=True, force_reload=True)
+    assert rebuilds[family] == 1
+    rebuilt = read_tables(duckdb_loader, family)
+    for grain in ('detailed', 'summary'):
+        pd.testing.assert_frame_equal(refreshed[grain], rebuilt[grain], check_dtype=False, obj=grain)
+
+
+def test_large_roster_changes_rebuild_fully(duckdb_loader, rebuilds):
+    roster = pd.read_csv(duckdb_loader.config['health_system']['npi_file'])['NPI'].astype(str)
+    # 100 of 250 NPIs removed: above the default max_changed_fraction of 25%
+    write_roster(duckdb_loader, set(roster[100:]))
+
+    duckdb_loader.load_open_payments(create_only=True)
+    assert rebuilds['open_payments'] == 1
+    assert 'open_payments_refreshed_at' not in duckdb_loader._load_cache_metadata()['bigquery_tables']
+    assert snapshot_npis(duckdb_loader, 'open_payments') == set(roster[100:])
+
+    # Re-adding them (100 of 150) is within a raised limit
+    duckdb_loader.config['bigquery']['incremental_refresh'] = {'max_changed_fraction': 0.75}
+    write_roster(duckdb_loader, set(roster))
+    duckdb_loader.load_open_payments(create_only=True)
+    assert rebuilds['open_payments'] == 1
+    assert snapshot_npis(duckdb_loader, 'open_payments') == set(roster)
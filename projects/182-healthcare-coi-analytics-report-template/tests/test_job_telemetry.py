@@ -0,0 +1,119 @@
+"""Job telemetry and the per-run performance profile of the lineage tracker"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.data.data_lineage import DataLineageTracker
+from src.data.job_telemetry import TELEMETRY_FIELDS, job_telemetry
+
+PROFILE_TOTALS = {'jobs', 'cache_hits', 'bytes_processed', 'bytes_billed', 'slot_ms', 'queue_ms', 'execution_ms'}
+TOP_JOB_FIELDS = {'table_name', 'step', 'job_id', 'slot_ms', 'bytes_billed', 'queue_ms', 'execution_ms',
+                  'top_stage', 'top_stage_slot_ms'}
+
+
+class LoadJob:
+    """Job whose query-only statistics raise, as on bigquery.LoadJob"""
+
+    job_id = 'load-1'
+    created = started = ended = None
+
+    @property
+    def slot_millis(self):
+        raise AttributeError('not a query job')
+
+
+def test_query_job_telemetry():
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    job = SimpleNamespace(
+        job_id='job-1', total_bytes_processed=2_000, total_bytes_billed=10_485_760, slot_millis=900,
+        cache_hit=False, created=created, started=created + timedelta(milliseconds=250),
+        ended=created + timedelta(milliseconds=1_250),
+        query_plan=[SimpleNamespace(name='S00: Input', slot_ms=600), SimpleNamespace(name='S01: Output', slot_ms=300),
+                    SimpleNamespace(name='S02: Pending', slot_ms=None)]
+    )
+    assert job_telemetry(job) == {
+        'job_id': 'job-1', 'bytes_processed': 2_000, 'bytes_billed': 10_485_760, 'slot_ms': 900,
+        'cache_hit': False, 'queue_ms': 250, 'execution_ms': 1_000,
+        'top_stage': 'S00: Input', 'top_stage_slot_ms': 600
+    }
+
+    assert job_telemetry(LoadJob()) == {'job_id': 'load-1', **{field: None for field in TELEMETRY_FIELDS}}
+
+
+def test_profile_ranks_steps_types_and_jobs():
+    tracker = DataLineageTracker('run-1')
+    tracker.set_current_step('tables')
+    tracker.add_bigquery_job('a', 'statement', 'op_detailed', slot_ms=5_000, bytes_billed=100, execution_ms=40)
+    tracker.add_bigquery_job('b', 'load', 'npis', bytes_billed=10, execution_ms=5)
+    tracker.set_current_step('analyses')
+    tracker.add_bigquery_job('c', 'analysis', 'overall_metrics', slot_ms=700, cache_hit=True, execution_ms=3)
+    tracker.add_bigquery_job('d', 'analysis', 'top_drugs', step='correlations', slot_ms=9_000, execution_ms=60)
+    tracker.set_current_step(None)
+    tracker.add_bigquery_job('e', 'query', 'count')
+
+    profile = tracker.get_performance_profile(top_n=2)
+    assert profile['totals'] == {'jobs': 5, 'cache_hits': 1, 'bytes_processed': 0, 'bytes_billed': 110,
+                                 'slot_ms': 14_700, 'queue_ms': 0, 'execution_ms': 108}
+    # Most slot time first
+    assert list(profile['by_step']) == ['correlations', 'tables', 'analyses', 'unattributed']
+    assert profile['by_step']['tables']['jobs'] == 2
+    assert list(profile['by_query_type']) == ['analysis', 'statement', 'load', 'query']
+    assert [job['job_id'] for job in profile['top_jobs']] == ['d', 'a']
+    assert set(profile['top_jobs'][0]) == TOP_JOB_FIELDS
+
+
+def test_duckdb_jobs_are_profiled(duckdb_config, tmp_path):
+    from src.data.bigquery_connector import BigQueryConnector
+
+    bq = BigQueryConnector(duckdb_config['bigquery']['backend'])
+    bq.configure_cache(cache_dir=str(tmp_path / 'query_cache'), enabled=False)
+    tracker = DataLineageTracker('duckdb-run')
+    bq.lineage_tracker = tracker
+
+    tracker.set_current_step('tables')
+    bq.execute("CREATE OR REPLACE TABLE `test-project.temp.payments_by_year` AS "
+               "SELECT program_year, SUM(total_amount_of_payment_usdollars) AS total "
+               "FROM `test-project.ds.op` GROUP BY program_year", 'payments_by_year')
+    bq.run_job("SELECT COUNT(*) AS n FROM `test-project.temp.payments_by_year`", 'payments_by_year_count')
+    tracker.set_current_step('analyses')
+    df = bq.query("SELECT * FROM `test-project.temp.payments_by_year` ORDER BY program_year",
+                  query_name='yearly_trends')
+    assert len(df) == 5
+
+    jobs = tracker.lineage['bigquery_jobs']
+    assert [(job['table_name'], job['query_type'], job['step']) for job in jobs] == [
+        ('payments_by_year', 'statement', 'tables'),
+        ('payments_by_year_count', 'query', 'tables'),
+        ('yearly_trends', 'query', 'analyses'),
+    ]
+    for job in jobs:
+        assert job['job_id'].startswith('duckdb_')
+        assert isinstance(job['execution_ms'], int) and job['execution_ms'] >= 0
+        # DuckDB scans local files: no billing, slots, queueing or query plan
+        assert job['bytes_billed'] == 0
+        assert job['slot_ms'] is None and job['queue_ms'] is None and job['top_stage'] is None
+    assert bq.last_query_stats['job_id'] == jobs[-1]['job_id']
+
+    tracker.finalize()
+    profile = tracker.lineage['performance_profile']
+    assert set(profile) == {'totals', 'by_step', 'by_query_type', 'top_jobs'}
+    assert set(profile['totals']) == PROFILE_TOTALS
+    assert profile['totals']['jobs'] == 3
+    assert profile['totals']['execution_ms'] == sum(job['execution_ms'] for job in jobs)
+    assert set(profile['by_step']) == {'tables', 'analyses'}
+    assert profile['by_step']['tables']['jobs'] == 2
+    assert set(profile['by_query_type']) == {'statement', 'query'}
+    assert len(profile['top_jobs']) == 3
+    assert all(set(job) == TOP_JOB_FIELDS for job in profile['top_jobs'])
+
+
+def test_previous_profile_is_loaded_from_earlier_lineage(tmp_path):
+    previous = DataLineageTracker('20240101_000000')
+    previous.add_bigquery_job('a', 'query', 'count', slot_ms=10)
+    previous.finalize()
+    previous.save_lineage(tmp_path / 'lineage_20240101_000000.json')
+
+    current = DataLineageTracker('20240102_000000')
+    loaded = current.load_previous_profile(tmp_path)
+    assert loaded['pipeline_id'] == '20240101_000000'
+    assert loaded['totals']['jobs'] == 1
@@ -0,0 +1,203 @@
+"""Compiled metric groups: one script per grain, fanned out per metric"""
+
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.metric_compiler import MetricGroup, MetricSet
+from src.data.query_guard import GB, QueryCostGuard
+
+# pandas dtypes QueryJob.to_dataframe() returns for the types the analyzer metrics declare
+DTYPES = {'INT64': 'Int64', 'FLOAT64': 'float64', 'STRING': 'object'}
+
+
+def compiled_rows(rows):
+    """Rows of a compiled group query from (metric_set, row_num, record) triples"""
+    return pd.DataFrame(
+        [(metric, row_num, json.dumps(record)) for metric, row_num, record in rows],
+        columns=['metric_set', 'row_num', 'row_json']
+    )
+
+
+@pytest.fixture
+def group() -> MetricGroup:
+    return MetricGroup('test_rollup', 'totals AS (SELECT 1 AS x),', [
+        MetricSet('by_year', 'SELECT year, providers, avg_amount FROM totals',
+                  {'year': 'INT64', 'providers': 'INT64', 'avg_amount': 'FLOAT64'}, order_by='year'),
+        MetricSet('ratios', 'SELECT label, ratio FROM totals', {'label': 'STRING', 'ratio': 'FLOAT64'}),
+        MetricSet('unused', 'SELECT x FROM totals', {'x': 'INT64'})
+    ])
+
+
+def test_fan_out_orders_rows_and_types_columns(group):
+    df = compiled_rows([
+        ('by_year', 2, {'year': 2021, 'providers': 7, 'avg_amount': 12.5}),
+        ('ratios', 1, {'label': 'a', 'ratio': 'Infinity'}),
+        ('by_year', 1, {'year': 2020, 'providers': 3, 'avg_amount': None}),
+        ('ratios', 2, {'label': 'NaN', 'ratio': 0.5}),
+        ('ratios', 3, {'label': 'c', 'ratio': 'NaN'})
+    ])
+    frames = group.fan_out(df)
+
+    by_year = frames['by_year']
+    assert by_year['year'].tolist() == [2020, 2021]
+    assert str(by_year['year'].dtype) == 'Int64'
+    assert np.isnan(by_year.loc[0, 'avg_amount'])
+
+    ratios = frames['ratios']
+    assert ratios['ratio'].dtype == float
+    assert ratios.loc[0, 'ratio'] == np.inf and np.isnan(ratios.loc[2, 'ratio'])
+    # Text columns keep a literal 'NaN'
+    assert ratios['label'].tolist() == ['a', 'NaN', 'c']
+
+    assert frames['unused'].empty and list(frames['unused'].columns) == ['x']
+    assert str(frames['unused']['x'].dtype) == 'Int64'
+
+
+def test_fan_out_restores_types_lost_in_json():
+    group = MetricGroup('typed', 't AS (SELECT 1)', [
+        MetricSet('typed', 'SELECT * FROM t', {'amount': 'FLOAT64', 'count': 'INT64', 'share': 'NUMERIC',
+                                               'day': 'DATE', 'flag': 'BOOL', 'code': 'STRING'})
+    ])
+    # TO_JSON_STRING writes whole-number FLOAT64 without a fraction and DATE/NUMERIC as strings
+    df = pd.DataFrame({
+        'metric_set': 'typed', 'row_num': [1, 2],
+        'row_json': ['{"amount":12,"count":3,"share":"0.125","day":"2024-02-29","flag":true,"code":"01"}',
+                     '{"amount":null,"count":null,"share":null,"day":null,"flag":null,"code":null}']
+    })
+    frame = group.fan_out(df)['typed']
+
+    assert frame.dtypes.astype(str).to_dict() == {
+        'amount': 'float64', 'count': 'Int64', 'share': 'object', 'day': 'dbdate', 'flag': 'boolean', 'code': 'object'
+    }
+    assert frame.loc[0, 'amount'] == 12.0 and np.isnan(frame.loc[1, 'amount'])
+    assert frame.loc[0, 'share'] == Decimal('0.125') and frame.loc[1, 'share'] is None
+    assert str(frame.loc[0, 'day']) == '2024-02-29'
+    assert frame.loc[0, 'code'] == '01' and frame.loc[1, 'code'] is None
+
+
+def test_unknown_column_types_are_rejected():
+    with pytest.raises(ValueError):
+        MetricSet('m', 'SELECT 1', {'x': 'INTEGER'})
+
+
+def test_all_null_columns_read_as_float(group):
+    df = compiled_rows([
+        ('by_year', 1, {'year': 2020, 'providers': 3, 'avg_amount': None}),
+        ('by_year', 2, {'year': 2021, 'providers': 0, 'avg_amount': None})
+    ])
+    avg_amount = group.fan_out(df)['by_year']['avg_amount']
+    assert avg_amount.dtype == float and avg_amount.isna().all()
+
+
+def test_restore_non_finite_only_touches_numeric_columns():
+    df = pd.DataFrame({
+        'amount': [1.5, 'NaN', '-Infinity', None],
+        'name': ['NaN', 'Infinity', 'x', 'y'],
+        'count': [1, 2, 3, 4]
+    })
+    restored = MetricGroup._restore_non_finite(df.copy())
+
+    assert restored['amount'].dtype == float
+    assert restored['amount'].iloc[0] == 1.5 and restored['amount'].iloc[2] == -np.inf
+    assert restored['amount'].iloc[1:].isna().tolist() == [True, False, True]
+    assert restored['name'].tolist() == ['NaN', 'Infinity', 'x', 'y']
+    assert restored['count'].tolist() == [1, 2, 3, 4]
+
+
+def test_split_results_statuses(group):
+    df = compiled_rows([('by_year', 1, {'year': 2020, 'providers': 3, 'avg_amount': 1.0})])
+    statuses = {name: status for name, (_, status) in group.split_results(df, 'success').items()}
+    assert statuses == {'by_year': 'success', 'ratios': 'empty', 'unused': 'empty'}
+
+    failed = group.split_results(pd.DataFrame(), 'failed')
+    assert all(status == 'failed' and frame.empty for frame, status in failed.values())
+
+
+def test_duplicate_metric_names_are_rejected():
+    with pytest.raises(ValueError):
+        MetricGroup('dupes', 'a AS (SELECT 1)', [MetricSet('m', 'SELECT 1', {'x': 'INT64'}),
+                                                 MetricSet('m', 'SELECT 2', {'x': 'INT64'})])
+
+
+@pytest.mark.parametrize('group_method', ['_open_payments_metric_group', '_correlations_metric_group'])
+def test_compiled_group_matches_separate_queries(duckdb_analyzer, group_method):
+    group = getattr(duckdb_analyzer, group_method)()
+    compiled, status = duckdb_analyzer._run_query(group.compile(), group.name)
+    assert status == 'success'
+    frames = group.fan_out(compiled)
+
+    for metric in group.metrics:
+        expected, status = duckdb_analyzer._run_query(group.compile_metric(metric), metric.name)
+        assert status in ('success', 'empty'), metric.name
+
+        result = frames[metric.name]
+        assert list(result.columns) == metric.columns
+        assert result.dtypes.astype(str).to_dict() == {
+            column: DTYPES[sql_type] for column, sql_type in metric.types.items()
+        }, metric.name
+        assert len(result) == len(expected), metric.name
+        # DuckDB widens some aggregates (SUM of BIGINT is HUGEINT, read as float); compare in the declared types
+        expected = expected[metric.columns].astype(
+            {column: DTYPES[sql_type] for column, sql_type in metric.types.items()}
+        )
+        if metric.limit is None:
+            result = result.sort_values(metric.columns).reset_index(drop=True)
+            expected = expected.sort_values(metric.columns).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, obj=metric.name)
+
+
+class ScanningDryRunClient:
+    """Dry runs charge a source table's size for every reference, as BigQuery scans an unmaterialized CTE"""
+
+    def __init__(self, table_bytes):
+        self.table_bytes = table_bytes
+
+    def query(self, query, job_config=None):
+        assert job_config.dry_run
+        scanned = sum(query.count(table) * size for table, size in self.table_bytes.items())
+        return SimpleNamespace(total_bytes_processed=scanned)
+
+
+@pytest.mark.parametrize('group_method, sources', [
+    ('_open_payments_metric_group', ['op_summary']),
+    ('_correlations_metric_group', ['op_summary', 'rx_summary']),
+])
+def test_rollup_is_materialized_once(duckdb_analyzer, group_method, sources):
+    group = getattr(duckdb_analyzer, group_method)()
+    tables = [getattr(duckdb_analyzer, source) for source in sources]
+    script = group.compile()
+    assert script.startswith('CREATE TEMP TABLE')
+    assert all(script.count(table) == 1 for table in tables)
+
+    # Per-metric queries inline the rollup, so each reads the source tables again
+    guard = QueryCostGuard(ScanningDryRunClient({table: GB for table in tables}))
+    compiled_bytes = guard.estimate(script)
+    per_metric_bytes = sum(guard.estimate(group.compile_metric(metric)) for metric in group.metrics)
+    assert compiled_bytes == len(tables) * GB
+    assert per_metric_bytes == len(group.metrics) * len(tables) * GB
+
+
+def test_failed_group_runs_metrics_separately(duckdb_analyzer, monkeypatch):
+    group = duckdb_analyzer._open_payments_metric_group()
+    broken = next(metric for metric in group.metrics if metric.name == 'top_manufacturers')
+    broken.select_sql = broken.select_sql.replace('manufacturer', 'no_such_column', 1)
+    monkeypatch.setattr(duckdb_analyzer, '_open_payments_metric_group', lambda: group)
+
+    results = duckdb_analyzer.analyze_open_payments()
+
+    # Only the broken metric degrades (to an empty frame, as when it was its own query)
+    assert results['top_manufacturers'].empty
+    assert results['overall_metrics']['unique_providers'] > 0
+    for key in ('yearly_trends', 'payment_categories', 'payment_distribution', 'consecutive_years'):
+        assert not results[key].empty, key
+
+    statuses = {entry['name']: entry['status'] for entry in duckdb_analyzer.query_tracker.queries}
+    assert statuses.pop(group.name) == 'failed'
+    assert statuses == {name: 'failed' if name == 'top_manufacturers' else 'success' for name in group.metric_names}
+    summary = duckdb_analyzer.get_query_summary()
+    assert (summary['total_queries'], summary['failed'], summary['bigquery_jobs']) == (6, 1, 7)
@@ -0,0 +1,214 @@
+"""Cached section narratives and the concurrent section scheduler, with stubbed Claude clients"""
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+pytest.importorskip('anthropic')
+
+from src.reporting import report_generator  # noqa: E402
+from src.reporting.llm_client import ClaudeLLMClient  # noqa: E402
+from src.reporting.narrative_cache import NarrativeCache  # noqa: E402
+from src.reporting.report_generator import ReportGenerator  # noqa: E402
+
+PROMPTS_PATH = Path(report_generator.__file__).parent / 'section_prompts.yaml'
+
+SECTION = {
+    'context': 'Section 1: Payments',
+    'prompt': 'Summarize these payments:\n{data}',
+    'constraints': {'max_length': 100},
+}
+DATA = {'overall_metrics': {'total_payments': 1_250_000.0, 'unique_providers': 420}}
+
+
+class StubMessages:
+    """messages.create stand-in returning a numbered narrative"""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=f"narrative {len(self.requests)}")])
+
+
+@pytest.fixture
+def messages():
+    return StubMessages()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return NarrativeCache(str(tmp_path / 'narratives'))
+
+
+def make_client(cache, messages, model='claude-sonnet-4-20250514'):
+    client = ClaudeLLMClient(model=model, cache=cache)
+    client._client = SimpleNamespace(messages=messages)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def no_api_key(monkeypatch):
+    monkeypatch.delenv('CLAUDE_API_KEY', raising=False)
+
+
+def test_identical_requests_reuse_the_cached_narrative(cache, messages):
+    client = make_client(cache, messages)
+    first = client.generate_section(SECTION, DATA)
+    again = client.generate_section(SECTION, DATA)
+
+    assert first == again == 'narrative 1'
+    assert len(messages.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize('change', [
+    lambda section, data, client: client.__setattr__('model', 'claude-opus-4-20250514'),
+    lambda section, data, client: section.__setitem__('prompt', 'Describe these payments:\n{data}'),
+    lambda section, data, client: data['overall_metrics'].__setitem__('unique_providers', 421),
+    # max_tokens is part of the generation settings
+    lambda section, data, client: section.__setitem__('constraints', {'max_length': 200}),
+])
+def test_changed_inputs_miss_the_cache(cache, messages, change):
+    client = make_client(cache, messages)
+    client.generate_section(SECTION, DATA)
+
+    section = {**SECTION}
+    data = {'overall_metrics': {**DATA['overall_metrics']}}
+    change(section, data, client)
+    assert client.generate_section(section, data) == 'narrative 2'
+    assert len(messages.requests) == 2
+
+
+def test_cache_key_covers_model_prompt_data_and_settings():
+    settings = {'system': 'analyst', 'max_tokens': 400, 'temperature': 0.1}
+    key = NarrativeCache.key('model-a', 'prompt', 'data', settings)
+    assert key == NarrativeCache.key('model-a', 'prompt', 'data', dict(reversed(settings.items())))
+    assert len({
+        key,
+        NarrativeCache.key('model-b', 'prompt', 'data', settings),
+        NarrativeCache.key('model-a', 'prompt 2', 'data', settings),
+        NarrativeCache.key('model-a', 'prompt', 'data 2', settings),
+        NarrativeCache.key('model-a', 'prompt', 'data', {**settings, 'temperature': 0.2}),
+        NarrativeCache.key('model-a', 'prompt', 'data', {**settings, 'system': 'journalist'}),
+    }) == 6
+
+
+def test_cache_hits_need_no_api_key(cache, messages):
+    make_client(cache, messages).generate_section(SECTION, DATA)
+
+    offline = ClaudeLLMClient(cache=cache)
+    offline.retry_delay = 0
+    assert offline.generate_section(SECTION, DATA) == 'narrative 1'
+    # A miss needs the API, which needs the key
+    with pytest.raises(ValueError):
+        offline.generate_section(SECTION, {'overall_metrics': {'unique_providers': 1}})
+
+    with pytest.raises(ValueError):
+        ClaudeLLMClient(cache=None)
+
+
+def test_refresh_bypasses_and_updates_the_cache(cache, messages):
+    client = make_client(cache, messages)
+    client.generate_section(SECTION, DATA)
+
+    assert client.generate_section(SECTION, DATA, refresh=True) == 'narrative 2'
+    assert len(messages.requests) == 2
+    assert client.generate_section(SECTION, DATA) == 'narrative 2'
+    assert len(messages.requests) == 2
+
+
+def test_unreadable_entries_are_regenerated(cache, messages):
+    client = make_client(cache, messages)
+    client.generate_section(SECTION, DATA)
+    for path in cache.cache_dir.glob('*/*.json'):
+        path.write_text('{"narrative": ')
+
+    assert client.generate_section(SECTION, DATA) == 'narrative 2'
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    """ReportGenerator writing under tmp_path, with concurrent sections and no narrative cache"""
+    monkeypatch.chdir(tmp_path)
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'health_system': {'name': 'Test Health', 'short_name': 'test'},
+        'analysis': {'start_year': 2020, 'end_year': 2024},
+        'reports': {'llm': {'max_concurrent_sections': 4, 'narrative_cache': {'enabled': False}}},
+    }))
+    generator = ReportGenerator(str(config_path))
+    generator.report_data = {}
+    return generator
+
+
+def test_only_sections_that_build_on_earlier_ones_have_dependencies(generator):
+    with open(PROMPTS_PATH) as f:
+        prompts = yaml.safe_load(f)
+    order = prompts['section_order']
+    dependencies = generator._section_dependencies(prompts, order)
+
+    assert dependencies['executive_summary'] == order[:-1]
+    assert all(dependencies[name] == [] for name in order[:-1])
+
+    # A mid-report section referencing {previous_sections} waits for the sections before it only
+    prompts = {
+        'a': {'prompt': '{data}'},
+        'b': {'prompt': '{data}\n{previous_sections}'},
+        'c': {'prompt': '{data}'},
+        'd': {'prompt': '{data}', 'data_required': ['all_section_summaries']},
+    }
+    dependencies = generator._section_dependencies(prompts, ['a', 'b', 'c', 'd'])
+    assert dependencies == {'a': [], 'b': ['a'], 'c': [], 'd': ['a', 'b', 'c']}
+
+
+class StubSectionClient:
+    """ClaudeLLMClient stand-in recording each section's context and failing one section"""
+
+    failing = 'Section 3: The Quantification of Influence'
+
+    def __init__(self, cache=None):
+        self.calls = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        StubSectionClient.instance = self
+
+    def generate_section(self, section_config, section_data, previous_sections=None, refresh=False):
+        context = section_config['context']
+        with self.lock:
+            self.calls[context] = dict(previous_sections or {})
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(0.05)
+            if context == self.failing:
+                raise RuntimeError('API unavailable')
+            return f"Narrative for {context}"
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_scheduler_runs_sections_concurrently_and_falls_back(generator, monkeypatch):
+    monkeypatch.setattr(report_generator, 'ClaudeLLMClient', StubSectionClient)
+    report = generator._generate_investigative_report()
+
+    client = StubSectionClient.instance
+    assert len(client.calls) == 10
+    assert 1 < client.peak_in_flight <= 4
+
+    # The failed section falls back to its placeholder; the report is still assembled
+    assert '[Section correlation_analysis - Data analysis in progress]' in report
+    assert 'Narrative for Section 1: The Landscape of Industry Financial Relationships' in report
+
+    # The executive summary ran last and saw every earlier section, the fallback included
+    summary_inputs = client.calls['Executive Summary - Written AFTER analyzing all findings']
+    assert len(summary_inputs) == 9
+    assert summary_inputs['correlation_analysis'] == '[Section correlation_analysis - Data analysis in progress]'
+    assert 'Narrative for Executive Summary' in report
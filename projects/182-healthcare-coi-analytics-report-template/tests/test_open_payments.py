@@ -0,0 +1,68 @@
+"""Provider tenure and consecutive-year streaks"""
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.open_payments import OpenPaymentsAnalyzer, provider_tenure
+
+
+def reference_tenure(payments: pd.DataFrame) -> pd.DataFrame:
+    """Per-provider loop over the sorted distinct payment years"""
+    rows = {}
+    for provider, group in payments.groupby('physician_id'):
+        years = sorted(set(group['payment_year']))
+        longest = current = 1
+        for previous, year in zip(years, years[1:]):
+            current = current + 1 if year == previous + 1 else 1
+            longest = max(longest, current)
+        rows[provider] = {
+            'first_year': years[0],
+            'last_year': years[-1],
+            'years_active': len(years),
+            'longest_streak': longest,
+            'gap_years': years[-1] - years[0] + 1 - len(years),
+            'total_received': group['total_amount'].sum()
+        }
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis('physician_id')
+
+
+def test_known_streaks():
+    payments = pd.DataFrame({
+        'physician_id': [1, 1, 1, 1, 2, 2, 2, 3, 4, 4, 4, 4],
+        'payment_year': [2019, 2020, 2020, 2022, 2018, 2019, 2020, 2021, 2016, 2018, 2019, 2023],
+        'total_amount': [10.0, 5.0, 5.0, 1.0, 1.0, 1.0, 1.0, 7.0, 1.0, 1.0, 1.0, 1.0]
+    })
+    tenure = provider_tenure(payments)
+
+    assert tenure['longest_streak'].to_dict() == {1: 2, 2: 3, 3: 1, 4: 2}
+    assert tenure['gap_years'].to_dict() == {1: 1, 2: 0, 3: 0, 4: 4}
+    assert tenure['years_active'].to_dict() == {1: 3, 2: 3, 3: 1, 4: 4}
+    assert tenure.loc[1, 'total_received'] == 21.0
+
+
+def test_matches_per_provider_loop(payments_data):
+    # Drop random provider-years so streaks break in different places
+    rng = np.random.default_rng(3)
+    payments = payments_data[rng.random(len(payments_data)) < 0.3]
+
+    tenure = provider_tenure(payments)
+    expected = reference_tenure(payments)
+    pd.testing.assert_frame_equal(tenure.sort_index(), expected[tenure.columns].sort_index(),
+                                  check_dtype=False, check_names=False)
+
+
+def test_empty_payments():
+    payments = pd.DataFrame({'physician_id': [], 'payment_year': [], 'total_amount': []})
+    tenure = provider_tenure(payments)
+    assert tenure.empty
+    assert 'longest_streak' in tenure.columns
+
+
+def test_consecutive_years_summary(payments_data):
+    payments = payments_data[payments_data['payment_year'] != 2021]
+    summary = OpenPaymentsAnalyzer(payments).analyze_consecutive_years()
+    expected = reference_tenure(payments).groupby('longest_streak')['total_received'].agg(['size', 'mean'])
+
+    assert summary['consecutive_years'].tolist() == expected.index.tolist()
+    assert summary['provider_count'].tolist() == expected['size'].tolist()
+    np.testing.assert_allclose(summary['avg_total_payment'], expected['mean'])
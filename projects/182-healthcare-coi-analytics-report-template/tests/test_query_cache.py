@@ -0,0 +1,120 @@
+"""Query result cache: SQL normalization, table-version keys and LRU eviction"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.data.query_cache import QueryResultCache, normalize_sql, referenced_tables
+
+
+@pytest.mark.parametrize('query, normalized', [
+    ("SELECT a,\n       b\n  FROM `p.d.t`\n WHERE x = 1;\n", "SELECT a, b FROM `p.d.t` WHERE x = 1"),
+    ("SELECT a -- the key\nFROM t # legacy comment\n/* block\n comment */ WHERE b = 2 ;;",
+     "SELECT a FROM t WHERE b = 2"),
+    # Literals and quoted identifiers keep their whitespace and comment markers
+    ("SELECT 'a  -- not a comment' AS s, \"x  y\" FROM `p.d.my  table`",
+     "SELECT 'a  -- not a comment' AS s, \"x  y\" FROM `p.d.my  table`"),
+    ("SELECT 'it\\'s /* kept */'", "SELECT 'it\\'s /* kept */'"),
+])
+def test_normalize_sql(query, normalized):
+    assert normalize_sql(query) == normalized
+
+
+def test_equivalent_sql_shares_a_key(tmp_path):
+    cache = QueryResultCache(str(tmp_path / 'cache'))
+    key = cache.make_key("SELECT a FROM `p.d.t` WHERE b = 'x'")
+    assert cache.make_key("-- report query\nSELECT a\n  FROM `p.d.t`\n WHERE b = 'x';") == key
+    assert cache.make_key("SELECT a FROM `p.d.t` WHERE b = 'X'") != key
+    assert cache.make_key("SELECT a FROM `p.d.t` WHERE b = 'x'", params={'year': 2024}) != key
+
+
+def test_table_versions_are_part_of_the_key(tmp_path):
+    cache = QueryResultCache(str(tmp_path / 'cache'))
+    query = "SELECT * FROM `p.d.a` JOIN p.d.b USING (id)"
+    assert referenced_tables(query) == ['p.d.a', 'p.d.b']
+
+    key = cache.make_key(query, table_versions={'p.d.a': '2024-01-01', 'p.d.b': '2024-01-01'})
+    assert key == cache.make_key(query, table_versions={'p.d.b': '2024-01-01', 'p.d.a': '2024-01-01'})
+    assert key != cache.make_key(query, table_versions={'p.d.a': '2024-01-02', 'p.d.b': '2024-01-01'})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    df = pd.DataFrame({'value': range(2_000)})
+    cache = QueryResultCache(str(tmp_path / 'cache'))
+    cache.put('first', df)
+    entry_size = cache.size_bytes()
+    cache.max_bytes = 3 * entry_size
+    cache.put('second', df)
+    cache.put('third', df)
+    for age, key in enumerate(['first', 'second', 'third']):
+        os.utime(tmp_path / 'cache' / f'{key}.parquet', (1_000 + age, 1_000 + age))
+
+    # Reading 'first' makes 'second' the least recently used
+    assert cache.get('first') is not None
+    cache.put('fourth', df)
+
+    assert cache.get('second') is None
+    assert all(cache.get(key) is not None for key in ('first', 'third', 'fourth'))
+    assert not (tmp_path / 'cache' / 'second.json').exists()
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['size_bytes'] <= cache.max_bytes
+
+
+def test_unversioned_results_expire(tmp_path):
+    cache = QueryResultCache(str(tmp_path / 'cache'), fallback_ttl_seconds=0)
+    df = pd.DataFrame({'value': [1]})
+    cache.put('versioned', df)
+    cache.put('unversioned', df, {'unversioned': True})
+
+    assert cache.get('versioned') is not None
+    assert cache.get('unversioned') is None
+    assert not (tmp_path / 'cache' / 'unversioned.parquet').exists()
+
+
+@pytest.fixture
+def connector(duckdb_config, tmp_path):
+    """Connector on the DuckDB backend with the query cache enabled"""
+    from src.data.bigquery_connector import BigQueryConnector
+
+    bq = BigQueryConnector(duckdb_config['bigquery']['backend'])
+    bq.configure_cache(cache_dir=str(tmp_path / 'query_cache'))
+    return bq
+
+
+def test_connector_reuses_results_until_a_table_is_rewritten(connector):
+    table = 'test-project.temp.cache_probe'
+    connector.execute(f"CREATE OR REPLACE TABLE `{table}` AS SELECT 1 AS value")
+    query = f"SELECT SUM(value) AS total FROM `{table}`"
+
+    assert connector.query(query)['total'].iloc[0] == 1
+    assert connector.last_query_stats['source'] == 'duckdb'
+    assert connector.query(f"SELECT SUM(value) AS total\n  FROM `{table}` -- same query\n")['total'].iloc[0] == 1
+    assert connector.last_query_stats['source'] == 'cache'
+
+    # execute() forgets the table's memoized version, so the next lookup sees the rewrite
+    connector.execute(f"CREATE OR REPLACE TABLE `{table}` AS SELECT 1 AS value UNION ALL SELECT 2")
+    assert connector.query(query)['total'].iloc[0] == 3
+    assert connector.last_query_stats['source'] == 'duckdb'
+    assert connector.query(query)['total'].iloc[0] == 3
+    assert connector.last_query_stats['source'] == 'cache'
+
+    stats = connector.get_cache_stats()
+    assert (stats['hits'], stats['misses']) == (2, 2)
+
+
+def test_source_tables_are_versioned_by_their_extracts(connector, duckdb_config):
+    query = "SELECT COUNT(*) AS n FROM `test-project.ds.op`"
+    key, versioned = connector._get_cache_key(query)
+    assert versioned
+
+    extract = f"{duckdb_config['bigquery']['backend']['source_dir']}/ds/op.parquet"
+    os.utime(extract, (2_000_000_000, 2_000_000_000))
+    # Memoized until the resolver refreshes or is invalidated
+    assert connector._get_cache_key(query)[0] == key
+    connector.invalidate_table_versions('test-project.ds.op')
+    assert connector._get_cache_key(query)[0] != key
+
+    # Wildcard tables cannot be versioned and fall back to time-based expiry
+    assert not connector._get_cache_key("SELECT * FROM `test-project.ds.op_*`")[1]
@@ -0,0 +1,159 @@
+"""Query cost guard: per-query and per-run bytes budgets, fallback routing and bytes-billed caps"""
+
+from types import SimpleNamespace
+
+import pytest
+from google.cloud import bigquery
+
+from src.data.query_guard import GB, QueryBudgetExceeded, QueryCostGuard
+
+
+class DryRunClient:
+    """Dry runs report the bytes encoded in the query text ('SELECT <GB>') or the size of its table"""
+
+    def __init__(self, table_gb=None):
+        self.table_gb = table_gb or {}
+        self.dry_runs = []
+
+    def query(self, query, job_config=None):
+        assert job_config.dry_run
+        self.dry_runs.append(query)
+        for table, gb in self.table_gb.items():
+            if f'`{table}`' in query:
+                return SimpleNamespace(total_bytes_processed=int(gb * GB))
+        return SimpleNamespace(total_bytes_processed=int(float(query.split()[1]) * GB))
+
+
+@pytest.fixture
+def guard():
+    guard = QueryCostGuard(DryRunClient(), max_gb_per_query=5, max_gb_per_run=10)
+    guard.start_run()
+    return guard
+
+
+def test_batch_within_budget_is_reserved(guard):
+    checked = guard.check_many({'a': 'SELECT 2', 'b': 'SELECT 3'})
+    assert {name: bytes_estimate for name, (_, bytes_estimate) in checked.items()} == {'a': 2 * GB, 'b': 3 * GB}
+    assert guard.run_bytes == 5 * GB
+
+
+def test_blocked_batch_releases_its_reservations(guard):
+    with pytest.raises(QueryBudgetExceeded):
+        guard.check_many({'a': 'SELECT 2', 'b': 'SELECT 3', 'too_big': 'SELECT 6'})
+    assert guard.run_bytes == 0
+    statuses = {record['name']: record['status'] for record in guard.get_summary()['queries']}
+    assert statuses == {'a': 'released', 'b': 'released', 'too_big': 'blocked'}
+
+    # Nothing was spent, so the full run budget is still available
+    guard.check_many({'c': 'SELECT 5', 'd': 'SELECT 5'})
+    assert guard.run_bytes == 10 * GB
+
+
+def test_per_query_limit(guard):
+    assert guard.check('SELECT 5', 'at_limit') == ('SELECT 5', 5 * GB)
+    guard.start_run()
+
+    with pytest.raises(QueryBudgetExceeded) as error:
+        guard.check('SELECT 6', 'too_big')
+    assert (error.value.query_name, error.value.scope) == ('too_big', 'per-query')
+    assert (error.value.bytes_estimate, error.value.limit) == (6 * GB, 5 * GB)
+    # A blocked query reserves nothing
+    assert guard.run_bytes == 0
+    assert guard.get_summary()['queries_blocked'] == 1
+
+
+def test_per_run_limit(guard):
+    guard.check('SELECT 4', 'first')
+    guard.check('SELECT 4', 'second')
+    with pytest.raises(QueryBudgetExceeded) as error:
+        guard.check('SELECT 4', 'third')
+    assert error.value.scope == 'per-run' and error.value.limit == 10 * GB
+    assert guard.run_bytes == 8 * GB
+
+
+DETAILED = 'p.ds.op_detailed'
+SUMMARY = 'p.ds.op_summary'
+
+
+def fallback_guard(summary_gb, **kwargs):
+    client = DryRunClient({DETAILED: 8, SUMMARY: summary_gb})
+    guard = QueryCostGuard(client, max_gb_per_query=5, max_gb_per_run=10, on_exceed='fallback', **kwargs)
+    guard.register_fallback(f'`{DETAILED}`', SUMMARY)
+    return guard, client
+
+
+def test_over_budget_queries_are_routed_to_the_fallback_table():
+    guard, client = fallback_guard(summary_gb=1)
+    tracker = SimpleNamespace(costs=[], add_query_cost=lambda *args: tracker.costs.append(args))
+    guard.lineage_tracker = tracker
+
+    query, bytes_estimate = guard.check(f'SELECT * FROM `{DETAILED}`', 'payments')
+
+    assert query == f'SELECT * FROM `{SUMMARY}`'
+    assert bytes_estimate == 1 * GB and guard.run_bytes == 1 * GB
+    assert client.dry_runs == [f'SELECT * FROM `{DETAILED}`', query]
+    [record] = guard.get_summary()['queries']
+    assert record['status'] == 'routed'
+    assert record['original_bytes_estimate'] == 8 * GB
+    assert record['bytes_processed_estimate'] == 1 * GB
+    assert guard.get_summary()['queries_routed'] == 1
+    assert tracker.costs == [('payments', 1 * GB, 'routed')]
+
+
+def test_fallback_still_over_budget_is_blocked():
+    guard, _ = fallback_guard(summary_gb=6)
+    with pytest.raises(QueryBudgetExceeded) as error:
+        guard.check(f'SELECT * FROM `{DETAILED}`', 'payments')
+    assert error.value.scope == 'per-query'
+    [record] = guard.get_summary()['queries']
+    assert record['status'] == 'blocked' and 'original_bytes_estimate' not in record
+    assert guard.run_bytes == 0
+
+
+def test_fallback_is_not_used_when_disallowed_or_failing():
+    guard, client = fallback_guard(summary_gb=1)
+    # Statements that write tables are never rerouted
+    with pytest.raises(QueryBudgetExceeded):
+        guard.check(f'SELECT * FROM `{DETAILED}`', 'create_table', allow_fallback=False)
+    assert len(client.dry_runs) == 1
+
+    # Queries on tables without a fallback are blocked as in "fail" mode
+    with pytest.raises(QueryBudgetExceeded):
+        guard.check('SELECT 7', 'unrouted')
+
+    # A fallback that fails its dry run leaves the original verdict
+    def broken_dry_run(query, job_config=None):
+        if SUMMARY in query:
+            raise RuntimeError('Not found: Table p:ds.op_summary')
+        return SimpleNamespace(total_bytes_processed=8 * GB)
+
+    client.query = broken_dry_run
+    with pytest.raises(QueryBudgetExceeded):
+        guard.check(f'SELECT * FROM `{DETAILED}`', 'payments')
+
+
+def test_fail_mode_does_not_route():
+    client = DryRunClient({DETAILED: 8, SUMMARY: 1})
+    guard = QueryCostGuard(client, max_gb_per_query=5)
+    guard.register_fallback(DETAILED, SUMMARY)
+    with pytest.raises(QueryBudgetExceeded):
+        guard.check(f'SELECT * FROM `{DETAILED}`', 'payments')
+    assert len(client.dry_runs) == 1
+
+
+def test_job_config_caps_bytes_billed():
+    guard = QueryCostGuard(DryRunClient(), max_gb_per_query=5)
+    assert guard.job_config().maximum_bytes_billed == 5 * GB
+
+    # An existing config keeps its settings
+    existing = bigquery.QueryJobConfig(use_query_cache=False)
+    assert guard.job_config(existing) is existing
+    assert existing.maximum_bytes_billed == 5 * GB and existing.use_query_cache is False
+
+    # Without a per-query limit nothing is capped
+    assert QueryCostGuard(DryRunClient()).job_config().maximum_bytes_billed is None
+
+
+def test_invalid_on_exceed_is_rejected():
+    with pytest.raises(ValueError):
+        QueryCostGuard(DryRunClient(), on_exceed='warn')
@@ -0,0 +1,205 @@
+"""QueryScheduler against a stub connector: concurrency cap, cache reuse, retry backoff and timeouts"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.analysis.query_scheduler import QueryScheduler
+
+
+class StubJob:
+    """Query job that finishes `duration` seconds after submission, optionally failing"""
+
+    def __init__(self, client, sql, duration, error=None):
+        self.client = client
+        self.sql = sql
+        self.error = error
+        self.finishes_at = time.perf_counter() + duration
+        self.cancelled = False
+        self.job_id = f'job-{len(client.submitted)}'
+
+    def done(self):
+        return time.perf_counter() >= self.finishes_at
+
+    def to_dataframe(self):
+        self.client.release(self)
+        if self.error:
+            raise self.error
+        return pd.DataFrame({'query': [self.sql]})
+
+    def cancel(self):
+        self.cancelled = True
+        self.client.release(self)
+
+
+class StubClient:
+    """bigquery.Client stand-in tracking how many jobs are in flight"""
+
+    def __init__(self, duration=0.05):
+        self.duration = duration
+        self.fail = {}          # sql -> failures left (errors raised by the job)
+        self.reject = {}        # sql -> submissions left to reject
+        self.hang = set()       # sql whose jobs never finish
+        self.submitted = []     # (sql, time)
+        self.jobs = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def query(self, sql, job_config=None):
+        self.submitted.append((sql, time.perf_counter()))
+        if self.reject.get(sql):
+            self.reject[sql] -= 1
+            raise ConnectionError('submission rejected')
+        error = None
+        if self.fail.get(sql):
+            self.fail[sql] -= 1
+            error = RuntimeError('backend error')
+        job = StubJob(self, sql, float('inf') if sql in self.hang else self.duration, error)
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.jobs.append(job)
+        return job
+
+    def release(self, job):
+        with self._lock:
+            self.in_flight -= 1
+
+    def submissions(self, sql):
+        return [at for submitted, at in self.submitted if submitted == sql]
+
+
+class StubConnector:
+    """BigQueryConnector stand-in with an in-memory result cache"""
+
+    backend = 'stub'
+    cost_guard = None
+
+    def __init__(self, client):
+        self.client = client
+        self.cache = {}
+        self.recorded = []
+
+    def query(self, sql):
+        raise AssertionError('the scheduler submits jobs itself')
+
+    def get_cached_result(self, sql):
+        return self.cache.get(sql), sql
+
+    def store_result(self, cache_key, df):
+        self.cache[cache_key] = df
+
+    def record_job(self, job, query_name, query_type='query', step=None):
+        self.recorded.append((query_name, step))
+        return {'job_id': job.job_id}
+
+
+class StubTracker:
+    def __init__(self):
+        self.queries = {}
+
+    def add_query(self, name, status, rows, duration_ms=None, **details):
+        self.queries[name] = {'status': status, 'rows': rows, **details}
+
+
+@pytest.fixture
+def client():
+    return StubClient()
+
+
+@pytest.fixture
+def connector(client):
+    return StubConnector(client)
+
+
+@pytest.fixture
+def tracker():
+    return StubTracker()
+
+
+def queries(count):
+    return {f'q{i}': f'SELECT {i}' for i in range(count)}
+
+
+def test_concurrency_is_capped(connector, client, tracker):
+    scheduler = QueryScheduler(connector, max_concurrent=3, poll_interval=0.01, query_tracker=tracker,
+                               query_steps={'q0': 'open_payments'})
+    results = scheduler.run(queries(10))
+
+    assert client.peak_in_flight == 3
+    assert len(client.submitted) == 10
+    assert {name: status for name, (_, status) in results.items()} == {f'q{i}': 'success' for i in range(10)}
+    assert results['q4'][0]['query'].tolist() == ['SELECT 4']
+    assert {name: details['status'] for name, details in tracker.queries.items()} == \
+        {f'q{i}': 'success' for i in range(10)}
+    assert tracker.queries['q0']['source'] == 'stub' and tracker.queries['q0']['attempts'] == 1
+    assert ('q0', 'open_payments') in connector.recorded
+
+
+def test_cached_results_are_not_resubmitted(connector, client, tracker):
+    QueryScheduler(connector, poll_interval=0.01).run(queries(4))
+    client.submitted.clear()
+
+    results = QueryScheduler(connector, poll_interval=0.01, query_tracker=tracker).run(queries(6))
+    assert [sql for sql, _ in client.submitted] == ['SELECT 4', 'SELECT 5']
+    assert results['q0'][1] == 'success'
+    assert tracker.queries['q0']['source'] == 'cache'
+
+
+def test_failed_queries_are_retried_after_a_backoff(connector, client, tracker):
+    client.fail['SELECT 0'] = 1
+    client.reject['SELECT 1'] = 1
+    scheduler = QueryScheduler(connector, max_concurrent=4, poll_interval=0.01, max_retries=1,
+                               retry_delay=0.3, query_tracker=tracker)
+    results = scheduler.run(queries(4))
+
+    assert all(status == 'success' for _, status in results.values())
+    for sql in ('SELECT 0', 'SELECT 1'):
+        first, retry = client.submissions(sql)
+        assert retry - first >= 0.3
+    assert tracker.queries['q0']['attempts'] == tracker.queries['q1']['attempts'] == 2
+    # The other queries did not wait for the backoff
+    assert client.submissions('SELECT 3')[0] < client.submissions('SELECT 0')[1]
+    # Failed attempts are not cached
+    assert connector.cache['SELECT 0']['query'].tolist() == ['SELECT 0']
+
+
+def test_backoff_doubles_and_retries_run_out(connector, client, tracker):
+    client.fail['SELECT 0'] = 3
+    scheduler = QueryScheduler(connector, poll_interval=0.01, max_retries=2, retry_delay=0.1,
+                               query_tracker=tracker)
+    results = scheduler.run(queries(1))
+
+    df, status = results['q0']
+    assert status == 'failed' and df.empty
+    first, second, third = client.submissions('SELECT 0')
+    assert second - first >= 0.1
+    assert third - second >= 0.2
+    assert tracker.queries['q0']['status'] == 'failed'
+    assert tracker.queries['q0']['attempts'] == 3
+    assert 'backend error' in tracker.queries['q0']['error']
+    assert 'SELECT 0' not in connector.cache
+
+
+def test_slow_jobs_are_cancelled_after_the_timeout(connector, client, tracker):
+    client.hang.add('SELECT 0')
+    scheduler = QueryScheduler(connector, poll_interval=0.01, timeout_seconds=0.2, max_retries=0,
+                               query_tracker=tracker)
+    start = time.perf_counter()
+    results = scheduler.run(queries(3))
+
+    assert 0.2 <= time.perf_counter() - start < 2
+    assert results['q0'][1] == 'failed'
+    assert results['q1'][1] == results['q2'][1] == 'success'
+    assert [job.cancelled for job in client.jobs if job.sql == 'SELECT 0'] == [True]
+    assert 'exceeded' in tracker.queries['q0']['error']
+    assert client.in_flight == 0
+
+
+def test_raw_clients_are_supported(client):
+    results = QueryScheduler(client, max_concurrent=2, poll_interval=0.01).run(queries(3))
+    assert client.peak_in_flight == 2
+    assert all(status == 'success' for _, status in results.values())
@@ -0,0 +1,164 @@
+"""Persisted, incremental provider risk scoring"""
+
+import copy
+
+import pandas as pd
+import pytest
+
+from src.analysis.risk_scoring import RiskScorer
+from src.analysis.risk_model import ProviderScoreStore
+
+THRESHOLDS = {'payment': {'high_single_payment': 5000, 'high_annual_total': 10000}}
+SCORE_COLUMNS = ['NPI', 'payment_risk', 'prescription_risk', 'relationship_risk',
+                 'behavioral_risk', 'correlation_risk', 'composite_risk_score', 'risk_level', 'is_anomaly']
+
+
+def make_config(model_dir, short_name='test', thresholds=None, **settings):
+    return {
+        'health_system': {'short_name': short_name},
+        'thresholds': copy.deepcopy(thresholds or THRESHOLDS),
+        'analysis': {'risk_scoring': {'persist_model': True, 'model_dir': str(model_dir),
+                                      'chunk_size': 97, 'n_jobs': 4, **settings}}
+    }
+
+
+def scores(df: pd.DataFrame) -> pd.DataFrame:
+    return df[SCORE_COLUMNS].sort_values('NPI').reset_index(drop=True)
+
+
+def stored_keys(model_dir, short_name='test') -> set:
+    return set(ProviderScoreStore(model_dir / short_name).load()['scoring_key'])
+
+
+def test_incremental_matches_full_rescore(tmp_path, payments_data, prescription_data):
+    # First run fits and persists the model and scores
+    RiskScorer(make_config(tmp_path)).score_providers(payments_data, prescription_data)
+
+    # Change some providers' inputs and add a new provider
+    changed = payments_data.copy()
+    changed.loc[changed.index[:50], 'total_amount'] *= 10
+    new_provider = changed.iloc[:3].assign(physician_id=2_000_000_000)
+    changed = pd.concat([changed, new_provider], ignore_index=True)
+
+    incremental = RiskScorer(make_config(tmp_path)).score_providers(changed, prescription_data)
+    full = RiskScorer(make_config(tmp_path, incremental=False)).score_providers(changed, prescription_data)
+
+    pd.testing.assert_frame_equal(scores(incremental), scores(full))
+    assert 2_000_000_000 in set(incremental['NPI'])
+
+
+def test_threshold_change_rescores_everything(tmp_path, payments_data, prescription_data):
+    RiskScorer(make_config(tmp_path)).score_providers(payments_data, prescription_data)
+    keys_before = stored_keys(tmp_path)
+
+    lowered = {'payment': {'high_single_payment': 50, 'high_annual_total': 100}}
+    incremental = RiskScorer(make_config(tmp_path, thresholds=lowered)).score_providers(
+        payments_data, prescription_data
+    )
+    full = RiskScorer(make_config(tmp_path, thresholds=lowered, incremental=False)).score_providers(
+        payments_data, prescription_data
+    )
+
+    # No stored score computed under the old thresholds survives
+    pd.testing.assert_frame_equal(scores(incremental), scores(full))
+    assert stored_keys(tmp_path).isdisjoint(keys_before)
+
+
+def test_scoring_key_covers_thresholds_and_code(tmp_path):
+    scorer = RiskScorer(make_config(tmp_path))
+    fingerprint = scorer._scoring_fingerprint()
+    assert RiskScorer(make_config(tmp_path))._scoring_fingerprint() == fingerprint
+
+    lowered = {'payment': {'high_single_payment': 50, 'high_annual_total': 10000}}
+    assert RiskScorer(make_config(tmp_path, thresholds=lowered))._scoring_fingerprint() != fingerprint
+
+    class PatchedScorer(RiskScorer):
+        def _calculate_payment_risk(self, df):
+            return super()._calculate_payment_risk(df) / 2
+
+    assert PatchedScorer(make_config(tmp_path))._scoring_fingerprint() != fingerprint
+
+
+def test_model_dir_is_per_health_system(tmp_path, payments_data, prescription_data):
+    alpha = RiskScorer(make_config(tmp_path, short_name='alpha'))
+    alpha.score_providers(payments_data, prescription_data)
+    beta = RiskScorer(make_config(tmp_path, short_name='beta'))
+    beta.score_providers(payments_data.iloc[:1000], prescription_data.iloc[:1000])
+
+    # Each population gets its own fitted model instead of reusing the first one
+    assert alpha.risk_model.version != beta.risk_model.version
+    assert (tmp_path / 'alpha').is_dir() and (tmp_path / 'beta').is_dir()
+
+
+def test_sustained_relationship_counts_distinct_years_by_default(tmp_path):
+    providers = pd.DataFrame({
+        'unique_manufacturers': [2, 2],
+        'total_payments': [6000.0, 6000.0],
+        'total_rx_cost': [1e6, 1e6],
+        'payment_years': [3, 3],
+        'longest_streak': [3, 1]  # 2019-2021 vs 2017, 2019, 2021
+    })
+    stats = {'payment_rx_ratio_p95': 1.0}
+
+    distinct = RiskScorer(make_config(tmp_path))._calculate_relationship_risk(providers, stats)
+    assert distinct[0] == distinct[1]
+
+    thresholds = {**THRESHOLDS, 'relationship': {'consecutive_years': True}}
+    consecutive = RiskScorer(make_config(tmp_path, thresholds=thresholds))._calculate_relationship_risk(
+        providers, stats
+    )
+    assert consecutive[0] == distinct[0]
+    assert consecutive[1] == distinct[1] - 40
+
+
+# Population percentiles pinned so each component can be checked by hand
+PINNED_STATS = {
+    'rx_claims_p75': 100, 'rx_claims_p90': 1000, 'rx_cost_p75': 5000, 'rx_cost_p90': 1e6,
+    'payments_p75': 1000, 'cost_per_claim_p90': 50, 'claims_per_beneficiary_p95': 5,
+    'payment_rx_ratio_p95': 1.0
+}
+
+
+def pinned_providers() -> pd.DataFrame:
+    return pd.DataFrame({
+        # Many small payments, one-drug prescriber | large multi-year payments
+        'max_single_payment': [50.0, 10000.0],
+        'total_payments': [600.0, 20000.0],
+        'payment_count': [60, 4],
+        'unique_manufacturers': [2, 12],
+        'payment_categories': [1, 6],
+        'payment_years': [1, 5],
+        'longest_streak': [1, 5],
+        'total_rx_claims': [200, 50],
+        'total_rx_cost': [20000.0, 1000.0],
+        'unique_drugs': [1, 10],
+        'total_beneficiaries': [100, 10],
+    })
+
+
+def test_pinned_component_and_composite_scores(tmp_path):
+    df = RiskScorer(make_config(tmp_path))._score_frame(pinned_providers(), PINNED_STATS)
+
+    # 15 for many small payments (was 1: `a & b * 15` is `a & (b * 15)`) + 3 + 2 + 4
+    # | 20 + 20 + 15 + 10 + 20
+    assert df['payment_risk'].tolist() == [24.0, 85.0]
+    # 20 expensive claims + 15 low drug diversity (was 1, same precedence bug) | nothing
+    assert df['prescription_risk'].tolist() == [35.0, 0.0]
+    assert df['relationship_risk'].tolist() == [15.0, 72.5]
+    assert df['behavioral_risk'].tolist() == [35.0, 0.0]
+    assert df['correlation_risk'].tolist() == [50, 50]
+    # Components used to start from NaN, so every composite score was NaN
+    assert df['composite_risk_score'].tolist() == pytest.approx([30.5, 43.25])
+    assert df['risk_level'].tolist() == ['Medium', 'Medium']
+
+
+def test_default_path_scores_every_provider(tmp_path, payments_data, prescription_data):
+    config = make_config(tmp_path, persist_model=False)
+    df = RiskScorer(config).score_providers(payments_data, prescription_data)
+
+    components = [component for component, _ in RiskScorer.RISK_COMPONENTS]
+    assert df[components + ['composite_risk_score']].notna().all().all()
+    assert df['composite_risk_score'].between(0, 100).all()
+    # Composite is the weighted sum of the components
+    expected = sum(df[component] * weight for component, weight in RiskScorer.RISK_COMPONENTS)
+    pd.testing.assert_series_equal(df['composite_risk_score'], expected, check_names=False)
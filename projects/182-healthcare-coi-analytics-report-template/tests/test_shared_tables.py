@@ -0,0 +1,79 @@
+"""Batch mode: shared client-tagged tables and per-client connector settings on the DuckDB backend"""
+
+import copy
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.data.data_loader import DataLoader
+from src.data.shared_tables import SharedTables
+
+GB = 1024 ** 3
+
+
+@pytest.fixture
+def client_loaders(duckdb_config, tmp_path):
+    """Loaders of two clients with overlapping rosters on the same backend"""
+    npis = pd.read_csv(duckdb_config['health_system']['npi_file'])['NPI']
+    rosters = {'alpha': npis[:150], 'beta': npis[100:]}
+
+    loaders = {}
+    for short_name, roster in rosters.items():
+        config = copy.deepcopy(duckdb_config)
+        config['health_system'].update(short_name=short_name, npi_file=str(tmp_path / f'{short_name}_npis.csv'))
+        roster.to_frame().to_csv(config['health_system']['npi_file'], index=False)
+        if short_name == 'alpha':
+            config['bigquery']['query_cache'] = {'enabled': False, 'cache_dir': str(tmp_path / 'alpha_cache')}
+            config['bigquery']['cost_limits'] = {'max_gb_per_run': 1, 'on_exceed': 'fallback'}
+        config_path = tmp_path / f'{short_name}.yaml'
+        config_path.write_text(yaml.safe_dump(config))
+        loaders[short_name] = DataLoader(str(config_path))
+    return loaders
+
+
+def test_clients_share_a_connector_but_not_its_settings(client_loaders):
+    alpha, beta = client_loaders['alpha'], client_loaders['beta']
+    assert alpha.bq is beta.bq
+
+    alpha.apply_connector_settings()
+    assert alpha.bq.cost_guard.max_bytes_per_run == GB
+    assert alpha.bq.cache_dir.parent.name == 'alpha_cache'
+    alpha.bq.cost_guard.register_fallback('p.temp.alpha_detailed', 'p.temp.alpha_summary')
+
+    beta.apply_connector_settings()
+    assert beta.bq.cost_guard is None
+    assert beta.bq.cache_dir.parent.name == 'query_results'
+
+    alpha.apply_connector_settings()
+    assert alpha.bq.cost_guard.fallback_tables == {}
+
+
+def summary_totals(loader: DataLoader) -> pd.DataFrame:
+    summary = loader.load_open_payments(summary_only=True)
+    return (summary.groupby('physician_id')['total_amount'].sum()
+            .sort_index().round(6))
+
+
+def test_client_partition_matches_direct_scan(client_loaders):
+    beta = client_loaders['beta']
+    beta.apply_connector_settings()
+    beta.load_open_payments(create_only=True)
+    direct = summary_totals(beta)
+
+    shared = SharedTables(client_loaders['alpha'])
+    tables = shared.build({name: loader.load_provider_npis() for name, loader in client_loaders.items()})
+
+    # Both clients' rows are in the shared table, overlapping providers once per client
+    rows = beta.bq.query(
+        f"SELECT DISTINCT client, physician_id FROM `{tables['open_payments']['detailed']}`",
+        query_name='shared_clients'
+    )
+    providers = rows.groupby('client')['physician_id'].apply(set)
+    assert sorted(providers.index) == ['alpha', 'beta']
+    assert providers['alpha'] & providers['beta']
+    assert providers['beta'] == set(direct.index)
+
+    beta.use_shared_tables(tables)
+    beta.load_open_payments(create_only=True)
+    pd.testing.assert_series_equal(summary_totals(beta), direct)
@@ -0,0 +1,180 @@
+"""Resumable, content-addressed pipeline steps: invalidation, resume, targeting and pruning"""
+
+import pytest
+
+from pipelines import step_cache
+from pipelines.step_cache import PipelineStep, StepCache, StepRunner
+
+
+class StubPipeline:
+    """Four stub steps (load -> a -> report, load -> b) that count their executions"""
+
+    def __init__(self, root):
+        self.calls = []
+        self.load_value = 1
+        self.fail = set()
+        (root / 'steps').mkdir()
+        for name in ('load', 'a', 'b', 'report'):
+            (root / 'steps' / f'{name}.py').write_text(f'# {name} v1\n')
+
+    def _step(self, name, compute, depends_on=(), **kwargs):
+        def run(inputs):
+            self.calls.append(name)
+            if name in self.fail:
+                raise RuntimeError(f'{name} failed')
+            return compute(inputs)
+        return PipelineStep(name, run, depends_on=list(depends_on), code=[f'steps/{name}.py'], **kwargs)
+
+    def steps(self, params=None):
+        return [
+            self._step('load', lambda inputs: {'rows': self.load_value}, config_keys=['source'], uses_npis=True),
+            self._step('a', lambda inputs: inputs['load']['rows'] * 10, depends_on=['load'],
+                       config_keys=['analysis.a']),
+            self._step('b', lambda inputs: inputs['load']['rows'] > 0, depends_on=['load']),
+            self._step('report', lambda inputs: f"report of {inputs['a']}", depends_on=['a'],
+                       params=params or {'style': 'investigative'}),
+        ]
+
+
+CONFIG = {'source': 'op', 'analysis': {'a': 1, 'unused': 'x'}}
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(step_cache, '_ROOT', tmp_path)
+    return StubPipeline(tmp_path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StepCache(str(tmp_path / 'cache'))
+
+
+def run(pipeline, cache, config=CONFIG, npi_hash='npis-1', params=None, **kwargs):
+    pipeline.calls = []
+    runner = StepRunner(pipeline.steps(params), config, npi_hash=npi_hash, cache=cache)
+    outputs = runner.run(**kwargs)
+    return runner, outputs
+
+
+def test_unchanged_steps_are_restored(pipeline, cache):
+    _, first = run(pipeline, cache)
+    assert pipeline.calls == ['load', 'a', 'b', 'report']
+
+    runner, second = run(pipeline, cache)
+    assert pipeline.calls == []
+    assert second == first
+    assert {status['status'] for status in runner.status.values()} == {'cached'}
+    assert runner.pending() == []
+
+
+@pytest.mark.parametrize('change, reran', [
+    # Config the step doesn't declare is not part of its fingerprint
+    (lambda p, kw: kw.update(config={**CONFIG, 'analysis': {'a': 1, 'unused': 'y'}}), []),
+    # Downstream steps are keyed on a's output, which these changes leave as it was
+    (lambda p, kw: kw.update(config={**CONFIG, 'analysis': {'a': 2}}), ['a']),
+    (lambda p, kw: kw.update(npi_hash='npis-2'), ['load']),
+    (lambda p, kw: kw.update(params={'style': 'research'}), ['report']),
+    (lambda p, kw: (p.steps_dir / 'a.py').write_text('# a v2\n'), ['a']),
+])
+def test_changed_inputs_invalidate_the_step(pipeline, cache, tmp_path, change, reran):
+    run(pipeline, cache)
+    pipeline.steps_dir = tmp_path / 'steps'
+    kwargs = {}
+    change(pipeline, kwargs)
+    run(pipeline, cache, **kwargs)
+    assert pipeline.calls == reran
+
+
+def test_changed_upstream_output_invalidates_downstream(pipeline, cache):
+    run(pipeline, cache)
+
+    # New roster and new data: everything below load reruns
+    pipeline.load_value = 2
+    runner, outputs = run(pipeline, cache, npi_hash='npis-2')
+    assert pipeline.calls == ['load', 'a', 'b', 'report']
+    assert outputs['report'] == 'report of 20'
+
+    # New roster but the same data: downstream outputs are content-addressed and reused
+    runner, outputs = run(pipeline, cache, npi_hash='npis-3')
+    assert pipeline.calls == ['load']
+    assert runner.status['a']['status'] == 'cached'
+
+
+def test_rerun_resumes_after_a_failed_step(pipeline, cache):
+    pipeline.fail = {'report'}
+    with pytest.raises(RuntimeError):
+        run(pipeline, cache)
+    assert pipeline.calls == ['load', 'a', 'b', 'report']
+
+    pipeline.fail = set()
+    runner, outputs = run(pipeline, cache)
+    assert pipeline.calls == ['report']
+    assert {runner.status[name]['status'] for name in ('load', 'a', 'b')} == {'cached'}
+    assert outputs['report'] == 'report of 10'
+
+
+def test_step_targeting(pipeline, cache):
+    # --step a: a and what it depends on, nothing downstream or unrelated
+    runner, outputs = run(pipeline, cache, targets=['a'], force=['a'])
+    assert pipeline.calls == ['load', 'a']
+    assert set(outputs) == {'load', 'a'}
+
+    # Targeted steps are re-executed even when cached; their upstream steps are reused
+    runner, _ = run(pipeline, cache, targets=['a'], force=['a'])
+    assert pipeline.calls == ['a']
+    assert runner.status['load']['status'] == 'cached'
+
+    assert StepRunner(pipeline.steps(), CONFIG, npi_hash='npis-1', cache=cache).pending(['report']) == ['report']
+    with pytest.raises(ValueError):
+        run(pipeline, cache, targets=['missing'])
+
+
+def test_invalid_cached_outputs_are_recomputed(pipeline, cache):
+    steps = pipeline.steps()
+    run(pipeline, cache)
+    steps[1].validate = lambda output: False
+    pipeline.calls = []
+    StepRunner(steps, CONFIG, npi_hash='npis-1', cache=cache).run()
+    assert pipeline.calls == ['a']
+
+
+def test_cache_keeps_the_latest_versions_per_step(tmp_path):
+    cache = StepCache(str(tmp_path / 'cache'), keep_versions=2)
+    for version in range(4):
+        cache.put('report', f'fingerprint{version}', f'output {version}', 0.1)
+        meta = tmp_path / 'cache' / 'report' / f'fingerprint{version}.json'
+        # Distinct mtimes: pruning keeps the most recently used entries
+        step_cache.os.utime(meta, (1_000 + version, 1_000 + version))
+
+    cache.put('report', 'fingerprint4', 'output 4', 0.1)
+    kept = sorted(path.stem for path in (tmp_path / 'cache' / 'report').glob('*.pkl'))
+    assert kept == ['fingerprint3', 'fingerprint4']
+    assert cache.get('report', 'fingerprint0') is None
+    assert cache.get('report', 'fingerprint3')['output'] == 'output 3'
+    assert not list((tmp_path / 'cache' / 'report').glob('*.tmp'))
+
+    cache.put('load', 'f', {'rows': 1}, 0.1)
+    assert cache.clear('report') == 2
+    assert cache.clear() == 1
+
+
+@pytest.fixture(scope='module')
+def analysis_steps():
+    """Steps of the local (non-BigQuery) analysis path, by name"""
+    from pipelines.full_analysis import FullAnalysisPipeline
+
+    steps = FullAnalysisPipeline._build_steps(object(), force_reload=False, generate_visualizations=False,
+                                              report_style='investigative', output_format='markdown',
+                                              use_bigquery_analysis=False)
+    return {step.name: step for step in steps}
+
+
+@pytest.mark.parametrize('name, module', [
+    # analyze_drug_specific_correlations reads min_prescribers_per_group from the analysis config
+    ('correlations', 'src/config/analysis_config.py'),
+    # Relationship risk uses provider_tenure for payment years and streaks
+    ('risk_assessment', 'src/analysis/open_payments.py'),
+])
+def test_steps_fingerprint_the_modules_they_read(analysis_steps, name, module):
+    assert module in analysis_steps[name].code
@@ -0,0 +1,101 @@
+"""Streamed temp-table downloads to partitioned Parquet on the DuckDB backend"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')  # Optional backend
+
+from src.data.table_stream import StreamedDataset, stream_table  # noqa: E402
+
+KEYS = ['physician_id', 'manufacturer', 'payment_year', 'payment_category', 'Product_Name']
+
+
+def _sorted(df: pd.DataFrame, keys) -> pd.DataFrame:
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def test_detailed_loads_stream_by_default(duckdb_loader):
+    payments = duckdb_loader.load_open_payments()
+    assert isinstance(payments, StreamedDataset)
+    assert payments.partition_by == ['payment_year']
+    assert sorted(p.name for p in payments.path.glob('payment_year=*')) == \
+        [f'payment_year={year}' for year in range(2020, 2025)]
+
+    queried = duckdb_loader.load_open_payments(stream=False)
+    assert isinstance(queried, pd.DataFrame)
+    assert len(payments) == len(queried)
+    pd.testing.assert_frame_equal(_sorted(payments.to_pandas()[list(queried.columns)], KEYS),
+                                  _sorted(queried, KEYS), check_dtype=False)
+
+    prescriptions = duckdb_loader.load_prescriptions()
+    assert isinstance(prescriptions, StreamedDataset)
+    assert prescriptions.partition_by == ['rx_year']
+
+    # Summary loads are still queried into a DataFrame
+    assert isinstance(duckdb_loader.load_open_payments(summary_only=True), pd.DataFrame)
+
+
+def test_downloads_are_reused_until_the_read_or_table_changes(duckdb_loader):
+    first = duckdb_loader.load_open_payments()
+    assert duckdb_loader.bq.last_query_stats['source'] == 'duckdb'
+
+    again = duckdb_loader.load_open_payments()
+    assert duckdb_loader.bq.last_query_stats['source'] == 'cache'
+    assert again.manifest['created'] == first.manifest['created']
+
+    # A different projection is a different download
+    duckdb_loader.load_open_payments(columns=['physician_id', 'payment_year', 'total_amount'])
+    assert duckdb_loader.bq.last_query_stats['source'] == 'duckdb'
+    duckdb_loader.load_open_payments(columns=['physician_id', 'payment_year', 'total_amount'])
+    assert duckdb_loader.bq.last_query_stats['source'] == 'cache'
+
+    # Recreated tables have a new version
+    duckdb_loader.load_open_payments(force_reload=True, create_only=True)
+    duckdb_loader.load_open_payments(columns=['physician_id', 'payment_year', 'total_amount'])
+    assert duckdb_loader.bq.last_query_stats['source'] == 'duckdb'
+
+
+def test_projection_and_filters_are_pushed_down(duckdb_loader):
+    full = duckdb_loader.load_open_payments(stream=False)
+
+    streamed = duckdb_loader.load_open_payments(
+        columns=['physician_id', 'payment_year', 'total_amount'], row_filter='payment_year >= 2023'
+    )
+    assert streamed.columns == ['physician_id', 'payment_year', 'total_amount']
+    assert len(streamed) == (full['payment_year'] >= 2023).sum()
+    assert sorted(p.name for p in streamed.path.glob('payment_year=*')) == ['payment_year=2023', 'payment_year=2024']
+
+    # Reads filter on partition columns (whole files) and other columns (rows)
+    assert streamed.count_rows(filter=[('payment_year', '==', 2024)]) == (full['payment_year'] == 2024).sum()
+    large = streamed.to_pandas(columns=['total_amount'], filter=[('total_amount', '>', 500)])
+    assert list(large.columns) == ['total_amount']
+    assert len(large) == ((full['payment_year'] >= 2023) & (full['total_amount'] > 500)).sum()
+    assert sum(len(chunk) for chunk in streamed.iter_frames(batch_size=100)) == len(streamed)
+
+
+def test_interrupted_stream_leaves_the_previous_download(duckdb_loader, tmp_path, monkeypatch):
+    client = duckdb_loader.bq.client
+    table_id = f"test-project.temp.{duckdb_loader.config['health_system']['short_name']}_open_payments_detailed_2020_2024"
+    output_dir = tmp_path / 'stream'
+
+    complete = stream_table(client, table_id, output_dir, partition_by=['payment_year'], batch_rows=500)
+    assert not output_dir.with_name('stream.partial').exists()
+
+    read_arrow_batches = client.read_arrow_batches
+
+    def failing_read(*args, **kwargs):
+        schema, batches = read_arrow_batches(*args, **kwargs)
+
+        def interrupted():
+            yield next(batches)
+            raise ConnectionError('stream reset')
+
+        return schema, interrupted()
+
+    monkeypatch.setattr(client, 'read_arrow_batches', failing_read)
+    with pytest.raises(ConnectionError):
+        stream_table(client, table_id, output_dir, partition_by=['payment_year'], batch_rows=500)
+
+    reopened = StreamedDataset.open(output_dir)
+    assert reopened.manifest['created'] == complete.manifest['created']
+    assert reopened.count_rows() == len(complete)
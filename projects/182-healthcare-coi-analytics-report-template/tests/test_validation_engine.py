@@ -0,0 +1,82 @@
+"""Vectorized NPI check-digit kernel and columnar validation"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.data.validation_engine import ColumnarValidator, _valid_npi_strings
+from validation.npi import is_valid_npi, valid_npis
+
+MALFORMED = ['', '123456789', '12345678901', 'abcdefghij', '123456789a', ' 123456789', '1234567893 ', '١٢٣٤٥٦٧٨٩٣']
+
+
+def reference_is_valid_npi(npi) -> bool:
+    """Scalar Luhn check with the 80840 prefix (previous DataValidator.validate_npi)"""
+    if not isinstance(npi, str) or len(npi) != 10 or not all('0' <= c <= '9' for c in npi):
+        return False
+    digits = [int(d) for d in npi]
+    total = 24
+    for i in range(8, -1, -1):
+        if (8 - i) % 2 == 0:
+            doubled = digits[i] * 2
+            total += doubled if doubled < 10 else doubled - 9
+        else:
+            total += digits[i]
+    return (total + digits[-1]) % 10 == 0
+
+
+@pytest.fixture(scope='module')
+def npis() -> np.ndarray:
+    """Random 10-digit numbers (about one in ten valid) plus known valid NPIs"""
+    rng = np.random.default_rng(5)
+    numbers = rng.integers(1_000_000_000, 10_000_000_000, 20_000, dtype=np.int64)
+    return np.concatenate([numbers, [1234567893, 1245319599, 1003000126]])
+
+
+def test_reference_known_values():
+    assert reference_is_valid_npi('1234567893')
+    assert not reference_is_valid_npi('1234567890')
+
+
+def test_integer_kernel_matches_scalar_check(npis):
+    expected = np.array([reference_is_valid_npi(str(n)) for n in npis])
+    assert 0 < expected.sum() < len(npis)
+    np.testing.assert_array_equal(valid_npis(npis), expected)
+    np.testing.assert_array_equal(valid_npis(npis.astype(float)), expected)
+
+
+def test_string_kernel_matches_scalar_check(npis):
+    text = [str(n) for n in npis] + MALFORMED
+    expected = np.array([reference_is_valid_npi(value) for value in text])
+    np.testing.assert_array_equal(valid_npis(np.array(text)), expected)
+    np.testing.assert_array_equal(valid_npis(np.array(text, dtype=object)), expected)
+    assert [is_valid_npi(value) for value in text[-50:]] == expected[-50:].tolist()
+
+
+def test_malformed_values_are_invalid():
+    values = [None, np.nan, 123456789, 12345678930, 1234567893.5, -1234567893]
+    assert not valid_npis(np.array(values, dtype=object)).any()
+    assert not is_valid_npi(None)
+
+
+def test_arrow_buffer_kernel_matches_scalar_check(npis):
+    text = [str(n) for n in npis[:500]] + MALFORMED
+    expected = np.array([reference_is_valid_npi(value) for value in text])
+    array = pa.array(text)
+    np.testing.assert_array_equal(_valid_npi_strings(array), expected)
+
+    # Sliced arrays start at a non-zero offset into the shared buffers
+    np.testing.assert_array_equal(_valid_npi_strings(array.slice(37)), expected[37:])
+
+
+def test_columnar_validator_reports_invalid_npis(npis):
+    text = [str(n) for n in npis[:2000]]
+    expected = sorted(value for value in set(text) if not reference_is_valid_npi(value))
+
+    for column in (text, npis[:2000]):
+        frame = pd.DataFrame({'NPI': column})
+        validator = ColumnarValidator(npi_columns=['NPI'])
+        for start in range(0, len(frame), 300):
+            validator.update(frame.iloc[start:start + 300])
+        assert sorted(map(str, validator.invalid_npis('NPI'))) == expected
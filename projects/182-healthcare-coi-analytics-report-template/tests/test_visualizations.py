@@ -0,0 +1,113 @@
+"""Chart rendering: process pool parity with serial rendering, unchanged-chart skips and manifest fingerprints"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from src.reporting.visualizations import VisualizationGenerator
+
+
+def distribution(counts):
+    tiers = pd.DataFrame({'tier': ['$0-100', '$100-1K', '$1K+'], 'count': counts})
+    return {'tiers': tiers}
+
+
+def render(output_dir, counts):
+    generator = VisualizationGenerator(output_dir=str(output_dir), draft=True, max_workers=1)
+    paths = generator.render_charts([
+        ('payment_distribution', '_create_payment_distribution_chart', distribution(counts))
+    ])
+    return generator.figure_fingerprints(paths)
+
+
+def test_figures_unchanged_until_rewritten(tmp_path):
+    fingerprints = render(tmp_path, [10, 5, 1])
+    assert list(fingerprints.values())[0] is not None
+    assert VisualizationGenerator.figures_unchanged(fingerprints)
+
+    # Another client's chart written to the same directory invalidates the first
+    render(tmp_path, [3, 2, 1])
+    assert not VisualizationGenerator.figures_unchanged(fingerprints)
+
+
+def test_client_directories_are_independent(tmp_path):
+    first = render(tmp_path / 'client_a', [10, 5, 1])
+    second = render(tmp_path / 'client_b', [3, 2, 1])
+    assert VisualizationGenerator.figures_unchanged(first)
+    assert VisualizationGenerator.figures_unchanged(second)
+
+
+def test_missing_figure_is_not_reused(tmp_path):
+    fingerprints = render(tmp_path, [10, 5, 1])
+    for path in fingerprints:
+        Path(path).unlink()
+    assert not VisualizationGenerator.figures_unchanged(fingerprints)
+
+
+def payment_charts():
+    years = pd.Index([2020, 2021, 2022], name='year')
+    return {
+        'payment_distribution': distribution([10, 5, 1]),
+        'yearly_trends': pd.DataFrame({'total_payments': [1e6, 2e6, 1.5e6], 'providers': [40, 55, 50]},
+                                      index=years),
+        'top_manufacturers': pd.DataFrame({'total_payments': [3e6, 2e6, 1e6]},
+                                          index=['Pfizer', 'Merck', 'AbbVie']),
+    }
+
+
+def test_process_pool_writes_the_same_figures_as_serial_rendering(tmp_path):
+    serial = VisualizationGenerator(output_dir=str(tmp_path / 'serial'), draft=True, max_workers=1)
+    pooled = VisualizationGenerator(output_dir=str(tmp_path / 'pooled'), draft=True, max_workers=3)
+    serial_paths = serial.generate_payment_visualizations(payment_charts())
+    pooled_paths = pooled.generate_payment_visualizations(payment_charts())
+
+    # Same figures, returned in task order
+    assert [Path(path).name for path in serial_paths] == \
+        ['payment_distribution.png', 'yearly_trends.png', 'top_manufacturers.png']
+    assert [Path(path).name for path in pooled_paths] == [Path(path).name for path in serial_paths]
+    for serial_path, pooled_path in zip(serial_paths, pooled_paths):
+        assert Path(serial_path).read_bytes() == Path(pooled_path).read_bytes()
+    assert serial._load_manifest() == pooled._load_manifest()
+
+
+def rewritten(paths):
+    """Figures written since mark_old"""
+    return [Path(path).stem for path in paths if Path(path).stat().st_mtime > 1_000]
+
+
+def mark_old(paths):
+    for path in paths:
+        os.utime(path, (1_000, 1_000))
+
+
+def test_unchanged_charts_are_not_rerendered(tmp_path, monkeypatch):
+    paths = VisualizationGenerator(output_dir=str(tmp_path), draft=True, max_workers=3) \
+        .generate_payment_visualizations(payment_charts())
+    mark_old(paths)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError('no chart needs rendering')
+
+    monkeypatch.setattr('src.reporting.visualizations.ProcessPoolExecutor', no_pool)
+    generator = VisualizationGenerator(output_dir=str(tmp_path), draft=True, max_workers=3)
+    assert generator.generate_payment_visualizations(payment_charts()) == paths
+    assert rewritten(paths) == []
+
+    # Only the chart whose data changed is rendered again
+    charts = payment_charts()
+    charts['payment_distribution'] = distribution([3, 2, 1])
+    assert generator.generate_payment_visualizations(charts) == paths
+    assert rewritten(paths) == ['payment_distribution']
+
+    # A changed style invalidates every chart
+    mark_old(paths)
+    VisualizationGenerator(output_dir=str(tmp_path), draft=True, draft_dpi=50, max_workers=1) \
+        .generate_payment_visualizations(charts)
+    assert rewritten(paths) == ['payment_distribution', 'yearly_trends', 'top_manufacturers']
+
+    # Without skipping, every chart is rendered
+    mark_old(paths)
+    VisualizationGenerator(output_dir=str(tmp_path), draft=True, draft_dpi=50, max_workers=1,
+                           skip_unchanged=False).generate_payment_visualizations(charts)
+    assert len(rewritten(paths)) == 3
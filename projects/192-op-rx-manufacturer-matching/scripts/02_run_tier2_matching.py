@@ -15,7 +15,7 @@ from datetime import datetime
 import yaml
 
 # Add parent directories to path
-project_root = Path(__file__).parent.parent.parent
+project_root = Path(__file__).resolve().parents[3]
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / 'src' / 'analysis' / '01-core-name-matching'))
 
@@ -137,7 +137,10 @@ def run_matching(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -> pd.D
         fuzzy_threshold=match_config['fuzzy_threshold'],
         decision_threshold=match_config['decision_threshold'],
         model=match_config['ai_model'],
-        max_workers=match_config['max_workers']
+        max_workers=match_config['max_workers'],
+        ai_batch_size=match_config.get('ai_batch_size', 1),
+        cache_path=str(Path(__file__).parent.parent / match_config['llm_cache_path']) if match_config.get('llm_cache_path') else None,
+        cache_ttl_days=match_config.get('llm_cache_ttl_days', 180)
     )
 
     logger.info("Starting Tier2 name matching with blocking...")
@@ -210,6 +213,7 @@ def run_matching(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -> pd.D
     logger.info(f"  Total processed: {stats['total_processed']}")
     logger.info(f"  Fuzzy only: {stats['fuzzy_only']} ({stats['fuzzy_only_pct']:.1f}%)")
     logger.info(f"  AI enhanced: {stats['ai_enhanced']} ({stats['ai_enhanced_pct']:.1f}%)")
+    logger.info(f"  LLM cache hits: {stats['cache_hits']} ({stats['cache_hit_rate']:.1f}% of AI lookups)")
     if stats['api_errors'] > 0:
         logger.warning(f"  API errors: {stats['api_errors']} ({stats['api_error_rate']:.1f}%)")
 
@@ -15,8 +15,8 @@ from datetime import datetime
 import yaml
 import time
 
-# Add scripts directory to path so we can import tier2_matcher
-sys.path.insert(0, str(Path(__file__).parent))
+# Add shared name matching module to path so we can import tier2_matcher
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
 
 # Import Tier2 matcher
 from tier2_matcher import Tier2NameMatcher
@@ -104,7 +104,10 @@ def run_tier2_matching_sample100(op_df: pd.DataFrame, rx_df: pd.DataFrame, confi
         fuzzy_threshold=match_config['fuzzy_threshold'],
         decision_threshold=match_config['decision_threshold'],
         model=match_config['ai_model'],
-        max_workers=match_config['max_workers']  # Now 30 workers
+        max_workers=match_config['max_workers'],  # Now 30 workers
+        ai_batch_size=match_config.get('ai_batch_size', 1),
+        cache_path=str(Path(__file__).parent.parent / match_config['llm_cache_path']) if match_config.get('llm_cache_path') else None,
+        cache_ttl_days=match_config.get('llm_cache_ttl_days', 180)
     )
 
     logger.info("Starting Tier2 name matching with LLM enhancement (100-sample)...")
@@ -205,6 +208,7 @@ def run_tier2_matching_sample100(op_df: pd.DataFrame, rx_df: pd.DataFrame, confi
     logger.info(f"  Total processed: {stats['total_processed']}")
     logger.info(f"  Fuzzy only (high confidence): {stats['fuzzy_only']} ({stats['fuzzy_only_pct']:.1f}%)")
     logger.info(f"  AI enhanced: {stats['ai_enhanced']} ({stats['ai_enhanced_pct']:.1f}%)")
+    logger.info(f"  LLM cache hits: {stats['cache_hits']} ({stats['cache_hit_rate']:.1f}% of AI lookups)")
     if stats['api_errors'] > 0:
         logger.warning(f"  API errors: {stats['api_errors']} ({stats['api_error_rate']:.1f}%)")
 
@@ -14,14 +14,17 @@ import json
 from datetime import datetime
 import yaml
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 
-# Add scripts directory to path so we can import tier2_matcher
-sys.path.insert(0, str(Path(__file__).parent))
+# Add shared name matching module to path so we can import tier2_matcher
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
 
 # Import Tier2 matcher
 from tier2_matcher import Tier2NameMatcher
+from async_matcher import AsyncTier2Matcher
+from pair_generation import count_blocked_pairs, iter_blocked_pairs
+from blocking import MultiKeyBlocker, KEY_TYPES
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -62,47 +65,74 @@ def get_blocking_key(name: str) -> str:
     return 'UNKNOWN'
 
 
-def prepare_comparison_pairs(op_df: pd.DataFrame, rx_df: pd.DataFrame) -> List[Tuple]:
+def prepare_comparison_pairs(op_df: pd.DataFrame, rx_df: pd.DataFrame,
+                             blocking_config: Dict = None) -> Tuple[int, Callable[[int], Iterator[List[Tuple]]]]:
     """
-    Prepare all comparison pairs with blocking
-    Returns list of (op_id, op_name, rx_name, blocking_key) tuples
+    Prepare comparison pairs with blocking
+    Returns (total_pairs, generate_batches); generate_batches(chunk_size) lazily
+    yields lists of at most chunk_size (op_id, op_name, rx_name, blocking_key) tuples
+
+    With blocking strategy 'multi_key' the candidates are the union of the
+    MultiKeyBlocker keys and blocking_key records the key type that paired them
     """
+    blocking_config = blocking_config or {}
+
+    if blocking_config.get('strategy') == 'multi_key':
+        blocker = MultiKeyBlocker(
+            key_types=blocking_config.get('key_types', KEY_TYPES),
+            minhash_bands=blocking_config.get('minhash_bands', 20),
+            minhash_rows=blocking_config.get('minhash_rows', 3),
+            max_block_size=blocking_config.get('max_block_size')
+        )
+        op_list = op_df['manufacturer_name'].tolist()
+        rx_list = rx_df['manufacturer_name'].tolist()
+        total_pairs = blocker.count_candidate_pairs(op_list, rx_list)
+        total_full = len(op_df) * len(rx_df)
+        logger.info(f"Created {total_pairs:,} comparison pairs with multi-key blocking "
+                    f"({1 - total_pairs / max(total_full, 1):.2%} of {total_full:,} pruned)")
+
+        op_ids = op_df['manufacturer_id'].to_numpy()
+        op_names = op_df['manufacturer_name'].to_numpy()
+        rx_names = rx_df['manufacturer_name'].to_numpy()
+        key_names = np.asarray(blocker.key_types, dtype=object)
+
+        def generate_batches(chunk_size: int) -> Iterator[List[Tuple]]:
+            # Candidates are generated and deduplicated per block of OP rows, chunk by chunk
+            for op_pos, rx_pos, key_kinds in blocker.iter_candidate_pairs(op_list, rx_list, chunk_size=chunk_size,
+                                                                          return_key_types=True):
+                yield list(zip(op_ids[op_pos].tolist(), op_names[op_pos].tolist(),
+                               rx_names[rx_pos].tolist(), key_names[key_kinds].tolist()))
+
+        return total_pairs, generate_batches
 
     # Add blocking keys
     op_df['blocking_key'] = op_df['manufacturer_name'].apply(get_blocking_key)
     rx_df['blocking_key'] = rx_df['manufacturer_name'].apply(get_blocking_key)
 
-    # Create all valid pairs with blocking
-    pairs = []
-    for blocking_key in op_df['blocking_key'].unique():
-        if blocking_key not in rx_df['blocking_key'].values:
-            continue
-
-        op_block = op_df[op_df['blocking_key'] == blocking_key]
-        rx_block = rx_df[rx_df['blocking_key'] == blocking_key]
+    total_pairs = count_blocked_pairs(op_df['blocking_key'], rx_df['blocking_key'])
+    logger.info(f"Created {total_pairs:,} comparison pairs with blocking")
 
-        for _, op_row in op_block.iterrows():
-            for _, rx_row in rx_block.iterrows():
-                pairs.append((
-                    op_row['manufacturer_id'],
-                    op_row['manufacturer_name'],
-                    rx_row['manufacturer_name'],
-                    blocking_key
-                ))
+    def generate_batches(chunk_size: int) -> Iterator[List[Tuple]]:
+        # Keyed cross join per block, gathered chunk by chunk
+        for chunk in iter_blocked_pairs(op_df, rx_df, left_columns=['manufacturer_id', 'manufacturer_name'],
+                                        right_columns=['manufacturer_name'], chunk_size=chunk_size):
+            yield list(zip(chunk['manufacturer_id'].tolist(), chunk['manufacturer_name_left'].tolist(),
+                           chunk['manufacturer_name_right'].tolist(), chunk['blocking_key'].tolist()))
 
-    logger.info(f"Created {len(pairs):,} comparison pairs with blocking")
-    return pairs
+    return total_pairs, generate_batches
 
 
 def process_batch(matcher: Tier2NameMatcher, batch: List[Tuple], use_ai: bool) -> List[Dict]:
     """
     Process a batch of comparisons
     """
-    results = []
-    for op_id, op_name, rx_name, blocking_key in batch:
-        # Run Tier2 matching
-        match_result = matcher.match_pair(op_name, rx_name, use_ai=use_ai)
+    pair_names = [(op_name, rx_name) for _, op_name, rx_name, _ in batch]
 
+    # Run Tier2 matching (low-confidence pairs are adjudicated ai_batch_size per request)
+    match_results = matcher.match_batch(pair_names, use_ai=use_ai)
+
+    results = []
+    for (op_id, op_name, rx_name, blocking_key), match_result in zip(batch, match_results):
         # Add metadata
         match_result['op_manufacturer_id'] = op_id
         match_result['op_manufacturer_name'] = op_name
@@ -113,6 +143,47 @@ def process_batch(matcher: Tier2NameMatcher, batch: List[Tuple], use_ai: bool) -
 
     return results
 
+def run_async_engine(matcher: Tier2NameMatcher, pair_batches: Iterable[List[Tuple]], async_config: dict,
+                     use_ai: bool) -> List[Dict]:
+    """
+    Match all pair batches with the async engine (rate-limit aware, adaptive concurrency)
+    """
+    engine = AsyncTier2Matcher(
+        matcher=matcher,
+        requests_per_minute=async_config.get('requests_per_minute', 500),
+        tokens_per_minute=async_config.get('tokens_per_minute', 200000),
+        initial_concurrency=async_config.get('initial_concurrency', 8),
+        max_concurrency=async_config.get('max_concurrency', 64),
+        max_retries=async_config.get('max_retries', 5)
+    )
+    logger.info(f"Async engine: {engine.requests_per_minute} rpm, {engine.tokens_per_minute} tpm, "
+                f"concurrency {engine.concurrency_limit}-{engine.max_concurrency}")
+
+    # One engine (rate limits, concurrency, client) for all batches of the run
+    results = []
+    try:
+        for pairs in pair_batches:
+            match_results = engine.match_batch([(op_name, rx_name) for _, op_name, rx_name, _ in pairs],
+                                               use_ai=use_ai)
+
+            for (op_id, op_name, rx_name, blocking_key), match_result in zip(pairs, match_results):
+                # Add metadata
+                match_result['op_manufacturer_id'] = op_id
+                match_result['op_manufacturer_name'] = op_name
+                match_result['rx_manufacturer_name'] = rx_name
+                match_result['blocking_key'] = blocking_key
+
+                results.append(match_result)
+    finally:
+        engine.close()
+
+    stats = engine.get_statistics()
+    logger.info(f"Async engine: {stats['pairs_per_second']:.1f} pairs/sec, {stats['requests']:,} requests, "
+                f"{stats['throttled']:,} throttled ({stats['throttle_rate']:.1f}%), "
+                f"{stats['retries']:,} retries, {stats['failures']:,} failures, "
+                f"final concurrency {stats['concurrency_limit']}")
+    return results
+
 
 def run_tier2_parallel(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -> pd.DataFrame:
     """
@@ -127,7 +198,10 @@ def run_tier2_parallel(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -
         fuzzy_threshold=match_config['fuzzy_threshold'],
         decision_threshold=match_config['decision_threshold'],
         model=match_config['ai_model'],
-        max_workers=1  # Each matcher instance uses 1 worker, we parallelize at higher level
+        max_workers=1,  # Each matcher instance uses 1 worker, we parallelize at higher level
+        ai_batch_size=match_config.get('ai_batch_size', 1),
+        cache_path=str(Path(__file__).parent.parent / match_config['llm_cache_path']) if match_config.get('llm_cache_path') else None,
+        cache_ttl_days=match_config.get('llm_cache_ttl_days', 180)
     )
 
     logger.info("Starting parallel Tier2 name matching...")
@@ -137,28 +211,27 @@ def run_tier2_parallel(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -
     logger.info(f"  AI model: {match_config['ai_model']}")
     logger.info(f"  Parallel workers: {match_config['max_workers']}")
 
-    # Prepare all comparison pairs
-    pairs = prepare_comparison_pairs(op_df.copy(), rx_df.copy())
-
-    # Split pairs into batches for parallel processing
-    batch_size = max(1, len(pairs) // (match_config['max_workers'] * 10))  # Create more batches than workers
-    batches = [pairs[i:i+batch_size] for i in range(0, len(pairs), batch_size)]
-    logger.info(f"Split into {len(batches)} batches of ~{batch_size} comparisons each")
-
-    # Process batches in parallel
     all_results = []
     start_time = time.time()
-
-    with ThreadPoolExecutor(max_workers=match_config['max_workers']) as executor:
-        # Submit all batches
-        futures = {
-            executor.submit(process_batch, matcher, batch, config['processing']['use_ai_enhancement']): i
-            for i, batch in enumerate(batches)
-        }
-
+    use_ai = config['processing']['use_ai_enhancement']
+    async_config = match_config.get('async_engine') or {}
+
+    # Pairs are generated lazily in batches, so scoring starts while later blocks are still being joined
+    total_pairs, generate_batches = prepare_comparison_pairs(op_df.copy(), rx_df.copy(),
+                                                             match_config.get('blocking'))
+    batch_size = max(1, total_pairs // (match_config['max_workers'] * 10))  # Create more batches than workers
+    pair_batches = generate_batches(batch_size)
+    logger.info(f"Streaming batches of up to {batch_size} comparisons each")
+
+    if async_config.get('enabled'):
+        all_results = run_async_engine(matcher, pair_batches, async_config, use_ai)
+    else:
+        # Process batches in parallel, keeping a bounded number queued
         completed = 0
-        for future in as_completed(futures):
-            batch_idx = futures[future]
+        max_in_flight = match_config['max_workers'] * 2
+
+        def collect(future, batch_idx):
+            nonlocal completed
             try:
                 batch_results = future.result()
                 all_results.extend(batch_results)
@@ -166,16 +239,29 @@ def run_tier2_parallel(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -
 
                 # Progress logging
                 elapsed = time.time() - start_time
-                progress_pct = (completed / len(batches)) * 100
+                progress_pct = (len(all_results) / total_pairs) * 100 if total_pairs else 100
                 rate = len(all_results) / elapsed if elapsed > 0 else 0
-                eta = (len(pairs) - len(all_results)) / rate if rate > 0 else 0
+                eta = (total_pairs - len(all_results)) / rate if rate > 0 else 0
 
-                logger.info(f"Progress: {completed}/{len(batches)} batches ({progress_pct:.1f}%) | "
+                logger.info(f"Progress: {completed} batches, {len(all_results):,}/{total_pairs:,} comparisons ({progress_pct:.1f}%) | "
                            f"Rate: {rate:.0f} comparisons/sec | ETA: {eta:.0f}s")
 
             except Exception as e:
                 logger.error(f"Batch {batch_idx} failed: {e}")
 
+        with ThreadPoolExecutor(max_workers=match_config['max_workers']) as executor:
+            futures = {}
+            for i, batch in enumerate(pair_batches):
+                futures[executor.submit(process_batch, matcher, batch, use_ai)] = i
+
+                if len(futures) >= max_in_flight:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, futures.pop(future))
+
+            for future in as_completed(futures):
+                collect(future, futures[future])
+
     total_time = time.time() - start_time
 
     # Filter results by decision threshold and group by OP manufacturer
@@ -211,9 +297,10 @@ def run_tier2_parallel(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -
     logger.info(f"\nMatching Statistics:")
     logger.info(f"  Fuzzy only: {stats['fuzzy_only']} ({stats['fuzzy_only_pct']:.1f}%)")
     logger.info(f"  AI enhanced: {stats['ai_enhanced']} ({stats['ai_enhanced_pct']:.1f}%)")
+    logger.info(f"  LLM cache hits: {stats['cache_hits']} ({stats['cache_hit_rate']:.1f}% of AI lookups)")
 
     # Calculate API cost
-    api_calls = stats['ai_enhanced']
+    api_calls = stats['ai_enhanced'] - stats['cache_hits']  # Cached verdicts cost nothing
     cost = (api_calls / 1000) * 0.15  # $0.15 per 1000 for gpt-4o-mini
     logger.info(f"\nAPI Usage:")
     logger.info(f"  Total API calls: {api_calls}")
@@ -4,7 +4,6 @@ Full population Tier2 matching with checkpointing for resumable processing
 Saves progress every batch and can resume from last checkpoint
 """
 
-import os
 import sys
 import pandas as pd
 import numpy as np
@@ -14,23 +13,31 @@ import json
 from datetime import datetime
 import yaml
 import time
-import pickle
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
-from typing import Dict, List, Tuple
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterator, List, Tuple
 
-# Add scripts directory to path so we can import tier2_matcher
-sys.path.insert(0, str(Path(__file__).parent))
+# Add shared name matching module to path so we can import tier2_matcher
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+# Add shared checkpoint store to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src' / 'checkpointing'))
 
 # Import Tier2 matcher
 from tier2_matcher import Tier2NameMatcher
+from segment_store import SegmentCheckpointStore
+from pair_generation import count_blocked_pairs, iter_blocked_pairs
+from blocking import MultiKeyBlocker, KEY_TYPES
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Checkpoint file
-CHECKPOINT_FILE = "checkpoint/tier2_checkpoint.pkl"
-RESULTS_FILE = "checkpoint/tier2_results.pkl"
+# Checkpoint directory (one Parquet segment per completed batch + manifest)
+CHECKPOINT_DIR = "checkpoint/tier2_segments"
+
+# Comparisons per batch (= per checkpoint segment)
+BATCH_SIZE = 100
 
 
 def load_config(config_path: Path) -> dict:
@@ -67,122 +74,141 @@ def get_blocking_key(name: str) -> str:
     return 'UNKNOWN'
 
 
-def save_checkpoint(checkpoint_data: dict):
-    """Save checkpoint to file"""
-    checkpoint_path = Path("checkpoint") / "tier2_checkpoint.pkl"
-    with open(checkpoint_path, 'wb') as f:
-        pickle.dump(checkpoint_data, f)
-    logger.info(f"Checkpoint saved: {len(checkpoint_data['completed_batches'])}/{checkpoint_data['total_batches']} batches completed")
-
-
-def load_checkpoint():
-    """Load checkpoint if exists"""
-    checkpoint_path = Path(CHECKPOINT_FILE)
-    if checkpoint_path.exists():
-        with open(checkpoint_path, 'rb') as f:
-            checkpoint = pickle.load(f)
-        logger.info(f"Checkpoint loaded: {checkpoint['completed_batches']}/{checkpoint['total_batches']} batches already completed")
-        return checkpoint
-    return None
-
-
-def save_results(results: List[Dict]):
-    """Save accumulated results to file"""
-    results_path = Path("checkpoint") / "tier2_results.pkl"
-
-    # Load existing results if any
-    existing_results = []
-    if results_path.exists():
-        with open(results_path, 'rb') as f:
-            existing_results = pickle.load(f)
-
-    # Append new results
-    all_results = existing_results + results
-
-    with open(results_path, 'wb') as f:
-        pickle.dump(all_results, f)
-
-    logger.info(f"Saved {len(results)} new results (total: {len(all_results)})")
-
-
-def load_all_results():
-    """Load all accumulated results"""
-    results_path = Path(RESULTS_FILE)
-    if results_path.exists():
-        with open(results_path, 'rb') as f:
-            return pickle.load(f)
-    return []
-
-
-def prepare_comparison_pairs(op_df: pd.DataFrame, rx_df: pd.DataFrame) -> List[Tuple]:
+def compute_run_key(op_df: pd.DataFrame, rx_df: pd.DataFrame, total_pairs: int, batch_size: int,
+                    blocking_config: Dict = None) -> str:
+    """
+    Fingerprint the inputs, blocking config and batch size so a checkpoint is
+    only resumed against the exact same batches
     """
-    Prepare all comparison pairs with blocking
-    Returns list of (op_id, op_name, rx_name, blocking_key) tuples
+    digest = hashlib.sha1()
+    for op_id, op_name in zip(op_df['manufacturer_id'], op_df['manufacturer_name']):
+        digest.update(f"{op_id}|{op_name}\n".encode())
+    for rx_name in rx_df['manufacturer_name']:
+        digest.update(f"{rx_name}\n".encode())
+    # The blocking strategy and its keys decide which pairs exist and how they are ordered into batches
+    digest.update(json.dumps(blocking_config or {}, sort_keys=True, default=str).encode())
+    return f"{total_pairs}:{batch_size}:{digest.hexdigest()[:16]}"
+
+
+def prepare_comparison_pairs(op_df: pd.DataFrame, rx_df: pd.DataFrame,
+                             blocking_config: Dict = None) -> Tuple[int, Callable[[int], Iterator[List[Tuple]]]]:
     """
+    Prepare comparison pairs with blocking
+    Returns (total_pairs, generate_batches); generate_batches(chunk_size) lazily
+    yields lists of at most chunk_size (op_id, op_name, rx_name, blocking_key) tuples
+
+    With blocking strategy 'multi_key' the candidates are the union of the
+    MultiKeyBlocker keys and blocking_key records the key type that paired them
+    """
+    blocking_config = blocking_config or {}
+
+    if blocking_config.get('strategy') == 'multi_key':
+        blocker = MultiKeyBlocker(
+            key_types=blocking_config.get('key_types', KEY_TYPES),
+            minhash_bands=blocking_config.get('minhash_bands', 20),
+            minhash_rows=blocking_config.get('minhash_rows', 3),
+            max_block_size=blocking_config.get('max_block_size')
+        )
+        op_list = op_df['manufacturer_name'].tolist()
+        rx_list = rx_df['manufacturer_name'].tolist()
+        total_pairs = blocker.count_candidate_pairs(op_list, rx_list)
+        total_full = len(op_df) * len(rx_df)
+        logger.info(f"Created {total_pairs:,} comparison pairs with multi-key blocking "
+                    f"({1 - total_pairs / max(total_full, 1):.2%} of {total_full:,} pruned)")
+
+        op_ids = op_df['manufacturer_id'].to_numpy()
+        op_names = op_df['manufacturer_name'].to_numpy()
+        rx_names = rx_df['manufacturer_name'].to_numpy()
+        key_names = np.asarray(blocker.key_types, dtype=object)
+
+        def generate_batches(chunk_size: int) -> Iterator[List[Tuple]]:
+            # Candidates are generated and deduplicated per block of OP rows, chunk by chunk
+            for op_pos, rx_pos, key_kinds in blocker.iter_candidate_pairs(op_list, rx_list, chunk_size=chunk_size,
+                                                                          return_key_types=True):
+                yield list(zip(op_ids[op_pos].tolist(), op_names[op_pos].tolist(),
+                               rx_names[rx_pos].tolist(), key_names[key_kinds].tolist()))
+
+        return total_pairs, generate_batches
 
     # Add blocking keys
     op_df['blocking_key'] = op_df['manufacturer_name'].apply(get_blocking_key)
     rx_df['blocking_key'] = rx_df['manufacturer_name'].apply(get_blocking_key)
 
-    # Create all valid pairs with blocking
-    pairs = []
-    for blocking_key in op_df['blocking_key'].unique():
-        if blocking_key not in rx_df['blocking_key'].values:
-            continue
+    total_pairs = count_blocked_pairs(op_df['blocking_key'], rx_df['blocking_key'])
+    logger.info(f"Created {total_pairs:,} comparison pairs with blocking")
 
-        op_block = op_df[op_df['blocking_key'] == blocking_key]
-        rx_block = rx_df[rx_df['blocking_key'] == blocking_key]
+    def generate_batches(chunk_size: int) -> Iterator[List[Tuple]]:
+        # Keyed cross join per block, gathered chunk by chunk
+        for chunk in iter_blocked_pairs(op_df, rx_df, left_columns=['manufacturer_id', 'manufacturer_name'],
+                                        right_columns=['manufacturer_name'], chunk_size=chunk_size):
+            yield list(zip(chunk['manufacturer_id'].tolist(), chunk['manufacturer_name_left'].tolist(),
+                           chunk['manufacturer_name_right'].tolist(), chunk['blocking_key'].tolist()))
 
-        for _, op_row in op_block.iterrows():
-            for _, rx_row in rx_block.iterrows():
-                pairs.append((
-                    op_row['manufacturer_id'],
-                    op_row['manufacturer_name'],
-                    rx_row['manufacturer_name'],
-                    blocking_key
-                ))
+    return total_pairs, generate_batches
 
-    logger.info(f"Created {len(pairs):,} comparison pairs with blocking")
-    return pairs
+
+def call_with_retries(operation: Callable, label: str, max_retries: int = 3):
+    """
+    Run a matching call, retrying API 503 errors with exponential backoff
+    Returns the call's result, or None once retries are exhausted or on any other error
+    """
+    retry_count = 0
+    while retry_count < max_retries:
+        try:
+            return operation()
+        except Exception as e:
+            error_str = str(e)
+            if '503' in error_str or 'Service Unavailable' in error_str:
+                retry_count += 1
+                if retry_count < max_retries:
+                    wait_time = 2 ** retry_count  # Exponential backoff
+                    logger.warning(f"API 503 error, retrying in {wait_time}s (attempt {retry_count}/{max_retries})")
+                    time.sleep(wait_time)
+                else:
+                    logger.error(f"Max retries reached for {label}: {e}")
+            else:
+                logger.error(f"Error matching {label}: {e}")
+                return None
+    return None
 
 
-def process_batch(matcher: Tier2NameMatcher, batch: List[Tuple], use_ai: bool, batch_idx: int) -> Tuple[int, List[Dict]]:
+def process_batch(matcher: Tier2NameMatcher, batch: List[Tuple], use_ai: bool,
+                  batch_idx: int) -> Tuple[int, List[Dict], int]:
     """
     Process a batch of comparisons with retry logic for API errors
-    Returns batch_idx and results
+    If the batch call fails, its pairs are matched one by one so a single bad
+    pair only loses itself
+    Returns batch_idx, results and the number of pairs that failed
     """
+    pair_names = [(op_name, rx_name) for _, op_name, rx_name, _ in batch]
+
+    # Run Tier2 matching (low-confidence pairs are adjudicated ai_batch_size per request)
+    match_results = call_with_retries(lambda: matcher.match_batch(pair_names, use_ai=use_ai),
+                                      f"batch {batch_idx}")
+    if match_results is None:
+        logger.warning(f"Batch {batch_idx} failed as a whole; matching its pairs one by one")
+        match_results = [
+            call_with_retries(lambda: matcher.match_pair(op_name, rx_name, use_ai=use_ai),
+                              f"{op_name} with {rx_name}")
+            for op_name, rx_name in pair_names
+        ]
+
     results = []
-    for op_id, op_name, rx_name, blocking_key in batch:
-        retry_count = 0
-        max_retries = 3
-        while retry_count < max_retries:
-            try:
-                # Run Tier2 matching
-                match_result = matcher.match_pair(op_name, rx_name, use_ai=use_ai)
-
-                # Add metadata
-                match_result['op_manufacturer_id'] = op_id
-                match_result['op_manufacturer_name'] = op_name
-                match_result['rx_manufacturer_name'] = rx_name
-                match_result['blocking_key'] = blocking_key
-
-                results.append(match_result)
-                break  # Success, exit retry loop
-            except Exception as e:
-                error_str = str(e)
-                if '503' in error_str or 'Service Unavailable' in error_str:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        wait_time = 2 ** retry_count  # Exponential backoff
-                        logger.warning(f"API 503 error, retrying in {wait_time}s (attempt {retry_count}/{max_retries})")
-                        time.sleep(wait_time)
-                    else:
-                        logger.error(f"Max retries reached for {op_name} with {rx_name}: {e}")
-                else:
-                    logger.error(f"Error matching {op_name} with {rx_name}: {e}")
-                    break
+    failed = 0
+    for (op_id, op_name, rx_name, blocking_key), match_result in zip(batch, match_results):
+        if match_result is None:
+            failed += 1
+            continue
+
+        # Add metadata
+        match_result['op_manufacturer_id'] = op_id
+        match_result['op_manufacturer_name'] = op_name
+        match_result['rx_manufacturer_name'] = rx_name
+        match_result['blocking_key'] = blocking_key
 
-    return batch_idx, results
+        results.append(match_result)
+
+    return batch_idx, results, failed
 
 
 def run_tier2_with_checkpoint(op_df: pd.DataFrame, rx_df: pd.DataFrame, config: dict) -> tuple:
@@ -190,9 +216,6 @@ def run_tier2_with_checkpoint(op_df: pd.DataFrame, rx_df: pd.DataFrame, config:
     Run Tier2 matching with checkpointing support
     Returns: (results_df, is_complete) tuple
     """
-    # Create checkpoint directory upfront
-    Path("checkpoint").mkdir(exist_ok=True)
-
     # Get matching configuration
     match_config = config['matching']
 
@@ -201,176 +224,154 @@ def run_tier2_with_checkpoint(op_df: pd.DataFrame, rx_df: pd.DataFrame, config:
         fuzzy_threshold=match_config['fuzzy_threshold'],
         decision_threshold=match_config['decision_threshold'],
         model=match_config['ai_model'],
-        max_workers=1
+        max_workers=1,
+        ai_batch_size=match_config.get('ai_batch_size', 1),
+        cache_path=str(Path(__file__).parent.parent / match_config['llm_cache_path']) if match_config.get('llm_cache_path') else None,
+        cache_ttl_days=match_config.get('llm_cache_ttl_days', 180)
     )
 
-    # Prepare all comparison pairs
-    pairs = prepare_comparison_pairs(op_df.copy(), rx_df.copy())
-
-    # Split pairs into batches of 100 for frequent checkpointing
-    batch_size = 100  # Fixed batch size of 100 items
-    batches = [pairs[i:i+batch_size] for i in range(0, len(pairs), batch_size)]
+    # Prepare comparison pairs; batches of 100 are generated lazily for frequent checkpointing
+    blocking_config = match_config.get('blocking')
+    total_pairs, generate_batches = prepare_comparison_pairs(op_df.copy(), rx_df.copy(), blocking_config)
+    total_batches = (total_pairs + BATCH_SIZE - 1) // BATCH_SIZE
 
-    logger.info(f"Split into {len(batches)} batches of ~{batch_size} comparisons each")
+    logger.info(f"Split into {total_batches} batches of ~{BATCH_SIZE} comparisons each")
 
-    # Try to load checkpoint
-    checkpoint = load_checkpoint()
-    if checkpoint:
-        completed_batches = checkpoint['completed_batches']
-        start_batch = checkpoint['last_batch_idx'] + 1
-        logger.info(f"Resuming from batch {start_batch}/{len(batches)}")
-    else:
-        completed_batches = set()
-        start_batch = 0
-        # Initialize checkpoint
-        checkpoint = {
-            'total_batches': len(batches),
-            'completed_batches': completed_batches,
-            'last_batch_idx': -1,
-            'start_time': time.time()
-        }
+    # Open checkpoint store; committed batches are skipped on resume
+    store = SegmentCheckpointStore(CHECKPOINT_DIR, run_key=compute_run_key(op_df, rx_df, total_pairs, BATCH_SIZE,
+                                                                      blocking_config))
+    completed_batches = {int(batch_id) for batch_id in store.completed_batches()}
+    if completed_batches:
+        logger.info(f"Resuming: {len(completed_batches)}/{total_batches} batches already completed")
+    elapsed_before = store.metadata.get('elapsed_seconds', 0)
 
     # Process batches - HARDCODED TO RUN 500 BATCHES PER SESSION
-    batch_results = []
     start_time = time.time()
-    last_checkpoint_time = time.time()
+    session_rows = 0
 
     # Calculate batch limit for this session
     max_batches_per_session = 500
-    session_start_count = len(completed_batches)  # Track how many were already done
-    target_batch_count = min(session_start_count + max_batches_per_session, len(batches))
-    batches_to_process_this_session = target_batch_count - session_start_count
-    logger.info(f"Starting from batch {session_start_count}, will process {batches_to_process_this_session} new batches (up to batch {target_batch_count})")
+    session_batch_count = min(max_batches_per_session, total_batches - len(completed_batches))
+    logger.info(f"{len(completed_batches)} batches already done, will process {session_batch_count} new batches this session")
+
+    # Pending batches for this session, in generation order
+    session_batches = ((idx, batch) for idx, batch in enumerate(generate_batches(BATCH_SIZE))
+                       if idx not in completed_batches)
 
     with ThreadPoolExecutor(max_workers=match_config['max_workers']) as executor:
         futures = {}
-        next_batch_to_submit = start_batch
+        batches_submitted = 0
         batches_processed_this_session = 0
 
-        # Keep processing until we hit the session limit OR run out of batches
-        while batches_processed_this_session < max_batches_per_session and len(completed_batches) < len(batches):
-            # Submit batches up to max_workers limit
-            while (len(futures) < match_config['max_workers'] and
-                   next_batch_to_submit < len(batches) and
-                   batches_processed_this_session < max_batches_per_session):
-                if next_batch_to_submit not in completed_batches:
-                    future = executor.submit(process_batch, matcher, batches[next_batch_to_submit],
-                                           config['processing']['use_ai_enhancement'], next_batch_to_submit)
-                    futures[future] = next_batch_to_submit
-                next_batch_to_submit += 1
-
-            # If no futures are running and no more batches to submit, we're done
-            if not futures:
-                if next_batch_to_submit >= len(batches) or batches_processed_this_session >= max_batches_per_session:
-                    break
-                else:
-                    # Skip to next uncompleted batch
-                    while next_batch_to_submit < len(batches) and next_batch_to_submit in completed_batches:
-                        next_batch_to_submit += 1
-                    continue
-
-            # Wait for at least one future to complete
-            from concurrent.futures import wait, FIRST_COMPLETED
-            done, pending = wait(futures.keys(), return_when=FIRST_COMPLETED, timeout=1)
+        def submit_next() -> bool:
+            nonlocal batches_submitted
+            if batches_submitted >= max_batches_per_session:
+                return False
+            batch_idx, batch = next(session_batches, (None, None))
+            if batch_idx is None:
+                return False
+            future = executor.submit(process_batch, matcher, batch,
+                                     config['processing']['use_ai_enhancement'], batch_idx)
+            futures[future] = batch_idx
+            batches_submitted += 1
+            return True
+
+        # Keep at most max_workers batches in flight
+        while len(futures) < match_config['max_workers'] and submit_next():
+            pass
+
+        while futures:
+            done, _ = wait(futures.keys(), return_when=FIRST_COMPLETED, timeout=1)
 
             # Process completed futures
             for future in done:
-                batch_idx = futures[future]
+                batch_idx = futures.pop(future)
                 try:
-                    idx, results = future.result()
-                    batch_results.extend(results)
+                    idx, results, failed = future.result()
+                except Exception as e:
+                    logger.error(f"Batch {batch_idx} failed: {e}")
+                    results, failed = None, 0
+
+                if results:
+                    if failed:
+                        logger.warning(f"Batch {idx}: {failed} pairs failed and are left out of its segment")
+                    # Commit the batch as its own segment with the run state in one manifest
+                    # record (atomic; a crash loses at most in-flight batches)
+                    store.write_segment(idx, results, metadata={
+                        'elapsed_seconds': elapsed_before + (time.time() - start_time),
+                        'total_batches': total_batches,
+                        'failed_pairs': store.metadata.get('failed_pairs', 0) + failed
+                    })
                     completed_batches.add(idx)
+                    session_rows += len(results)
                     batches_processed_this_session += 1
 
-                # Update checkpoint
-                checkpoint['completed_batches'] = completed_batches
-                checkpoint['last_batch_idx'] = max(completed_batches)
+                    # Log progress
+                    elapsed = time.time() - start_time
+                    progress_pct = (len(completed_batches) / total_batches) * 100
+                    total_results = store.total_rows()
+                    rate = session_rows / elapsed if elapsed > 0 else 0
+                    eta = (total_pairs - total_results) / rate if rate > 0 else 0
 
-                # Save checkpoint and results immediately after each batch
-                checkpoint['elapsed_before'] = checkpoint.get('elapsed_before', 0) + (time.time() - checkpoint.get('session_start', start_time))
-                checkpoint['session_start'] = time.time()
-                save_checkpoint(checkpoint)
-                if batch_results:
-                    save_results(batch_results)
-                    batch_results = []  # Clear after saving
-
-                # Log progress
-                elapsed = time.time() - start_time
-                progress_pct = (len(completed_batches) / len(batches)) * 100
-                total_results = len(load_all_results())
-                rate = total_results / (elapsed + checkpoint.get('elapsed_before', 0)) if (elapsed + checkpoint.get('elapsed_before', 0)) > 0 else 0
-                eta = (len(pairs) - total_results) / rate if rate > 0 else 0
-
-                logger.info(f"Progress: {len(completed_batches)}/{len(batches)} batches ({progress_pct:.1f}%) | "
-                           f"Results: {total_results:,}/{len(pairs):,} | "
-                           f"Rate: {rate:.0f} comp/sec | ETA: {eta/60:.1f} min")
-
-                last_checkpoint_time = time.time()
-
-                    # Remove completed future from tracking dict
-                    del futures[future]
+                    logger.info(f"Progress: {len(completed_batches)}/{total_batches} batches ({progress_pct:.1f}%) | "
+                               f"Results: {total_results:,}/{total_pairs:,} | "
+                               f"Rate: {rate:.0f} comp/sec | ETA: {eta/60:.1f} min")
 
                     # Log session progress every 10 batches
                     if batches_processed_this_session % 10 == 0:
                         logger.info(f"Session progress: {batches_processed_this_session}/{max_batches_per_session} batches processed this session")
+                else:
+                    # Not committed, so the batch is retried on the next run
+                    logger.warning(f"Batch {batch_idx} produced no results; it will be retried on resume")
 
-                except Exception as e:
-                    logger.error(f"Batch {batch_idx} failed: {e}")
-                    del futures[future]
+                submit_next()
 
         # Log session completion
         logger.info(f"Session complete - processed {batches_processed_this_session} batches in this session")
-        logger.info(f"Total completed: {len(completed_batches)}/{len(batches)} batches")
-
-    # Save any remaining results
-    if batch_results:
-        save_results(batch_results)
-
-    # Load all results
-    all_results = load_all_results()
+        logger.info(f"Total completed: {len(completed_batches)}/{total_batches} batches")
 
-    total_time = time.time() - start_time + checkpoint.get('elapsed_before', 0)
+    total_time = time.time() - start_time + elapsed_before
 
-    # Filter and rank results
+    # Filter results segment by segment (never holds every comparison in memory)
     logger.info("Filtering and ranking matches...")
-    filtered_results = []
-    op_matches = {}
-
-    for result in all_results:
-        if result['final_score'] >= match_config['decision_threshold']:
-            op_id = result['op_manufacturer_id']
-            if op_id not in op_matches:
-                op_matches[op_id] = []
-            op_matches[op_id].append(result)
+    total_comparisons = 0
+    candidates = []
+    for segment_df in store.iter_dataframes():
+        total_comparisons += len(segment_df)
+        candidates.append(segment_df[segment_df['final_score'] >= match_config['decision_threshold']])
+    op_matches_df = pd.concat(candidates, ignore_index=True) if candidates else pd.DataFrame()
 
     # Take top N matches per OP manufacturer
-    for op_id, matches in op_matches.items():
-        matches.sort(key=lambda x: x['final_score'], reverse=True)
-        for rank, match in enumerate(matches[:match_config['top_n_matches']], 1):
-            match['match_rank'] = rank
-            filtered_results.append(match)
-
-    # Get statistics
-    stats = matcher.get_statistics()
+    if not op_matches_df.empty:
+        op_matches_df = op_matches_df.sort_values(['op_manufacturer_id', 'final_score'],
+                                                  ascending=[True, False], kind='stable')
+        op_matches_df['match_rank'] = op_matches_df.groupby('op_manufacturer_id').cumcount() + 1
+        filtered_df = op_matches_df[op_matches_df['match_rank'] <= match_config['top_n_matches']]
+        unique_matched = op_matches_df['op_manufacturer_id'].nunique()
+    else:
+        filtered_df = op_matches_df
+        unique_matched = 0
 
     logger.info(f"\n{'='*60}")
-    logger.info(f"MATCHING COMPLETE")
+    logger.info("MATCHING COMPLETE")
     logger.info(f"{'='*60}")
     logger.info(f"Total runtime: {total_time:.1f} seconds ({total_time/60:.1f} minutes)")
-    logger.info(f"Total comparisons: {len(all_results):,}")
-    logger.info(f"Processing rate: {len(all_results)/total_time:.1f} comparisons/second")
-    logger.info(f"Matches found: {len(filtered_results)}")
-    logger.info(f"Unique OP manufacturers matched: {len(op_matches)}")
+    logger.info(f"Total comparisons: {total_comparisons:,}")
+    logger.info(f"Processing rate: {total_comparisons/total_time:.1f} comparisons/second" if total_time > 0 else "Processing rate: n/a")
+    if store.metadata.get('failed_pairs'):
+        logger.warning(f"Failed pairs (not matched): {store.metadata['failed_pairs']:,}")
+    logger.info(f"Matches found: {len(filtered_df)}")
+    logger.info(f"Unique OP manufacturers matched: {unique_matched}")
 
     # Check if all batches were completed
-    is_complete = len(completed_batches) == len(batches)
+    is_complete = len(completed_batches) == total_batches
     if is_complete:
         logger.info("ALL BATCHES COMPLETED SUCCESSFULLY")
     else:
-        logger.info(f"RUN INTERRUPTED - Completed {len(completed_batches)}/{len(batches)} batches")
+        logger.info(f"RUN INTERRUPTED - Completed {len(completed_batches)}/{total_batches} batches")
         logger.info("Checkpoint files preserved for resumption")
 
-    return pd.DataFrame(filtered_results), is_complete
+    return filtered_df.reset_index(drop=True), is_complete
 
 
 def save_final_results(results_df: pd.DataFrame, output_dir: Path, runtime: float, op_total: int):
@@ -452,10 +453,8 @@ def main():
     config = load_config(config_path)
 
     # Check for existing checkpoint
-    checkpoint = load_checkpoint()
-    if checkpoint:
+    if (Path(CHECKPOINT_DIR) / "manifest.json").exists():
         logger.info("Found existing checkpoint - RESUMING from last position")
-        logger.info(f"Previously completed: {len(checkpoint['completed_batches'])} batches")
     else:
         logger.info("No checkpoint found - STARTING fresh")
 
@@ -485,12 +484,15 @@ def main():
 
         # Only clean up checkpoint files if ALL batches completed
         if is_complete:
-            logger.info("\nAll batches completed - cleaning up checkpoint files...")
-            checkpoint_dir = Path("checkpoint")
-            if checkpoint_dir.exists():
-                for f in checkpoint_dir.glob("*.pkl"):
-                    f.unlink()
-                logger.info("Checkpoint files cleaned up")
+            logger.info("\nAll batches completed - compacting and cleaning up checkpoint files...")
+            store = SegmentCheckpointStore(CHECKPOINT_DIR)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            store.compact(output_dir / f"tier2_checkpoint_all_comparisons_{timestamp}.parquet",
+                          columns=['op_manufacturer_id', 'op_manufacturer_name', 'rx_manufacturer_name',
+                                   'final_score', 'is_match', 'confidence_source', 'fuzzy_score',
+                                   'ai_score', 'blocking_key'])
+            store.clear()
+            logger.info("Checkpoint files cleaned up")
         else:
             logger.info("\nRun was interrupted - checkpoint files preserved")
             logger.info("Re-run the script to resume from the last checkpoint")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched vs single-pair LLM adjudication for Tier2 matching
+Runs the same low-confidence pairs through ai_batch_size=1 and the configured
+batch size (verdict cache disabled) and reports pairs/second, $/1k pairs and
+score agreement between the two modes
+"""
+
+import sys
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import logging
+import yaml
+import time
+
+# Add shared name matching module to path so we can import tier2_matcher
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+# Import Tier2 matcher
+from tier2_matcher import Tier2NameMatcher
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def load_config(config_path: Path) -> dict:
+    """Load configuration from YAML file"""
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def load_low_confidence_pairs(results_file: Path, fuzzy_threshold: float, sample_size: int) -> list:
+    """
+    Sample pairs from a previous full-results file that need AI adjudication
+    """
+    df = pd.read_csv(results_file)
+    df = df[df['fuzzy_score'] < fuzzy_threshold].drop_duplicates(['op_manufacturer_name', 'rx_manufacturer_name'])
+    df = df.sample(n=min(sample_size, len(df)), random_state=42)
+    return list(zip(df['op_manufacturer_name'], df['rx_manufacturer_name']))
+
+
+def run_mode(pairs: list, match_config: dict, ai_batch_size: int) -> dict:
+    """
+    Match all pairs with AI enabled and collect throughput and cost
+    """
+    matcher = Tier2NameMatcher(
+        fuzzy_threshold=match_config['fuzzy_threshold'],
+        decision_threshold=match_config['decision_threshold'],
+        model=match_config['model'],
+        max_workers=match_config['max_workers'],
+        ai_batch_size=ai_batch_size,
+        cache_path=None
+    )
+    # Disable any cache picked up from the environment so both modes hit the API
+    matcher.cache = None
+
+    start_time = time.time()
+    results = matcher.match_batch(pairs, use_ai=True)
+    runtime = time.time() - start_time
+
+    stats = matcher.get_statistics()
+    return {
+        'ai_batch_size': ai_batch_size,
+        'runtime': runtime,
+        'pairs_per_second': len(pairs) / runtime if runtime else 0.0,
+        'api_requests': stats['api_requests'],
+        'api_errors': stats['api_errors'],
+        'batch_fallbacks': stats['batch_fallbacks'],
+        'cost_usd': stats['estimated_cost_usd'],
+        'cost_per_1k_pairs': stats['cost_per_1k_ai_pairs'],
+        'ai_scores': np.array([r['ai_score'] if r['ai_score'] is not None else np.nan for r in results]),
+        'is_match': np.array([r['is_match'] for r in results]),
+    }
+
+
+def main():
+    """Main execution"""
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--results-file', default=None,
+                        help='Previous tier2 full results CSV (defaults to the latest in data/output)')
+    parser.add_argument('--sample-size', type=int, default=200,
+                        help='Number of low-confidence pairs to adjudicate')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Batch size to compare against single-pair mode '
+                             '(defaults to config ai_batch_size when batching is enabled, else 20)')
+    args = parser.parse_args()
+
+    project_dir = Path(__file__).parent.parent
+    config = load_config(project_dir / "config.yaml")
+    match_config = config['matching']
+    configured_batch_size = match_config.get('ai_batch_size', 1)
+    batch_size = args.batch_size or (configured_batch_size if configured_batch_size > 1 else 20)
+
+    results_file = Path(args.results_file) if args.results_file else max(
+        (project_dir / "data" / "output").glob("tier2_*_full_*.csv"))
+    pairs = load_low_confidence_pairs(results_file, match_config['fuzzy_threshold'], args.sample_size)
+
+    logger.info("="*60)
+    logger.info("TIER2 BATCH ADJUDICATION BENCHMARK")
+    logger.info("="*60)
+    logger.info(f"Source: {results_file.name}")
+    logger.info(f"Low-confidence pairs: {len(pairs)}")
+
+    single = run_mode(pairs, match_config, ai_batch_size=1)
+    batched = run_mode(pairs, match_config, ai_batch_size=batch_size)
+
+    logger.info(f"\n{'Mode':<14} {'Pairs/sec':>10} {'Requests':>9} {'Errors':>7} {'Fallbacks':>10} {'$/1k pairs':>11}")
+    for label, result in [('single', single), (f'batch={batch_size}', batched)]:
+        logger.info(f"{label:<14} {result['pairs_per_second']:>10.2f} {result['api_requests']:>9} "
+                    f"{result['api_errors']:>7} {result['batch_fallbacks']:>10} {result['cost_per_1k_pairs']:>11.4f}")
+
+    both = ~np.isnan(single['ai_scores']) & ~np.isnan(batched['ai_scores'])
+    if both.any():
+        diff = np.abs(single['ai_scores'][both] - batched['ai_scores'][both])
+        logger.info(f"\nAI score mean |diff|: {diff.mean():.1f}, within 10 points: {(diff <= 10).mean():.1%}")
+    logger.info(f"Match decision agreement: {(single['is_match'] == batched['is_match']).mean():.1%}")
+
+    if single['runtime'] and batched['runtime']:
+        logger.info(f"Speedup: {single['runtime'] / batched['runtime']:.1f}x")
+    if batched['cost_usd']:
+        logger.info(f"Cost reduction: {single['cost_usd'] / batched['cost_usd']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
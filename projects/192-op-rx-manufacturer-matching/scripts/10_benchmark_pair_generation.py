@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark blocked pair generation at 10k OP x 5k RX manufacturer names
+Compares the legacy per-block filter + nested iterrows() loop (timed on a
+subset and extrapolated) with the chunked, vectorized generator: time to
+first chunk, total pairs/second and peak memory
+"""
+
+import sys
+import time
+import random
+import string
+import logging
+import tracemalloc
+import pandas as pd
+from pathlib import Path
+
+# Add shared name matching module to path so we can import pair_generation
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src' / 'analysis' / '01-core-name-matching'))
+
+from pair_generation import count_blocked_pairs, iter_blocked_pairs
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_blocking_key(name: str) -> str:
+    """First character blocking key (same rule as the 05/06/07 runners)"""
+    name = str(name).strip().upper()
+    for prefix in ['THE ', 'A ', 'AN ']:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    if not name:
+        return 'UNKNOWN'
+    if name[0].isdigit():
+        return 'NUMERIC'
+    return name[0] if name[0].isalpha() else 'SPECIAL'
+
+
+def synthetic_names(n: int, seed: int) -> list:
+    """Random manufacturer-like names"""
+    rng = random.Random(seed)
+    suffixes = ['Inc', 'LLC', 'Pharmaceuticals', 'Medical', 'Labs', 'Corp', 'Therapeutics']
+    return [' '.join([''.join(rng.choices(string.ascii_uppercase, k=1)) +
+                      ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))),
+                      rng.choice(suffixes)]) for _ in range(n)]
+
+
+def legacy_pairs(op_df: pd.DataFrame, rx_df: pd.DataFrame) -> list:
+    """Original prepare_comparison_pairs loop"""
+    pairs = []
+    for blocking_key in op_df['blocking_key'].unique():
+        if blocking_key not in rx_df['blocking_key'].values:
+            continue
+        op_block = op_df[op_df['blocking_key'] == blocking_key]
+        rx_block = rx_df[rx_df['blocking_key'] == blocking_key]
+        for _, op_row in op_block.iterrows():
+            for _, rx_row in rx_block.iterrows():
+                pairs.append((op_row['manufacturer_id'], op_row['manufacturer_name'],
+                              rx_row['manufacturer_name'], blocking_key))
+    return pairs
+
+
+def main():
+    """Main execution"""
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--op-names', type=int, default=10_000, help='Number of OP names')
+    parser.add_argument('--rx-names', type=int, default=5_000, help='Number of RX names')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Pairs per generated chunk')
+    parser.add_argument('--legacy-sample', type=int, default=200,
+                        help='OP names used to time the legacy loop (extrapolated)')
+    args = parser.parse_args()
+
+    op_df = pd.DataFrame({'manufacturer_id': range(args.op_names),
+                          'manufacturer_name': synthetic_names(args.op_names, seed=1)})
+    rx_df = pd.DataFrame({'manufacturer_name': synthetic_names(args.rx_names, seed=2)})
+    op_df['blocking_key'] = op_df['manufacturer_name'].apply(get_blocking_key)
+    rx_df['blocking_key'] = rx_df['manufacturer_name'].apply(get_blocking_key)
+
+    total_pairs = count_blocked_pairs(op_df['blocking_key'], rx_df['blocking_key'])
+    logger.info("="*60)
+    logger.info("BLOCKED PAIR GENERATION BENCHMARK")
+    logger.info("="*60)
+    logger.info(f"{args.op_names:,} OP x {args.rx_names:,} RX names -> {total_pairs:,} blocked pairs")
+
+    def consume_chunks():
+        # Consume chunk by chunk as a scorer would (tuples as process_batch expects)
+        first_chunk_time = None
+        generated = 0
+        start_time = time.perf_counter()
+        for chunk in iter_blocked_pairs(op_df, rx_df, left_columns=['manufacturer_id', 'manufacturer_name'],
+                                        right_columns=['manufacturer_name'], chunk_size=args.chunk_size):
+            batch = list(zip(chunk['manufacturer_id'].tolist(), chunk['manufacturer_name_left'].tolist(),
+                             chunk['manufacturer_name_right'].tolist(), chunk['blocking_key'].tolist()))
+            if first_chunk_time is None:
+                first_chunk_time = time.perf_counter() - start_time
+            generated += len(batch)
+        return generated, first_chunk_time, time.perf_counter() - start_time
+
+    # Timing and memory are measured in separate passes (tracemalloc slows allocation)
+    generated, first_chunk_time, vectorized_time = consume_chunks()
+    tracemalloc.start()
+    consume_chunks()
+    _, vectorized_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Legacy loop on a sample of OP names, extrapolated by pair count
+    sample = op_df.head(args.legacy_sample)
+    sample_pairs = count_blocked_pairs(sample['blocking_key'], rx_df['blocking_key'])
+    start_time = time.perf_counter()
+    legacy = legacy_pairs(sample, rx_df)
+    legacy_sample_time = time.perf_counter() - start_time
+    tracemalloc.start()
+    legacy = legacy_pairs(sample, rx_df)
+    _, legacy_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    legacy_time = legacy_sample_time / max(len(legacy), 1) * total_pairs
+    legacy_peak_full = legacy_peak / max(len(legacy), 1) * total_pairs
+
+    logger.info(f"\nVectorized (chunk={args.chunk_size:,}):")
+    logger.info(f"  Pairs generated: {generated:,}")
+    logger.info(f"  Time to first chunk: {first_chunk_time:.3f}s")
+    logger.info(f"  Total: {vectorized_time:.2f}s ({generated / vectorized_time:,.0f} pairs/sec)")
+    logger.info(f"  Peak traced memory: {vectorized_peak / 1e6:,.1f} MB")
+    logger.info(f"\nLegacy iterrows (measured on {sample_pairs:,} pairs, extrapolated):")
+    logger.info(f"  Total: ~{legacy_time:,.0f}s ({len(legacy) / legacy_sample_time:,.0f} pairs/sec)")
+    logger.info(f"  Peak memory (all pairs materialized): ~{legacy_peak_full / 1e6:,.0f} MB")
+    logger.info(f"\nSpeedup: {legacy_time / vectorized_time:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,41 @@ Combines fuzzy matching with AI enhancement for optimal results.
 # Import the production Tier 2 matcher
 try:
     from .tier2_matcher import Tier2NameMatcher, match_names
+    from .candidate_index import CandidateIndex
+    from .name_normalization import NameNormalizer, normalize_name, normalize_series
+    from .llm_cache import LLMVerdictCache
+    from .pair_generation import iter_blocked_pairs, count_blocked_pairs
+    from .blocking import MultiKeyBlocker
 except ImportError as e:
     print(f"Warning: tier2_matcher not available. Install requirements: pip install -r requirements.txt")
     print(f"Error: {e}")
     Tier2NameMatcher = None
     match_names = None
+    CandidateIndex = None
+    NameNormalizer = None
+    normalize_name = None
+    normalize_series = None
+    LLMVerdictCache = None
+    iter_blocked_pairs = None
+    count_blocked_pairs = None
+    MultiKeyBlocker = None
+
+# The async engine needs the AsyncOpenAI client; the synchronous matcher works without it
+try:
+    from .async_matcher import AsyncTier2Matcher
+except ImportError as e:
+    print("Warning: async_matcher not available. Install requirements: pip install -r requirements.txt")
+    print(f"Error: {e}")
+    AsyncTier2Matcher = None
 
 # Export only production modules
 __all__ = []
 if Tier2NameMatcher:
-    __all__.extend(['Tier2NameMatcher', 'match_names'])
+    __all__.extend(['Tier2NameMatcher', 'match_names', 'CandidateIndex',
+                    'NameNormalizer', 'normalize_name', 'normalize_series', 'LLMVerdictCache',
+                    'iter_blocked_pairs', 'count_blocked_pairs', 'MultiKeyBlocker'])
+if AsyncTier2Matcher:
+    __all__.append('AsyncTier2Matcher')
 
 # Module metadata
 __version__ = '3.0.0'
@@ -0,0 +1,516 @@
+"""
+Asyncio Tier 2 Matching Engine with Adaptive Rate Limiting
+Drives AI adjudication through AsyncOpenAI instead of a fixed thread pool
+
+- Token buckets enforce the account's requests/min and tokens/min budgets
+- 429 responses honour Retry-After (pausing the shared buckets) and halve the
+  concurrency limit; successful requests grow it again additively (AIMD)
+- Fuzzy scoring runs in a worker thread, chunk by chunk, while API calls for
+  earlier chunks are already in flight
+
+Decision logic, prompts, the verdict cache and cost statistics are shared with
+Tier2NameMatcher, so results are identical to the synchronous path. The rate
+limit state (buckets, concurrency limit, API client) lives on the engine, so
+budgets and Retry-After pauses hold across successive `match_batch` calls.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+try:
+    from .tier2_matcher import Tier2NameMatcher
+except ImportError:
+    from tier2_matcher import Tier2NameMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at a per-minute rate.
+
+    Acquisitions are served in FIFO order. The level may go negative when
+    actual usage exceeds the estimate (see `adjust`), which delays later
+    acquisitions until the debt is refilled.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Refill rate (requests or tokens per minute)
+            capacity: Maximum burst size (default: one minute of budget)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # The bucket outlives event loops (asyncio.run per call); locks do not
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` units are available, then consume them."""
+        amount = min(amount, self.capacity)
+        async with self._get_lock():
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    continue
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) units after the fact."""
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+    def pause(self, seconds: float):
+        """Block every acquisition for `seconds` (e.g. a server Retry-After)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AIMDConcurrencyLimiter:
+    """
+    Concurrency limit adjusted by additive-increase / multiplicative-decrease.
+
+    Each success raises the limit by `increase / limit` (about +increase per
+    window of `limit` requests); each throttle multiplies it by
+    `decrease_factor`, at most once per `cooldown` seconds so one burst of
+    429s counts as a single congestion signal.
+    """
+
+    def __init__(self,
+                 initial: int = 8,
+                 min_limit: int = 1,
+                 max_limit: int = 64,
+                 increase: float = 1.0,
+                 decrease_factor: float = 0.5,
+                 cooldown: float = 2.0):
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._condition, self._loop = asyncio.Condition(), loop
+        return self._condition
+
+    async def __aenter__(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def on_success(self):
+        """Additive increase."""
+        self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+
+    def on_throttle(self):
+        """Multiplicative decrease (rate limited by the cooldown)."""
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self.decreases += 1
+            logger.info(f"Rate limited: concurrency limit reduced to {int(self.limit)}")
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's retry delay from an OpenAI API error.
+
+    Supports `retry-after-ms`, `retry-after` in seconds and `retry-after` as
+    an HTTP date.
+
+    Returns:
+        Delay in seconds, or None if the response carries no hint
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get('retry-after')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class AsyncTier2Matcher:
+    """
+    Async Tier 2 matching engine with rate-limit-aware AI adjudication.
+
+    Attributes:
+        matcher (Tier2NameMatcher): Supplies fuzzy scoring, prompts, decision
+            logic, the verdict cache and token/cost statistics
+        requests_per_minute (float): Request budget enforced by a token bucket
+        tokens_per_minute (float): Token budget enforced by a token bucket
+        concurrency_limit (int): Current adaptive concurrency limit
+        max_retries (int): Retries per pair for 429, 5xx and connection errors
+        stats (Dict[str, float]): Engine counters (requests, throttles, retries, ...)
+    """
+
+    # Completion tokens reserved per single-pair request
+    MAX_COMPLETION_TOKENS = 10
+
+    def __init__(self,
+                 matcher: Optional[Tier2NameMatcher] = None,
+                 api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 requests_per_minute: float = 500,
+                 tokens_per_minute: float = 200_000,
+                 initial_concurrency: int = 8,
+                 min_concurrency: int = 1,
+                 max_concurrency: int = 64,
+                 max_retries: int = 5,
+                 request_timeout: float = 30.0,
+                 fuzzy_chunk_size: int = 1000,
+                 **matcher_kwargs):
+        """
+        Initialize the async engine.
+
+        Args:
+            matcher: Existing Tier2NameMatcher to share (created from
+                api_key and matcher_kwargs if not given)
+            api_key: OpenAI API key (if not in environment)
+            base_url: Alternative API base URL, e.g. a local fake server
+            requests_per_minute: Request rate limit
+            tokens_per_minute: Token rate limit (prompt + completion)
+            initial_concurrency: Starting number of in-flight requests
+            min_concurrency: Lower bound for the adaptive limit
+            max_concurrency: Upper bound for the adaptive limit
+            max_retries: Retries per pair before falling back to the fuzzy score
+            request_timeout: Per-request timeout in seconds
+            fuzzy_chunk_size: Pairs fuzzy-scored per worker-thread chunk
+            **matcher_kwargs: Passed to Tier2NameMatcher when matcher is None
+        """
+        self.matcher = matcher or Tier2NameMatcher(api_key=api_key, **matcher_kwargs)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.fuzzy_chunk_size = max(1, fuzzy_chunk_size)
+
+        self.stats = self._empty_stats()
+
+        # Shared by every match_batch call of the run
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._limiter = AIMDConcurrencyLimiter(initial_concurrency, min_concurrency, max_concurrency)
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(self.min_concurrency, int(self._limiter.limit))
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'pairs': 0,
+            'requests': 0,
+            'successes': 0,
+            'throttled': 0,
+            'server_errors': 0,
+            'retries': 0,
+            'failures': 0,
+            'peak_concurrency': 0,
+            'concurrency_decreases': 0,
+            'runtime_seconds': 0.0,
+        }
+
+    def _make_client(self) -> AsyncOpenAI:
+        # Retries are handled here so the limiter sees every 429
+        kwargs = {'max_retries': 0, 'timeout': self.request_timeout}
+        if self.api_key:
+            kwargs['api_key'] = self.api_key
+        if self.base_url:
+            kwargs['base_url'] = self.base_url
+        return AsyncOpenAI(**kwargs)
+
+    def _get_client(self) -> AsyncOpenAI:
+        # The HTTP connection pool belongs to one event loop
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client, self._client_loop = self._make_client(), loop
+        return self._client
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        # ~4 characters per token plus the reserved completion
+        text_length = len(prompt) + len(self.matcher.AI_SYSTEM_PROMPT)
+        return text_length // 4 + self.MAX_COMPLETION_TOKENS
+
+    async def _request(self, client: AsyncOpenAI, prompt: str) -> Tuple[str, object]:
+        """Send one adjudication request; returns (result_text, response)."""
+        model = self.matcher.model
+        if 'gpt-5' in model:
+            response = await client.responses.create(
+                model=model,
+                input=[{"role": "user", "content": prompt}],
+                text={"verbosity": "low"},
+                reasoning={"effort": "high"}
+            )
+            return response.output_text, response
+
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": self.matcher.AI_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.0,
+            max_tokens=self.MAX_COMPLETION_TOKENS
+        )
+        return response.choices[0].message.content, response
+
+    async def enhance_with_ai(self, name_a: str, name_b: str, fuzzy_score: float) -> Tuple[float, str]:
+        """
+        Adjudicate one low-confidence pair within the rate limits.
+
+        Returns:
+            Tuple of (ai_confidence, reasoning); the fuzzy score and an error
+            message once retries are exhausted or on any other error
+        """
+        try:
+            return await self._adjudicate(name_a, name_b, fuzzy_score)
+        except Exception as e:
+            logger.error(f"AI enhancement error: {e}")
+            self.stats['failures'] += 1
+            self.matcher.stats['api_errors'] += 1
+            # Fall back to fuzzy score on error
+            return fuzzy_score, f"Error: {str(e)}"
+
+    async def _adjudicate(self, name_a: str, name_b: str, fuzzy_score: float) -> Tuple[float, str]:
+        """Cache lookup and request loop; raises the last error once retries are exhausted."""
+        matcher = self.matcher
+        cached = matcher._cache_get(name_a, name_b, matcher.PROMPT_VERSION)
+        if cached is not None:
+            return cached
+
+        client = self._get_client()
+        request_bucket, token_bucket = self._request_bucket, self._token_bucket
+        prompt = matcher._ai_prompt(name_a, name_b, fuzzy_score)
+        estimate = self._estimate_tokens(prompt)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+
+            await request_bucket.acquire(1)
+            await token_bucket.acquire(estimate)
+
+            delay = None
+            async with self._limiter:
+                self.stats['requests'] += 1
+                try:
+                    result_text, response = await self._request(client, prompt)
+                except RateLimitError as e:
+                    last_error = e
+                    self.stats['throttled'] += 1
+                    self._limiter.on_throttle()
+                    delay = retry_after_seconds(e)
+                    if delay is not None:
+                        # The server says when capacity returns; stop everyone until then
+                        request_bucket.pause(delay)
+                        token_bucket.pause(delay)
+                except (APIConnectionError, APITimeoutError) as e:
+                    last_error = e
+                    self.stats['server_errors'] += 1
+                except APIStatusError as e:
+                    last_error = e
+                    if e.status_code < 500:
+                        break
+                    self.stats['server_errors'] += 1
+                    delay = retry_after_seconds(e)
+                else:
+                    self._limiter.on_success()
+                    self.stats['successes'] += 1
+                    matcher._record_usage(response)
+                    usage = getattr(response, 'usage', None)
+                    actual = getattr(usage, 'total_tokens', None) if usage is not None else None
+                    if actual:
+                        token_bucket.adjust(actual - estimate)
+                    try:
+                        confidence = matcher._parse_confidence(result_text or '')
+                    except ValueError as e:
+                        last_error = e
+                        break
+                    matcher._cache_put(name_a, name_b, matcher.PROMPT_VERSION, confidence)
+                    return confidence, "AI enhanced"
+
+            if attempt < self.max_retries:
+                # Exponential backoff with jitter when the server gave no hint
+                await asyncio.sleep(delay if delay is not None else
+                                    min(30.0, 0.5 * 2 ** attempt) * (0.5 + random.random()))
+
+        raise last_error
+
+    def _score_chunk(self, pairs: List[Tuple[str, str]]) -> List[Tuple[float, Dict[str, float]]]:
+        return [self.matcher.fuzzy_match(name_a, name_b) for name_a, name_b in pairs]
+
+    async def match_batch_async(self, pairs: List[Tuple[str, str]], use_ai: bool = True) -> List[Dict]:
+        """
+        Match name pairs, overlapping fuzzy scoring with AI requests.
+
+        Args:
+            pairs: List of (name_a, name_b) tuples
+            use_ai: Whether to use AI enhancement
+
+        Returns:
+            List of match result dictionaries, in the order of `pairs`
+        """
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        results: List[Optional[Dict]] = [None] * len(pairs)
+
+        decreases = self._limiter.decreases
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 4)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                i, fuzzy_score, fuzzy_details = item
+                name_a, name_b = pairs[i]
+                # A failing pair must not stop the worker, or the queue stops draining
+                try:
+                    ai_result = await self.enhance_with_ai(name_a, name_b, fuzzy_score)
+                    results[i] = self.matcher._resolve_match(name_a, name_b, fuzzy_score, fuzzy_details,
+                                                             True, ai_result)
+                except Exception as e:
+                    logger.error(f"Tier 2 match error for {name_a!r} / {name_b!r}: {e}")
+                    self.stats['failures'] += 1
+                    results[i] = self.matcher._resolve_match(name_a, name_b, fuzzy_score, fuzzy_details,
+                                                             True, (fuzzy_score, f"Error: {str(e)}"))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)] if use_ai else []
+        try:
+            for offset in range(0, len(pairs), self.fuzzy_chunk_size):
+                chunk = pairs[offset:offset + self.fuzzy_chunk_size]
+                fuzzy = await loop.run_in_executor(None, self._score_chunk, chunk)
+                for i, (fuzzy_score, fuzzy_details) in enumerate(fuzzy, offset):
+                    if use_ai and fuzzy_score < self.matcher.fuzzy_threshold:
+                        await queue.put((i, fuzzy_score, fuzzy_details))
+                    else:
+                        name_a, name_b = pairs[i]
+                        results[i] = self.matcher._resolve_match(name_a, name_b, fuzzy_score,
+                                                                 fuzzy_details, use_ai)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        self.stats['pairs'] += len(pairs)
+        self.stats['peak_concurrency'] = max(self.stats['peak_concurrency'], self._limiter.peak_in_flight)
+        self.stats['concurrency_decreases'] += self._limiter.decreases - decreases
+        self.stats['runtime_seconds'] += time.time() - start_time
+        return results
+
+    def match_batch(self, pairs: List[Tuple[str, str]], use_ai: bool = True) -> List[Dict]:
+        """
+        Synchronous wrapper around `match_batch_async` for scripts.
+
+        Every call runs on the same event loop and API client, so a run made
+        of many small batches shares one set of rate limits. Call `close`
+        when done.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.match_batch_async(pairs, use_ai))
+
+    def close(self):
+        """Close the API client and the event loop used by `match_batch`."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if self._client is not None and self._client_loop is self._loop:
+            self._loop.run_until_complete(self._client.close())
+            self._client = None
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
+
+    def get_statistics(self) -> Dict:
+        """
+        Get matcher and engine statistics.
+
+        Returns:
+            Tier2NameMatcher statistics plus throughput, throttle and error
+            rates and the current concurrency limit
+        """
+        runtime = max(self.stats['runtime_seconds'], 1e-9)
+        requests = max(self.stats['requests'], 1)
+        return {
+            **self.matcher.get_statistics(),
+            **self.stats,
+            'pairs_per_second': self.stats['pairs'] / runtime,
+            'requests_per_second': self.stats['requests'] / runtime,
+            'throttle_rate': (self.stats['throttled'] / requests) * 100,
+            'request_error_rate': ((self.stats['throttled'] + self.stats['server_errors']) / requests) * 100,
+            'concurrency_limit': self.concurrency_limit,
+        }
+
+    def reset_statistics(self):
+        """Reset engine and matcher statistics counters."""
+        self.stats = self._empty_stats()
+        self.matcher.reset_statistics()
@@ -0,0 +1,347 @@
+"""
+Multi-Key Blocking for Organization Name Matching
+Generates candidate pairs as the union of several cheap blocking keys instead
+of a single first-letter block
+
+Keys per name (after Tier 2 normalization and generic-word removal):
+1. first_token  - first significant token
+2. sorted_token - alphabetically first significant token (word-order robust)
+3. metaphone    - Metaphone code of the first significant token (spelling robust)
+4. acronym      - initials of the significant tokens, or a short single token
+                  itself ("Bristol-Myers Squibb" and "BMS" both give "bms")
+5. minhash      - MinHash LSH bands over character 3-grams (typo robust)
+
+Two names are candidates if they share any key. `iter_candidate_pairs`
+generates and deduplicates the pairs lazily, one block of left rows at a time,
+so peak memory is bounded by the block rather than the full candidate list.
+`evaluate` reports the reduction ratio and pairs completeness against labeled
+pairs so the key set and LSH parameters can be tuned for speed vs recall.
+"""
+
+import re
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import jellyfish
+
+try:
+    from .name_normalization import TIER2_NORMALIZER, NameNormalizer
+    from .pair_generation import DEFAULT_CHUNK_SIZE
+except ImportError:
+    from name_normalization import TIER2_NORMALIZER, NameNormalizer
+    from pair_generation import DEFAULT_CHUNK_SIZE
+
+# Words too common in healthcare/manufacturer names to identify a block
+GENERIC_TOKENS = frozenset({
+    'the', 'a', 'an', 'of', 'and', 'for', 'de', 'la', 'le', 'du', 'et',
+    'usa', 'us', 'america', 'american', 'north', 'international', 'global', 'worldwide',
+    'holdings', 'holding', 'group', 'division', 'dba', 'fka', 'sa', 'ag', 'gmbh', 'bv', 'nv', 'srl', 'spa', 'pty',
+    'pharmaceuticals', 'pharmaceutical', 'pharma', 'pharmas', 'medical', 'healthcare', 'health',
+    'laboratories', 'laboratory', 'labs', 'lab', 'technologies', 'technology', 'sciences', 'science',
+    'therapeutics', 'products', 'services', 'systems', 'system', 'solutions', 'industries',
+    'company', 'corporation', 'incorporated', 'limited', 'inc', 'corp', 'llc', 'ltd', 'co', 'lp', 'llp', 'plc',
+})
+
+# Key types in priority order (the first shared key labels a candidate pair)
+KEY_TYPES = ('first_token', 'sorted_token', 'metaphone', 'acronym', 'minhash')
+
+# Left rows whose candidates are generated and deduplicated together
+DEFAULT_BLOCK_ROWS = 1_000
+
+# Mersenne prime for the MinHash universal hash family
+_MINHASH_PRIME = np.uint64((1 << 31) - 1)
+
+_TOKEN_SPLIT = re.compile(r'[\s\-/&]+')
+
+
+class MultiKeyBlocker:
+    """
+    Candidate pair generator using the union of several blocking keys.
+
+    Attributes:
+        key_types (Tuple[str, ...]): Enabled key types (subset of KEY_TYPES)
+        minhash_bands (int): LSH bands (more bands = higher recall)
+        minhash_rows (int): MinHash values per band (more rows = fewer candidates)
+        max_block_size (Optional[int]): Blocks with more right-side names are
+            skipped (prunes near-stop-word keys)
+    """
+
+    def __init__(self,
+                 key_types: Sequence[str] = KEY_TYPES,
+                 normalizer: NameNormalizer = TIER2_NORMALIZER,
+                 generic_tokens: Iterable[str] = GENERIC_TOKENS,
+                 minhash_bands: int = 20,
+                 minhash_rows: int = 3,
+                 ngram_size: int = 3,
+                 max_acronym_length: int = 6,
+                 max_block_size: Optional[int] = None,
+                 seed: int = 42):
+        """
+        Configure the blocker.
+
+        Args:
+            key_types: Key types to generate (see KEY_TYPES)
+            normalizer: Name normalization profile applied before keying
+            generic_tokens: Tokens ignored when picking significant tokens
+            minhash_bands: Number of LSH bands
+            minhash_rows: Rows (hash values) per band
+            ngram_size: Character n-gram size for MinHash
+            max_acronym_length: Longest single token treated as an acronym
+            max_block_size: Skip keys shared by more right-side names than this
+            seed: Seed for the MinHash permutations
+        """
+        unknown = set(key_types) - set(KEY_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown blocking key types: {sorted(unknown)}")
+        self.key_types = tuple(k for k in KEY_TYPES if k in key_types)
+        self.normalizer = normalizer
+        self.generic_tokens = frozenset(generic_tokens)
+        self.minhash_bands = minhash_bands
+        self.minhash_rows = minhash_rows
+        self.ngram_size = ngram_size
+        self.max_acronym_length = max_acronym_length
+        self.max_block_size = max_block_size
+
+        rng = np.random.default_rng(seed)
+        n_hashes = minhash_bands * minhash_rows
+        self._hash_a = rng.integers(1, int(_MINHASH_PRIME), size=n_hashes, dtype=np.uint64)
+        self._hash_b = rng.integers(0, int(_MINHASH_PRIME), size=n_hashes, dtype=np.uint64)
+        self._keys_by_name: Dict = {}
+
+    def significant_tokens(self, clean: str) -> List[str]:
+        """Tokens of a normalized name with generic words removed (falls back to all tokens)."""
+        tokens = [t for t in _TOKEN_SPLIT.split(clean) if t]
+        significant = [t for t in tokens if t not in self.generic_tokens]
+        return significant or tokens
+
+    def _minhash_keys(self, clean: str) -> List[str]:
+        text = f' {clean} '
+        n = self.ngram_size
+        grams = {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+        signature = ((self._hash_a[:, None] * hashes[None, :] + self._hash_b[:, None]) % _MINHASH_PRIME).min(axis=1)
+        bands = signature.reshape(self.minhash_bands, self.minhash_rows)
+        return [f'mh{b}:{zlib.crc32(band.tobytes())}' for b, band in enumerate(bands)]
+
+    def keys_for(self, name) -> Dict[str, List[str]]:
+        """
+        Blocking keys of one name, by key type.
+
+        Args:
+            name: Raw organization name
+
+        Returns:
+            Dictionary of key type -> list of key strings (empty for blank names)
+        """
+        clean = self.normalizer.normalize(name)
+        keys = {key_type: [] for key_type in self.key_types}
+        if not clean:
+            return keys
+
+        tokens = self.significant_tokens(clean)
+        if 'first_token' in keys:
+            keys['first_token'].append(f'ft:{tokens[0]}')
+        if 'sorted_token' in keys:
+            keys['sorted_token'].append(f'st:{min(tokens)}')
+        if 'metaphone' in keys:
+            code = jellyfish.metaphone(tokens[0])
+            if code:
+                keys['metaphone'].append(f'mp:{code.lower()}')
+        if 'acronym' in keys:
+            if len(tokens) > 1:
+                keys['acronym'].append('ac:' + ''.join(t[0] for t in tokens))
+            elif 2 <= len(tokens[0]) <= self.max_acronym_length:
+                keys['acronym'].append(f'ac:{tokens[0]}')
+        if 'minhash' in keys:
+            keys['minhash'].extend(self._minhash_keys(clean))
+        return keys
+
+    def _explode(self, names: Sequence) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Per key type: (row positions, key strings), one entry per (row, key)."""
+        rows = {key_type: [] for key_type in self.key_types}
+        values = {key_type: [] for key_type in self.key_types}
+        keys_by_name = self._keys_by_name  # Reused by the counting and generating passes
+        for pos, name in enumerate(names):
+            if name not in keys_by_name:
+                keys_by_name[name] = self.keys_for(name)
+            for key_type, key_list in keys_by_name[name].items():
+                rows[key_type].extend([pos] * len(key_list))
+                values[key_type].extend(key_list)
+        return {key_type: (np.asarray(rows[key_type], dtype=np.int64), np.asarray(values[key_type], dtype=object))
+                for key_type in self.key_types}
+
+    def _block_index(self, left_names: Sequence, right_names: Sequence) -> List[Tuple[np.ndarray, ...]]:
+        """
+        Per key type: left (row, key code) entries in row order, and the right
+        rows grouped by key code (positions plus block bounds per code).
+        """
+        left = self._explode(left_names)
+        right = self._explode(right_names)
+
+        index = []
+        for key_type in self.key_types:
+            left_rows, left_keys = left[key_type]
+            right_rows, right_keys = right[key_type]
+            if self.max_block_size is not None and len(right_keys):
+                counts = pd.Series(right_keys).map(pd.Series(right_keys).value_counts())
+                keep = counts.to_numpy() <= self.max_block_size
+                right_rows, right_keys = right_rows[keep], right_keys[keep]
+
+            # Codes shared by both sides; left keys with no right block are dropped
+            codes, uniques = pd.factorize(np.concatenate([left_keys, right_keys]))
+            left_codes, right_codes = codes[:len(left_keys)], codes[len(left_keys):]
+            paired = np.isin(left_codes, right_codes)
+            order = np.argsort(right_codes, kind='stable')
+            bounds = np.searchsorted(right_codes[order], np.arange(len(uniques) + 1))
+            index.append((left_rows[paired], left_codes[paired], right_rows[order], bounds))
+        return index
+
+    def iter_candidate_pairs(self, left_names: Sequence, right_names: Sequence,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             return_key_types: bool = False,
+                             block_rows: int = DEFAULT_BLOCK_ROWS) -> Iterator[Tuple[np.ndarray, ...]]:
+        """
+        Lazily generate the deduplicated union of candidate pairs over all key types.
+
+        Every candidate of a left row is produced in the same block of
+        block_rows left rows, so deduplicating within the block is exact and
+        only one block of pairs is held at a time.
+
+        Args:
+            left_names: Query names
+            right_names: Reference names
+            chunk_size: Pairs per yielded chunk (the last chunk may be smaller)
+            return_key_types: Also yield, per pair, the index into key_types
+                of the first key type that produced it
+            block_rows: Left rows generated and deduplicated together
+
+        Yields:
+            (left_positions, right_positions[, key_type_indices]) arrays of
+            equal length <= chunk_size, ordered by left then right position
+        """
+        chunk_size = max(1, int(chunk_size))
+        block_rows = max(1, int(block_rows))
+        n_right = max(len(right_names), 1)
+        index = self._block_index(left_names, right_names)
+
+        buffered_codes, buffered_kinds, buffered = [], [], 0
+        for lo in range(0, len(left_names), block_rows):
+            codes, kinds = [], []
+            for kind, (left_rows, left_codes, right_rows, bounds) in enumerate(index):
+                start, stop = np.searchsorted(left_rows, [lo, lo + block_rows])
+                rows, key_codes = left_rows[start:stop], left_codes[start:stop]
+                sizes = bounds[key_codes + 1] - bounds[key_codes]
+                if not sizes.sum():
+                    continue
+                # Concatenated right-block ranges, one per left entry
+                offsets = np.repeat(bounds[key_codes] - np.cumsum(sizes) + sizes, sizes)
+                right_pos = right_rows[offsets + np.arange(sizes.sum())]
+                codes.append(np.repeat(rows, sizes) * n_right + right_pos)
+                kinds.append(np.full(len(right_pos), kind, dtype=np.int8))
+            if not codes:
+                continue
+
+            # Sorted unique pairs of the block, labeled by the first key type that found them
+            unique_codes, first = np.unique(np.concatenate(codes), return_index=True)
+            buffered_codes.append(unique_codes)
+            buffered_kinds.append(np.concatenate(kinds)[first])
+            buffered += len(unique_codes)
+
+            while buffered >= chunk_size:
+                all_codes, all_kinds = np.concatenate(buffered_codes), np.concatenate(buffered_kinds)
+                yield self._split_pairs(all_codes[:chunk_size], all_kinds[:chunk_size], n_right, return_key_types)
+                buffered_codes, buffered_kinds = [all_codes[chunk_size:]], [all_kinds[chunk_size:]]
+                buffered -= chunk_size
+
+        if buffered:
+            yield self._split_pairs(np.concatenate(buffered_codes), np.concatenate(buffered_kinds),
+                                    n_right, return_key_types)
+
+    @staticmethod
+    def _split_pairs(codes: np.ndarray, kinds: np.ndarray, n_right: int, return_key_types: bool):
+        left_pos, right_pos = np.divmod(codes, n_right)
+        return (left_pos, right_pos, kinds) if return_key_types else (left_pos, right_pos)
+
+    def count_candidate_pairs(self, left_names: Sequence, right_names: Sequence,
+                              block_rows: int = DEFAULT_BLOCK_ROWS) -> int:
+        """Number of deduplicated candidate pairs (one generating pass, no pairs kept)."""
+        return sum(len(chunk[0]) for chunk in self.iter_candidate_pairs(
+            left_names, right_names, chunk_size=DEFAULT_CHUNK_SIZE, block_rows=block_rows))
+
+    def candidate_pairs(self, left_names: Sequence, right_names: Sequence,
+                        return_key_types: bool = False):
+        """
+        Generate the deduplicated union of candidate pairs over all key types.
+
+        Args:
+            left_names: Query names
+            right_names: Reference names
+            return_key_types: Also return, per pair, the index into key_types
+                of the first key type that produced it
+
+        Returns:
+            (left_positions, right_positions) int64 arrays sorted by left then
+            right position, plus the key type index array if requested
+        """
+        chunks = list(self.iter_candidate_pairs(left_names, right_names, return_key_types=return_key_types))
+        if not chunks:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8))
+            return empty if return_key_types else empty[:2]
+        return tuple(np.concatenate(arrays) for arrays in zip(*chunks))
+
+    def evaluate(self, left_names: Sequence, right_names: Sequence,
+                 true_pairs: Iterable[Tuple[str, str]]) -> Dict:
+        """
+        Measure blocking quality against labeled matching pairs.
+
+        Args:
+            left_names: Query names
+            right_names: Reference names
+            true_pairs: (left_name, right_name) pairs known to match
+
+        Returns:
+            Dictionary with candidate count, reduction ratio (share of the full
+            cross product pruned), pairs completeness (recall of true pairs),
+            pairs quality (true pairs per candidate) and per-key-type
+            completeness
+        """
+        left_names = list(left_names)
+        right_names = list(right_names)
+        left_index = {name: pos for pos, name in enumerate(left_names)}
+        right_index = {name: pos for pos, name in enumerate(right_names)}
+        n_right = max(len(right_names), 1)
+        true_codes = np.array(sorted({left_index[a] * n_right + right_index[b] for a, b in true_pairs
+                                      if a in left_index and b in right_index}), dtype=np.int64)
+
+        left_pos, right_pos, kinds = self.candidate_pairs(left_names, right_names, return_key_types=True)
+        candidate_codes = left_pos * n_right + right_pos
+        found = np.isin(true_codes, candidate_codes)
+        total = len(left_names) * len(right_names)
+
+        # Completeness each key type would reach on its own
+        by_key = {}
+        for kind, key_type in enumerate(self.key_types):
+            single = MultiKeyBlocker([key_type], self.normalizer, self.generic_tokens, self.minhash_bands,
+                                     self.minhash_rows, self.ngram_size, self.max_acronym_length,
+                                     self.max_block_size)
+            single_left, single_right = single.candidate_pairs(left_names, right_names)
+            single_codes = single_left * n_right + single_right
+            by_key[key_type] = {
+                'candidates': int(len(single_codes)),
+                'pairs_completeness': float(np.isin(true_codes, single_codes).mean()) if len(true_codes) else 0.0,
+                'first_key_pairs': int((kinds == kind).sum()),
+            }
+
+        return {
+            'candidates': int(len(candidate_codes)),
+            'total_pairs': total,
+            'reduction_ratio': 1 - len(candidate_codes) / total if total else 0.0,
+            'true_pairs': int(len(true_codes)),
+            'true_pairs_found': int(found.sum()),
+            'pairs_completeness': float(found.mean()) if len(true_codes) else 0.0,
+            'pairs_quality': float(found.sum() / len(candidate_codes)) if len(candidate_codes) else 0.0,
+            'by_key': by_key,
+            'missed': [(left_names[c // n_right], right_names[c % n_right]) for c in true_codes[~found]],
+        }
@@ -0,0 +1,234 @@
+"""
+Persistent LLM Verdict Cache for AI-Enhanced Name Matching
+SQLite-backed store of AI match confidences so repeated pairs across runs
+never hit the API twice
+
+Entries are keyed by (model, prompt version, normalized name pair). The pair
+is stored in sorted order, so (a, b) and (b, a) share one entry. Expired
+entries (TTL) are dropped on read, and the least recently used entries are
+evicted once the cache grows past its size limit.
+
+Verdicts from different prompts are never shared: the single-pair and batch
+adjudication prompts have their own prompt versions, so changing the
+matcher's `ai_batch_size` between 1 and >1 starts from a cold cache.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default cache settings
+DEFAULT_TTL_DAYS = 180
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+# Environment variable that enables the cache when no path is passed explicitly
+CACHE_PATH_ENV = 'TIER2_LLM_CACHE_PATH'
+
+
+class LLMVerdictCache:
+    """
+    Disk-backed, symmetric cache of LLM match verdicts.
+
+    Attributes:
+        path (Path): SQLite database file
+        ttl_seconds (Optional[float]): Entry lifetime (None = never expires)
+        max_entries (int): Maximum entries kept before LRU eviction
+        stats (Dict[str, int]): Hit/miss/write/eviction counters
+    """
+
+    def __init__(self,
+                 path: str,
+                 ttl_days: Optional[float] = DEFAULT_TTL_DAYS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 eviction_check_interval: int = 1000):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file path
+            ttl_days: Days before an entry expires (None disables expiry;
+                0 expires every entry at once, so nothing is reused)
+            max_entries: Maximum number of cached verdicts
+            eviction_check_interval: Writes between size-limit checks
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400 if ttl_days is not None else None
+        self.max_entries = max_entries
+        self.eviction_check_interval = max(1, eviction_check_interval)
+
+        # One connection shared across matcher worker threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS verdicts (
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                name_lo TEXT NOT NULL,
+                name_hi TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                reasoning TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (model, prompt_version, name_lo, name_hi)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_verdicts_accessed ON verdicts (accessed_at)')
+
+        self._writes_since_check = 0
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'expired': 0, 'evicted': 0}
+
+        logger.info(f"LLM verdict cache opened at {self.path} ({len(self):,} entries)")
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional['LLMVerdictCache']:
+        """Open the cache at $TIER2_LLM_CACHE_PATH, or return None if unset."""
+        path = os.getenv(CACHE_PATH_ENV)
+        return cls(path, **kwargs) if path else None
+
+    @staticmethod
+    def make_key(model: str, name_a: str, name_b: str, prompt_version: str) -> Tuple[str, str, str, str]:
+        """
+        Build the symmetric cache key for a name pair.
+
+        Args:
+            model: LLM model name
+            name_a: First normalized name
+            name_b: Second normalized name
+            prompt_version: Version tag of the prompt template
+
+        Returns:
+            (model, prompt_version, lower_name, higher_name) tuple
+        """
+        name_lo, name_hi = sorted((name_a or '', name_b or ''))
+        return model, prompt_version, name_lo, name_hi
+
+    def get(self, model: str, name_a: str, name_b: str, prompt_version: str) -> Optional[Tuple[float, str]]:
+        """
+        Look up a cached verdict.
+
+        Args:
+            model: LLM model name
+            name_a: First normalized name
+            name_b: Second normalized name
+            prompt_version: Version tag of the prompt template
+
+        Returns:
+            (confidence, reasoning) tuple, or None on a miss
+        """
+        key = self.make_key(model, name_a, name_b, prompt_version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT confidence, reasoning, created_at FROM verdicts '
+                'WHERE model = ? AND prompt_version = ? AND name_lo = ? AND name_hi = ?',
+                key
+            ).fetchone()
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            confidence, reasoning, created_at = row
+            if self.ttl_seconds is not None and now - created_at >= self.ttl_seconds:
+                self._conn.execute(
+                    'DELETE FROM verdicts WHERE model = ? AND prompt_version = ? AND name_lo = ? AND name_hi = ?',
+                    key
+                )
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE verdicts SET accessed_at = ? '
+                'WHERE model = ? AND prompt_version = ? AND name_lo = ? AND name_hi = ?',
+                (now, *key)
+            )
+            self.stats['hits'] += 1
+            return confidence, reasoning
+
+    def put(self, model: str, name_a: str, name_b: str, prompt_version: str,
+            confidence: float, reasoning: str = '') -> None:
+        """
+        Store a verdict (overwrites any existing entry for the pair).
+
+        Args:
+            model: LLM model name
+            name_a: First normalized name
+            name_b: Second normalized name
+            prompt_version: Version tag of the prompt template
+            confidence: AI confidence (0-100)
+            reasoning: Optional reasoning text
+        """
+        key = self.make_key(model, name_a, name_b, prompt_version)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO verdicts '
+                '(model, prompt_version, name_lo, name_hi, confidence, reasoning, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (*key, float(confidence), reasoning, now, now)
+            )
+            self.stats['writes'] += 1
+            self._writes_since_check += 1
+            if self._writes_since_check >= self.eviction_check_interval:
+                self._writes_since_check = 0
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones over the size limit (lock held)."""
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute('DELETE FROM verdicts WHERE created_at <= ?',
+                                        (time.time() - self.ttl_seconds,))
+            self.stats['expired'] += max(cursor.rowcount, 0)
+
+        count = self._conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                'DELETE FROM verdicts WHERE (model, prompt_version, name_lo, name_hi) IN ('
+                'SELECT model, prompt_version, name_lo, name_hi FROM verdicts ORDER BY accessed_at LIMIT ?)',
+                (overflow,)
+            )
+            self.stats['evicted'] += overflow
+            logger.info(f"LLM verdict cache evicted {overflow:,} least recently used entries")
+
+    def purge(self) -> None:
+        """Run TTL expiry and size-based eviction now."""
+        with self._lock:
+            self._evict()
+
+    def clear(self) -> None:
+        """Delete every cached verdict."""
+        with self._lock:
+            self._conn.execute('DELETE FROM verdicts')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+
+    def get_statistics(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and hit rate
+        """
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': (self.stats['hits'] / max(lookups, 1)) * 100,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,299 @@
+"""
+Shared Name Normalization Pipeline
+Precompiled, memoized organization-name normalization used by all matchers
+
+Each normalization profile compiles its rules once:
+1. One combined alternation regex for abbreviation expansion (single pass)
+2. One anchored regex for legal-suffix stripping (single pass; optionally
+   stripping a run of stacked suffixes such as "Co Ltd")
+3. One punctuation regex and whitespace collapse
+
+Normalized names are memoized in a bounded LRU cache keyed by the raw name,
+and `normalize_series` normalizes only the unique values of a pandas Series.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Default LRU cache size per profile (raw name -> normalized name)
+DEFAULT_CACHE_SIZE = 200_000
+
+
+class NameNormalizer:
+    """
+    Compiled normalization profile for organization names.
+
+    Attributes:
+        abbreviations (Dict[str, str]): Regex pattern -> replacement, applied in one pass
+        suffixes (List[str]): Legal suffix regex fragments stripped from the end
+        strip_suffixes_first (bool): Strip suffixes before expanding abbreviations
+        stacked_suffixes (bool): Strip every trailing suffix, not only the last one
+    """
+
+    def __init__(self,
+                 abbreviations: Dict[str, str],
+                 suffixes: List[str],
+                 suffix_prefix: str = r'\b',
+                 suffix_trailer: str = r'\.?',
+                 strip_suffixes_first: bool = False,
+                 stacked_suffixes: bool = False,
+                 punctuation_pattern: str = r'[^\w\s]',
+                 punctuation_replacement: str = ' ',
+                 cache_size: Optional[int] = DEFAULT_CACHE_SIZE):
+        """
+        Compile a normalization profile.
+
+        Args:
+            abbreviations: Ordered mapping of regex pattern to replacement text
+            suffixes: Suffix regex fragments (without anchors)
+            suffix_prefix: Regex required before a suffix (word boundary or whitespace)
+            suffix_trailer: Regex allowed after a suffix (e.g. optional period)
+            strip_suffixes_first: Strip suffixes before abbreviation expansion
+            stacked_suffixes: Strip a run of trailing suffixes ("Company LLC",
+                "Co Ltd") in one pass, each suffix at most once and in list order
+            punctuation_pattern: Regex of characters to replace after expansion
+            punctuation_replacement: Replacement text for punctuation
+            cache_size: LRU cache size (None for unbounded)
+        """
+        self.abbreviations = dict(abbreviations)
+        self.suffixes = list(suffixes)
+        self.strip_suffixes_first = strip_suffixes_first
+        self.stacked_suffixes = stacked_suffixes
+        self.punctuation_replacement = punctuation_replacement
+
+        # One capturing group per abbreviation; lastindex identifies the rule
+        self._abbreviation_regex = re.compile(
+            '|'.join(f'({pattern})' for pattern in self.abbreviations)
+        ) if self.abbreviations else None
+        self._replacements = [None] + list(self.abbreviations.values())
+
+        if stacked_suffixes:
+            # One optional group per suffix, last listed first: the run of trailing
+            # suffixes a strip-each-suffix-in-list-order loop would remove
+            suffix_pattern = ''.join(
+                f'(?:{suffix_prefix}(?:{suffix}){suffix_trailer})?' for suffix in reversed(self.suffixes)
+            )
+            suffix_pattern = rf'(?:{suffix_pattern})$'
+        else:
+            suffix_alternation = '|'.join(self.suffixes)
+            suffix_pattern = f'{suffix_prefix}(?:{suffix_alternation}){suffix_trailer}$'
+        self._suffix_regex = re.compile(suffix_pattern, flags=re.IGNORECASE) if self.suffixes else None
+
+        self._punctuation_regex = re.compile(punctuation_pattern)
+
+        self._cached_normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _expand(self, name: str) -> str:
+        if self._abbreviation_regex is None:
+            return name
+
+        # Rules applied one after another would not see a word boundary after an
+        # earlier rule's expansion swallowed the period ("hosp.grp" -> "hospitalgrp"),
+        # so a match directly after such an expansion is only expanded by an
+        # earlier (or the same) rule
+        glued = {'end': -1, 'rule': 0}
+
+        def replace(match):
+            rule = match.lastindex
+            if match.start() == glued['end'] and rule > glued['rule']:
+                return match.group(0)
+            if match.group(0).endswith('.'):
+                glued['end'], glued['rule'] = match.end(), rule
+            return self._replacements[rule]
+
+        return self._abbreviation_regex.sub(replace, name)
+
+    def _strip_suffixes(self, name: str) -> str:
+        if self._suffix_regex is None:
+            return name
+        return self._suffix_regex.sub('', name)
+
+    def _normalize(self, name) -> str:
+        if not name:
+            return ""
+
+        name = str(name).lower().strip()
+
+        if self.strip_suffixes_first:
+            name = self._expand(self._strip_suffixes(name))
+        else:
+            name = self._strip_suffixes(self._expand(name))
+
+        name = self._punctuation_regex.sub(self.punctuation_replacement, name)
+
+        # Normalize whitespace
+        return ' '.join(name.split())
+
+    def normalize(self, name) -> str:
+        """
+        Normalize a single organization name (memoized).
+
+        Args:
+            name: Raw organization name
+
+        Returns:
+            Cleaned and standardized name
+        """
+        try:
+            return self._cached_normalize(name)
+        except TypeError:
+            # Unhashable input, normalize without caching
+            return self._normalize(name)
+
+    __call__ = normalize
+
+    def normalize_series(self, names: pd.Series) -> pd.Series:
+        """
+        Normalize a Series of names, computing each unique value once.
+
+        Args:
+            names: Series of raw names
+
+        Returns:
+            Series of normalized names aligned with the input index
+        """
+        uniques = pd.unique(names)
+        mapping = {name: self.normalize(name) for name in uniques if not pd.isna(name)}
+        return names.map(mapping).fillna('').astype(object)
+
+    def cache_info(self):
+        """Return LRU cache statistics (hits, misses, maxsize, currsize)."""
+        return self._cached_normalize.cache_info()
+
+    def cache_clear(self):
+        """Clear the LRU cache."""
+        self._cached_normalize.cache_clear()
+
+
+# Healthcare abbreviations used by the production Tier 2 matcher
+TIER2_ABBREVIATIONS = {
+    r'\bhosp\.?\b': 'hospital',
+    r'\bhosps\.?\b': 'hospitals',
+    r'\bmed\.?\b': 'medical',
+    r'\bctr\.?\b': 'center',
+    r'\bctrs\.?\b': 'centers',
+    r'\bhc\b': 'healthcare',
+    r'\bhca\b': 'healthcare',
+    r'\bhlth\b': 'health',
+    r'\bsvcs?\b': 'services',
+    r'\bmgmt\b': 'management',
+    r'\bassoc\.?\b': 'associates',
+    r'\bgrp\.?\b': 'group',
+    r'\buniv\.?\b': 'university',
+    r'\bsys\.?\b': 'system',
+    r'\bphys\.?\b': 'physicians',
+    r'\bclin\.?\b': 'clinic',
+    r'\brehab\.?\b': 'rehabilitation',
+    r'\bspec\.?\b': 'specialty',
+    r'\bemerg\.?\b': 'emergency',
+    r'\bsurg\.?\b': 'surgical',
+    r'\bortho\.?\b': 'orthopedic',
+    r'\bcardio\.?\b': 'cardiovascular',
+}
+
+# Legal suffixes stripped by the production Tier 2 matcher (in the order the
+# original loop stripped them; only abbreviations take a trailing period)
+TIER2_SUFFIXES = [
+    r'inc\.?', 'incorporated', r'corp\.?', 'corporation',
+    r'llc\.?', r'llp\.?', r'lp\.?', r'ltd\.?', 'limited',
+    r'co\.?', 'company', r'plc\.?',
+]
+
+# Extended healthcare rules used by Tier 1 fuzzy matching (project 005)
+HEALTHCARE_ABBREVIATIONS = {
+    **TIER2_ABBREVIATIONS,
+    r'\bpeds?\b': 'pediatric',
+    r'\bob\/gyn\b': 'obstetrics gynecology',
+    r'\bobgyn\b': 'obstetrics gynecology',
+    r'\ber\b': 'emergency room',
+    r'\bicu\b': 'intensive care unit',
+    r'\bdba\b': '',  # Remove "doing business as"
+    r'\bfka\b': '',  # Remove "formerly known as"
+    r'\bcorp\.?\b': 'corporation',
+    r'\binc\.?\b': 'incorporated',
+    r'\bllc\b': 'limited liability company',
+    r'\bllp\b': 'limited liability partnership',
+    r'\bltd\.?\b': 'limited',
+    r'\bco\.?\b': 'company',
+    r'\bst\.?\b': 'saint',
+    r'\bmt\.?\b': 'mount',
+}
+
+HEALTHCARE_SUFFIXES = [
+    'incorporated', 'corporation', 'limited liability company',
+    'limited liability partnership', 'limited', 'company',
+    'llc', 'llp', 'inc', 'corp', 'ltd', 'co',
+]
+
+# PR1362-style company normalization used by Tier-prod (project 005)
+TIER_PROD_ABBREVIATIONS = {
+    r'\bhosp\.?\b': 'hospital',
+    r'\bmed\.?\b': 'medical',
+    r'\bctr\.?\b': 'center',
+    r'\bhc\b': 'healthcare',
+    r'\bhlth\b': 'health',
+    r'\bsvcs?\b': 'services',
+    r'\bmgmt\b': 'management',
+    r'\bgrp\.?\b': 'group',
+    r'\buniv\.?\b': 'university',
+    r'\bsys\.?\b': 'system',
+}
+
+TIER_PROD_SUFFIXES = TIER2_SUFFIXES + ['gmbh', 'sa', 'ag']
+
+# Shared compiled profiles
+#
+# The tier2 and tier_prod profiles strip a run of trailing suffixes in list
+# order, as the original one-re.sub-per-suffix loops did ("Acme Co.Corp")
+TIER2_NORMALIZER = NameNormalizer(TIER2_ABBREVIATIONS, TIER2_SUFFIXES, suffix_trailer='',
+                                  stacked_suffixes=True)
+
+HEALTHCARE_NORMALIZER = NameNormalizer(
+    HEALTHCARE_ABBREVIATIONS,
+    HEALTHCARE_SUFFIXES,
+    suffix_prefix=r'\s+',
+    suffix_trailer='',
+    stacked_suffixes=True,
+    punctuation_pattern=r'[^\w\s-]',
+    punctuation_replacement='',
+)
+
+TIER_PROD_NORMALIZER = NameNormalizer(TIER_PROD_ABBREVIATIONS, TIER_PROD_SUFFIXES, suffix_trailer='',
+                                      strip_suffixes_first=True, stacked_suffixes=True)
+
+NORMALIZERS = {
+    'tier2': TIER2_NORMALIZER,
+    'healthcare': HEALTHCARE_NORMALIZER,
+    'tier_prod': TIER_PROD_NORMALIZER,
+}
+
+
+def normalize_name(name, profile: str = 'tier2') -> str:
+    """
+    Normalize an organization name with a named profile.
+
+    Args:
+        name: Raw organization name
+        profile: One of 'tier2', 'healthcare', 'tier_prod'
+
+    Returns:
+        Cleaned and standardized name
+    """
+    return NORMALIZERS[profile].normalize(name)
+
+
+def normalize_series(names: pd.Series, profile: str = 'tier2') -> pd.Series:
+    """
+    Normalize a Series of names with a named profile, once per unique value.
+
+    Args:
+        names: Series of raw names
+        profile: One of 'tier2', 'healthcare', 'tier_prod'
+
+    Returns:
+        Series of normalized names aligned with the input index
+    """
+    return NORMALIZERS[profile].normalize_series(names)
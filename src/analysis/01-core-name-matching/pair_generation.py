@@ -0,0 +1,147 @@
+"""
+Vectorized Blocked Pair Generation
+Lazily yields the candidate pairs of a blocked (keyed) cross join in
+fixed-size chunks instead of materializing every pair up front
+
+Pairs are produced block by block, in the same order as the classic nested
+loop (blocks in order of first appearance on the left, then left rows, then
+right rows), using NumPy repeat/tile over the row positions of each block.
+Peak memory is bounded by the chunk size, and callers can start scoring the
+first chunk while later blocks are still being generated.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Default number of pairs per chunk
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _block_positions(codes: np.ndarray, n_blocks: int) -> List[np.ndarray]:
+    """Row positions of every block code, each in original row order."""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(n_blocks + 1))
+    return [order[bounds[b]:bounds[b + 1]] for b in range(n_blocks)]
+
+
+def _factorize_keys(left_keys: Sequence, right_keys: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Shared integer codes for both key columns (-1 = missing key)."""
+    left_keys = pd.Series(np.asarray(left_keys, dtype=object))
+    right_keys = pd.Series(np.asarray(right_keys, dtype=object))
+    codes, uniques = pd.factorize(pd.concat([left_keys, right_keys], ignore_index=True))
+    return codes[:len(left_keys)], codes[len(left_keys):], np.asarray(uniques, dtype=object)
+
+
+def count_blocked_pairs(left_keys: Sequence, right_keys: Sequence) -> int:
+    """
+    Count the pairs a blocked join would produce, without generating them.
+
+    Args:
+        left_keys: Blocking key per left row
+        right_keys: Blocking key per right row
+
+    Returns:
+        Sum over shared keys of |left block| x |right block|
+    """
+    left_codes, right_codes, uniques = _factorize_keys(left_keys, right_keys)
+    n_blocks = len(uniques)
+    left_sizes = np.bincount(left_codes[left_codes >= 0], minlength=n_blocks)
+    right_sizes = np.bincount(right_codes[right_codes >= 0], minlength=n_blocks)
+    return int((left_sizes.astype(np.int64) * right_sizes).sum())
+
+
+def blocked_pair_indices(left_keys: Sequence,
+                         right_keys: Sequence,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (left_positions, right_positions) arrays for every pair sharing a key.
+
+    Args:
+        left_keys: Blocking key per left row (None/NaN rows are never paired)
+        right_keys: Blocking key per right row
+        chunk_size: Pairs per yielded chunk (the last chunk may be smaller)
+
+    Yields:
+        Tuple of int64 position arrays of equal length <= chunk_size
+    """
+    chunk_size = max(1, int(chunk_size))
+    left_codes, right_codes, uniques = _factorize_keys(left_keys, right_keys)
+    n_blocks = len(uniques)
+    left_blocks = _block_positions(left_codes, n_blocks)
+    right_blocks = _block_positions(right_codes, n_blocks)
+
+    # Blocks in order of first appearance on the left (pd.unique order)
+    block_order = pd.unique(left_codes[left_codes >= 0])
+
+    buffer_left, buffer_right, buffered = [], [], 0
+    for block in block_order:
+        left_pos, right_pos = left_blocks[block], right_blocks[block]
+        if not len(right_pos):
+            continue
+
+        # Emit the block's cross product in slices of at most chunk_size pairs
+        right_step = min(len(right_pos), chunk_size)
+        left_step = max(1, chunk_size // right_step)
+        for l_start in range(0, len(left_pos), left_step):
+            left_slice = left_pos[l_start:l_start + left_step]
+            for r_start in range(0, len(right_pos), right_step):
+                right_slice = right_pos[r_start:r_start + right_step]
+                buffer_left.append(np.repeat(left_slice, len(right_slice)))
+                buffer_right.append(np.tile(right_slice, len(left_slice)))
+                buffered += len(left_slice) * len(right_slice)
+
+                while buffered >= chunk_size:
+                    lefts = np.concatenate(buffer_left)
+                    rights = np.concatenate(buffer_right)
+                    yield lefts[:chunk_size], rights[:chunk_size]
+                    buffer_left, buffer_right = [lefts[chunk_size:]], [rights[chunk_size:]]
+                    buffered -= chunk_size
+
+    if buffered:
+        yield np.concatenate(buffer_left), np.concatenate(buffer_right)
+
+
+def iter_blocked_pairs(left_df: pd.DataFrame,
+                       right_df: pd.DataFrame,
+                       left_key: str = 'blocking_key',
+                       right_key: Optional[str] = None,
+                       left_columns: Optional[List[str]] = None,
+                       right_columns: Optional[List[str]] = None,
+                       suffixes: Tuple[str, str] = ('_left', '_right'),
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Yield the blocked join of two DataFrames as chunked DataFrames.
+
+    Column values are gathered per chunk with NumPy fancy indexing, so only
+    chunk_size rows exist at a time.
+
+    Args:
+        left_df: Left side (e.g. OP manufacturers)
+        right_df: Right side (e.g. RX manufacturers)
+        left_key: Blocking key column in left_df
+        right_key: Blocking key column in right_df (defaults to left_key)
+        left_columns: Left columns to carry (default: all but the key)
+        right_columns: Right columns to carry (default: all but the key)
+        suffixes: Appended to column names present on both sides
+        chunk_size: Pairs per chunk
+
+    Yields:
+        DataFrame with the left columns, right columns and the blocking key
+    """
+    right_key = right_key or left_key
+    left_columns = left_columns or [c for c in left_df.columns if c != left_key]
+    right_columns = right_columns or [c for c in right_df.columns if c != right_key]
+    shared = set(left_columns) & set(right_columns)
+
+    left_arrays = {(c + suffixes[0] if c in shared else c): left_df[c].to_numpy() for c in left_columns}
+    right_arrays = {(c + suffixes[1] if c in shared else c): right_df[c].to_numpy() for c in right_columns}
+    key_array = left_df[left_key].to_numpy()
+
+    for left_pos, right_pos in blocked_pair_indices(left_df[left_key].to_numpy(), right_df[right_key].to_numpy(),
+                                                    chunk_size):
+        chunk = {name: values[left_pos] for name, values in left_arrays.items()}
+        chunk.update({name: values[right_pos] for name, values in right_arrays.items()})
+        chunk[left_key] = key_array[left_pos]
+        yield pd.DataFrame(chunk)
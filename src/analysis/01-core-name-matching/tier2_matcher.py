@@ -7,18 +7,28 @@ Based on the successful DA-156 Name Matching POC
 """
 
 import os
+import json
 import time
 import logging
 from typing import Dict, Tuple, List, Optional, Union
 import pandas as pd
 import numpy as np
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import JaroWinkler
 import jellyfish
-import re
 from openai import OpenAI
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    from .candidate_index import CandidateIndex
+    from .name_normalization import TIER2_NORMALIZER
+    from .llm_cache import LLMVerdictCache
+except ImportError:
+    from candidate_index import CandidateIndex
+    from name_normalization import TIER2_NORMALIZER
+    from llm_cache import LLMVerdictCache
+
 # Load environment variables
 load_dotenv()
 
@@ -41,14 +51,57 @@ class Tier2NameMatcher:
         decision_threshold (float): Final threshold for accepting matches (default: 50.0)
         model (str): OpenAI model to use (default: gpt-4o-mini)
         max_workers (int): Maximum concurrent workers for API calls
+        cache (Optional[LLMVerdictCache]): Persistent AI verdict cache (None = disabled)
     """
     
+    # Version of the AI prompt; bump whenever the prompt text changes so cached
+    # verdicts from the old prompt are not reused. Single-pair and batch verdicts
+    # are cached separately, so a cache warmed with one ai_batch_size setting
+    # does not answer pairs for the other
+    PROMPT_VERSION = 'tier2-v1'
+    BATCH_PROMPT_VERSION = 'tier2-batch-v1'
+    AI_SYSTEM_PROMPT = ("You are an expert at healthcare organization name matching. "
+                        "Respond with only a confidence score between 0 and 100.")
+    
+    # USD per 1M (input, output) tokens, used for cost reporting
+    MODEL_PRICING = {
+        'gpt-4o-mini': (0.15, 0.60),
+        'gpt-4o': (2.50, 10.00),
+        'gpt-4.1-mini': (0.40, 1.60),
+        'gpt-4.1-nano': (0.10, 0.40),
+        'gpt-5-mini': (0.25, 2.00),
+        'gpt-5-nano': (0.05, 0.40),
+    }
+    
+    # Weights for the fuzzy score components (shared by per-pair and bulk scoring)
+    FUZZY_WEIGHTS = {
+        'exact': 0.25,
+        'ratio': 0.15,
+        'partial': 0.10,
+        'token_sort': 0.15,
+        'token_set': 0.10,
+        'jaro_winkler': 0.15,
+        'first_word': 0.10
+    }
+    
+    # rapidfuzz scorers for the string similarity components of the bulk path
+    _MATRIX_SCORERS = {
+        'ratio': fuzz.ratio,
+        'partial': fuzz.partial_ratio,
+        'token_sort': fuzz.token_sort_ratio,
+        'token_set': fuzz.token_set_ratio,
+    }
+    
     def __init__(self, 
                  fuzzy_threshold: float = 85.0,
                  decision_threshold: float = 50.0,
                  model: str = 'gpt-4o-mini',
                  api_key: Optional[str] = None,
-                 max_workers: int = 5):
+                 max_workers: int = 5,
+                 ai_batch_size: int = 1,
+                 cache_path: Optional[str] = None,
+                 cache_ttl_days: Optional[float] = 180,
+                 cache_max_entries: int = 2_000_000):
         """
         Initialize the Tier 2 matcher.
         
@@ -58,11 +111,19 @@ class Tier2NameMatcher:
             model: OpenAI model name
             api_key: OpenAI API key (if not in environment)
             max_workers: Maximum concurrent API workers
+            ai_batch_size: Low-confidence pairs adjudicated per API request in
+                `match_batch` (1 = one request per pair)
+            cache_path: SQLite file for the persistent AI verdict cache
+                (falls back to $TIER2_LLM_CACHE_PATH; no caching if neither is set)
+            cache_ttl_days: Days before a cached verdict expires (None = never,
+                0 = cached verdicts are never reused)
+            cache_max_entries: Maximum cached verdicts before LRU eviction
         """
         self.fuzzy_threshold = fuzzy_threshold
         self.decision_threshold = decision_threshold
         self.model = model
         self.max_workers = max_workers
+        self.ai_batch_size = max(1, ai_batch_size)
         
         # Initialize OpenAI client
         if api_key:
@@ -70,75 +131,42 @@ class Tier2NameMatcher:
         else:
             self.client = OpenAI()  # Uses OPENAI_API_KEY from environment
         
+        # Persistent AI verdict cache (consulted before every API call)
+        cache_kwargs = {'ttl_days': cache_ttl_days, 'max_entries': cache_max_entries}
+        if cache_path:
+            self.cache = LLMVerdictCache(cache_path, **cache_kwargs)
+        else:
+            self.cache = LLMVerdictCache.from_env(**cache_kwargs)
+        
         # Track statistics
         self.stats = {
             'fuzzy_only': 0,
             'ai_enhanced': 0,
             'total_processed': 0,
-            'api_errors': 0
+            'api_errors': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'api_requests': 0,
+            'batch_requests': 0,
+            'batch_fallbacks': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0
         }
     
     def preprocess_name(self, name: str) -> str:
         """
         Preprocess healthcare organization names for better matching.
         
+        Uses the shared precompiled Tier 2 normalization profile, which is
+        memoized by raw name across all matcher instances.
+        
         Args:
             name: Organization name to preprocess
             
         Returns:
             Cleaned and standardized name
         """
-        if not name:
-            return ""
-        
-        name = str(name).lower().strip()
-        
-        # Healthcare-specific abbreviation expansions
-        replacements = {
-            r'\bhosp\.?\b': 'hospital',
-            r'\bhosps\.?\b': 'hospitals',
-            r'\bmed\.?\b': 'medical',
-            r'\bctr\.?\b': 'center',
-            r'\bctrs\.?\b': 'centers',
-            r'\bhc\b': 'healthcare',
-            r'\bhca\b': 'healthcare',
-            r'\bhlth\b': 'health',
-            r'\bsvcs?\b': 'services',
-            r'\bmgmt\b': 'management',
-            r'\bassoc\.?\b': 'associates',
-            r'\bgrp\.?\b': 'group',
-            r'\buniv\.?\b': 'university',
-            r'\bsys\.?\b': 'system',
-            r'\bphys\.?\b': 'physicians',
-            r'\bclin\.?\b': 'clinic',
-            r'\brehab\.?\b': 'rehabilitation',
-            r'\bspec\.?\b': 'specialty',
-            r'\bemerg\.?\b': 'emergency',
-            r'\bsurg\.?\b': 'surgical',
-            r'\bortho\.?\b': 'orthopedic',
-            r'\bcardio\.?\b': 'cardiovascular',
-        }
-        
-        for pattern, replacement in replacements.items():
-            name = re.sub(pattern, replacement, name)
-        
-        # Remove common suffixes
-        suffixes = [
-            r'\binc\.?$', r'\bincorporated$', r'\bcorp\.?$', r'\bcorporation$',
-            r'\bllc\.?$', r'\bllp\.?$', r'\blp\.?$', r'\bltd\.?$', r'\blimited$',
-            r'\bco\.?$', r'\bcompany$', r'\bplc\.?$'
-        ]
-        
-        for suffix in suffixes:
-            name = re.sub(suffix, '', name, flags=re.IGNORECASE)
-        
-        # Remove special characters but keep spaces
-        name = re.sub(r'[^\w\s]', ' ', name)
-        
-        # Normalize whitespace
-        name = ' '.join(name.split())
-        
-        return name
+        return TIER2_NORMALIZER.normalize(name)
     
     def fuzzy_match(self, name_a: str, name_b: str) -> Tuple[float, Dict[str, float]]:
         """
@@ -155,6 +183,19 @@ class Tier2NameMatcher:
         clean_a = self.preprocess_name(name_a)
         clean_b = self.preprocess_name(name_b)
         
+        return self.fuzzy_match_preprocessed(clean_a, clean_b)
+    
+    def fuzzy_match_preprocessed(self, clean_a: str, clean_b: str) -> Tuple[float, Dict[str, float]]:
+        """
+        Score two names that have already been through `preprocess_name`.
+        
+        Args:
+            clean_a: First preprocessed name
+            clean_b: Second preprocessed name
+            
+        Returns:
+            Tuple of (final_score, individual_scores_dict)
+        """
         # Calculate various similarity scores
         scores = {
             'exact': 100.0 if clean_a == clean_b else 0.0,
@@ -174,20 +215,100 @@ class Tier2NameMatcher:
             scores['first_word'] = 0.0
         
         # Calculate weighted average
-        weights = {
-            'exact': 0.25,
-            'ratio': 0.15,
-            'partial': 0.10,
-            'token_sort': 0.15,
-            'token_set': 0.10,
-            'jaro_winkler': 0.15,
-            'first_word': 0.10
-        }
+        weights = self.FUZZY_WEIGHTS
         
         final_score = sum(scores[k] * weights[k] for k in scores)
         
         return final_score, scores
     
+    def fuzzy_match_matrix(self,
+                           names_a: List[str],
+                           names_b: List[str],
+                           top_n: int = 1,
+                           preprocessed: bool = False,
+                           return_components: bool = False,
+                           workers: int = -1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score every name in names_a against every name in names_b in bulk.
+        
+        Computes the same weighted components as `fuzzy_match` (the per-pair
+        reference implementation), but as NumPy matrices using
+        `rapidfuzz.process.cdist` across all cores.
+        
+        Args:
+            names_a: Query names (rows)
+            names_b: Reference names (columns)
+            top_n: Number of best columns to return per row
+            preprocessed: Whether names are already passed through `preprocess_name`
+            return_components: Also return the individual component matrices
+            workers: cdist worker threads (-1 uses all cores)
+            
+        Returns:
+            Tuple of (score_matrix, top_indices, top_scores); score_matrix is
+            |A| x |B|, top_indices/top_scores are |A| x min(top_n, |B|) sorted by
+            descending score. With return_components a fourth element holds the
+            dict of component matrices.
+        """
+        if preprocessed:
+            clean_a = ['' if name is None else str(name) for name in names_a]
+            clean_b = ['' if name is None else str(name) for name in names_b]
+        else:
+            clean_a = [self.preprocess_name(name) for name in names_a]
+            clean_b = [self.preprocess_name(name) for name in names_b]
+        
+        shape = (len(clean_a), len(clean_b))
+        components = {}
+        
+        # Exact and first-word components compare integer codes instead of strings
+        codes, _ = pd.factorize(pd.Series(clean_a + clean_b, dtype=object))
+        codes_a, codes_b = codes[:len(clean_a)], codes[len(clean_a):]
+        components['exact'] = np.where(codes_a[:, None] == codes_b[None, :], 100.0, 0.0)
+        
+        for key, scorer in self._MATRIX_SCORERS.items():
+            components[key] = process.cdist(clean_a, clean_b, scorer=scorer,
+                                            dtype=np.float64, workers=workers) if all(shape) else np.zeros(shape)
+        
+        # Jaro-Winkler is defined as 0 when either name is empty
+        jaro_winkler = process.cdist(clean_a, clean_b, scorer=JaroWinkler.normalized_similarity,
+                                     dtype=np.float64, workers=workers) * 100 if all(shape) else np.zeros(shape)
+        empty_a = np.array([not name for name in clean_a], dtype=bool)
+        empty_b = np.array([not name for name in clean_b], dtype=bool)
+        jaro_winkler[empty_a, :] = 0.0
+        jaro_winkler[:, empty_b] = 0.0
+        components['jaro_winkler'] = jaro_winkler
+        
+        first_a = [name.split()[0] if name.split() else None for name in clean_a]
+        first_b = [name.split()[0] if name.split() else None for name in clean_b]
+        word_codes, _ = pd.factorize(pd.Series(first_a + first_b, dtype=object))
+        word_a, word_b = word_codes[:len(clean_a)], word_codes[len(clean_a):]
+        # factorize marks missing first words as -1, which must never match
+        components['first_word'] = np.where((word_a[:, None] == word_b[None, :]) & (word_a[:, None] >= 0),
+                                            100.0, 0.0)
+        
+        # Weighted sum in the same component order as fuzzy_match
+        scores = np.zeros(shape)
+        for key in ('exact', 'ratio', 'partial', 'token_sort', 'token_set', 'jaro_winkler', 'first_word'):
+            scores += components[key] * self.FUZZY_WEIGHTS[key]
+        
+        # Top N per row
+        n = min(top_n, shape[1])
+        if n > 0:
+            if n < shape[1]:
+                top_indices = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+            else:
+                top_indices = np.tile(np.arange(shape[1]), (shape[0], 1))
+            top_scores = np.take_along_axis(scores, top_indices, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top_indices = np.take_along_axis(top_indices, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+        else:
+            top_indices = np.empty((shape[0], 0), dtype=np.int64)
+            top_scores = np.empty((shape[0], 0))
+        
+        if return_components:
+            return scores, top_indices, top_scores, components
+        return scores, top_indices, top_scores
+    
     def enhance_with_ai(self, name_a: str, name_b: str, fuzzy_score: float) -> Tuple[float, str]:
         """
         Use OpenAI to enhance low-confidence fuzzy matches.
@@ -200,26 +321,11 @@ class Tier2NameMatcher:
         Returns:
             Tuple of (ai_confidence, reasoning)
         """
-        prompt = f"""You are an expert at matching healthcare organization names.
-
-Compare these two organization names and determine if they refer to the same entity:
-
-Name A: "{name_a}"
-Name B: "{name_b}"
-
-Initial fuzzy matching score: {fuzzy_score:.1f}%
-
-Consider:
-1. Common abbreviations in healthcare (hosp→hospital, med→medical, etc.)
-2. Subsidiaries and parent organizations
-3. Name variations and rebranding
-4. Typos and misspellings
-5. Word order differences
-
-Provide your confidence (0-100) that these are the same organization.
-Be conservative - only give high confidence if you're certain they match.
-
-Respond with just a number between 0 and 100."""
+        cached = self._cache_get(name_a, name_b, self.PROMPT_VERSION)
+        if cached is not None:
+            return cached
+        
+        prompt = self._ai_prompt(name_a, name_b, fuzzy_score)
 
         try:
             # Handle different model types
@@ -234,22 +340,25 @@ Respond with just a number between 0 and 100."""
                 
                 # Parse gpt-5 response
                 result_text = response.output_text.strip()
+                self._record_usage(response)
             else:
                 # Standard chat completion for gpt-4/gpt-3.5
                 response = self.client.chat.completions.create(
                     model=self.model,
                     messages=[
-                        {"role": "system", "content": "You are an expert at healthcare organization name matching. Respond with only a confidence score between 0 and 100."},
+                        {"role": "system", "content": self.AI_SYSTEM_PROMPT},
                         {"role": "user", "content": prompt}
                     ],
                     temperature=0.0,
                     max_tokens=10
                 )
                 result_text = response.choices[0].message.content.strip()
+                self._record_usage(response)
             
             # Parse the confidence score
-            confidence = float(result_text.replace('%', ''))
-            confidence = max(0, min(100, confidence))  # Clamp to 0-100
+            confidence = self._parse_confidence(result_text)
+            
+            self._cache_put(name_a, name_b, self.PROMPT_VERSION, confidence)
             
             return confidence, "AI enhanced"
             
@@ -259,6 +368,203 @@ Respond with just a number between 0 and 100."""
             # Fall back to fuzzy score on error
             return fuzzy_score, f"Error: {str(e)}"
     
+    def _ai_prompt(self, name_a: str, name_b: str, fuzzy_score: float) -> str:
+        """Build the single-pair adjudication prompt (versioned by PROMPT_VERSION)."""
+        return f"""You are an expert at matching healthcare organization names.
+
+Compare these two organization names and determine if they refer to the same entity:
+
+Name A: "{name_a}"
+Name B: "{name_b}"
+
+Initial fuzzy matching score: {fuzzy_score:.1f}%
+
+Consider:
+1. Common abbreviations in healthcare (hosp→hospital, med→medical, etc.)
+2. Subsidiaries and parent organizations
+3. Name variations and rebranding
+4. Typos and misspellings
+5. Word order differences
+
+Provide your confidence (0-100) that these are the same organization.
+Be conservative - only give high confidence if you're certain they match.
+
+Respond with just a number between 0 and 100."""
+    
+    @staticmethod
+    def _parse_confidence(result_text: str) -> float:
+        """Parse a single-pair response into a confidence clamped to 0-100."""
+        confidence = float(result_text.strip().replace('%', ''))
+        return max(0, min(100, confidence))
+    
+    def _cache_get(self, name_a: str, name_b: str, prompt_version: str,
+                   count_miss: bool = True) -> Optional[Tuple[float, str]]:
+        """Look up a cached AI verdict; returns (confidence, reasoning) or None."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self.model, self.preprocess_name(name_a), self.preprocess_name(name_b),
+                                prompt_version)
+        if cached is None:
+            if count_miss:
+                self.stats['cache_misses'] += 1
+            return None
+        self.stats['cache_hits'] += 1
+        return cached[0], "AI enhanced (cached)"
+    
+    def _cache_put(self, name_a: str, name_b: str, prompt_version: str, confidence: float):
+        """Store a successful AI verdict in the cache (no-op without a cache)."""
+        if self.cache is not None:
+            self.cache.put(self.model, self.preprocess_name(name_a), self.preprocess_name(name_b),
+                           prompt_version, confidence, "AI enhanced")
+    
+    def _record_usage(self, response):
+        """Accumulate request and token counts from an OpenAI response."""
+        self.stats['api_requests'] += 1
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        # Chat completions report prompt/completion tokens, the responses API input/output tokens
+        self.stats['prompt_tokens'] += getattr(usage, 'prompt_tokens', None) or getattr(usage, 'input_tokens', 0) or 0
+        self.stats['completion_tokens'] += getattr(usage, 'completion_tokens', None) or getattr(usage, 'output_tokens', 0) or 0
+    
+    def estimated_cost(self) -> float:
+        """
+        Estimate the API spend so far from recorded token usage.
+        
+        Returns:
+            Cost in USD (0 if the model has no pricing entry)
+        """
+        input_price, output_price = self.MODEL_PRICING.get(self.model, (0.0, 0.0))
+        return (self.stats['prompt_tokens'] * input_price + self.stats['completion_tokens'] * output_price) / 1_000_000
+    
+    def enhance_with_ai_batch(self, items: List[Tuple[str, str, float]]) -> List[Tuple[float, str]]:
+        """
+        Adjudicate several low-confidence pairs with a single OpenAI request.
+        
+        Pairs are numbered in one structured prompt and the model returns a JSON
+        array of scores. Cached pairs are answered without the API, and any item
+        that is missing or unparseable in the response is re-sent on its own via
+        `enhance_with_ai`.
+        
+        Args:
+            items: List of (name_a, name_b, fuzzy_score) tuples
+            
+        Returns:
+            List of (ai_confidence, reasoning) tuples aligned with items
+        """
+        results: List[Optional[Tuple[float, str]]] = [None] * len(items)
+        pending = []
+        for i, (name_a, name_b, fuzzy_score) in enumerate(items):
+            # Misses are counted once, when the pair is answered by the batch request
+            # or by enhance_with_ai (which looks the pair up again)
+            cached = self._cache_get(name_a, name_b, self.BATCH_PROMPT_VERSION, count_miss=False)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+        
+        if len(pending) == 1:
+            i = pending[0]
+            results[i] = self.enhance_with_ai(*items[i])
+            return results
+        
+        if pending:
+            pair_lines = "\n".join(
+                f'{n}. Name A: "{items[i][0]}" | Name B: "{items[i][1]}" | Fuzzy score: {items[i][2]:.1f}%'
+                for n, i in enumerate(pending, 1)
+            )
+            prompt = f"""You are an expert at matching healthcare organization names.
+
+For each numbered pair below, determine if the two organization names refer to the same entity:
+
+{pair_lines}
+
+Consider:
+1. Common abbreviations in healthcare (hosp→hospital, med→medical, etc.)
+2. Subsidiaries and parent organizations
+3. Name variations and rebranding
+4. Typos and misspellings
+5. Word order differences
+
+Provide your confidence (0-100) that each pair is the same organization.
+Be conservative - only give high confidence if you're certain they match.
+
+Respond with a JSON object of the form {{"scores": [{{"id": 1, "confidence": <0-100>}}, ...]}} containing exactly one entry per pair id."""
+            
+            parsed = {}
+            try:
+                if 'gpt-5' in self.model:
+                    response = self.client.responses.create(
+                        model=self.model,
+                        input=[{"role": "user", "content": prompt}],
+                        text={"format": {"type": "json_object"}, "verbosity": "low"},
+                        reasoning={"effort": "high"}
+                    )
+                    result_text = response.output_text
+                else:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": "You are an expert at healthcare organization name matching. Always respond in valid JSON."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        response_format={"type": "json_object"},
+                        temperature=0.0,
+                        max_tokens=20 * len(pending) + 20
+                    )
+                    result_text = response.choices[0].message.content
+                self._record_usage(response)
+                self.stats['batch_requests'] += 1
+                parsed = self._parse_batch_scores(result_text, len(pending))
+            except Exception as e:
+                logger.error(f"AI batch enhancement error: {e}")
+                self.stats['api_errors'] += 1
+            
+            for n, i in enumerate(pending, 1):
+                if n in parsed:
+                    if self.cache is not None:
+                        self.stats['cache_misses'] += 1
+                    results[i] = (parsed[n], "AI enhanced (batch)")
+                    self._cache_put(items[i][0], items[i][1], self.BATCH_PROMPT_VERSION, parsed[n])
+                else:
+                    # Re-send unparseable or missing items individually
+                    self.stats['batch_fallbacks'] += 1
+                    results[i] = self.enhance_with_ai(*items[i])
+        
+        return results
+    
+    @staticmethod
+    def _parse_batch_scores(result_text: str, expected: int) -> Dict[int, float]:
+        """
+        Parse and validate a batch adjudication response.
+        
+        Args:
+            result_text: Raw model output
+            expected: Number of pairs in the request (ids 1..expected)
+            
+        Returns:
+            Dictionary of pair id -> confidence (0-100) for valid entries only
+        """
+        data = json.loads(result_text)
+        entries = data.get('scores', []) if isinstance(data, dict) else data
+        if not isinstance(entries, list):
+            return {}
+        
+        scores = {}
+        for position, entry in enumerate(entries, 1):
+            try:
+                if isinstance(entry, dict):
+                    pair_id = int(entry.get('id', position))
+                    confidence = float(str(entry['confidence']).replace('%', ''))
+                else:
+                    # Bare array of numbers, in pair order
+                    pair_id, confidence = position, float(entry)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 1 <= pair_id <= expected and pair_id not in scores and 0 <= confidence <= 100:
+                scores[pair_id] = confidence
+        return scores
+    
     def match_pair(self, name_a: str, name_b: str, use_ai: bool = True) -> Dict:
         """
         Match a single pair of names using Tier 2 approach.
@@ -271,11 +577,31 @@ Respond with just a number between 0 and 100."""
         Returns:
             Dictionary with match results
         """
-        self.stats['total_processed'] += 1
-        
         # Step 1: Fuzzy matching
         fuzzy_score, fuzzy_details = self.fuzzy_match(name_a, name_b)
         
+        return self._resolve_match(name_a, name_b, fuzzy_score, fuzzy_details, use_ai)
+    
+    def _resolve_match(self, name_a: str, name_b: str, fuzzy_score: float,
+                       fuzzy_details: Dict[str, float], use_ai: bool,
+                       ai_result: Optional[Tuple[float, str]] = None) -> Dict:
+        """
+        Apply the Tier 2 decision logic to an already computed fuzzy score.
+        
+        Args:
+            name_a: First organization name
+            name_b: Second organization name
+            fuzzy_score: Weighted fuzzy score
+            fuzzy_details: Individual fuzzy component scores
+            use_ai: Whether to use AI enhancement for low-confidence cases
+            ai_result: Precomputed (ai_confidence, reasoning), e.g. from batch
+                adjudication; the API is only called when this is None
+            
+        Returns:
+            Dictionary with match results
+        """
+        self.stats['total_processed'] += 1
+        
         # Step 2: Check if fuzzy is sufficient
         if fuzzy_score >= self.fuzzy_threshold:
             self.stats['fuzzy_only'] += 1
@@ -294,7 +620,9 @@ Respond with just a number between 0 and 100."""
         # Step 3: AI enhancement for low-confidence cases
         if use_ai:
             self.stats['ai_enhanced'] += 1
-            ai_score, ai_reasoning = self.enhance_with_ai(name_a, name_b, fuzzy_score)
+            if ai_result is None:
+                ai_result = self.enhance_with_ai(name_a, name_b, fuzzy_score)
+            ai_score, ai_reasoning = ai_result
             
             # Combine scores (40% fuzzy, 60% AI - proven optimal weights)
             final_score = 0.4 * fuzzy_score + 0.6 * ai_score
@@ -328,15 +656,21 @@ Respond with just a number between 0 and 100."""
         """
         Match a batch of name pairs with optional parallel processing.
         
+        When `ai_batch_size` > 1, all pairs are fuzzy-scored first and the
+        low-confidence ones are adjudicated `ai_batch_size` pairs per request.
+        
         Args:
             pairs: List of (name_a, name_b) tuples
             use_ai: Whether to use AI enhancement
             
         Returns:
-            List of match result dictionaries
+            List of match result dictionaries, in the order of `pairs`
         """
         results = []
         
+        if use_ai and self.ai_batch_size > 1:
+            return self._match_batch_grouped(pairs)
+        
         if use_ai and self.max_workers > 1:
             # Parallel processing for AI calls
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
@@ -345,7 +679,7 @@ Respond with just a number between 0 and 100."""
                     future = executor.submit(self.match_pair, name_a, name_b, use_ai)
                     futures.append(future)
                 
-                for future in as_completed(futures):
+                for future in futures:
                     try:
                         result = future.result()
                         results.append(result)
@@ -359,15 +693,66 @@ Respond with just a number between 0 and 100."""
         
         return results
     
+    def _match_batch_grouped(self, pairs: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Match pairs using multi-pair AI adjudication for low-confidence cases.
+        
+        Args:
+            pairs: List of (name_a, name_b) tuples
+            
+        Returns:
+            List of match result dictionaries, in the order of `pairs`
+        """
+        fuzzy = [self.fuzzy_match(name_a, name_b) for name_a, name_b in pairs]
+        low_confidence = [i for i, (score, _) in enumerate(fuzzy) if score < self.fuzzy_threshold]
+        chunks = [low_confidence[i:i + self.ai_batch_size]
+                  for i in range(0, len(low_confidence), self.ai_batch_size)]
+        
+        def adjudicate(chunk: List[int]) -> List[Tuple[float, str]]:
+            return self.enhance_with_ai_batch([(pairs[i][0], pairs[i][1], fuzzy[i][0]) for i in chunk])
+        
+        if self.max_workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                chunk_results = list(executor.map(adjudicate, chunks))
+        else:
+            chunk_results = [adjudicate(chunk) for chunk in chunks]
+        
+        ai_results = {}
+        for chunk, verdicts in zip(chunks, chunk_results):
+            ai_results.update(zip(chunk, verdicts))
+        
+        return [
+            self._resolve_match(name_a, name_b, fuzzy[i][0], fuzzy[i][1], True, ai_results.get(i))
+            for i, (name_a, name_b) in enumerate(pairs)
+        ]
+    
+    def build_candidate_index(self, names: List[str], **kwargs) -> CandidateIndex:
+        """
+        Build a candidate index over reference names using this matcher's preprocessing.
+        
+        Args:
+            names: Reference names to index
+            **kwargs: Extra CandidateIndex options (ngram_size, weights, ...)
+            
+        Returns:
+            CandidateIndex instance
+        """
+        return CandidateIndex(names, preprocess=self.preprocess_name, **kwargs)
+    
     def match_dataframes(self, 
                         df_a: pd.DataFrame, 
                         df_b: pd.DataFrame,
                         name_col_a: str,
                         name_col_b: str,
                         use_ai: bool = True,
-                        top_n: int = 1) -> pd.DataFrame:
+                        top_n: int = 1,
+                        candidate_k: Optional[int] = 25) -> pd.DataFrame:
         """
-        Match all names from df_a against all names in df_b.
+        Match all names from df_a against the names in df_b.
+        
+        An index over df_b is built once, and each name in df_a is only scored
+        against its top `candidate_k` candidates from that index. Names in df_a
+        are preprocessed once per row and names in df_b once per build.
         
         Args:
             df_a: First dataframe
@@ -376,22 +761,31 @@ Respond with just a number between 0 and 100."""
             name_col_b: Name column in df_b
             use_ai: Whether to use AI enhancement
             top_n: Number of top matches to return per name
+            candidate_k: Candidates per name sent to the full scorer
+                (None scores every row of df_b, the exhaustive behaviour)
             
         Returns:
             DataFrame with match results
         """
         results = []
         
-        for idx_a, row_a in df_a.iterrows():
-            name_a = row_a[name_col_a]
-            matches = []
+        index = self.build_candidate_index(df_b[name_col_b].tolist())
+        index_labels_b = df_b.index.tolist()
+        
+        for position_a, (idx_a, name_a) in enumerate(df_a[name_col_a].items()):
+            clean_a = self.preprocess_name(name_a)
             
-            # Compare against all names in df_b
-            for idx_b, row_b in df_b.iterrows():
-                name_b = row_b[name_col_b]
-                match_result = self.match_pair(name_a, name_b, use_ai)
+            if candidate_k is None:
+                positions = range(len(index))
+            else:
+                positions = [pos for pos, _ in index.candidates_clean(clean_a, top_k=max(candidate_k, top_n))]
+            
+            matches = []
+            for pos in positions:
+                fuzzy_score, fuzzy_details = self.fuzzy_match_preprocessed(clean_a, index.clean_names[pos])
+                match_result = self._resolve_match(name_a, index.names[pos], fuzzy_score, fuzzy_details, use_ai)
                 match_result['index_a'] = idx_a
-                match_result['index_b'] = idx_b
+                match_result['index_b'] = index_labels_b[pos]
                 matches.append(match_result)
             
             # Sort by final score and take top N
@@ -403,8 +797,8 @@ Respond with just a number between 0 and 100."""
                 results.append(match)
             
             # Log progress
-            if (idx_a + 1) % 10 == 0:
-                logger.info(f"Processed {idx_a + 1}/{len(df_a)} names")
+            if (position_a + 1) % 100 == 0:
+                logger.info(f"Processed {position_a + 1}/{len(df_a)} names")
         
         return pd.DataFrame(results)
     
@@ -419,7 +813,11 @@ Respond with just a number between 0 and 100."""
             **self.stats,
             'fuzzy_only_pct': (self.stats['fuzzy_only'] / max(self.stats['total_processed'], 1)) * 100,
             'ai_enhanced_pct': (self.stats['ai_enhanced'] / max(self.stats['total_processed'], 1)) * 100,
-            'api_error_rate': (self.stats['api_errors'] / max(self.stats['ai_enhanced'], 1)) * 100
+            'api_error_rate': (self.stats['api_errors'] / max(self.stats['ai_enhanced'], 1)) * 100,
+            'cache_hit_rate': (self.stats['cache_hits'] /
+                               max(self.stats['cache_hits'] + self.stats['cache_misses'], 1)) * 100,
+            'estimated_cost_usd': self.estimated_cost(),
+            'cost_per_1k_ai_pairs': self.estimated_cost() / max(self.stats['ai_enhanced'], 1) * 1000
         }
     
     def reset_statistics(self):
@@ -428,7 +826,14 @@ Respond with just a number between 0 and 100."""
             'fuzzy_only': 0,
             'ai_enhanced': 0,
             'total_processed': 0,
-            'api_errors': 0
+            'api_errors': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'api_requests': 0,
+            'batch_requests': 0,
+            'batch_fallbacks': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0
         }
 
 
@@ -0,0 +1,8 @@
+"""Crash-safe, append-only checkpointing for long batch runs."""
+
+try:
+    from .segment_store import SegmentCheckpointStore
+except ImportError:
+    from segment_store import SegmentCheckpointStore
+
+__all__ = ['SegmentCheckpointStore']
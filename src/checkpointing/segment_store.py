@@ -0,0 +1,346 @@
+"""
+Append-only, crash-safe checkpoint store for long batch runs.
+
+Each completed batch is written once as its own Parquet segment (temporary
+file, fsync, rename). Commits are appended as one JSON line each to a manifest
+log and fsynced, so committing a batch costs the same however many batches came
+before it; every COMPACT_EVERY records (and on open) the log is folded into a
+JSON manifest snapshot written the same atomic way, and truncated. A crash
+leaves at most a torn last log line, which is ignored. A batch is only "done"
+once its log record (or snapshot entry) exists, which makes resume idempotent:
+re-running a batch whose segment was never committed simply rewrites it.
+
+Layout::
+
+    <directory>/
+        manifest.json
+        manifest.log
+        segments/batch-<id>.parquet
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_LOG_NAME = 'manifest.log'
+SEGMENT_DIR = 'segments'
+MANIFEST_VERSION = 1
+COMPACT_EVERY = 1000  # Log records before the manifest snapshot is rewritten
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write bytes to a temp file in the same directory, fsync and rename over path."""
+    tmp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename (no-op on platforms without directory fsync)."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SegmentCheckpointStore:
+    """
+    Batch-keyed checkpoint store backed by Parquet segments and a manifest.
+
+    Attributes:
+        directory (Path): Root directory of the store
+        run_key (Optional[str]): Identifies the input the batches were cut
+            from; opening an existing store with a different key raises
+        metadata (Dict[str, Any]): Free-form run state persisted in the manifest
+    """
+
+    def __init__(self, directory: Union[str, Path], run_key: Optional[str] = None):
+        """
+        Open (or create) a checkpoint store.
+
+        Args:
+            directory: Store directory
+            run_key: Fingerprint of the run's input (e.g. row count and batch
+                size); protects against resuming with different batches
+
+        Raises:
+            ValueError: If the store was created for a different run_key
+        """
+        self.directory = Path(directory)
+        self.segment_dir = self.directory / SEGMENT_DIR
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.log_path = self.directory / MANIFEST_LOG_NAME
+        self._lock = threading.Lock()
+        self._log_records = 0
+
+        manifest = self._read_manifest()
+        if manifest is None:
+            manifest = {
+                'version': MANIFEST_VERSION,
+                'run_key': run_key,
+                'created_at': time.time(),
+                'segments': {},
+                'metadata': {},
+            }
+        elif run_key is not None and manifest.get('run_key') not in (None, run_key):
+            raise ValueError(
+                f"Checkpoint at {self.directory} belongs to run {manifest['run_key']!r}, "
+                f"not {run_key!r}; clear it or use another directory"
+            )
+        else:
+            manifest['run_key'] = manifest.get('run_key') or run_key
+
+        self._manifest = manifest
+        self.run_key = manifest['run_key']
+        self.metadata = manifest['metadata']
+        self._replay_log()
+        self._remove_orphans()
+        # Fold the log into the snapshot (this also drops a torn last line)
+        if not self.manifest_path.exists() or (self.log_path.exists() and self.log_path.stat().st_size):
+            self._compact_manifest()
+
+        if manifest['segments']:
+            logger.info(f"Checkpoint store {self.directory}: {len(manifest['segments']):,} batches, "
+                        f"{self.total_rows():,} rows already committed")
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return None
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one manifest log record to the in-memory manifest."""
+        if 'batch' in record:
+            self._manifest['segments'][record['batch']] = record['entry']
+        self.metadata.update(record.get('metadata') or {})
+
+    def _replay_log(self) -> None:
+        """Apply the log records written since the last snapshot (stops at a torn last line)."""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring torn record at the end of {self.log_path}")
+                    break
+                self._apply(record)
+                self._log_records += 1
+
+    def _append_log(self, record: Dict[str, Any]) -> None:
+        """Durably append one record to the manifest log; compact when the log grows long."""
+        with open(self.log_path, 'ab') as f:
+            f.write(json.dumps(record, default=str).encode() + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+        self._log_records += 1
+        if self._log_records >= COMPACT_EVERY:
+            self._compact_manifest()
+
+    def _compact_manifest(self) -> None:
+        """Write the full manifest snapshot, then start an empty log."""
+        self._manifest['updated_at'] = time.time()
+        _atomic_write_bytes(self.manifest_path, json.dumps(self._manifest, indent=2, default=str).encode())
+        # Log records already in the snapshot are harmless to replay if this is interrupted
+        _atomic_write_bytes(self.log_path, b'')
+        self._log_records = 0
+
+    def _remove_orphans(self) -> None:
+        """Delete temp files and segments that never made it into the manifest."""
+        committed = {entry['file'] for entry in self._manifest['segments'].values() if entry.get('file')}
+        for path in list(self.segment_dir.iterdir()) + list(self.directory.glob('.*.tmp')):
+            if path.is_file() and path.name not in committed:
+                path.unlink()
+
+    @staticmethod
+    def _segment_name(batch_id) -> str:
+        return f'batch-{batch_id}.parquet'
+
+    def is_complete(self, batch_id) -> bool:
+        """Whether a batch has been committed."""
+        return str(batch_id) in self._manifest['segments']
+
+    def completed_batches(self) -> Set[str]:
+        """IDs (as strings) of all committed batches."""
+        return set(self._manifest['segments'])
+
+    def total_rows(self) -> int:
+        """Rows across all committed segments (read from the manifest)."""
+        return sum(entry['rows'] for entry in self._manifest['segments'].values())
+
+    def write_segment(self,
+                      batch_id,
+                      records: Union[List[Dict[str, Any]], pd.DataFrame, pa.Table],
+                      overwrite: bool = False,
+                      metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Commit one batch's results as a new segment.
+
+        Args:
+            batch_id: Unique batch identifier (int or str)
+            records: Rows as dicts, a DataFrame or an Arrow table
+            overwrite: Replace an already committed batch
+            metadata: Run state to persist in the same commit record
+
+        Returns:
+            True if written, False if the batch was already committed
+        """
+        key = str(batch_id)
+        if isinstance(records, pa.Table):
+            table = records
+        elif isinstance(records, pd.DataFrame):
+            table = pa.Table.from_pandas(records, preserve_index=False)
+        else:
+            table = pa.Table.from_pylist(list(records))
+
+        with self._lock:
+            if key in self._manifest['segments'] and not overwrite:
+                return False
+
+            file_name = None
+            if table.num_rows:
+                file_name = self._segment_name(key)
+                tmp_path = self.segment_dir / f'.{file_name}.{uuid.uuid4().hex}.tmp'
+                pq.write_table(table, tmp_path)
+                with open(tmp_path, 'rb') as f:
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.segment_dir / file_name)
+                _fsync_dir(self.segment_dir)
+
+            record = {
+                'batch': key,
+                'entry': {'file': file_name, 'rows': table.num_rows, 'written_at': time.time()},
+            }
+            if metadata:
+                record['metadata'] = metadata
+            self._append_log(record)
+        return True
+
+    def update_metadata(self, **values) -> None:
+        """Persist run state (elapsed time, counters, ...) in the manifest."""
+        with self._lock:
+            self._append_log({'metadata': values})
+
+    def _segment_paths(self) -> List[Path]:
+        entries = self._manifest['segments'].values()
+        return [self.segment_dir / entry['file'] for entry in entries if entry.get('file')]
+
+    def schema(self) -> Optional[pa.Schema]:
+        """Unified schema of all segments (footers only; None when empty)."""
+        schemas = [pq.read_schema(path) for path in self._segment_paths()]
+        if not schemas:
+            return None
+        # Segments where a column was all-null carry a null type; widen to the real one
+        return pa.unify_schemas(schemas, promote_options='permissive')
+
+    def iter_tables(self, columns: Optional[List[str]] = None) -> Iterator[pa.Table]:
+        """
+        Stream committed segments one at a time, cast to the unified schema.
+
+        Args:
+            columns: Optional subset of columns to read
+        """
+        schema = self.schema()
+        if schema is None:
+            return
+        if columns is not None:
+            schema = pa.schema([schema.field(name) for name in columns])
+        for path in self._segment_paths():
+            table = pq.read_table(path, columns=[name for name in schema.names
+                                                 if name in pq.read_schema(path).names])
+            for field in schema:
+                if field.name not in table.column_names:
+                    table = table.append_column(field.name, pa.nulls(table.num_rows, field.type))
+            yield table.select(schema.names).cast(schema)
+
+    def iter_dataframes(self, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Stream committed segments as DataFrames."""
+        for table in self.iter_tables(columns):
+            yield table.to_pandas()
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Stream committed rows as dicts."""
+        for table in self.iter_tables():
+            yield from table.to_pylist()
+
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read every committed row into one DataFrame."""
+        frames = list(self.iter_dataframes(columns))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def compact(self, output_path: Union[str, Path], columns: Optional[List[str]] = None) -> int:
+        """
+        Stream all segments into a single Parquet file (atomic rename).
+
+        Args:
+            output_path: Destination Parquet file
+            columns: Optional subset of columns to keep
+
+        Returns:
+            Number of rows written
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(f'.{output_path.name}.{uuid.uuid4().hex}.tmp')
+
+        rows = 0
+        writer = None
+        try:
+            try:
+                for table in self.iter_tables(columns):
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, table.schema)
+                    writer.write_table(table)
+                    rows += table.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            if writer is None:
+                return 0
+            os.replace(tmp_path, output_path)
+        finally:
+            # A failed or empty compaction leaves neither the output nor a partial temp file
+            if tmp_path.exists():
+                tmp_path.unlink()
+        logger.info(f"Compacted {len(self._segment_paths()):,} segments ({rows:,} rows) into {output_path}")
+        return rows
+
+    def clear(self) -> None:
+        """Delete all segments, the manifest and its log."""
+        with self._lock:
+            for path in self.segment_dir.iterdir():
+                path.unlink()
+            for path in (self.manifest_path, self.log_path):
+                if path.exists():
+                    path.unlink()
+            self._log_records = 0
+            self._manifest['segments'] = {}
+            self._manifest['metadata'] = {}
+            self.metadata = self._manifest['metadata']
@@ -0,0 +1,16 @@
+"""Shared fixtures for the checkpoint store tests"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+CHECKPOINTING_DIR = Path(__file__).resolve().parents[1]
+
+# Scripts import the store as a top-level module from src/checkpointing
+sys.path.append(str(CHECKPOINTING_DIR))
+
+
+@pytest.fixture
+def store_dir(tmp_path) -> Path:
+    return tmp_path / 'checkpoint'
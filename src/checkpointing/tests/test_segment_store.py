@@ -0,0 +1,139 @@
+"""SegmentCheckpointStore: crash/resume, torn manifest lines, orphan cleanup and compaction"""
+
+import subprocess
+import sys
+import textwrap
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import segment_store
+from segment_store import SegmentCheckpointStore
+
+from conftest import CHECKPOINTING_DIR
+
+
+def batch_rows(batch_id: int, size: int = 3):
+    return [{'batch': batch_id, 'item': i, 'score': batch_id * 10.0 + i} for i in range(size)]
+
+
+def test_committed_batches_survive_reopening(store_dir):
+    store = SegmentCheckpointStore(store_dir, run_key='run-1')
+    for batch_id in range(3):
+        assert store.write_segment(batch_id, batch_rows(batch_id), metadata={'elapsed_seconds': batch_id})
+    store.update_metadata(total_batches=5)
+
+    reopened = SegmentCheckpointStore(store_dir, run_key='run-1')
+    assert reopened.completed_batches() == {'0', '1', '2'}
+    assert reopened.total_rows() == 9
+    assert reopened.metadata == {'elapsed_seconds': 2, 'total_batches': 5}
+    # Committed batches are not written twice
+    assert not reopened.write_segment(1, batch_rows(99))
+    assert reopened.load()['batch'].tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+
+    with pytest.raises(ValueError):
+        SegmentCheckpointStore(store_dir, run_key='run-2')
+
+
+def test_resume_after_a_crash_mid_commit(store_dir):
+    # Commit five batches, then die after batch 5's segment is renamed into place but before its log record
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {str(CHECKPOINTING_DIR)!r})
+        from segment_store import SegmentCheckpointStore
+
+        store = SegmentCheckpointStore({str(store_dir)!r}, run_key='run-1')
+        for batch_id in range(5):
+            store.write_segment(batch_id, [{{'batch': batch_id, 'item': 0}}])
+        store._append_log = lambda record: os._exit(1)
+        store.write_segment(5, [{{'batch': 5, 'item': 0}}])
+    """)
+    assert subprocess.run([sys.executable, '-c', script]).returncode == 1
+    assert (store_dir / 'segments' / 'batch-5.parquet').exists()
+
+    store = SegmentCheckpointStore(store_dir, run_key='run-1')
+    assert store.completed_batches() == {str(batch_id) for batch_id in range(5)}
+    # The uncommitted segment is an orphan and is removed
+    assert not (store_dir / 'segments' / 'batch-5.parquet').exists()
+
+    pending = [batch_id for batch_id in range(8) if not store.is_complete(batch_id)]
+    assert pending == [5, 6, 7]
+    for batch_id in pending:
+        store.write_segment(batch_id, [{'batch': batch_id, 'item': 0}])
+    assert store.load()['batch'].tolist() == list(range(8))
+
+
+def test_torn_last_log_line_is_ignored(store_dir):
+    store = SegmentCheckpointStore(store_dir)
+    store.write_segment(0, batch_rows(0))
+    store.write_segment(1, batch_rows(1))
+    with open(store_dir / 'manifest.log', 'ab') as f:
+        f.write(b'{"batch": "2", "entry": {"file": "batch-2.par')
+
+    reopened = SegmentCheckpointStore(store_dir)
+    assert reopened.completed_batches() == {'0', '1'}
+    # The log is folded into the snapshot on open, dropping the torn line
+    assert (store_dir / 'manifest.log').read_bytes() == b''
+    assert set(SegmentCheckpointStore(store_dir).completed_batches()) == {'0', '1'}
+
+
+def test_log_is_folded_into_the_snapshot(store_dir, monkeypatch):
+    monkeypatch.setattr(segment_store, 'COMPACT_EVERY', 3)
+    store = SegmentCheckpointStore(store_dir)
+    for batch_id in range(4):
+        store.write_segment(batch_id, batch_rows(batch_id))
+
+    # Three records were compacted into manifest.json, the fourth is in the log
+    assert len((store_dir / 'manifest.log').read_bytes().splitlines()) == 1
+    assert SegmentCheckpointStore(store_dir).completed_batches() == {'0', '1', '2', '3'}
+
+
+def test_orphans_and_temp_files_are_removed(store_dir):
+    store = SegmentCheckpointStore(store_dir)
+    store.write_segment(0, batch_rows(0))
+    store.write_segment(1, [])  # Empty batches are committed without a segment file
+    segments = store_dir / 'segments'
+    pq.write_table(pq.read_table(segments / 'batch-0.parquet'), segments / 'batch-7.parquet')
+    (segments / '.batch-8.parquet.0123.tmp').write_bytes(b'partial')
+    (store_dir / '.manifest.json.0123.tmp').write_bytes(b'{')
+
+    reopened = SegmentCheckpointStore(store_dir)
+    assert sorted(path.name for path in segments.iterdir()) == ['batch-0.parquet']
+    assert not list(store_dir.glob('.*.tmp'))
+    assert reopened.completed_batches() == {'0', '1'}
+    assert reopened.total_rows() == 3
+
+
+def test_compact_widens_schemas(store_dir, tmp_path):
+    store = SegmentCheckpointStore(store_dir)
+    store.write_segment(0, [{'name': 'a', 'ai_score': None}])
+    store.write_segment(1, [{'name': 'b', 'ai_score': 42.0, 'extra': 'x'}])
+
+    output = tmp_path / 'out' / 'all.parquet'
+    assert store.compact(output) == 2
+    compacted = pd.read_parquet(output)
+    assert compacted['name'].tolist() == ['a', 'b']
+    assert compacted['ai_score'].tolist()[1] == 42.0
+    assert compacted['extra'].tolist() == [None, 'x']
+
+
+def test_failed_compaction_leaves_no_temp_file(store_dir, tmp_path, monkeypatch):
+    store = SegmentCheckpointStore(store_dir)
+    for batch_id in range(3):
+        store.write_segment(batch_id, batch_rows(batch_id))
+    output = tmp_path / 'out' / 'all.parquet'
+
+    def failing_tables(columns=None):
+        tables = SegmentCheckpointStore.iter_tables(store, columns)
+        yield next(tables)
+        raise OSError('disk full')
+
+    monkeypatch.setattr(store, 'iter_tables', failing_tables)
+    with pytest.raises(OSError):
+        store.compact(output)
+    assert list(output.parent.iterdir()) == []
+
+    # Nothing to compact: no output and no temp file either
+    assert SegmentCheckpointStore(tmp_path / 'empty').compact(output) == 0
+    assert list(output.parent.iterdir()) == []
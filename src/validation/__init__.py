@@ -0,0 +1,8 @@
+"""Vectorized validation kernels shared across projects."""
+
+try:
+    from .npi import digits_from_codes, is_valid_npi, luhn_valid, npi_digits, valid_npis
+except ImportError:
+    from npi import digits_from_codes, is_valid_npi, luhn_valid, npi_digits, valid_npis
+
+__all__ = ['digits_from_codes', 'is_valid_npi', 'luhn_valid', 'npi_digits', 'valid_npis']
@@ -0,0 +1,108 @@
+"""
+Vectorized NPI check-digit validation.
+
+An NPI is 10 digits whose last digit is a Luhn check digit computed over the
+first nine digits prefixed with the card issuer code 80840 (which contributes
+a constant 24 to the Luhn sum). Values are turned into an (n, 10) uint8 digit
+matrix in one step -- integer arithmetic for numeric input, a character code
+view for text -- and the Luhn sum is evaluated over the whole matrix at once,
+so validating millions of NPIs never enters a per-value Python loop.
+"""
+
+from typing import Any, Tuple
+
+import numpy as np
+
+NPI_LENGTH = 10
+
+# Luhn contribution of the 80840 prefix
+_PREFIX_SUM = 24
+
+
+def _integer_digits(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    well_formed = (values >= 10 ** (NPI_LENGTH - 1)) & (values < 10 ** NPI_LENGTH)
+    remaining = np.where(well_formed, values, 0).astype(np.int64)
+    digits = np.empty((len(values), NPI_LENGTH), dtype=np.uint8)
+    for position in range(NPI_LENGTH - 1, -1, -1):
+        remaining, digits[:, position] = np.divmod(remaining, 10)
+    return digits, well_formed
+
+
+def digits_from_codes(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Digit matrix from an (n, 10) matrix of character codes.
+
+    Args:
+        codes: ASCII bytes (uint8) or code points (uint32), one row per value
+
+    Returns:
+        (digits, well_formed): uint8 digits (zeros for malformed rows) and a
+        mask of rows made of the characters 0-9 only.
+    """
+    well_formed = ((codes >= ord('0')) & (codes <= ord('9'))).all(axis=1)
+    digits = (codes - ord('0')).astype(np.uint8)
+    digits[~well_formed] = 0
+    return digits, well_formed
+
+
+def _string_digits(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    text = values.astype(str)
+    width = max(text.dtype.itemsize // 4, NPI_LENGTH)
+    text = text.astype(f'<U{width}')
+    # Fixed-width UCS-4: one uint32 code point per character, zero padded
+    codes = text.view(np.uint32).reshape(len(text), width)
+    digits, well_formed = digits_from_codes(codes[:, :NPI_LENGTH])
+    if width > NPI_LENGTH:
+        well_formed &= codes[:, NPI_LENGTH] == 0
+    return digits, well_formed
+
+
+def npi_digits(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Digit matrix of candidate NPIs.
+
+    Args:
+        values: Sequence/array/Series of NPIs as strings or integers (floats
+            must be integral; NaN and None are malformed)
+
+    Returns:
+        (digits, well_formed): an (n, 10) uint8 matrix (zeros for malformed
+        rows) and a boolean mask of values that are exactly 10 ASCII digits.
+    """
+    values = np.asarray(values)
+    if values.ndim == 0:
+        values = values.reshape(1)
+
+    if values.dtype.kind in 'iu':
+        return _integer_digits(values.astype(np.int64))
+    if values.dtype.kind == 'f':
+        integral = np.isfinite(values) & (np.mod(values, 1) == 0)
+        digits, well_formed = _integer_digits(np.where(integral, values, 0).astype(np.int64))
+        return digits, well_formed & integral
+    # Anything else is compared as text (None/NaN/pd.NA render as non-digits)
+    return _string_digits(values)
+
+
+def luhn_valid(digits: np.ndarray) -> np.ndarray:
+    """Whether each row of an (n, 10) NPI digit matrix has a valid check digit."""
+    body = digits[:, :NPI_LENGTH - 1].astype(np.int16)
+
+    # Double every other digit starting from the rightmost body digit
+    doubled = body[:, 0::2] * 2
+    doubled -= 9 * (doubled > 9)
+    total = doubled.sum(axis=1) + body[:, 1::2].sum(axis=1) + _PREFIX_SUM
+
+    return (total + digits[:, -1]) % 10 == 0
+
+
+def valid_npis(values: Any) -> np.ndarray:
+    """Boolean mask of values that are well-formed NPIs with a valid check digit."""
+    digits, well_formed = npi_digits(values)
+    return well_formed & luhn_valid(digits)
+
+
+def is_valid_npi(npi: Any) -> bool:
+    """Whether a single value is a valid NPI."""
+    if npi is None:
+        return False
+    return bool(valid_npis([npi])[0])